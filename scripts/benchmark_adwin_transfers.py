@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+ADwin Array Transfer Benchmark
+
+Measures the Python overhead of reading a Data_ array from the ADwin: read_probes('int_array') converted
+with np.array(list(...)) (what the experiments used to do), GetData_Long of the ADwin package followed by
+np.asarray, and read_data / read_data_into of AdwinGoldDevice, which copy the array GetData_Long returns
+once into a NumPy buffer. read_data_into is also timed without the instrumentation every device method
+gets (arbiter, metrics and tracing span), and the cost of the copy and of the instrumentation compared to
+GetData_Long + np.asarray is printed at the end. The ADwin is simulated by a driver library that copies
+from memory, so the times are the cost on the PC side only; the transfer over the bus comes on top and is
+the same for all cases.
+
+Usage:
+    python scripts/benchmark_adwin_transfers.py [--length N] [--repeat N]
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import argparse
+import ctypes
+import statistics
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ADwin  # noqa: E402
+from src.Controller.adwin_gold import AdwinGoldDevice  # noqa: E402
+from src.core.adwin_helpers import digits_to_volts  # noqa: E402
+
+
+class SimulatedDll:
+    """driver library whose Data_ arrays are NumPy arrays in memory"""
+
+    def __init__(self, length):
+        self.data = {
+            ADwin.ADwin.ADWIN_DATATYPE_INT32: np.arange(length, dtype=np.int32),
+            ADwin.ADwin.ADWIN_DATATYPE_SINGLE: np.arange(length, dtype=np.float32),
+            ADwin.ADwin.ADWIN_DATATYPE_DOUBLE: np.arange(length, dtype=np.float64),
+        }
+
+    def e_Get_Data(self, buffer, data_type, data_no, start, count, device_no, error_pointer):
+        source = self.data[data_type]
+        ctypes.memmove(buffer, source.ctypes.data + (start - 1) * source.itemsize, count * source.itemsize)
+
+
+class SimulatedADwin(ADwin.ADwin):
+    """ADwin of the ADwin package on top of SimulatedDll"""
+
+    def __init__(self, length):
+        self.dll = SimulatedDll(length)
+        self.ADwindir = ''
+        self.DeviceNo = 1
+        self.raiseExceptions = True
+        self.useNumpyArrays = False
+
+
+def time_case(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--length', type=int, default=10000, help='number of elements per read')
+    parser.add_argument('--repeat', type=int, default=200, help='number of reads per case')
+    args = parser.parse_args()
+
+    adw = SimulatedADwin(args.length)
+    with patch('src.Controller.adwin_gold.ADwin.ADwin', lambda **kwargs: adw):
+        device = AdwinGoldDevice(boot=False)
+    buffer = np.empty(args.length, dtype=np.int32)
+    # the method without the wrapper that Device puts around hardware access methods
+    read_data_into = AdwinGoldDevice.read_data_into.__wrapped__
+    volts = np.empty(args.length, dtype=np.float64)
+
+    def volts_loop(digits):
+        # per element conversion the sweep experiments used before digits_to_volts
+        return np.array([(int(d) * 20.0 / 65535.0) - 10.0 if 0 <= int(d) <= 65535 else 0.0 for d in digits])
+
+    cases = {
+        'read_probes + np.array(list())': lambda: np.array(list(device.read_probes('int_array', 1, args.length))),
+        'GetData_Long + np.asarray': lambda: np.asarray(device.adw.GetData_Long(1, 1, args.length)),
+        'read_data': lambda: device.read_data(1, args.length),
+        'read_data_into (preallocated)': lambda: device.read_data_into(1, buffer),
+        'read_data_into, not instrumented': lambda: read_data_into(device, 1, buffer),
+        'volts, per element loop': lambda: volts_loop(device.read_probes('int_array', 2, args.length)),
+        'volts, digits_to_volts (out=)': lambda: digits_to_volts(device.read_data_into(2, buffer), out=volts),
+    }
+
+    print(f'{args.length} element reads, {args.repeat} repetitions')
+    print('{:<34s} {:>12s} {:>12s}'.format('case', 'median [us]', 'min [us]'))
+    medians = {}
+    for name, function in cases.items():
+        times = time_case(function, args.repeat)
+        medians[name] = statistics.median(times) * 1e6
+        print('{:<34s} {:>12.1f} {:>12.1f}'.format(name, medians[name], min(times) * 1e6))
+
+    baseline = medians['GetData_Long + np.asarray']
+    plain = medians['read_data_into, not instrumented']
+    instrumented = medians['read_data_into (preallocated)']
+    print()
+    print('read_data_into compared to GetData_Long + np.asarray, difference of the medians [us]:')
+    print('{:<34s} {:>12.1f}'.format('copy into the buffer + checks', plain - baseline))
+    print('{:<34s} {:>12.1f}'.format('instrumentation', instrumented - plain))
+    print('{:<34s} {:>12.1f}'.format('total', instrumented - baseline))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Plugin Registry Startup Benchmark
+
+Compares the time to list the devices and experiments of the project by importing every module
+(src.tools.export_default, what the GUI used to do) with the lazy plugin registry, cold (no manifest)
+and warm (cached manifest). Every measurement runs in a fresh interpreter so module caches do not
+affect the result; the time to import src.core itself is excluded.
+
+Usage:
+    python scripts/benchmark_plugin_registry.py [--repeat N]
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+CASES = {
+    'import all modules': '''
+from src.tools.export_default import find_devices_in_python_files, find_experiments_in_python_files
+devices = find_devices_in_python_files(os.path.abspath('src/Controller'))
+experiments = find_experiments_in_python_files(os.path.abspath('src/Model/experiments'))
+''',
+    'registry, cold manifest': '''
+from src.core.plugin_registry import PluginRegistry
+registry = PluginRegistry(manifest={manifest!r})
+devices, experiments = registry.entries('device'), registry.entries('experiment')
+''',
+    'registry, cached manifest': '''
+from src.core.plugin_registry import PluginRegistry
+registry = PluginRegistry(manifest={manifest!r})
+devices, experiments = registry.entries('device'), registry.entries('experiment')
+''',
+    'import src.Model.experiments': '''
+import src.Model.experiments
+devices, experiments = [], dir(src.Model.experiments)
+''',
+}
+
+# src.core (Qt, matplotlib, pandas) is loaded by the GUI in any case and is not part of the timing
+TIMER = '''
+import time, os, sys
+sys.path.insert(0, os.getcwd())
+import src.core
+start = time.perf_counter()
+{code}
+print(time.perf_counter() - start, len(devices), len(experiments))
+'''
+
+
+def run_case(code: str):
+    result = subprocess.run([sys.executable, '-c', TIMER.format(code=code)], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+    seconds, num_devices, num_experiments = result.stdout.strip().splitlines()[-1].split()
+    return float(seconds), int(num_devices), int(num_experiments)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=3, help='number of runs per case')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manifest = str(Path(tmp_dir) / 'plugin_manifest.json')
+        print('{:<32s} {:>10s} {:>10s} {:>8s} {:>12s}'.format('case', 'median [s]', 'min [s]', 'devices',
+                                                               'experiments'))
+        for name, code in CASES.items():
+            times = []
+            try:
+                for _ in range(args.repeat):
+                    if name == 'registry, cold manifest':
+                        Path(manifest).unlink(missing_ok=True)
+                    seconds, num_devices, num_experiments = run_case(code.format(manifest=manifest))
+                    times.append(seconds)
+            except RuntimeError as e:
+                print('{:<32s} failed: {}'.format(name, e))
+                continue
+            print('{:<32s} {:>10.3f} {:>10.3f} {:>8d} {:>12d}'.format(name, statistics.median(times), min(times),
+                                                                       num_devices, num_experiments))
+
+
+if __name__ == '__main__':
+    main()
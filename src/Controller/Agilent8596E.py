@@ -29,6 +29,7 @@ import pyvisa
 import pyvisa.errors
 import numpy as np
 from src.core import Device, Parameter
+from src.core.scpi_transport import VisaTransport
 import pandas as pd
 from src.core.struct_hdf5 import save_parameters_hdf5
 
@@ -87,11 +88,22 @@ class Agilent8596E(Device):
             self.agilent_analyzer = rm.open_resource(
                 'GPIB' + str(self.settings['GPIB_num']) + '::' + str(self.settings['port']) + '::INSTR')
             self.agilent_analyzer.write("IP;")  # initialize
+            # the commands already end with ';', so a batch concatenates them into one GPIB message
+            self._transport = VisaTransport(self.agilent_analyzer, separator='')
             print("Agilent8596E Connected. Please note that the units are in MHz, us, and dBm")
         return 0
 
     def update(self, settings):
         super(Agilent8596E, self).update(settings)
+        if getattr(self, '_transport', None) is None:
+            # not connected yet, Device.__init__ only stores the settings
+            self._update_settings(settings)
+        else:
+            # the settings are written as one GPIB message
+            with self._transport.batch(check_errors=False):
+                self._update_settings(settings)
+
+    def _update_settings(self, settings):
         for key, value in settings.items():
             if key == 'connection_type':
                 self._connect()
@@ -103,14 +115,14 @@ class Agilent8596E(Device):
                 # only send update to Device if connection to Device has been established
                 if self._settings_initialized:
                     if key == "VAVG ":
-                        self.agilent_analyzer.write(key + str(value) + ";")
+                        self._transport.write(key + str(value) + ";")
                     elif key == "ST " :
-                        self.agilent_analyzer.write(key + str(value) + "US;")
+                        self._transport.write(key + str(value) + "US;")
                     else:
-                        self.agilent_analyzer.write(key + str(value) + "MZ;")
+                        self._transport.write(key + str(value) + "MZ;")
 
     def write(self, message):
-        self.agilent_analyzer.write(message)
+        self._transport.write(message)
 
     @property
     def _PROBES(self):
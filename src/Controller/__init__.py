@@ -12,23 +12,25 @@ import sys
 from pathlib import Path
 import numpy as np
 
-# Import basic device classes that don't have platform dependencies
-from .pulse_blaster import PulseBlaster
-from .awg520 import AWG520Device
-from .sg384 import SG384Generator
-from .windfreak_synth_usbii import WindfreakSynthUSBII
-from .example_device import ExampleDevice, Plant, PIController
-
 # Import the base Device class
 from src.core.device import Device
 from src.core.parameter import Parameter
+from src.core.plugin_registry import lazy_attributes
 
-# Import MicrowaveGeneratorBase for mock SG384Generator
-try:
-    from .mw_generator_base import MicrowaveGeneratorBase
-except ImportError:
-    # Fallback if the base class is not available
-    MicrowaveGeneratorBase = Device
+# the drivers are imported the first time they are used, so importing one driver module (or the package)
+# does not load all the others, see src.core.plugin_registry
+_DEVICES = {
+    # device classes that don't have platform dependencies
+    'PulseBlaster': '.pulse_blaster',
+    'AWG520Device': '.awg520',
+    'WindfreakSynthUSBII': '.windfreak_synth_usbii',
+    'ExampleDevice': '.example_device',
+    'Plant': '.example_device',
+    'PIController': '.example_device',
+    'MicrowaveGeneratorBase': '.mw_generator_base',
+}
+# used instead if the driver cannot be imported
+_FALLBACKS = {'MicrowaveGeneratorBase': Device}
 
 # Mock device classes for cross-platform compatibility
 class MockSG384Generator(Device):
@@ -1031,32 +1033,30 @@ class MockMUXControl(MockMUXControlDevice):
 
 # Platform-specific device assignments
 if sys.platform.startswith('win'):
-    try:
-        from .ni_daq import PXI6733, NI6281, PCI6229, PCI6601, NIDAQ
-    except ImportError:
-        PXI6733 = MockNI6229
-        NI6281 = MockNI6229
-        PCI6229 = MockNI6229
-        PCI6601 = MockPCI6601
-        NIDAQ = MockNI6229
-    
-    try:
-        from .nanodrive import MCLNanoDrive
-        from .adwin_gold import AdwinGoldDevice
-    except ImportError:
-        MCLNanoDrive = MockMCLNanoDrive
-        AdwinGoldDevice = MockAdwinGoldDevice
-    
-    try:
-        from .sg384 import SG384Generator
-    except ImportError:
-        SG384Generator = MockSG384Generator
-    
-    try:
-        from .mux_control import MUXControlDevice, MUXControl
-    except ImportError:
-        MUXControlDevice = MockMUXControlDevice
-        MUXControl = MockMUXControl
+    _DEVICES.update({
+        'PXI6733': '.ni_daq',
+        'NI6281': '.ni_daq',
+        'PCI6229': '.ni_daq',
+        'PCI6601': '.ni_daq',
+        'NIDAQ': '.ni_daq',
+        'MCLNanoDrive': '.nanodrive',
+        'AdwinGoldDevice': '.adwin_gold',
+        'SG384Generator': '.sg384',
+        'MUXControlDevice': '.mux_control',
+        'MUXControl': '.mux_control',
+    })
+    _FALLBACKS.update({
+        'PXI6733': MockNI6229,
+        'NI6281': MockNI6229,
+        'PCI6229': MockNI6229,
+        'PCI6601': MockPCI6601,
+        'NIDAQ': MockNI6229,
+        'MCLNanoDrive': MockMCLNanoDrive,
+        'AdwinGoldDevice': MockAdwinGoldDevice,
+        'SG384Generator': MockSG384Generator,
+        'MUXControlDevice': MockMUXControlDevice,
+        'MUXControl': MockMUXControl,
+    })
 else:
     PXI6733 = MockNI6229
     NI6281 = MockNI6229
@@ -1069,33 +1069,36 @@ else:
     MUXControlDevice = MockMUXControlDevice
     MUXControl = MockMUXControl
 
+__getattr__, __dir__ = lazy_attributes(__name__, _DEVICES, _FALLBACKS)
+
+# device kind: name of the class in this package
 _DEVICE_REGISTRY = {
-    "awg520": AWG520Device, 
-    "sg384": SG384Generator,
-    "windfreak_synth_usbii": WindfreakSynthUSBII,
-    "nanodrive": MCLNanoDrive,
-    "adwin": AdwinGoldDevice,
-    "pulseblaster": PulseBlaster,
-    "example_device": ExampleDevice,
-    "plant": Plant,
-    "pi_controller": PIController,
-    "mux_control": MUXControlDevice,
-    "mux": MUXControl,  # Legacy alias
+    "awg520": 'AWG520Device',
+    "sg384": 'SG384Generator',
+    "windfreak_synth_usbii": 'WindfreakSynthUSBII',
+    "nanodrive": 'MCLNanoDrive',
+    "adwin": 'AdwinGoldDevice',
+    "pulseblaster": 'PulseBlaster',
+    "example_device": 'ExampleDevice',
+    "plant": 'Plant',
+    "pi_controller": 'PIController',
+    "mux_control": 'MUXControlDevice',
+    "mux": 'MUXControl',  # Legacy alias
 }
 
 _DEVICE_REGISTRY.update({
-    "ni_daq": NIDAQ,
-    "pxi6733": PXI6733,
-    "ni6281": NI6281,
-    "pci6229": PCI6229,
-    "pci6601": PCI6601,
+    "ni_daq": 'NIDAQ',
+    "pxi6733": 'PXI6733',
+    "ni6281": 'NI6281',
+    "pci6229": 'PCI6229',
+    "pci6601": 'PCI6601',
 })
 
 def create_device(kind: str, **kwargs):
-    cls = _DEVICE_REGISTRY.get(kind.lower())
-    if cls is None:
+    class_name = _DEVICE_REGISTRY.get(kind.lower())
+    if class_name is None:
         raise ValueError(f"Unknown device type: {kind}")
-    return cls(**kwargs)
+    return getattr(sys.modules[__name__], class_name)(**kwargs)
 
 __all__ = [
     'PXI6733', 'NI6281', 'PCI6229', 'PCI6601', 'NIDAQ',
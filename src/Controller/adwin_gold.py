@@ -1,11 +1,62 @@
 from src.core import Device, Parameter
+import numpy as np
 import ADwin
 from ADwin import ADwinError
 from src.core.adbasic_compiler import ADbasicCompiler
+from src.core.adwin_stream import FifoStream
 from pathlib import Path
+import hashlib
 import os
+import re
+import time
 #from ctypes import *
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator, NamedTuple
+
+# NumPy type of a Data_ array: suffix of the GetData_, SetData_ and GetFifo_ methods
+_DATA_TYPES = {
+    np.dtype(np.int32): 'Long',
+    np.dtype(np.float32): 'Float',
+    np.dtype(np.float64): 'Double',
+}
+
+
+# process number in the extension of an ADbasic binary, e.g. .TB1 (T11 processor, process 1) or .TBA (process 10)
+_PROCESS_EXTENSION = re.compile(r'\.T[0-9A-Z]([1-9A])$', re.IGNORECASE)
+
+
+class ResidentProcess(NamedTuple):
+    '''
+    ADbasic binary that was loaded into a process slot of the ADwin by this device.
+    '''
+    filepath: str  # file it was loaded from
+    sha256: str  # hash of the file content, identifies the binary
+    loaded_at: float  # time.time() of the load
+
+
+class AdwinSnapshot(NamedTuple):
+    '''
+    Global variables of the ADwin read with one block transfer for the Par_ and one for the FPar_ values,
+    so the values belong together instead of coming from different process cycles.
+    '''
+    timestamp: float  # time.time() before the transfer
+    duration: float  # seconds the transfers took
+    pars: Dict[int, int]  # {index: value} of Par_#
+    fpars: Dict[int, float]  # {index: value} of FPar_#
+
+
+def poll_intervals(first=0.001, factor=2.0, maximum=0.05) -> Iterator[float]:
+    '''
+    Adaptive backoff for wait_until: starts polling quickly for conditions that are met soon and slows down
+    to maximum for long waits.
+    Args:
+        first: first wait in s
+        factor: growth of the wait from one poll to the next
+        maximum: longest wait in s
+    '''
+    interval = first
+    while True:
+        yield interval
+        interval = min(interval * factor, maximum)
 
 
 class AdwinGoldDevice(Device):
@@ -68,10 +119,20 @@ class AdwinGoldDevice(Device):
         ]),
     ])
 
+    # array and FIFO access hold the device like read_probes, also when a FifoStream polls from its thread
+    _TRACED_METHODS = Device._TRACED_METHODS + ('read_data_into', 'read_fifo_into', 'fifo_levels', 'clear_fifo',
+                                                'snapshot')
+
+    # ADwin parameters are typically very precise
+    _PARAMETER_TOLERANCES = {'delay': {'type': 'absolute', 'value': 0.001}}
+
     def __init__(self, name=None, settings=None, boot=True, num_devices=1):
         super(AdwinGoldDevice, self).__init__(name, settings)
 
         self.adw = ADwin.ADwin(DeviceNo=num_devices, raiseExceptions=1)
+        # binaries loaded by this device per process number. Without a boot the content of the ADwin is unknown,
+        # so the first load_process of each slot always loads
+        self._resident = {}
         #boots the ADwin which resets processes and global variables. Input boot = False if ADwin is already initilized
         if boot:
             try:
@@ -98,8 +159,9 @@ class AdwinGoldDevice(Device):
                         if param_value == '' or param_value == ' ':   #will clear the process if load is updated to be empty
                             self.clear_process(process_number)
                         else:
-                            self.load_process(param_value)  #loads binary file ex. 'D:/PyCharmProjects/.../test_process.TB2'
-                            #may want to add some way to make sure a process isnt loaded over another as it can cause memory fragmenting
+                            # loads binary file ex. 'D:/PyCharmProjects/.../test_process.TB2', skipped if the
+                            # same binary is already in the process slot
+                            self.load_process(param_value)
                     elif param == 'delay':
                         self.adw.Set_Processdelay(process_number, param_value)
                     elif param == 'running':
@@ -109,19 +171,79 @@ class AdwinGoldDevice(Device):
                             self.stop_process(process_number)
 
 
-    def load_process(self, filepath):
+    def load_process(self, filepath, force=False):
         '''
         Loads a binary file created using ADbasic (max 10).
         Note: Only variables defined in the ADbasic script can be interacted with in the python code else will return 0.
+        The device remembers which binary (by content hash) it loaded into each process slot. Loading the binary
+        that is already in the slot does nothing, so experiments that use the same process back to back do not
+        reload it. A different binary replaces the old one after clearing the slot, loading over a process
+        fragments the memory of the ADwin.
         Args:
             filepath: file location of ADbasic script
                 -If the ADbasic files are in an 'ADbasic' subfolder in the same location as the controller can use
                     Path(__file__).parent / 'ADbasic' / '__name__.__(processor & number)__'
                 -If using in GUI can copy path and paste.
+            force: load even if the same binary is already in the slot, e.g. after the ADwin was reset by
+                another program
+        Returns:
+            bool: True if the binary was loaded, False if it was already in the slot
 
         Note: Path handling is now cross-platform compatible using pathlib.Path
         '''
+        filepath = str(filepath)
+        number = self._process_number(filepath)
+        try:
+            with open(filepath, 'rb') as f:
+                sha256 = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            sha256 = None  # let the ADwin report the missing file
+
+        if number is None or sha256 is None:
+            # the slot is unknown, any binary could have been replaced
+            self._resident.clear()
+            self.adw.Load_Process(filepath)
+            return True
+
+        resident = self._resident.get(number)
+        if resident is not None and not force:
+            if resident.sha256 == sha256:
+                return False
+            self.adw.Clear_Process(number)
+        self._resident.pop(number, None)
         self.adw.Load_Process(filepath)
+        self._resident[number] = ResidentProcess(filepath, sha256, time.time())
+        return True
+
+    @staticmethod
+    def _process_number(filepath):
+        '''process number from the extension of an ADbasic binary, None if it has no .T?# extension'''
+        match = _PROCESS_EXTENSION.search(str(filepath))
+        if match is None:
+            return None
+        digit = match.group(1).upper()
+        return 10 if digit == 'A' else int(digit)
+
+    @property
+    def resident_processes(self) -> Dict[int, ResidentProcess]:
+        '''
+        Binaries this device loaded into the ADwin, {process number: ResidentProcess}
+        '''
+        return dict(self._resident)
+
+    def is_resident(self, filepath):
+        '''
+        Returns True if the binary in filepath is in its process slot, i.e. load_process(filepath) would not load
+        '''
+        number = self._process_number(filepath)
+        resident = self._resident.get(number)
+        if resident is None:
+            return False
+        try:
+            with open(filepath, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest() == resident.sha256
+        except OSError:
+            return False
 
     def clear_process(self, number):
         '''
@@ -129,8 +251,79 @@ class AdwinGoldDevice(Device):
         Args:
             number: number corresponding to process defined in file path ex. test_process.TB2 is process 2
         '''
+        self._resident.pop(number, None)
         self.adw.Clear_Process(number)
 
+    def warm_start(self, number, pars=(), fpars=(), data=None, start=True, timeout=1.0):
+        '''
+        Brings a loaded process back to a fresh state without rebooting the ADwin: stops it, waits until it stopped,
+        sets the given global variables and Data_ arrays to 0 and starts it again, which runs its Init section.
+        Rebooting takes seconds and unloads all processes, this takes milliseconds.
+        Note: Par_ and FPar_ variables are shared by all processes, only reset the ones this process uses.
+        Args:
+            number: process number (1-10)
+            pars: indices of the Par_ variables to set to 0
+            fpars: indices of the FPar_ variables to set to 0
+            data: {Data_id: dtype} of the Data_ arrays to fill with 0 (int32 for Long, float32 for Float, float64
+                for Float64), None for none
+            start: start the process afterwards
+            timeout: maximum time in s to wait for the process to stop
+        Raises:
+            TimeoutError: if the process did not stop within timeout
+        '''
+        if (number < 1) or (number > 10):
+            raise KeyError
+        self._stop_and_wait(number, timeout)
+
+        for Par_id in pars:
+            self.set_int_var(Par_id, 0)
+        for FPar_id in fpars:
+            self.set_float_var(FPar_id, 0.0)
+        for Data_id, dtype in (data or {}).items():
+            length = self.adw.Data_Length(Data_id)
+            suffix = _DATA_TYPES[np.dtype(dtype)]
+            getattr(self.adw, f'SetData_{suffix}')(np.zeros(length, dtype=dtype), Data_id, 1, length)
+
+        if start:
+            self.adw.Start_Process(number)
+
+    def _stop_and_wait(self, number, timeout):
+        self.adw.Stop_Process(number)
+        deadline = time.monotonic() + timeout
+        for interval in poll_intervals():
+            if self.adw.Process_Status(number) == 0:
+                return
+            if time.monotonic() > deadline:
+                raise TimeoutError(f'ADwin process {number} did not stop within {timeout} s')
+            time.sleep(interval)
+
+    def prepare_process(self, filepath, pars=(), fpars=(), data=None, reboot=False, timeout=1.0):
+        '''
+        Gets a process ready for a run: stops it, loads the binary and resets it with warm_start without starting
+        it. The binary stays loaded between runs, so experiments that run again only pay for the reset. The ADwin
+        is rebooted instead if reboot is set or the process does not stop within timeout.
+        Args:
+            filepath: binary file of the process, the extension .TB# gives the process number
+            pars, fpars, data: global variables and Data_ arrays the process uses, see warm_start
+            reboot: reboot the ADwin first, e.g. if the data looks wrong
+            timeout: maximum time in s to wait for the process to stop
+        Returns:
+            bool: True if the ADwin was rebooted
+        '''
+        number = self._process_number(str(filepath))
+        if number is None:
+            raise ValueError(f'no process number in the extension of {filepath}')
+        if not reboot:
+            try:
+                self._stop_and_wait(number, timeout)
+            except TimeoutError as e:
+                print(f"Warning: {e}, rebooting the ADwin")
+                reboot = True
+        if reboot:
+            self.reboot_adwin()
+        self.load_process(filepath)
+        self.warm_start(number, pars, fpars, data, start=False, timeout=timeout)
+        return reboot
 
     def start_process(self, number):
         '''
@@ -206,6 +399,71 @@ class AdwinGoldDevice(Device):
             raise KeyError
         return self.adw.Get_FPar(FPar_id)
 
+    def snapshot(self, pars=None, fpars=None):
+        '''
+        Reads several global variables at once with Get_Par_Block/Get_FPar_Block (Get_Par_All/Get_FPar_All for
+        all), one driver call each instead of one per variable.
+        Args:
+            pars: indices of the Par_ variables, None for all 80, empty for none
+            fpars: indices of the FPar_ variables, None for all 80, empty for none
+        Returns:
+            AdwinSnapshot: timestamped values
+        '''
+        timestamp = time.time()
+        start = time.perf_counter()
+        par_values = self._read_block(pars, self.adw.Get_Par_All, self.adw.Get_Par_Block, int)
+        fpar_values = self._read_block(fpars, self.adw.Get_FPar_All, self.adw.Get_FPar_Block, float)
+        return AdwinSnapshot(timestamp, time.perf_counter() - start, par_values, fpar_values)
+
+    @staticmethod
+    def _read_block(indices, read_all, read_block, convert):
+        if indices is None:
+            return {index: convert(value) for index, value in enumerate(read_all(), start=1)}
+        indices = sorted(set(indices))
+        if not indices:
+            return {}
+        if indices[0] < 1 or indices[-1] > 80:
+            raise KeyError
+        # one block from the lowest to the highest index is still a single transfer
+        values = read_block(indices[0], indices[-1] - indices[0] + 1)
+        return {index: convert(values[index - indices[0]]) for index in indices}
+
+    def wait_until(self, predicate: Callable[[AdwinSnapshot], bool], timeout=10.0,
+                   poll_schedule: Optional[Iterable[float]] = None, pars=None, fpars=()):
+        '''
+        Polls snapshot(pars, fpars) until predicate(snapshot) is true. The device is only held while a snapshot
+        is read, not between the polls. Driver errors while polling (e.g. Get_Par timeouts during long process
+        cycles) are tolerated until the timeout.
+        Args:
+            predicate: function of the snapshot that returns True when the wait is over
+            timeout: maximum time to wait in s
+            poll_schedule: waits in s between the polls, the last one is repeated; poll_intervals() if None
+            pars: indices of the Par_ variables the predicate needs, None for all
+            fpars: indices of the FPar_ variables the predicate needs, None for all
+        Returns:
+            AdwinSnapshot: the snapshot that fulfilled the predicate
+        Raises:
+            TimeoutError: if the predicate was not fulfilled within timeout
+        '''
+        deadline = time.monotonic() + timeout
+        schedule = iter(poll_intervals() if poll_schedule is None else poll_schedule)
+        interval = 0.
+        last_error = None
+        while True:
+            try:
+                snapshot = self.snapshot(pars, fpars)
+            except ADwinError as e:
+                last_error = e
+            else:
+                if predicate(snapshot):
+                    return snapshot
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f'ADwin condition not met within {timeout} s'
+                                   + (f', last error: {last_error}' if last_error is not None else ''))
+            interval = next(schedule, interval)
+            time.sleep(min(interval, remaining))
+
     def get_int_data(self, Data_id, length=100):
         '''
         Gets integer data array from Data_#
@@ -219,6 +477,109 @@ class AdwinGoldDevice(Device):
             raise KeyError
         return self.read_probes('int_array', Data_id, length)
 
+    def read_data_into(self, Data_id, out, offset=0, length=None, start=1):
+        '''
+        Reads Data_# into a preallocated NumPy array: the array the driver returns is copied once into out,
+        without a list or an element by element conversion. The type of out selects the ADbasic type of the array: int32 for Long, float32 for Float and
+        float64 for Float64.
+        Args:
+            Data_id: index of data array (range Data_1 to Data_200)
+            out: 1D C-contiguous NumPy array that receives the data
+            offset: first element of out that is written
+            length: number of elements to read, the rest of out after offset if None
+            start: first index of Data_# that is read (ADbasic arrays start at 1)
+        Returns:
+            numpy.ndarray: view of out[offset:offset + length] holding the data
+        '''
+        return self._transfer_into('Data', Data_id, out, offset, length, start)
+
+    def _transfer_into(self, kind, Data_id, out, offset, length, start=None):
+        '''
+        Copies Data_# (kind 'Data', from index start) or FIFO Data_# (kind 'Fifo') into out[offset:offset + length]
+        '''
+        if (Data_id < 1) or (Data_id > 200):
+            raise KeyError
+        if out.dtype not in _DATA_TYPES:
+            raise TypeError(f'out must be int32, float32 or float64, not {out.dtype}')
+        if out.ndim != 1 or not out.flags.c_contiguous or not out.flags.writeable:
+            raise ValueError('out must be a writeable 1D C-contiguous array')
+        if length is None:
+            length = len(out) - offset
+        if offset < 0 or length < 0 or offset + length > len(out):
+            raise ValueError(f'{length} elements at offset {offset} do not fit into an array of {len(out)}')
+        view = out[offset:offset + length]
+        if length == 0:
+            return view
+
+        position = (start, length) if kind == 'Data' else (length,)
+        values = getattr(self.adw, f'Get{kind}_{_DATA_TYPES[out.dtype]}')(Data_id, *position)
+        try:
+            # the ctypes array the ADwin package returns (a NumPy array with useNumpyArrays) is wrapped without
+            # converting its elements, so the only copy is the one into out
+            view[:] = np.frombuffer(values, dtype=out.dtype, count=length)
+        except TypeError:
+            # lists, e.g. from mocked drivers
+            view[:] = np.asarray(values, dtype=out.dtype)
+        return view
+
+    def read_data(self, Data_id, length, dtype=np.int32, start=1):
+        '''
+        Reads Data_# into a new NumPy array, see read_data_into.
+        Args:
+            Data_id: index of data array (range Data_1 to Data_200)
+            length: number of elements to read
+            dtype: int32 for Long, float32 for Float, float64 for Float64 arrays
+            start: first index of Data_# that is read
+        Returns:
+            numpy.ndarray: the data
+        '''
+        return self.read_data_into(Data_id, np.empty(length, dtype=dtype), start=start)
+
+    def read_fifo_into(self, Data_id, out, offset=0, length=None):
+        '''
+        Reads elements of the FIFO Data_# into a preallocated NumPy array, see read_data_into.
+        Only read as many elements as fifo_levels reports as used.
+        Args:
+            Data_id: index of the FIFO array (range Data_1 to Data_200)
+            out: 1D C-contiguous NumPy array that receives the data
+            offset: first element of out that is written
+            length: number of elements to read, the rest of out after offset if None
+        Returns:
+            numpy.ndarray: view of out[offset:offset + length] holding the data
+        '''
+        return self._transfer_into('Fifo', Data_id, out, offset, length)
+
+    def fifo_levels(self, Data_id):
+        '''
+        Gets the fill level of the FIFO Data_#
+        Args:
+            Data_id: index of the FIFO array
+        Returns:
+            tuple: (number of used elements, number of free elements)
+        '''
+        return self.adw.Fifo_Full(Data_id), self.adw.Fifo_Empty(Data_id)
+
+    def clear_fifo(self, Data_id):
+        '''
+        Empties the FIFO Data_#
+        Args:
+            Data_id: index of the FIFO array
+        '''
+        self.adw.Fifo_Clear(Data_id)
+
+    def stream_fifo(self, Data_id, dtype=np.int32, record_size=1, **kwargs):
+        '''
+        Starts reading the FIFO Data_# on a background thread, see src.core.adwin_stream.
+        Args:
+            Data_id: index of the FIFO array
+            dtype: int32 for Long, float32 for Float, float64 for Float64 FIFOs
+            record_size: number of consecutive elements that form one record
+            **kwargs: capacity, chunk_size, poll_interval and clear of FifoStream
+        Returns:
+            FifoStream: the running stream, stop it with stop() or use it as a context manager
+        '''
+        return FifoStream(self, Data_id, dtype=dtype, record_size=record_size, **kwargs).start()
+
     def get_float_data(self, Data_id, length=100):
         '''
         Gets float data array from Data_#
@@ -295,6 +656,7 @@ class AdwinGoldDevice(Device):
             raise
         if new_adw_handle is not None:
             self.adw = new_adw_handle
+            self._resident = {}
 
     def compile_and_load_process(self, source_file: str, process_number: Optional[int] = None, 
                                 auto_start: bool = False, verbose: bool = False,
@@ -449,11 +811,11 @@ class AdwinGoldDevice(Device):
 
         #can use read_probes('fifo_full') to get how many elements are in a Fifo array
         elif key == 'int_fifo':
-            value = self.adw.GetFifo_Long(id, 1, length)
+            value = self.adw.GetFifo_Long(id, length)
         elif key == 'float_fifo':
-            value = self.adw.GetFifo_Float(id, 1, length)
-        elif key == 'float_64_fifo':
-            value = self.adw.GetFifo_Double(id, 1, length)
+            value = self.adw.GetFifo_Float(id, length)
+        elif key == 'float64_fifo':
+            value = self.adw.GetFifo_Double(id, length)
         elif key == 'fifo_empty':
             value = self.adw.Fifo_Empty(id)
         elif key == 'fifo_full':
@@ -473,6 +835,36 @@ class AdwinGoldDevice(Device):
 
         return value
 
+    # probes that are contained in one Get_*_All transfer: probe: (transfer probe, index of Par_1)
+    _BULK_PROBES = {
+        'int_var': ('all_ints', 0), 'all_ints': ('all_ints', None),
+        'float_var': ('all_floats', 0), 'all_floats': ('all_floats', None),
+        'float64_var': ('all_float64s', 0), 'all_float64s': ('all_float64s', None)
+    }
+
+    def _read_probes_many(self, keys):
+        '''
+        Reads the probes in keys, variables of the same type are taken from one Get_Par_All / Get_FPar_All /
+        Get_FPar_All_Double transfer when more than one of them is requested (int_var etc. are read with id=1).
+        '''
+        transfers = {}
+        for key in keys:
+            if key in self._BULK_PROBES:
+                transfer = self._BULK_PROBES[key][0]
+                transfers[transfer] = transfers.get(transfer, 0) + 1
+
+        values = {}
+        cache = {}
+        for key in keys:
+            transfer, index = self._BULK_PROBES.get(key, (None, None))
+            if transfer is None or transfers[transfer] < 2:
+                values[key] = self.read_probes(key)
+                continue
+            if transfer not in cache:
+                cache[transfer] = self.read_probes(transfer)
+            values[key] = cache[transfer] if index is None else cache[transfer][index]
+        return values
+
     @property
     def _PROBES(self):
         return {
@@ -0,0 +1,109 @@
+'<ADbasic Header, Headerversion 001.001>
+' Process_Number                 = 1
+' Initial_Processdelay           = 3000
+' Eventsource                    = Timer
+' Control_long_Delays_for_Stop   = No
+' Priority                       = Low
+' Priority_Low_Level             = 1
+' Version                        = 1
+' ADbasic_Version                = 6.3.0
+' Optimize                       = Yes
+' Optimize_Level                 = 1
+' Stacksize                      = 1000
+' Info_Last_Save                 = DUTTLAB8  Duttlab8\Duttlab
+'<Header End>
+'
+' ODMR List Stepper — counts photons while stepping the SG384 through its frequency list.
+' The SG384 is in list mode with its rear panel trigger input wired to a digital output of the ADwin.
+' For every list point: wait SETTLE_US, count falling edges on Counter 1 for DWELL_US, then pulse the
+' trigger output to step the SG384 to the next point. After the last point the SG384 returns to the
+' first point, so the next sweep starts aligned. One point is measured per Event.
+
+#Include ADwinGoldII.inc
+
+'================= Interface =================
+' From Python:
+'   Par_1  = N_POINTS    (points in the SG384 list, >= 1)
+'   Par_2  = SETTLE_US   (µs after a trigger before counting)
+'   Par_3  = DWELL_US    (µs counting time per point)
+'   Par_4  = N_SWEEPS    (passes through the list, >= 1)
+'   Par_5  = TRIG_CH     (digital output wired to the SG384 trigger input)
+'   Par_6  = PULSE_US    (trigger pulse width in µs)
+' To Python:
+'   Data_1[] = counts, Data_1[sweep * N_POINTS + point], sweep and point 0-based, array 1-based
+'   Par_20   = ready flag (1 = all sweeps done)
+'   Par_21   = points measured in the current sweep
+'   Par_22   = completed sweeps
+'   Par_80   = signature (7781)
+'=============================================
+
+#Define MAX_VALUES 100000
+
+Dim Data_1[MAX_VALUES] As Long   ' counts per point and sweep
+
+Dim n_points, n_sweeps, settle_us, dwell_us, trig_ch, pulse_us As Long
+Dim point, sweep, k As Long
+
+Init:
+  n_points = Par_1
+  IF (n_points < 1) THEN n_points = 1
+  n_sweeps = Par_4
+  IF (n_sweeps < 1) THEN n_sweeps = 1
+  ' setup_adwin_for_list_odmr refuses scans that do not fit, this only keeps Data_1 from overflowing
+  IF (n_points > MAX_VALUES) THEN n_points = MAX_VALUES
+  IF (n_points * n_sweeps > MAX_VALUES) THEN n_sweeps = MAX_VALUES / n_points
+  settle_us = Par_2
+  dwell_us = Par_3
+  trig_ch = Par_5
+  pulse_us = Par_6
+  IF (pulse_us < 1) THEN pulse_us = 1
+
+  Conf_DIO(1100b)       ' DIO 16-31 are outputs
+  DIGOUT(trig_ch, 0)
+
+  Cnt_Enable(0)
+  Cnt_Mode(1, 8)        ' count falling edges
+  Cnt_Clear(1)
+
+  FOR k = 1 TO n_points * n_sweeps
+    Data_1[k] = 0
+  NEXT k
+
+  point = 0
+  sweep = 0
+  Par_20 = 0
+  Par_21 = 0
+  Par_22 = 0
+  Par_80 = 7781
+
+Event:
+  ' settle at the current list point
+  IO_Sleep(settle_us * 100)
+
+  ' count for the dwell time
+  Cnt_Clear(1)
+  Cnt_Enable(1)
+  IO_Sleep(dwell_us * 100)
+  Cnt_Enable(0)
+  Data_1[sweep * n_points + point + 1] = Cnt_Read(1)
+
+  ' step the SG384 to the next list point
+  DIGOUT(trig_ch, 1)
+  IO_Sleep(pulse_us * 100)
+  DIGOUT(trig_ch, 0)
+
+  Inc(point)
+  Par_21 = point
+  IF (point >= n_points) THEN
+    point = 0
+    Inc(sweep)
+    Par_22 = sweep
+    IF (sweep >= n_sweeps) THEN
+      Par_20 = 1
+      End
+    ENDIF
+  ENDIF
+
+Finish:
+  Cnt_Enable(0)
+  DIGOUT(trig_ch, 0)
@@ -37,6 +37,7 @@
 '   Data_2[]  = DAC digits per step (LONG)
 '   FData_1[] = volts per step (FLOAT)
 '   Data_3[]  = triangle pos per step (LONG)
+'   Data_4    = FIFO, (counts, DAC digits) per step as they are measured, for streaming (LONG)
 '   Par_20    = ready flag (1=data ready)
 '   Par_21    = number of points (2*N_STEPS-2)
 '   Par_22    = current step index (0-based)
@@ -92,6 +93,7 @@ Dim Data_1[1000]  As Long   ' counts per step
 Dim Data_2[1000]  As Long   ' DAC digits per step
 Dim FData_1[1000] As Float  ' volts per step
 Dim Data_3[1000]  As Long   ' triangle pos per step
+Dim Data_4[10000] As Long As Fifo   ' (counts, DAC digits) pairs streamed to the PC
 
 Init:
   
@@ -222,6 +224,7 @@ Event:
         Par_22 = 0
         Par_23 = 0
         Par_24 = 0.0
+        FIFO_Clear(4)
         
         ' Configure counter once for entire sweep
         Cnt_Enable(0)
@@ -339,6 +342,8 @@ Event:
         ENDIF
         
         Data_1[k+1] = Round(fd)
+        Data_4 = Data_1[k+1]
+        Data_4 = Data_2[k+1]
         state = 35
 
       Case 35     ' NEXT STEP OR FINISH
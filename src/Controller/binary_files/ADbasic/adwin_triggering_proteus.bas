@@ -35,6 +35,7 @@
 ' Par_8: repetition_counter
 ' Data_1: signal counts
 ' Data_2: reference counts
+' Data_3: FIFO, (signal, reference) counts of every event, for streaming
 ' Par_9: sequence_duration (with calibration offset): Time of the awg sequence
 
 #Include ADwinGoldII.inc
@@ -44,12 +45,14 @@ DIM count_time, reset_time, sequence_duration, sleep_duration AS FLOAT
 DIM trigger_duration, delay AS FLOAT
 DIM Data_1[20] AS LONG ' 100000 is the maximum number of iterations
 DIM Data_2[20] AS LONG ' 100000 is the maximum number of iterations
+DIM Data_3[200000] AS LONG AS FIFO ' (signal, reference) pairs streamed to the PC
 
 init:
   Cnt_Enable(0)
   Cnt_Mode(1,8)   ' Counter 1 set to increasing
   Par_7 = 0       ' acquisition done flag
   Par_8 = 0       ' repetition_counter
+  FIFO_Clear(3)
   number_of_signal_events = Par_5 * Par_6
   trigger_duration = 1  ' 10ns trigger pulse width (in 10 ns)
 
@@ -99,6 +102,8 @@ event:
   ref_count=Cnt_Read(1)         ' accumulate reference counts
   Cnt_Clear(1)             ' Clear counter 1
   Data_2[iteration_number] = Data_2[iteration_number] + ref_count
+  Data_3 = signal_count
+  Data_3 = ref_count
   signal_count = 0
   ref_count = 0
   IF (iteration_number = Par_6) THEN 'if we did all of our iterations for a given sequence, then go back to iteration 0
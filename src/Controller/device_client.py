@@ -27,15 +27,22 @@ class Device_Client(Device):
     def read_probes(self, key=None):
         """Fetch one or more probes from the server."""
         if key is None:
-            all_probes = {}
-            for k in self._PROBES.keys():
-                all_probes[k] = self.read_probes(k)
-            return all_probes
+            return self.read_probes_many(max_age=0)
 
         response = requests.get(f"{self.SERVER_URL}/read/{key}")
         response.raise_for_status()
         return response.json()
 
+    def _read_probes_many(self, keys):
+        """Fetch several probes over one keep-alive connection instead of a new connection per probe."""
+        values = {}
+        with requests.Session() as session:
+            for key in keys:
+                response = session.get(f"{self.SERVER_URL}/read/{key}")
+                response.raise_for_status()
+                values[key] = response.json()
+        return values
+
     def get_settings(self):
         """Fetch available settings from the server."""
         response = requests.get(f"{self.SERVER_URL}/settings")
@@ -18,6 +18,7 @@ import pyvisa.errors
 import socket
 
 from src.core import Parameter, Device
+from src.core.scpi_transport import SocketTransport, get_transport, release_transport
 
 # RANGE_MIN = 2025000000 #2.025 GHz
 RANGE_MIN = 1012500000
@@ -92,23 +93,24 @@ class MicrowaveGenerator(Device):
 
     def _lan_command(self, command):    #method for sending socket command through ethernet
         query = '?' in command  # if the command has a ?, query signifies that there will be a response
-        if not command.endswith('\n'):
-            command += '\n'
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as mysocket:
-            mysocket.connect(self.addr)
-            mysocket.sendall(command.encode())
-            if query:
-                reply = b''
-                while not reply.endswith(b'\n'):  # recives bytes until the characters \n
-                    reply += mysocket.recv(1024)  # recives up to size 1024
-                return reply.decode()
-            else:
-                return None
+        command = command.rstrip('\n')
+        # the socket stays open between commands and is shared with other devices using the same address
+        transport = getattr(self, '_transport', None)
+        if transport is None or transport.address != tuple(self.addr):
+            if transport is not None:
+                release_transport(transport)
+            addr = tuple(self.addr)
+            self._transport = transport = get_transport(('LAN',) + addr, lambda: SocketTransport(addr))
+        if query:
+            return transport.query(command)
+        else:
+            transport.write(command)
+            return None
 
     #Doesn't appear to be necessary, can't manually make two sessions conflict, rms may share well
     def __del__(self):
         if self.settings['connection_type'] == 'LAN':
-            pass    #LAN closes soket connection after each command is sent
+            self.close()
         else: #elif self.settings['connection_type'] == 'GPIB' or self.settings['connection_type'] == 'RS232':
             self.srs.close()
 
@@ -225,9 +227,11 @@ class MicrowaveGenerator(Device):
             except pyvisa.errors.VisaIOError:
                 return False
 
-    def close(self):  # dont need close for ethernet connection
+    def close(self):
         if self.settings['connection_type'] == 'LAN':
-            pass
+            if getattr(self, '_transport', None) is not None:
+                release_transport(self._transport)
+                self._transport = None
         else: #elif self.settings['connection_type'] == 'GPIB' or self.settings['connection_type'] == 'RS232':
             try:
                 self.srs.close()
@@ -6,12 +6,15 @@ import pyvisa
 from abc import ABC, abstractmethod
 from pathlib import Path
 from src.core.device import Device, Parameter  # <-- your existing base
+from src.core.scpi_transport import SocketTransport, VisaTransport, get_transport, release_transport
 import logging
 
 logger = logging.getLogger("mw_generator_base")
 
 class MicrowaveGeneratorBase(Device, ABC):
 
+    _ERROR_QUERY = None  # query for the last error, checked once at the end of a _batch
+
     _DEFAULT_SETTINGS = Parameter([
         Parameter('connection_type', 'LAN', ['LAN','GPIB','RS232'], 'Transport type'),
         # for LAN:
@@ -63,6 +66,10 @@ class MicrowaveGeneratorBase(Device, ABC):
             self._addr = (self.settings['ip_address'], self.settings['port'])
             # For testing purposes, create a dummy _inst for LAN connections
             self._inst = None
+            # the socket is shared with other devices that address the same generator and opened on first use
+            self._transport = get_transport(('LAN',) + self._addr, lambda: SocketTransport(
+                self._addr, timeout=self.settings['socket_timeout'],
+                connection_timeout=self.settings['connection_timeout'], error_query=self._ERROR_QUERY))
         elif t in ('GPIB','RS232'):
             rm = pyvisa.ResourceManager()
             res = self.settings['visa_resource']
@@ -74,6 +81,7 @@ class MicrowaveGeneratorBase(Device, ABC):
                 except AttributeError:
                     # some backends may not expose baud_rate property
                     logger.debug("Could not set baud_rate on VISA inst")
+            self._transport = VisaTransport(self._inst, error_query=self._ERROR_QUERY)
         else:
             raise ValueError(f"Unknown transport: {t}")
         
@@ -82,77 +90,41 @@ class MicrowaveGeneratorBase(Device, ABC):
             self._inst = None
 
     def _send(self, cmd: str):
-        if self.settings['connection_type']=='LAN':
-            # Try to reuse existing socket if available
-            if hasattr(self, '_sock') and self._sock is not None:
-                try:
-                    self._sock.sendall((cmd + "\n").encode())
-                    return
-                except (socket.error, OSError):
-                    # Socket is broken, create new one
-                    try:
-                        self._sock.close()
-                    except:
-                        pass
-                    self._sock = None
-            
-            # Create new socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.settings['socket_timeout'])
-            sock.connect(self._addr)
-            sock.sendall((cmd + "\n").encode())
-            # Store socket for reuse
-            self._sock = sock
-        else:  # GPIB or RS232
-            if self._inst is not None:
-                self._inst.write(cmd)
-            else:
-                raise RuntimeError(f"No VISA instrument available for {self.settings['connection_type']} connection")
+        if not self._in_update():
+            # written by a set_* method, the values last written by update may no longer hold
+            self.forget_confirmed_settings()
+        if self.settings['connection_type'] != 'LAN' and self._inst is None:
+            raise RuntimeError(f"No VISA instrument available for {self.settings['connection_type']} connection")
+        # the transport reuses its connection and reconnects once if it broke
+        self._transport.write(cmd)
 
     def _query(self, cmd: str) -> str:
+        if self.settings['connection_type']=='LAN' and not cmd.endswith('?'):
+            cmd = cmd.strip() + '?'
+        return self._transport.query(cmd)
+
+    def _query_many(self, cmds: list) -> list:
+        """
+        Sends several queries and returns the responses in the same order. Over LAN the queries are
+        pipelined, they are sent in one message before the first response is read.
+        """
         if self.settings['connection_type']=='LAN':
-            # Try to reuse existing socket if available
-            if hasattr(self, '_sock') and self._sock is not None:
-                try:
-                    if not cmd.endswith('?'):
-                        cmd = cmd.strip() + '?'
-                    self._sock.sendall((cmd + "\n").encode())
-                    data = b''
-                    while not data.endswith(b'\n'):
-                        data += self._sock.recv(1024)
-                    return data.decode().strip()
-                except (socket.error, OSError):
-                    # Socket is broken, create new one
-                    try:
-                        self._sock.close()
-                    except:
-                        pass
-                    self._sock = None
-            
-            # Create new socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(self.settings['socket_timeout'])
-            sock.connect(self._addr)
-            if not cmd.endswith('?'):
-                cmd = cmd.strip() + '?'
-            sock.sendall((cmd + "\n").encode())
-            data = b''
-            while not data.endswith(b'\n'):
-                data += sock.recv(1024)
-            sock.close()
-            return data.decode().strip()
-        else:
-            # GPIB or RS232
-            return self._inst.query(cmd)
+            cmds = [cmd if cmd.endswith('?') else cmd.strip() + '?' for cmd in cmds]
+        return self._transport.query_many(cmds)
+
+    def _batch(self, check_errors: bool = True):
+        """
+        Context manager that sends the commands written with _send inside the block as one message and
+        then checks the error queue of the generator once (see ScpiTransport.batch).
+        """
+        return self._transport.batch(check_errors=check_errors)
 
     def test_connection(self) -> bool:
         """Test if the device is reachable with timeout."""
         if self.settings['connection_type'] == 'LAN':
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(self.settings['connection_timeout'])
-                sock.connect(self._addr)
-                sock.close()
+                # opens the persistent connection, does nothing if it is already open
+                self._transport.open()
                 return True
             except (socket.timeout, socket.error):
                 return False
@@ -169,12 +141,8 @@ class MicrowaveGeneratorBase(Device, ABC):
     
     def close_connection(self):
         """Close the socket connection if it exists."""
-        if hasattr(self, '_sock') and self._sock is not None:
-            try:
-                self._sock.close()
-            except:
-                pass
-            self._sock = None
+        if self.settings['connection_type'] == 'LAN' and getattr(self, '_transport', None) is not None:
+            self._transport.close()
     
     @property
     def is_connected(self) -> bool:
@@ -202,8 +170,11 @@ class MicrowaveGeneratorBase(Device, ABC):
     def close(self):
         if self.settings['connection_type'] in ('GPIB','RS232'):
             self._inst.close()
+        elif getattr(self, '_transport', None) is not None:
+            release_transport(self._transport)
+            self._transport = None
 
     @property
     def sock(self):
         """Return the socket for testing purposes."""
-        return getattr(self, '_sock', None)
+        return getattr(getattr(self, '_transport', None), '_socket', None)
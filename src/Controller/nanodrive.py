@@ -1,10 +1,13 @@
 from src.core import Device, Parameter
 from ctypes import (
     c_int, c_short, c_double, c_uint, c_ushort, c_bool,
-    byref
+    byref, POINTER
 )
+import hashlib
 import platform
 
+import numpy as np
+
 if platform.system() == 'Windows':
     from ctypes import windll
 else:
@@ -79,6 +82,17 @@ class MCLNanoDrive(Device):
                                    Parameter('server_port', 5001, int, 'server_port'),
                                    ])
 
+    # update only sends the settings that differ from the values last written (see Device._DIFFERENTIAL_UPDATES)
+    _DIFFERENTIAL_UPDATES = True
+    # pulses, waveforms and a change of the handle act every time they are written
+    _ALWAYS_SEND = ('pulse', 'load_waveform', 'serial')
+    _INVALIDATES = {'load_waveform': ('x_pos', 'y_pos', 'z_pos'), 'serial': None}
+    _PARAMETER_TOLERANCES = {
+        'x_pos': {'type': 'absolute', 'value': 0.01},  # 0.01 microns
+        'y_pos': {'type': 'absolute', 'value': 0.01},
+        'z_pos': {'type': 'absolute', 'value': 0.01},
+    }
+
     def __init__(self, name=None, settings=None):
         try:  # Loads DLL file. Should be in 'binary_files' folder in 'Controller' folder that houses nanodrive.py
             dll_path = Path(__file__).parent / 'binary_files' / 'Madlib.dll'
@@ -93,6 +107,8 @@ class MCLNanoDrive(Device):
         self.set_read_waveform = False  # setup status to false so that a trigger doesnt occur without a setup
         self.set_load_waveform = False
         self.set_mult_ax_waveform = False
+        # waveform set up on each axis by setup: axis -> (hash of the values, num_datapoints, load_rate)
+        self._setup_waveforms = {}
 
         # set an error dictionary to see what issue device runs into
         self.mcl_error_dic = {
@@ -135,14 +151,15 @@ class MCLNanoDrive(Device):
         Updates internal settings of NanoDrive and physical parameters of position (including a waveform) and clock settings
         Args:
             settings: a dictionary in the standard settings format
-                -waveforms can be made using numpy arrays but inputs should be lists ie. wf = list(np.arrange(#,#,#))
+                -waveforms can be lists or NumPy arrays. float64 arrays are passed to the DLL without a copy but
+                 are not stored in the settings
         ex:
             update({'x_pos':5}) for setting position
             update({'axis':'x', 'num_datapoints':len(waveform), 'load_waveform':waveform}) for running a waveform
             update({'Pixel':{'mode':'low','pulse':True}}) for setting pixel clock to low and triggering a pulse
         '''
         # print('triggering nd update with: ',settings)
-        super(MCLNanoDrive, self).update(settings)  # updates settings as per entered with method
+        super(MCLNanoDrive, self).update(self._storable_settings(settings))  # updates settings as per entered with method
 
         if self._settings_initialized:
             for key, value in settings.items():  # goes through inputed settings to see what commands to send ot update parameters
@@ -150,6 +167,7 @@ class MCLNanoDrive(Device):
                 if key == 'serial':
                     self.close()
                     self._initilize_handle()  # changes handle under control
+                    self.forget_waveforms()
 
                 elif key in ['x_pos', 'y_pos', 'z_pos']:  # updates axis position
                     axis = self._axis_to_internal(key)
@@ -159,13 +177,14 @@ class MCLNanoDrive(Device):
                     if self.settings['num_datapoints'] != len(settings['load_waveform']):
                         print('Error: Length of waveform input list does not match number of data points')
                         raise ValueError('Length of waveform input list does not match number of data points')
-                    ArrayType = c_double * self.settings['num_datapoints']  # creates empty array of proper length
-                    wf = ArrayType(*settings['load_waveform'])  # fills array with waveform values
+                    wf = self._waveform_array(settings['load_waveform'])
                     load_rate = self._load_rate_check(self.settings['load_rate'])
                     axis = self._axis_to_internal(self.settings['axis'])
+                    # loading a waveform replaces the one set up on the axis
+                    self.forget_waveforms(self.settings['axis'])
                     error = self._check_error(
-                        self.DLL.MCL_LoadWaveFormN(axis, c_uint(self.settings['num_datapoints']), load_rate, byref(wf),
-                                                   self.handle))
+                        self.DLL.MCL_LoadWaveFormN(axis, c_uint(self.settings['num_datapoints']), load_rate,
+                                                   wf.ctypes.data_as(POINTER(c_double)), self.handle))
 
                 # see clock_functions method for descriptions of mode, polarity, and binding
                 elif key in ['Pixel', 'Line', 'Frame', 'Aux']:
@@ -200,10 +219,14 @@ class MCLNanoDrive(Device):
         Updates internal settings of NanoDrive and sets up for triggering commands
         Args:
             settings: a dictionary in the standard settings format
-                -waveforms can be made using numpy arrays but inputs should be lists ie. wf = list(np.arrange(x,x,x))
+                -waveforms can be lists or NumPy arrays. float64 arrays are passed to the DLL without a copy but
+                 are not stored in the settings
             axis: specific axis to move (can also specify in settings dictionary). If not specified sets up last interacted with axis
+
+        A load waveform that is identical (same values, number of points and load rate) to the one last set up on
+        the axis is not sent to the NanoDrive again, e.g. the same line waveform for every line of a scan.
         '''
-        super(MCLNanoDrive, self).update(settings)
+        super(MCLNanoDrive, self).update(self._storable_settings(settings))
         if axis != None:
             self.settings['axis'] = axis
         axis = self._axis_to_internal(self.settings['axis'])
@@ -220,12 +243,16 @@ class MCLNanoDrive(Device):
                 if self.settings['num_datapoints'] != len(settings['load_waveform']):
                     print('Error: Length of waveform imput list does not match number of data points')
                     raise ValueError('Length of waveform input list does not match number of data points')
-                ArrayType = c_double * self.settings['num_datapoints']
-                wf = ArrayType(*settings['load_waveform'])
+                wf = self._waveform_array(settings['load_waveform'])
                 load_rate = self._load_rate_check(self.settings['load_rate'])
-                error = self._check_error(
-                    self.DLL.MCL_Setup_LoadWaveFormN(axis, c_uint(self.settings['num_datapoints']), load_rate,
-                                                     byref(wf), self.handle))
+                waveform_key = (hashlib.sha256(memoryview(wf)).hexdigest(), self.settings['num_datapoints'],
+                                load_rate.value)
+                if self._setup_waveforms.get(self.settings['axis']) != waveform_key:
+                    self._setup_waveforms.pop(self.settings['axis'], None)
+                    error = self._check_error(
+                        self.DLL.MCL_Setup_LoadWaveFormN(axis, c_uint(self.settings['num_datapoints']), load_rate,
+                                                         wf.ctypes.data_as(POINTER(c_double)), self.handle))
+                    self._setup_waveforms[self.settings['axis']] = waveform_key
                 self.set_load_waveform = True  # lets trigger_load and waveform_acquisition run
 
             elif key == 'mult_ax':
@@ -241,6 +268,7 @@ class MCLNanoDrive(Device):
                     raise ValueError('Length of waveform input lists do not match number of data points')
                 time_step = self._time_step_to_internal(settings['mult_ax']['time_step'])
                 iterations = c_ushort(settings['mult_ax']['iterations'])
+                self.forget_waveforms()
                 error = self._check_error(self.DLL.MCL_WfmaSetup(byref(wf[0]), byref(wf[1]), byref(wf[2]),
                                                                  c_uint(self.settings['num_datapoints']), time_step,
                                                                  iterations, self.handle))
@@ -254,6 +282,8 @@ class MCLNanoDrive(Device):
             axis: specific axis to move (can also specify in settings dictionary). If not specified will trigger last interacted with axis
             mult_ax_stop=True to stop multi axis waveform (input along with arbirtrary key)
         '''
+        # waveforms move the stage away from the position last written by update
+        self.forget_confirmed_settings(['x_pos', 'y_pos', 'z_pos'])
         if mult_ax_stop:
             error = self._check_error(self.DLL.MCL_WfmaStop(self.handle))
             return None
@@ -306,6 +336,7 @@ class MCLNanoDrive(Device):
             self.settings['num_datapoints'] = num_datapoints
 
         axis = self._axis_to_internal(self.settings['axis'])
+        self.forget_confirmed_settings(['x_pos', 'y_pos', 'z_pos'])
         ArrayType = c_double * self.settings['num_datapoints']
         empty_wf = ArrayType()  # creates empty array for read data
         error = self._check_error(
@@ -327,6 +358,8 @@ class MCLNanoDrive(Device):
             reset=True to reset ALL clocks to defaults (with arbitrary clock input)
             pulse=True to generate a 250ns pulse on specified clock (pulse triggers after polarity and mode update)
         '''
+        # the clocks are written directly, update has to send their settings again
+        self.forget_confirmed_settings(['Pixel', 'Line', 'Frame', 'Aux'])
         if reset:
             error = self._check_error(self.DLL.MCL_IssResetDefaults(self.handle))
             reset_settings = {'Pixel': {'mode': 'low', 'polarity': 'low-to-high', 'binding': 'read'},
@@ -496,7 +529,7 @@ class MCLNanoDrive(Device):
 
         Args:
             axis (str): Axis for waveform ('x', 'y', 'z')
-            waveform (list): List of position values
+            waveform (list or np.ndarray): Position values
         """
         if axis not in ['x', 'y', 'z']:
             raise ValueError(f"Invalid axis: {axis}. Must be 'x', 'y', or 'z'")
@@ -619,6 +652,7 @@ class MCLNanoDrive(Device):
     def close(self):
         # releases control of the handle under control in this instance
         self.DLL.MCL_ReleaseHandle(self.handle)
+        self.forget_waveforms()
 
     # 2 error functions to see if an error occured when sending a command and raise the error if it does
     def _raise_error(self, message):
@@ -667,6 +701,29 @@ class MCLNanoDrive(Device):
         else:
             raise KeyError
 
+    def forget_waveforms(self, axis=None):
+        '''
+        Forgets which load waveforms were set up, so the next setup sends them to the NanoDrive again
+        Args:
+            axis: 'x', 'y', 'z' or 'aux', all axes if None
+        '''
+        if axis is None:
+            self._setup_waveforms.clear()
+        else:
+            self._setup_waveforms.pop(axis, None)
+
+    @staticmethod
+    def _waveform_array(waveform):
+        # float64 arrays in C order are used as they are, anything else is converted once by NumPy
+        return np.ascontiguousarray(waveform, dtype=np.float64)
+
+    @staticmethod
+    def _storable_settings(settings):
+        # waveforms given as NumPy arrays are not copied into the settings, the settings only accept lists
+        if isinstance(settings.get('load_waveform'), np.ndarray):
+            settings = {key: value for key, value in settings.items() if key != 'load_waveform'}
+        return settings
+
     def _multiaxis_waveform(self, input_list, empty=False):
         '''
         Sets waveform as empty if input is 0 ie [[x_waveform], [0], [z_waveform]]
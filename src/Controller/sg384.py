@@ -4,6 +4,7 @@
 from .mw_generator_base import MicrowaveGeneratorBase, Parameter
 import logging
 import time
+import numpy as np
 
 logger = logging.getLogger("sg384")
 
@@ -124,6 +125,21 @@ class SG384Generator(MicrowaveGeneratorBase):
         # add more SG384-only knobs here...
     ])
 
+    # update only sends the settings that differ from the values last written (see Device._DIFFERENTIAL_UPDATES)
+    _DIFFERENTIAL_UPDATES = True
+    _ERROR_QUERY = 'LERR?'  # last error code, 0 if there was none
+    # the SG384 resets the phase to 0 when the frequency changes, a new connection starts from an unknown state
+    _INVALIDATES = {'frequency': ('phase',), 'connection_type': None, 'ip_address': None, 'port': None,
+                    'visa_resource': None}
+    _PARAMETER_TOLERANCES = {
+        'frequency': {'type': 'relative', 'value': 0.0001},  # 0.01% (very precise for frequency)
+        'sweep_center_frequency': {'type': 'relative', 'value': 0.0001},
+        'sweep_max_frequency': {'type': 'relative', 'value': 0.0001},
+        'sweep_min_frequency': {'type': 'relative', 'value': 0.0001},
+        'power': {'type': 'absolute', 'value': 0.1},  # 0.1 dBm
+        'phase': {'type': 'absolute', 'value': 0.1},  # 0.1 degrees
+    }
+
     def __init__(self, name=None, settings=None):
         super().__init__(name, settings)
         # verify comms
@@ -676,39 +692,41 @@ class SG384Generator(MicrowaveGeneratorBase):
                 print(f"🔧 Set frequency first: {freq_value/1e9:.3f} GHz (phase reset to 0°)")
                 time.sleep(0.1)  # Allow frequency to stabilize
         
-        # Step 2: Set all other parameters (except phase)
-        for key, value in other_settings.items():
-            if key in self.UPDATE_MAPPING:
-                method_name = self.UPDATE_MAPPING[key]
-                method = getattr(self, method_name)
-                
-                # Convert values as needed
-                if isinstance(value, bool):
-                    value = int(value)
-                elif key == 'modulation_type':
-                    value = self._mod_type_to_internal(value)
-                elif key == 'modulation_function':
-                    value = self._mod_func_to_internal(value)
-                elif key == 'pulse_modulation_function':
-                    value = self._pulse_mod_func_to_internal(value)
-                elif key == 'sweep_function':
-                    value = self._sweep_func_to_internal(value)
-                
-                # Call the appropriate method
-                method(value)
-                print(f"🔧 Set {key}: {value}")
-            else:
-                logger.warning(f"Unknown parameter for update: {key}")
-        
-        # Step 3: Set phase LAST (after frequency is stable)
-        if phase_value is not None:
-            if 'phase' in self.UPDATE_MAPPING:
-                method_name = self.UPDATE_MAPPING['phase']
-                method = getattr(self, method_name)
-                method(phase_value)
-                print(f"🔧 Set phase last: {phase_value}° (after frequency stabilization)")
-            else:
-                logger.warning(f"Phase parameter not found in UPDATE_MAPPING")
+        # Steps 2 and 3 are sent as one message, the error queue is checked once at the end
+        with self._batch():
+            # Step 2: Set all other parameters (except phase)
+            for key, value in other_settings.items():
+                if key in self.UPDATE_MAPPING:
+                    method_name = self.UPDATE_MAPPING[key]
+                    method = getattr(self, method_name)
+                    
+                    # Convert values as needed
+                    if isinstance(value, bool):
+                        value = int(value)
+                    elif key == 'modulation_type':
+                        value = self._mod_type_to_internal(value)
+                    elif key == 'modulation_function':
+                        value = self._mod_func_to_internal(value)
+                    elif key == 'pulse_modulation_function':
+                        value = self._pulse_mod_func_to_internal(value)
+                    elif key == 'sweep_function':
+                        value = self._sweep_func_to_internal(value)
+                    
+                    # Call the appropriate method
+                    method(value)
+                    print(f"🔧 Set {key}: {value}")
+                else:
+                    logger.warning(f"Unknown parameter for update: {key}")
+            
+            # Step 3: Set phase LAST (after frequency is stable)
+            if phase_value is not None:
+                if 'phase' in self.UPDATE_MAPPING:
+                    method_name = self.UPDATE_MAPPING['phase']
+                    method = getattr(self, method_name)
+                    method(phase_value)
+                    print(f"🔧 Set phase last: {phase_value}° (after frequency stabilization)")
+                else:
+                    logger.warning(f"Phase parameter not found in UPDATE_MAPPING")
     
     # Setter methods for update dispatch
     def _set_output_enable(self, enable: int):
@@ -810,6 +828,89 @@ class SG384Generator(MicrowaveGeneratorBase):
         self.settings['enable_modulation'] = False
         self._set_modulation_enable(0)
 
+    # List mode: the SG384 holds a table of up to 2000 points and steps to the next point on *TRG or a
+    # rising edge at the rear panel trigger input, after the last point it returns to the first
+    LIST_MAX_POINTS = 2000
+    _LIST_POINT_FIELDS = 15  # frequency, phase, LF amplitude, LF offset, RF amplitude, ..., 'N' keeps the value
+    _LIST_POINTS_PER_MESSAGE = 50
+
+    def load_list(self, frequencies, powers=None, force: bool = False) -> bool:
+        """
+        Uploads a frequency table for list mode, optionally with an RF power (dBm) per point. The table
+        that was uploaded last is remembered, loading the same table again only resets the list to its
+        first point instead of uploading it.
+
+        Args:
+            frequencies: frequencies in Hz
+            powers: RF powers in dBm (one per point or a single value), None keeps the current power
+            force: upload even if the table is already on the instrument (e.g. after a power cycle)
+
+        Returns:
+            True if the table was uploaded, False if it was already on the instrument
+        """
+        frequencies = np.asarray(frequencies, dtype=float).ravel()
+        num_points = len(frequencies)
+        if not 1 <= num_points <= self.LIST_MAX_POINTS:
+            raise ValueError(f"List needs 1 to {self.LIST_MAX_POINTS} points, got {num_points}")
+        ranges = self.get_parameter_ranges(['frequency'])
+        if frequencies.min() < ranges['min'] or frequencies.max() > ranges['max']:
+            raise ValueError(f"List frequencies must be between {ranges['min']/1e9:.3f} and "
+                             f"{ranges['max']/1e9:.3f} GHz")
+        if powers is not None:
+            powers = np.broadcast_to(np.asarray(powers, dtype=float), frequencies.shape).copy()
+
+        cached = getattr(self, '_list_table', None)
+        if not force and cached is not None and np.array_equal(cached[0], frequencies) and (
+                (cached[1] is None and powers is None) or
+                (cached[1] is not None and powers is not None and np.array_equal(cached[1], powers))):
+            self.reset_list()
+            return False
+
+        self._list_table = None
+        self.disable_list()
+        self._send('LSTD')
+        self._send('*CLS')  # LSTD leaves an error in the queue if there was no list
+        if int(float(self._query(f'LSTC? {num_points}'))) != 1:
+            raise IOError(f"SG384 could not allocate a list of {num_points} points")
+        for start in range(0, num_points, self._LIST_POINTS_PER_MESSAGE):
+            with self._batch():
+                for index in range(start, min(start + self._LIST_POINTS_PER_MESSAGE, num_points)):
+                    power = None if powers is None else powers[index]
+                    self._send(f"LSTP {index},{self._list_point(frequencies[index], power)}")
+        self._list_table = (frequencies.copy(), powers)
+        return True
+
+    def _list_point(self, frequency: float, power=None) -> str:
+        """Returns the LSTP field string of a list point."""
+        fields = ['N'] * self._LIST_POINT_FIELDS
+        fields[0] = repr(float(frequency))
+        if power is not None:
+            fields[4] = repr(float(power))
+        return ','.join(fields)
+
+    def enable_list(self):
+        """Enables list mode, the output goes to the first point of the list."""
+        self._send('LSTE 1')
+        self.reset_list()
+
+    def disable_list(self):
+        """Disables list mode, the output returns to the front panel settings."""
+        self._send('LSTE 0')
+
+    def reset_list(self):
+        """Goes back to the first point of the list."""
+        self._send('LSTI 0')
+
+    def trigger_list(self):
+        """Steps to the next list point with a software trigger."""
+        self._send('*TRG')
+
+    def clear_list(self):
+        """Deletes the list on the instrument."""
+        self.disable_list()
+        self._send('LSTD')
+        self._list_table = None
+
     def update(self, settings: dict):
         """
         Updates the internal settings and physical parameters using mapping dictionaries.
@@ -818,8 +919,12 @@ class SG384Generator(MicrowaveGeneratorBase):
         super().update(settings)
         
         # Send commands if device is connected
-        if self.is_connected:
+        self._last_update_sent = self.is_connected
+        if self._last_update_sent:
             self._dispatch_update(settings)
+
+    def _update_reached_instrument(self):
+        return getattr(self, '_last_update_sent', False)
     
     @property
     def _PROBES(self):
@@ -849,7 +954,20 @@ class SG384Generator(MicrowaveGeneratorBase):
         """Read probe values using mapping dictionaries."""
         assert self._settings_initialized
         assert key in list(self._PROBES.keys())
-        
+        return self._probe_reader(key)(key)
+
+    def _read_probes_many(self, keys):
+        """
+        Reads several probes with one pipelined round trip: all queries are sent before the first
+        response is read.
+        """
+        assert self._settings_initialized
+        readers = [self._probe_reader(key) for key in keys]
+        responses = self._query_many([self._probe_query(key) for key in keys])
+        return {key: reader(key, response) for key, reader, response in zip(keys, readers, responses)}
+
+    def _probe_reader(self, key):
+        """Returns the method that reads and converts the probe key."""
         # Define probe reading mappings with their conversion functions
         probe_mapping = {
             # Boolean probes (return True/False)
@@ -882,56 +1000,66 @@ class SG384Generator(MicrowaveGeneratorBase):
         }
         
         if key in probe_mapping:
-            return probe_mapping[key](key)
+            return probe_mapping[key]
         else:
             raise KeyError(f"No such probe: {key}")
+
+    def _probe_query(self, key):
+        """Returns the query command of the probe key."""
+        if key in ('amplitude', 'amplitude_lo', 'power_lo'):
+            return 'AMPL?'
+        if key in ('amplitude_rf', 'power_rf'):
+            return 'AMPR?'
+        if key == 'phase':
+            return 'PHAS?'
+        return self._param_to_scpi(key) + '?'
+
+    def _probe_response(self, key, response):
+        """Queries the probe key, unless its response was already read by a pipelined query."""
+        if response is None:
+            response = self._query(self._probe_query(key))
+        return response
     
-    def _read_boolean_probe(self, key):
+    def _read_boolean_probe(self, key, response=None):
         """Read boolean probe values (enable_output, enable_modulation, etc.)."""
-        key_internal = self._param_to_scpi(key)
-        value = int(self._query(key_internal + '?'))
+        value = int(self._probe_response(key, response))
         return bool(value)
     
-    def _read_modulation_type_probe(self, key):
+    def _read_modulation_type_probe(self, key, response=None):
         """Read modulation type probe values."""
-        key_internal = self._param_to_scpi(key)
-        value = int(self._query(key_internal + '?'))
+        value = int(self._probe_response(key, response))
         return self._internal_to_mod_type(value)
     
-    def _read_modulation_function_probe(self, key):
+    def _read_modulation_function_probe(self, key, response=None):
         """Read modulation function probe values."""
-        key_internal = self._param_to_scpi(key)
-        value = int(self._query(key_internal + '?'))
+        value = int(self._probe_response(key, response))
         return self._internal_to_mod_func(value)
     
-    def _read_pulse_modulation_function_probe(self, key):
+    def _read_pulse_modulation_function_probe(self, key, response=None):
         """Read pulse modulation function probe values."""
-        key_internal = self._param_to_scpi(key)
-        value = int(self._query(key_internal + '?'))
+        value = int(self._probe_response(key, response))
         return self._internal_to_pulse_mod_func(value)
     
-    def _read_sweep_function_probe(self, key):
+    def _read_sweep_function_probe(self, key, response=None):
         """Read sweep function probe values."""
-        key_internal = self._param_to_scpi(key)
-        value = int(self._query(key_internal + '?'))
+        value = int(self._probe_response(key, response))
         return self._internal_to_sweep_func(value)
     
-    def _read_float_probe(self, key):
+    def _read_float_probe(self, key, response=None):
         """Read float probe values (frequency, amplitude, phase, etc.)."""
-        key_internal = self._param_to_scpi(key)
-        return float(self._query(key_internal + '?'))
+        return float(self._probe_response(key, response))
 
-    def _read_amplitude_lo_probe(self, key):
+    def _read_amplitude_lo_probe(self, key, response=None):
         """Read low frequency amplitude from AMPL? command."""
-        return float(self._query('AMPL?'))
+        return float(self._probe_response(key, response))
 
-    def _read_amplitude_rf_probe(self, key):
+    def _read_amplitude_rf_probe(self, key, response=None):
         """Read RF amplitude from AMPR? command."""
-        return float(self._query('AMPR?'))
+        return float(self._probe_response(key, response))
     
-    def _read_phase_probe(self, key):
+    def _read_phase_probe(self, key, response=None):
         """Read phase from PHAS? command."""
-        raw_response = self._query('PHAS?')
+        raw_response = self._probe_response(key, response)
         print(f"🔍 Raw phase response: '{raw_response}'")
         phase_value = float(raw_response)
         print(f"🔍 Parsed phase value: {phase_value}°")
@@ -996,6 +1124,10 @@ class SG384Generator(MicrowaveGeneratorBase):
     
     def close(self):
         """Close the connection to the device."""
+        if self.settings['connection_type'] == 'LAN':
+            # gives up the shared socket, it is closed when no other device uses it
+            super().close()
+            return True
         if hasattr(self, '_inst') and self._inst is not None:
             try:
                 self._inst.close()
@@ -1,8 +1,8 @@
 import pyvisa.errors
 
 from src.core import Device,Parameter
+from src.core.scpi_transport import VisaTransport
 import pyvisa as visa
-from time import sleep
 
 class USB_RFGenerator(Device):
     '''
@@ -44,6 +44,9 @@ class USB_RFGenerator(Device):
     def _connect(self):
         self.rm = visa.ResourceManager()
         self.srs = self.rm.open_resource(self.settings['address'])
+        # the SynthUSBII drops a command that arrives before the previous one was processed (seen at 0.14 s),
+        # the transport only waits when commands follow each other that closely
+        self._transport = VisaTransport(self.srs, separator=None, min_interval=0.15, query_delay=0.15)
 
     def __del__(self):
         self.srs.close()
@@ -110,14 +113,10 @@ class USB_RFGenerator(Device):
         '''
         Sends command to device. Letters are given in _params_to_internal and in manual
         '''
-        self.srs.write(f'{command_letter}{value}')
-        sleep(0.15)     #sleep time to ensure a second command is not sent before the first one is processed
-                        #error occured with sleep of 0.14 seconds
+        self._transport.write(f'{command_letter}{value}')
 
     def _ask_value(self,command_letter):
-        self.srs.write(f'{command_letter}?')
-        sleep(0.15)
-        return self.srs.read().strip()
+        return self._transport.query(f'{command_letter}?')
 
     @property
     def _PROBES(self):
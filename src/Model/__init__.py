@@ -15,14 +15,25 @@
 #from .experiments.example_experiment import ExampleExperiment
 import sys
 
-from src.Model.experiments.example_experiment import ExampleExperimentWrapper,ExampleExperiment,MinimalExperiment
+from src.core.plugin_registry import lazy_attributes
+
+# imported the first time they are used, see src.Model.experiments
+_EXPERIMENTS = {
+    'ExampleExperimentWrapper': 'src.Model.experiments.example_experiment',
+    'ExampleExperiment': 'src.Model.experiments.example_experiment',
+    'MinimalExperiment': 'src.Model.experiments.example_experiment',
+    'ODMRExperiment': 'src.Model.experiments.deprecated.odmr_experiment',
+    'ODMRRabiExperiment': 'src.Model.experiments.deprecated.odmr_experiment',
+}
 
 # Only import NI-DAQ dependent modules on Windows
 if sys.platform.startswith('win'):
-    from src.Model.experiments.daq_read_counter import Pxi6733ReadCounter
-    from src.Model.experiments.galvo_scan import GalvoScan
-    from src.Model.experiments.galvo_scan_generic import GalvoScanGeneric
-    from src.Model.experiments.select_points import SelectPoints
+    _EXPERIMENTS.update({
+        'Pxi6733ReadCounter': 'src.Model.experiments.daq_read_counter',
+        'GalvoScan': 'src.Model.experiments.galvo_scan',
+        'GalvoScanGeneric': 'src.Model.experiments.galvo_scan_generic',
+        'SelectPoints': 'src.Model.experiments.select_points',
+    })
 else:
     # On non-Windows platforms, create placeholder imports to avoid import errors
     Pxi6733ReadCounter = None
@@ -30,6 +41,4 @@ else:
     GalvoScanGeneric = None
     SelectPoints = None
 
-from src.Model.experiments.deprecated.odmr_experiment import ODMRExperiment, ODMRRabiExperiment
-
-
+__getattr__, __dir__ = lazy_attributes(__name__, _EXPERIMENTS)
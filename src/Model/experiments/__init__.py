@@ -14,21 +14,46 @@
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 import sys
 
-from src.Model.experiments.example_experiment import ExampleExperimentWrapper,ExampleExperiment,MinimalExperiment
+from src.core.plugin_registry import lazy_attributes
+
+# the experiments are imported the first time they are used, so importing one experiment module does not load
+# the drivers of all the others (see src.core.plugin_registry)
+_EXPERIMENTS = {
+    'ExampleExperimentWrapper': '.example_experiment',
+    'ExampleExperiment': '.example_experiment',
+    'MinimalExperiment': '.example_experiment',
+
+    'ODMRExperiment': '.deprecated.odmr_experiment',
+    'ODMRRabiExperiment': '.deprecated.odmr_experiment',
+    'EnhancedODMRExperiment': '.deprecated.odmr_enhanced',
+    'SimpleODMRExperiment': '.deprecated.odmr_simple_adwin',
+
+    # New focused ODMR experiments with SG384 integration
+    'ODMRSteppedExperiment': '.odmr_stepped',
+    'ODMRSweepContinuousExperiment': '.odmr_sweep_continuous',
+    'ODMRFMModulationExperiment': '.odmr_fm_modulation',
+
+    # ODMR Pulsed experiment with AWG520 integration
+    'ODMRPulsedExperiment': '.odmr_pulsed',
+}
 
 # Only import NI-DAQ dependent modules on Windows
 if sys.platform.startswith('win'):
-    from src.Model.experiments.daq_read_counter import Pxi6733ReadCounter
-    from src.Model.experiments.galvo_scan import GalvoScan
-    from .galvo_scan_generic import GalvoScanGeneric
-    from .select_points import SelectPoints
+    _EXPERIMENTS.update({
+        'Pxi6733ReadCounter': '.daq_read_counter',
+        'GalvoScan': '.galvo_scan',
+        'GalvoScanGeneric': '.galvo_scan_generic',
+        'SelectPoints': '.select_points',
         # Legacy confocal experiments (deprecated - use new focused modules instead)
-    from .confocal import ConfocalScan_Fast, ConfocalScan_Slow, Confocal_Point
+        'ConfocalScan_Fast': '.confocal',
+        'ConfocalScan_Slow': '.confocal',
+        'Confocal_Point': '.confocal',
 
-    # New focused confocal experiments with hardware-specific naming
-    from .nanodrive_adwin_confocal_scan_fast import NanodriveAdwinConfocalScanFast
-    from .nanodrive_adwin_confocal_scan_slow import NanodriveAdwinConfocalScanSlow
-    from .nanodrive_adwin_confocal_point import NanodriveAdwinConfocalPoint
+        # New focused confocal experiments with hardware-specific naming
+        'NanodriveAdwinConfocalScanFast': '.nanodrive_adwin_confocal_scan_fast',
+        'NanodriveAdwinConfocalScanSlow': '.nanodrive_adwin_confocal_scan_slow',
+        'NanodriveAdwinConfocalPoint': '.nanodrive_adwin_confocal_point',
+    })
 else:
     # On non-Windows platforms, create placeholder imports to avoid import errors
     Pxi6733ReadCounter = None
@@ -38,22 +63,12 @@ else:
     ConfocalScan_Fast = None
     ConfocalScan_Slow = None
     Confocal_Point = None
-    
+
     # New focused confocal experiments (not available on non-Windows)
     NanodriveAdwinConfocalScanFast = None
     NanodriveAdwinConfocalScanSlow = None
     NanodriveAdwinConfocalPoint = None
 
-from .deprecated.odmr_experiment import ODMRExperiment, ODMRRabiExperiment
-from .deprecated.odmr_enhanced import EnhancedODMRExperiment
-from .deprecated.odmr_simple_adwin import SimpleODMRExperiment
-
-# New focused ODMR experiments with SG384 integration
-from .odmr_stepped import ODMRSteppedExperiment
-from .odmr_sweep_continuous import ODMRSweepContinuousExperiment
-from .odmr_fm_modulation import ODMRFMModulationExperiment
-
-# ODMR Pulsed experiment with AWG520 integration
-from .odmr_pulsed import ODMRPulsedExperiment
+__getattr__, __dir__ = lazy_attributes(__name__, _EXPERIMENTS)
 
-from src.core.experiment_iterator import ExperimentIterator
\ No newline at end of file
+from src.core.experiment_iterator import ExperimentIterator
@@ -101,7 +101,7 @@ class ConfocalScan_Fast(Experiment):
                          Parameter('folderpath',str(get_configured_confocal_scans_folder()),str,'folder location to save images at each z-value')]),
         #!!! If you see horizontial lines in the confocal image, the adwin arrays likely are corrupted. The fix is to reboot the adwin. You will nuke all
         #other process, variables, and arrays in the adwin. This parameter is added to make that easy to do in the GUI.
-        Parameter('reboot_adwin',False,bool,'Will reboot adwin when experiment is executed. Useful is data looks fishy'),
+        Parameter('reboot_adwin',False,bool,'Will reboot adwin when experiment is executed instead of only resetting the scan process. Useful is data looks fishy'),
         Parameter('cropping', #nested cause it does not need changed often
                   [Parameter('crop_data',True,bool,'Current logic scans over a larger area then crops data to requested size. Added for ease of seeing full image')]),
         #clocks currently not implemented
@@ -133,13 +133,9 @@ class ConfocalScan_Fast(Experiment):
         '''
         Gets paths for adbasic file and loads them onto ADwin.
         '''
-        self.adw.stop_process(2)
-        sleep(0.1)
-        self.adw.clear_process(2)
-        
-        # Use the helper function to find the binary file
+        # the binary stays loaded between runs and is only reset, or the adwin is rebooted if requested
         one_d_scan_path = get_adwin_binary_path('One_D_Scan.TB2')
-        self.adw.update({'process_2': {'load': str(one_d_scan_path)}})
+        self.adw.prepare_process(str(one_d_scan_path), data={1: np.int32}, reboot=self.settings['reboot_adwin'])
         # one_d_scan script increments an index then adds count values to an array in a constant time interval
         self.nd.clock_functions('Frame', reset=True)  # reset ALL clocks to default settings
 
@@ -158,10 +154,8 @@ class ConfocalScan_Fast(Experiment):
         '''
         Cleans up adwin and moves nanodrive to specified position
         '''
-        # clearing process to aviod memory fragmentation when running different experiments in GUI
+        # the binary stays loaded for the next run, prepare_process resets it
         self.adw.stop_process(2)    #neccesary if process is does not stop for some reason
-        sleep(0.1)
-        self.adw.clear_process(2)
         if self.settings['ending_behavior'] == 'return_to_inital_pos':
             self.nd.update({'x_pos': self.x_inital, 'y_pos': self.y_inital})
         elif self.settings['ending_behavior'] == 'return_to_origin':
@@ -172,8 +166,6 @@ class ConfocalScan_Fast(Experiment):
         This is the actual function that will be executed. It uses only information that is provided in the settings property
         will be overwritten in the __init__
         """
-        if self.settings['reboot_adwin'] == True:
-            self.adw.reboot_adwin()
         self.setup_scan()
         sleep(0.1)
 
@@ -234,7 +226,7 @@ class ConfocalScan_Fast(Experiment):
         adwin_delay = round((self.settings['time_per_pt']*1e6) / (3.3))
         #print('adwin delay: ',delay)
 
-        wf = list(y_array_adj)
+        wf = y_array_adj  # float64 array, set up on the NanoDrive once and reused for every line
         len_wf = len(y_array_adj)
         #print(len_wf,wf)
         load_read_ratio = self.settings['time_per_pt']/2.0 #used for scaling when rates are different
@@ -303,9 +295,9 @@ class ConfocalScan_Fast(Experiment):
                 index_diff = index_diff + 1
 
             # get count data from adwin and record it
-            raw_counts = np.array(list(self.adw.read_probes('int_array', id=1, length=len_wf+20)))
+            raw_counts = self.adw.read_data(1, len_wf+20)
             # units of count/seconds
-            count_rate = list(np.array(raw_counts) * 1e3 / self.settings['time_per_pt'])
+            count_rate = list(raw_counts * 1e3 / self.settings['time_per_pt'])
 
             crop_index = -index_mode - 1 - index_diff
             if self.settings['time_per_pt'] == 5.0:
@@ -489,7 +481,7 @@ class ConfocalScan_Slow(Experiment):
                    Parameter('folderpath', str(get_configured_confocal_scans_folder()), str,'folder location to save images at each z-value')]),
         # !!! If you see horizontial lines in the confocal image, the adwin arrays likely are corrupted. The fix is to reboot the adwin. You will nuke all
         # other process, variables, and arrays in the adwin. This parameter is added to make that easy to do in the GUI.
-        Parameter('reboot_adwin', False, bool,'Will reboot adwin when experiment is executed. Useful is data looks fishy'),
+        Parameter('reboot_adwin', False, bool,'Will reboot adwin when experiment is executed instead of only resetting the scan process. Useful is data looks fishy'),
         # clocks currently not implemented
         Parameter('laser_clock', 'Pixel', ['Pixel','Line','Frame','Aux'], 'Nanodrive clock used for turning laser on and off')
     ]
@@ -518,13 +510,9 @@ class ConfocalScan_Slow(Experiment):
         '''
         Gets paths for adbasic file and loads them onto ADwin.
         '''
-        self.adw.stop_process(1)
-        sleep(0.1)
-        self.adw.clear_process(1)
-        
-        # Use the helper function to find the binary file
+        # the binary stays loaded between runs and is only reset, or the adwin is rebooted if requested
         trial_counter_path = get_adwin_binary_path('Trial_Counter.TB1')
-        self.adw.update({'process_1': {'load': str(trial_counter_path)}})
+        self.adw.prepare_process(str(trial_counter_path), pars=[1], reboot=self.settings['reboot_adwin'])
         #trial counter simply reads the counter value
         self.nd.clock_functions('Frame', reset=True)  # reset ALL clocks to default settings
 
@@ -542,10 +530,8 @@ class ConfocalScan_Slow(Experiment):
         '''
         Cleans up adwin and moves nanodrive to specified position
         '''
-        # clearing process to aviod memory fragmentation when running different experiments in GUI
+        # the binary stays loaded for the next run, prepare_process resets it
         self.adw.stop_process(1)    #neccesary if process is does not stop for some reason
-        sleep(0.1)
-        self.adw.clear_process(1)
         if self.settings['ending_behavior'] == 'return_to_inital_pos':
             self.nd.update({'x_pos': self.x_inital, 'y_pos': self.y_inital})
         elif self.settings['ending_behavior'] == 'return_to_origin':
@@ -556,8 +542,6 @@ class ConfocalScan_Slow(Experiment):
         This is the actual function that will be executed. It uses only information that is provided in the settings property
         will be overwritten in the __init__
         """
-        if self.settings['reboot_adwin'] == True:
-            self.adw.reboot_adwin()
         self.setup_scan()
         sleep(0.1)
 
@@ -831,22 +815,17 @@ class Confocal_Point(Experiment):
         '''
         Gets paths for adbasic file and loads them onto ADwin.
         '''
-        self.adw.stop_process(1)
-        sleep(0.1)
-        self.adw.clear_process(1)
-        
-        # Use the helper function to find the binary file
+        # the binary stays loaded between runs and is only reset
         trial_counter_path = get_adwin_binary_path('Averagable_Trial_Counter.TB1')
-        self.adw.update({'process_1': {'load': str(trial_counter_path)}})
+        self.adw.prepare_process(str(trial_counter_path), pars=[1, 2, 5])
         self.nd.clock_functions('Frame', reset=True)  # reset ALL clocks to default settings
 
     def cleanup(self):
         '''
         Cleans up adwin after experiment
         '''
+        # the binary stays loaded for the next run, prepare_process resets it
         self.adw.stop_process(1)
-        sleep(0.1)
-        self.adw.clear_process(1)
 
     def _function(self):
         """
@@ -121,22 +121,17 @@ class NanodriveAdwinConfocalPoint(Experiment):
         '''
         Gets paths for adbasic file and loads them onto ADwin.
         '''
-        self.adw.stop_process(1)
-        sleep(0.1)
-        self.adw.clear_process(1)
-        
-        # Use the helper function to find the binary file
+        # the binary stays loaded between runs and is only reset
         trial_counter_path = get_adwin_binary_path('Averagable_Trial_Counter.TB1')
-        self.adw.update({'process_1': {'load': str(trial_counter_path)}})
+        self.adw.prepare_process(str(trial_counter_path), pars=[1, 2, 5])
         self.nd.clock_functions('Frame', reset=True)  # reset ALL clocks to default settings
 
     def cleanup(self):
         '''
         Cleans up adwin after experiment
         '''
+        # the binary stays loaded for the next run, prepare_process resets it
         self.adw.stop_process(1)
-        sleep(0.1)
-        self.adw.clear_process(1)
 
     def _function(self):
         """
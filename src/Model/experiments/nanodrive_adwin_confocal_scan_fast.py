@@ -15,6 +15,7 @@ from pyqtgraph.exporters import ImageExporter
 from pathlib import Path
 
 from src.core import Parameter, Experiment
+from src.core.data_store import DataStore, DataField
 from src.core.helper_functions import get_configured_confocal_scans_folder
 from src.core.adwin_helpers import get_adwin_binary_path
 from time import sleep
@@ -57,7 +58,7 @@ class NanodriveAdwinConfocalScanFast(Experiment):
                          Parameter('folderpath','',str,'folder location to save images at each z-value')]),
         #!!! If you see horizontial lines in the confocal image, the adwin arrays likely are corrupted. The fix is to reboot the adwin. You will nuke all
         #other process, variables, and arrays in the adwin. This parameter is added to make that easy to do in the GUI.
-        Parameter('reboot_adwin',False,bool,'Will reboot adwin when experiment is executed. Useful is data looks fishy'),
+        Parameter('reboot_adwin',False,bool,'Will reboot adwin when experiment is executed instead of only resetting the scan process. Useful is data looks fishy'),
         Parameter('cropping', #nested cause it does not need changed often
                   [Parameter('crop_data',True,bool,'Current logic scans over a larger area then crops data to requested size. Added for ease of seeing full image')]),
         #clocks currently not implemented
@@ -88,13 +89,9 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         '''
         Gets paths for adbasic file and loads them onto ADwin.
         '''
-        self.adw.stop_process(2)
-        sleep(0.1)
-        self.adw.clear_process(2)
-        
-        # Use the helper function to find the binary file
+        # the binary stays loaded between runs and is only reset, or the adwin is rebooted if requested
         one_d_scan_path = get_adwin_binary_path('One_D_Scan.TB2')
-        self.adw.update({'process_2': {'load': str(one_d_scan_path)}})
+        self.adw.prepare_process(str(one_d_scan_path), data={1: np.int32}, reboot=self.settings['reboot_adwin'])
         # one_d_scan script increments an index then adds count values to an array in a constant time interval
         self.nd.clock_functions('Frame', reset=True)  # reset ALL clocks to default settings
 
@@ -113,10 +110,8 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         '''
         Cleans up adwin and moves nanodrive to specified position
         '''
-        # clearing process to aviod memory fragmentation when running different experiments in GUI
+        # the binary stays loaded for the next run, prepare_process resets it
         self.adw.stop_process(2)    #neccesary if process is does not stop for some reason
-        sleep(0.1)
-        self.adw.clear_process(2)
         if self.settings['ending_behavior'] == 'return_to_inital_pos':
             self.nd.update({'x_pos': self.x_inital, 'y_pos': self.y_inital})
         elif self.settings['ending_behavior'] == 'return_to_origin':
@@ -131,8 +126,6 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         if not self.settings['3D_scan']['folderpath']:
             self.settings['3D_scan']['folderpath'] = str(get_configured_confocal_scans_folder())
         
-        if self.settings['reboot_adwin'] == True:
-            self.adw.reboot_adwin()
         self.setup_scan()
         sleep(0.1)
 
@@ -164,26 +157,21 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         self.z_inital = self.nd.read_probes('z_pos')
         self.settings['z_pos'] = self.z_inital
 
-        #makes sure data is getting recorded. If still equal none after running experiment data is not being stored or not measured
-        self.data['x_pos'] = None
+        # preallocate the data so every line is written in place. Images start at zero so they can be plotted while the experiment runs
+        Nx = len(x_array)
+        Ny = len(y_array)
+        self.data = DataStore([
+            DataField('x_pos', (Nx,), info='x position read back for each line'),
+            DataField('raw_counts', (Nx, Ny), int, info='cropped counts of each line'),
+            DataField('count_rate', (Nx, Ny), info='cropped count rate of each line in counts/sec'),
+            DataField('count_img', (Nx, Ny), fill_value=0, info='cropped count rate image'),
+            DataField('raw_img', (Nx, len(y_array_adj)+20), fill_value=0, info='uncropped count rate image')
+        ])
+        #y positions read back from the nanodrive; the number of points can vary between lines
         self.data['y_pos'] = None
-        self.data['raw_counts'] = None
-        self.data['count_rate'] = None
-        self.data['count_img'] = None
-        self.data['raw_img'] = None
-        #local lists to store data and append to global self.data lists
-        x_data = []
         y_data = []
-        raw_count_data = []
-        count_rate_data = []
         index_list = []
 
-        # set data to zero and update to plot while experiment runs
-        Nx = len(x_array)
-        Ny = len(y_array)
-        self.data['count_img'] = np.zeros((Nx, Ny))
-        self.data['raw_img'] = np.zeros((Nx, len(y_array_adj)+20))
-
         interation_num = 0 #number to track progress
         total_interations = ((x_max - x_min)/step + 1)*((y_max - y_min)/step + 1)       #plus 1 because in total_iterations because range is inclusive ie. [0,10]
         #print('total_interations=',total_interations)
@@ -193,7 +181,7 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         adwin_delay = round((self.settings['time_per_pt']*1e6) / (3.3))
         #print('adwin delay: ',delay)
 
-        wf = list(y_array_adj)
+        wf = y_array_adj  # float64 array, set up on the NanoDrive once and reused for every line
         len_wf = len(y_array_adj)
         #print(len_wf,wf)
         load_read_ratio = self.settings['time_per_pt']/2.0 #used for scaling when rates are different
@@ -205,19 +193,22 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         self.adw.update({'process_2':{'delay':adwin_delay}})
         sleep(0.1)  #time for stage to move to starting posiition and adwin process to initilize
 
+        #stream every finished line to an HDF5 file so an aborted or crashed scan keeps its data
+        if self.settings['save']:
+            self.open_store(flush_every=10)
+            self.store.declare('x_pos')
+            self.store.declare('count_img', row_shape=(Ny,))
+            self.store.declare('raw_img', row_shape=(len_wf+20,))
 
         for i, x in enumerate(x_array):
             if self._abort == True:
                 break
-            img_row = []
-            raw_img_row = []
             x = float(x)
 
             self.nd.update({'x_pos':x,'y_pos':y_min-5.0})     #goes to x position
             sleep(0.1)
             x_pos = self.nd.read_probes('x_pos')
-            x_data.append(x_pos)
-            self.data['x_pos'] = x_data     #adds x postion to data
+            self.data.write('x_pos', i, x_pos)     #adds x postion to data
 
             #The two different code lines to start counting seem to work for cropping. Honestly cant give a precise explaination, it seems to be related to
             #hardware delay. If the time_per_pt is 5.0 starting counting before waveform set up works to within 1 pixel with numpy cropping. If the
@@ -262,27 +253,27 @@ class NanodriveAdwinConfocalScanFast(Experiment):
                 index_diff = index_diff + 1
 
             # get count data from adwin and record it
-            raw_counts = np.array(list(self.adw.read_probes('int_array', id=1, length=len_wf+20)))
+            raw_counts = self.adw.read_data(1, len_wf+20)
             # units of count/seconds
-            count_rate = list(np.array(raw_counts) * 1e3 / self.settings['time_per_pt'])
+            count_rate = raw_counts * 1e3 / self.settings['time_per_pt']
 
             crop_index = -index_mode - 1 - index_diff
             if self.settings['time_per_pt'] == 5.0:
                 crop_index = crop_index-2
-            cropped_raw_counts = list(raw_counts[crop_index:crop_index + len(y_array)])
+            cropped_raw_counts = raw_counts[crop_index:crop_index + len(y_array)]
             cropped_count_rate = count_rate[crop_index:crop_index + len(y_array)]
 
-            raw_count_data.append(cropped_raw_counts)
-            self.data['raw_counts'] = raw_count_data
-
-            count_rate_data.append(cropped_count_rate)
-            self.data['count_rate'] = count_rate_data
+            self.data.write('raw_counts', i, cropped_raw_counts)
+            self.data.write('count_rate', i, cropped_count_rate)
 
             #adds count rate data to raw img and cropped count img
-            raw_img_row.extend(count_rate)
-            self.data['raw_img'][i, :] = raw_img_row
-            img_row.extend(cropped_count_rate)
-            self.data['count_img'][i, :] = img_row  # add previous scan data so image plots
+            self.data.write('raw_img', i, count_rate)
+            self.data.write('count_img', i, cropped_count_rate)  # add previous scan data so image plots
+
+            if self.store is not None:
+                self.store.append('x_pos', x_pos)
+                self.store.append('count_img', self.data['count_img'][i, :])
+                self.store.append('raw_img', self.data['raw_img'][i, :])
 
             # updates process bar and plots count_img so far
             interation_num = interation_num + len(y_array)
@@ -293,10 +284,7 @@ class NanodriveAdwinConfocalScanFast(Experiment):
         self.data_collected = True
 
         print('Data collected')
-        self.data['x_pos'] = x_data
         self.data['y_pos'] = np.array(y_data)
-        self.data['raw_counts'] = np.array(raw_count_data)
-        self.data['count_rate'] = np.array(count_rate_data)
         #print('Position Data: ','\n',self.data['x_pos'],'\n',self.data['y_pos'],'\n','Max x: ',np.max(self.data['x_pos']),'Max y: ',np.max(self.data['y_pos']))
         #print('Counts: ','\n',self.count_data)
         #print('All data: ',self.data)
@@ -57,7 +57,7 @@ class NanodriveAdwinConfocalScanSlow(Experiment):
                    Parameter('folderpath', str(get_configured_confocal_scans_folder()), str,'folder location to save images at each z-value')]),
         # !!! If you see horizontial lines in the confocal image, the adwin arrays likely are corrupted. The fix is to reboot the adwin. You will nuke all
         # other process, variables, and arrays in the adwin. This parameter is added to make that easy to do in the GUI.
-        Parameter('reboot_adwin', False, bool,'Will reboot adwin when experiment is executed. Useful is data looks fishy'),
+        Parameter('reboot_adwin', False, bool,'Will reboot adwin when experiment is executed instead of only resetting the scan process. Useful is data looks fishy'),
         # clocks currently not implemented
         Parameter('laser_clock', 'Pixel', ['Pixel','Line','Frame','Aux'], 'Nanodrive clock used for turning laser on and off')
     ]
@@ -86,13 +86,9 @@ class NanodriveAdwinConfocalScanSlow(Experiment):
         '''
         Gets paths for adbasic file and loads them onto ADwin.
         '''
-        self.adw.stop_process(1)
-        sleep(0.1)
-        self.adw.clear_process(1)
-        
-        # Use the helper function to find the binary file
+        # the binary stays loaded between runs and is only reset, or the adwin is rebooted if requested
         trial_counter_path = get_adwin_binary_path('Trial_Counter.TB1')
-        self.adw.update({'process_1': {'load': str(trial_counter_path)}})
+        self.adw.prepare_process(str(trial_counter_path), pars=[1], reboot=self.settings['reboot_adwin'])
         #trial counter simply reads the counter value
         self.nd.clock_functions('Frame', reset=True)  # reset ALL clocks to default settings
 
@@ -110,10 +106,8 @@ class NanodriveAdwinConfocalScanSlow(Experiment):
         '''
         Cleans up adwin and moves nanodrive to specified position
         '''
-        # clearing process to aviod memory fragmentation when running different experiments in GUI
+        # the binary stays loaded for the next run, prepare_process resets it
         self.adw.stop_process(1)    #neccesary if process is does not stop for some reason
-        sleep(0.1)
-        self.adw.clear_process(1)
         if self.settings['ending_behavior'] == 'return_to_inital_pos':
             self.nd.update({'x_pos': self.x_inital, 'y_pos': self.y_inital})
         elif self.settings['ending_behavior'] == 'return_to_origin':
@@ -124,8 +118,6 @@ class NanodriveAdwinConfocalScanSlow(Experiment):
         This is the actual function that will be executed. It uses only information that is provided in the settings property
         will be overwritten in the __init__
         """
-        if self.settings['reboot_adwin'] == True:
-            self.adw.reboot_adwin()
         self.setup_scan()
         sleep(0.1)
 
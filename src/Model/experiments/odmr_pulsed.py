@@ -72,6 +72,14 @@ class ODMRPulsedExperiment(Experiment):
             Parameter('reset_time', 1750000, float, 'Reset time between counts in ns', units='ns'),
             Parameter('repetitions_per_point', 50000, int, 'Number of repetitions per scan point')
         ]),
+        # !!! the committed adwin_triggering_proteus.TB1 was compiled before Data_3 was added to
+        # adwin_triggering_proteus.bas and does not stream. Recompile the .bas (T11) and replace the TB1 before
+        # switching stream on, otherwise the stream fails or times out without receiving events.
+        Parameter('acquisition', [
+            Parameter('stream', False, bool,
+                      'Stream counts through the Data_3 FIFO while the sequence runs instead of polling the done flag. '
+                      'Needs adwin_triggering_proteus.TB1 recompiled from the current .bas')
+        ]),
         Parameter('scan', [
             Parameter('preview_points', 10, int, 'Number of scan points to preview'),
             Parameter('auto_generate_files', True, bool, 'Automatically generate AWG files'),
@@ -101,6 +109,8 @@ class ODMRPulsedExperiment(Experiment):
         self.logger = logging.getLogger(__name__)
         self.repeat_count = None
         self.number_of_iterations = 0
+        self.live_signal_counts = None      # sums per iteration streamed while the ADwin counts
+        self.live_reference_counts = None
         # Configuration
         self.config_path = config_path or self.get_config_path("D:\\Duttlab\\Experiments\\AQuISS_default_save_location\\experiments_auto_generated\\ODMRPulsedExperiment.json")
         self.config = self._load_config()
@@ -924,10 +934,7 @@ class ODMRPulsedExperiment(Experiment):
                 time.sleep(0.1)
             except Exception:
                 pass
-            try:
-                self.adwin.clear_process(process_number)
-            except Exception:
-                pass
+            # the counter stays loaded between runs, load_process skips it if the binary did not change
             # the following were tests for option 3
             """# test 1
             odmr_pulsed_counter_path = get_adwin_binary_path('odmr_pulsed_counter.TB2')
@@ -967,6 +974,77 @@ class ODMRPulsedExperiment(Experiment):
             self.logger.error(f"Failed to setup ADwin counting: {e}")
             return False
     
+    def _acquisition_timeout(self) -> float:
+        """Twice the expected duration of all ADwin events plus 10 s, in seconds."""
+        events = self.repeat_count * max(1, self.number_of_iterations)
+        # one ADwin event per trigger: AWG sequence, two counting windows and the reset time between them
+        event_time_s = (self.sequence_duration + 2 * self.count_time + self.reset_time) * 1e-9
+        return 2 * events * event_time_s + 10
+    
+    def _wait_for_done_flag(self) -> bool:
+        """
+        Poll the acquisition done flag Par_7 of the ADwin process until all repetitions were counted.
+        Works with binaries that do not stream Data_3, progress comes from the event counter Par_8.
+        
+        Returns:
+            True if the acquisition finished
+        """
+        events = self.repeat_count * max(1, self.number_of_iterations)
+        
+        def finished(snapshot):
+            self.updateProgress.emit(min(100, int(100 * snapshot.pars[8] / events)))
+            return self._abort or snapshot.pars[7] == 1
+        
+        try:
+            self.adwin.wait_until(finished, timeout=self._acquisition_timeout(), poll_schedule=[0.5], pars=[7, 8])
+        except TimeoutError as e:
+            self.logger.error(f"ADwin acquisition did not finish: {e}")
+            return False
+        if self._abort:
+            self.logger.info("Acquisition aborted")
+            return False
+        return True
+    
+    def _wait_for_streamed_counts(self) -> bool:
+        """
+        Stream the (signal, reference) counts of every ADwin event from the Data_3 FIFO until all
+        repetitions arrived. The live sums per iteration are kept in live_signal_counts and
+        live_reference_counts for plotting while the acquisition runs.
+        
+        Returns:
+            True if all events arrived
+        """
+        iterations = max(1, self.number_of_iterations)
+        events = self.repeat_count * iterations
+        timeout = self._acquisition_timeout()
+        self.live_signal_counts = np.zeros(iterations)
+        self.live_reference_counts = np.zeros(iterations)
+        
+        def accumulate(chunk):
+            index = (chunk.first_record + np.arange(len(chunk.data))) % iterations
+            np.add.at(self.live_signal_counts, index, chunk.data[:, 0])
+            np.add.at(self.live_reference_counts, index, chunk.data[:, 1])
+            self.updateProgress.emit(min(100, int(100 * (chunk.first_record + len(chunk.data)) / events)))
+        
+        # the process cleared the FIFO when it started, events before this point are still in it
+        stream = self.adwin.stream_fifo(3, record_size=2, clear=False)
+        stream.subscribe(accumulate)
+        start = time.time()
+        try:
+            while not stream.wait(events, timeout=0.5):
+                if self._abort:
+                    self.logger.info("Acquisition aborted")
+                    return False
+                if not stream.is_running or time.time() - start > timeout:
+                    self.logger.error(f"Received {stream.num_records} of {events} events from the ADwin"
+                                      + (f": {stream.error}" if stream.error else ""))
+                    return False
+        finally:
+            stream.stop()
+        if stream.fifo_overruns:
+            self.logger.warning(f"ADwin FIFO was full {stream.fifo_overruns} times, live counts are incomplete")
+        return True
+    
     def _run_sequence_and_collect_data(self) -> Dict[str, Any]:
         """
         Run a single sequence and collect photon counting data from ADwin.
@@ -994,7 +1072,13 @@ class ODMRPulsedExperiment(Experiment):
             """while self.adwin.get_int_var(7) == 0:
                 time.sleep(60)
             print(f"self.adwin.get_int_var(8): {self.adwin.get_int_var(8)}")"""
-            time.sleep(3000)
+            # binaries compiled before Data_3 became a FIFO only report the done flag
+            if self.settings['acquisition']['stream']:
+                finished = self._wait_for_streamed_counts()
+            else:
+                finished = self._wait_for_done_flag()
+            if not finished:
+                return {'success': False, 'error': 'ADwin acquisition did not finish'}
             signal_counts = self.adwin.get_int_data(1, self.number_of_iterations)
             ref_counts = self.adwin.get_int_data(2, self.number_of_iterations)
             for i in range(self.number_of_iterations):
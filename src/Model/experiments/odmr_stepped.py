@@ -21,7 +21,8 @@ from src.core.parameter import Parameter
 from src.Controller.sg384 import SG384Generator
 from src.Controller.adwin_gold import AdwinGoldDevice
 from src.Controller.nanodrive import MCLNanoDrive
-from src.core.adwin_helpers import setup_adwin_for_odmr, read_adwin_odmr_data
+from src.core.adwin_helpers import (setup_adwin_for_odmr, read_adwin_odmr_data, setup_adwin_for_list_odmr,
+                                    read_adwin_list_odmr_data)
 
 
 class ODMRSteppedExperiment(Experiment):
@@ -34,6 +35,10 @@ class ODMRSteppedExperiment(Experiment):
     3. Stepping to the next frequency
     4. Repeating until the full frequency range is covered
     
+    With microwave.list_mode the frequency table is uploaded to the SG384 list once (and kept there while
+    it does not change) and the ADwin steps through it with trigger pulses, so no frequency is set over
+    the network during the scan.
+    
     This approach provides precise frequency control and is ideal for:
     - High-resolution frequency scans
     - Frequency-dependent power studies
@@ -60,7 +65,9 @@ class ODMRSteppedExperiment(Experiment):
         ]),
         Parameter('microwave', [
             Parameter('power', -10.0, float, 'Microwave power in dBm', units='dBm'),
-            Parameter('settle_time', 0.01, float, 'Settle time after frequency change', units='s')
+            Parameter('settle_time', 0.01, float, 'Settle time after frequency change', units='s'),
+            Parameter('list_mode', False, bool, 'Step through an SG384 frequency list triggered by the Adwin'),
+            Parameter('trigger_channel', 21, int, 'Adwin digital output wired to the SG384 trigger input')
         ]),
         Parameter('acquisition', [
             Parameter('integration_time', 0.1, float, 'Integration time per point in seconds', units='s'),
@@ -168,6 +175,18 @@ class ODMRSteppedExperiment(Experiment):
         if not self.adwin.is_connected:
             self.adwin.connect()
         
+        if self.settings['microwave']['list_mode']:
+            # the Adwin counts and triggers the SG384 list, it is started by _run_list_scan
+            setup_adwin_for_list_odmr(
+                self.adwin,
+                num_points=self.settings['frequency_range']['steps'],
+                integration_time_ms=self.settings['acquisition']['integration_time'] * 1000,
+                settle_time_ms=self.settings['microwave']['settle_time'] * 1000,
+                num_sweeps=self.settings['acquisition']['averages'],
+                trigger_channel=self.settings['microwave']['trigger_channel'])
+            self.logger.info("Adwin setup: list mode stepping")
+            return
+        
         # Use existing helper function for simple ODMR setup
         from src.core.adwin_helpers import setup_adwin_for_simple_odmr
         
@@ -221,6 +240,8 @@ class ODMRSteppedExperiment(Experiment):
         
         # Disable microwave output
         if self.microwave and self.microwave.is_connected:
+            if self.settings['microwave']['list_mode']:
+                self.microwave.disable_list()
             self.microwave.disable_output()
         
         super().cleanup()
@@ -248,6 +269,10 @@ class ODMRSteppedExperiment(Experiment):
     
     def _run_frequency_scan(self):
         """Run the frequency scan with photon counting."""
+        if self.settings['microwave']['list_mode']:
+            self._run_list_scan()
+            return
+        
         steps = self.settings['frequency_range']['steps']
         averages = self.settings['acquisition']['averages']
         settle_time = self.settings['microwave']['settle_time']
@@ -288,6 +313,42 @@ class ODMRSteppedExperiment(Experiment):
         
         self.logger.info("Frequency scan completed")
     
+    def _run_list_scan(self):
+        """Run the frequency scan with the SG384 stepping through its list on Adwin triggers."""
+        steps = self.settings['frequency_range']['steps']
+        averages = self.settings['acquisition']['averages']
+        power = self.settings['microwave']['power']
+        
+        # only uploaded if the table differs from the one already on the SG384
+        powers = np.full(steps, power)
+        if self.microwave.load_list(self.frequencies, powers):
+            self.logger.info(f"Uploaded {steps} point frequency list to the SG384")
+        else:
+            self.logger.info("Frequency list unchanged, using the list on the SG384")
+        self.microwave.enable_list()
+        
+        self.logger.info(f"Starting list mode scan: {steps} points, {averages} sweeps")
+        self.adwin.start_process(1)
+        try:
+            while True:
+                data = read_adwin_list_odmr_data(self.adwin, steps, averages)
+                if data['ready']:
+                    break
+                if self._abort:
+                    self.logger.info("List mode scan aborted")
+                    return
+                self.updateProgress.emit(int(100 * (data['sweeps_done'] * steps + data['points_done'])
+                                             / (steps * averages)))
+                time.sleep(0.1)
+        finally:
+            self.adwin.stop_process(1)
+            self.microwave.disable_list()
+        
+        self.counts_raw[:, :] = data['counts'].T
+        self.counts[:] = np.mean(self.counts_raw, axis=1)
+        self.powers[:] = powers
+        self.logger.info("Frequency scan completed")
+    
     def _analyze_data(self):
         """Analyze the ODMR data."""
         self.logger.info("Analyzing ODMR data...")
@@ -21,7 +21,7 @@ from src.core.parameter import Parameter
 from src.Controller.sg384 import SG384Generator
 from src.Controller.adwin_gold import AdwinGoldDevice
 from src.Controller.nanodrive import MCLNanoDrive
-from src.core.adwin_helpers import setup_adwin_for_odmr, read_adwin_odmr_data
+from src.core.adwin_helpers import setup_adwin_for_odmr, read_adwin_odmr_data, digits_to_volts
 
 
 class ODMRSweepContinuousExperiment(Experiment):
@@ -65,7 +65,9 @@ class ODMRSweepContinuousExperiment(Experiment):
             Parameter('integration_time', 0.001, float, 'Integration time per point in seconds', units='s'),
             Parameter('averages', 10, int, 'Number of sweep averages'),
             Parameter('settle_time', 0.01, float, 'Settle time between sweeps', units='s'),
-            Parameter('bidirectional', True, bool, 'Enable bidirectional sweeps (doubles acquisition efficiency)')
+            Parameter('bidirectional', True, bool, 'Enable bidirectional sweeps (doubles acquisition efficiency)'),
+            Parameter('stream', False, bool,
+                      'Stream counts through the Data_4 FIFO while the sweep runs instead of polling the ready flag')
         ]),
         Parameter('laser', [
             Parameter('power', 1.0, float, 'Laser power in mW', units='mW'),
@@ -114,6 +116,7 @@ class ODMRSweepContinuousExperiment(Experiment):
         self.counts_averaged = None
         self.voltages = None
         self.sweep_time = None
+        self._stream = None
         
         # Initialize analysis results
         self.fit_parameters = None
@@ -221,10 +224,7 @@ class ODMRSweepContinuousExperiment(Experiment):
             time.sleep(0.1)
         except Exception:
             pass
-        try:
-            self.adwin.clear_process(1)
-        except Exception:
-            pass
+        # the sweep counter stays loaded between runs, load_process skips it if the binary did not change
         
         # Load the ADbasic script but don't start it yet
         from src.core.adwin_helpers import get_adwin_binary_path
@@ -436,8 +436,8 @@ class ODMRSweepContinuousExperiment(Experiment):
         """Cleanup experiment resources."""
         # Stop Adwin process
         if self.adwin and self.adwin.is_connected:
+            # keeps the binary in process 1 for the next run
             self.adwin.stop_process(1)
-            self.adwin.clear_process(1)
         
         # Disable microwave sweep and output
         if self.microwave and self.microwave.is_connected:
@@ -489,30 +489,41 @@ class ODMRSweepContinuousExperiment(Experiment):
         all_v_fwd = np.empty((averages, half), dtype=np.float32)
         all_v_rev = np.empty((averages, half), dtype=np.float32)
         
-        for avg in range(averages):
-            self.log(f"Running sweep {avg + 1}/{averages}")
-            
-            # Run single sweep - get raw data
-            counts, volts = self._run_single_sweep()
-            
-            # Split into equal halves (299 + 299 = 598)
-            n_points = len(counts)
-            assert n_points == 2 * n_steps - 2, f"Expected {2 * n_steps - 2} points, got {n_points}"
-            
-            forward = counts[:half]
-            reverse = counts[half:]
-            v_fwd = volts[:half]
-            v_rev = volts[half:]
-            
-            # Store data
-            all_forward[avg, :] = forward
-            all_reverse[avg, :] = reverse
-            all_v_fwd[avg, :] = v_fwd
-            all_v_rev[avg, :] = v_rev
-            
-            # Settle time between sweeps
-            if avg < averages - 1:
-                time.sleep(settle_time)
+        if self.settings['acquisition']['stream']:
+            # (counts, DAC digits) pairs arrive while the ADwin sweeps, the progress follows the points
+            total_points = averages * (2 * n_steps - 2)
+            self._stream = self.adwin.stream_fifo(4, record_size=2)
+            self._stream.subscribe(lambda chunk: self.updateProgress.emit(
+                min(100, int(100 * (chunk.first_record + len(chunk.data)) / total_points))))
+        try:
+            for avg in range(averages):
+                self.log(f"Running sweep {avg + 1}/{averages}")
+                
+                # Run single sweep - get raw data
+                counts, volts = self._run_single_sweep()
+                
+                # Split into equal halves (299 + 299 = 598)
+                n_points = len(counts)
+                assert n_points == 2 * n_steps - 2, f"Expected {2 * n_steps - 2} points, got {n_points}"
+                
+                forward = counts[:half]
+                reverse = counts[half:]
+                v_fwd = volts[:half]
+                v_rev = volts[half:]
+                
+                # Store data
+                all_forward[avg, :] = forward
+                all_reverse[avg, :] = reverse
+                all_v_fwd[avg, :] = v_fwd
+                all_v_rev[avg, :] = v_rev
+                
+                # Settle time between sweeps
+                if avg < averages - 1:
+                    time.sleep(settle_time)
+        finally:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream = None
         
         # Average the data
         self.counts_forward = np.mean(all_forward, axis=0)
@@ -541,21 +552,12 @@ class ODMRSweepContinuousExperiment(Experiment):
         # Wait for heartbeat to start advancing (like debug script)
         self.log("⏳ Waiting for ADwin heartbeat to start...")
         initial_hb = self.adwin.get_int_var(25)
-        start_time = time.time()
-        
-        while time.time() - start_time < 1.0:  # Wait up to 1 second
-            try:
-                current_hb = self.adwin.get_int_var(25)
-                if current_hb > initial_hb:
-                    self.log(f"✅ ADwin heartbeat advancing: {initial_hb} → {current_hb}")
-                    break
-                time.sleep(0.01)  # 10ms polling
-            except Exception as e:
-                self.log(f"⚠️  Transient Get_Par error (tolerated): {e}")
-                time.sleep(0.01)
-        else:
+        try:
+            snapshot = self.adwin.wait_until(lambda s: s.pars[25] > initial_hb, timeout=1.0, pars=[25])
+        except TimeoutError:
             self.log("❌ ADwin heartbeat not advancing after 1s - process not running!")
             return np.zeros(2 * actual_steps), np.zeros(2 * actual_steps)
+        self.log(f"✅ ADwin heartbeat advancing: {initial_hb} → {snapshot.pars[25]}")
         
         # Clear any stale ready flags first (like debug script)
         self.log("🧹 Clearing any stale ready flags...")
@@ -571,39 +573,36 @@ class ODMRSweepContinuousExperiment(Experiment):
         per_point_s = settle_time + integration_time  # Both already in seconds
         timeout = max(5.0, expected_points * per_point_s * 10)  # Very generous margin
         
+        if self._stream is not None:
+            return self._read_streamed_sweep(expected_points, timeout)
+        
         self.log(f"⏳ Waiting for Par_20 == 1 (sweep ready)…")
         self.log(f"   Expected {expected_points} points, timeout: {timeout:.1f}s")
         
         t0 = time.time()
-        last_hb = self.adwin.get_int_var(25)
-        
-        while True:
-            try:
-                ready = self.adwin.get_int_var(20)  # ready flag
-                hb = self.adwin.get_int_var(25)     # heartbeat
-                state = self.adwin.get_int_var(26)  # current state
-                elapsed = time.time() - t0
-                
-                if ready == 1:
-                    self.log(f"✅ Sweep ready after {elapsed:.2f}s!")
-                    break
-                    
-                # Check if heartbeat is still advancing (after 100ms grace period)
-                if hb <= last_hb and elapsed > 0.1:
-                    self.log(f"⚠️  Heartbeat stalled at {hb}!")
-                    
-                last_hb = hb
-                time.sleep(0.05)
-            except Exception as e:
-                self.log(f"⚠️  Transient Get_Par error (tolerated): {e}")
-                time.sleep(0.05)  # Continue polling despite error
-
-            if elapsed > timeout:
-                self.log(f"❌ Timeout after {elapsed:.1f}s (expected ~{expected_points * per_point_s:.1f}s)")
-                return np.zeros(2 * actual_steps), np.zeros(2 * actual_steps)
+        heartbeat = {'last': self.adwin.get_int_var(25), 'stalled': False}
+        
+        def sweep_ready(snapshot):
+            # ready flag, heartbeat and state come from the same transfer
+            if snapshot.pars[20] == 1:
+                return True
+            # Check if heartbeat is still advancing (after 100ms grace period)
+            if snapshot.pars[25] <= heartbeat['last'] and time.time() - t0 > 0.1 and not heartbeat['stalled']:
+                self.log(f"⚠️  Heartbeat stalled at {snapshot.pars[25]} (state {snapshot.pars[26]})!")
+                heartbeat['stalled'] = True
+            heartbeat['last'] = snapshot.pars[25]
+            return False
+        
+        try:
+            # Par_20 ready flag, Par_21 number of points, Par_25 heartbeat, Par_26 state
+            snapshot = self.adwin.wait_until(sweep_ready, timeout=timeout, pars=[20, 21, 25, 26])
+        except TimeoutError:
+            self.log(f"❌ Timeout after {time.time() - t0:.1f}s (expected ~{expected_points * per_point_s:.1f}s)")
+            return np.zeros(2 * actual_steps), np.zeros(2 * actual_steps)
+        self.log(f"✅ Sweep ready after {time.time() - t0:.2f}s!")
         
-        # Read arrays (like debug script)
-        n_points = self.adwin.get_int_var(21)
+        # Read arrays (like debug script), the number of points was read together with the ready flag
+        n_points = snapshot.pars[21]
         if n_points <= 0:
             self.log("❌ n_points <= 0 — nothing to read.")
             return np.zeros(2 * actual_steps), np.zeros(2 * actual_steps)
@@ -612,18 +611,11 @@ class ODMRSweepContinuousExperiment(Experiment):
         
         # Read the data arrays
         try:
-            counts = self.adwin.read_probes('int_array', 1, n_points)  # Data_1
-            dac_digits = self.adwin.read_probes('int_array', 2, n_points)  # Data_2
+            counts = self.adwin.read_data(1, n_points)  # Data_1
+            dac_digits = self.adwin.read_data(2, n_points)  # Data_2
             
-            # Compute volts from DAC digits
-            volts = []
-            for d in dac_digits:
-                d_int = int(d)
-                if 0 <= d_int <= 65535:
-                    volt = (d_int * 20.0 / 65535.0) - 10.0
-                    volts.append(volt)
-                else:
-                    volts.append(0.0)  # Invalid digit
+            # Compute volts from DAC digits, invalid digits become 0 V
+            volts = digits_to_volts(dac_digits)
             
             self.log(f"✅ Read {len(counts)} counts, {len(volts)} volts")
             
@@ -639,15 +631,32 @@ class ODMRSweepContinuousExperiment(Experiment):
             self.log(f"   This indicates ADwin sweep did not complete properly")
             return np.zeros(2 * actual_steps), np.zeros(2 * actual_steps)
         
-        # Convert to numpy arrays
-        counts = np.array(counts)
-        volts = np.array(volts)
-        
         # Clear ready flag for next sweep
         self.adwin.set_int_var(20, 0)
         
         return counts, volts
     
+    def _read_streamed_sweep(self, expected_points: int, timeout: float):
+        """Wait for the points of one sweep in the FIFO stream instead of the ready flag.
+        
+        Returns:
+            tuple: (counts, volts) like _run_single_sweep
+        """
+        self.log(f"⏳ Streaming {expected_points} points from the Data_4 FIFO, timeout: {timeout:.1f}s")
+        try:
+            records = self._stream.read(expected_points, timeout=timeout)
+        except (TimeoutError, RuntimeError) as e:
+            self.log(f"❌ Streaming failed: {e}")
+            return np.zeros(expected_points), np.zeros(expected_points)
+        
+        if self._stream.fifo_overruns or self._stream.lost_records:
+            self.log(f"⚠️  FIFO overruns: {self._stream.fifo_overruns}, lost points: {self._stream.lost_records}")
+        
+        # Clear ready flag for next sweep
+        self.adwin.set_int_var(20, 0)
+        
+        return records[:, 0], digits_to_volts(records[:, 1])
+    
     def _analyze_data(self):
         """Analyze the ODMR sweep data."""
         self.log("Analyzing ODMR sweep data...")
@@ -672,50 +681,37 @@ class ODMRSweepContinuousExperiment(Experiment):
     def _monitor_sweep_progress(self, total_wait_time: float):
         """Monitor ADwin state during sweep execution."""
         start_time = time.time()
-        last_heartbeat = None
-        last_state = None
-        check_interval = 0.5  # Check every 500ms
+        last = {'heartbeat': None, 'state': None}
+        state_names = {
+            255: "IDLE", 10: "PREP", 20: "PREPARE", 30: "ISSUE_STEP",
+            31: "SETTLE", 32: "OPEN_WINDOW", 33: "DWELL", 34: "CLOSE_WINDOW",
+            35: "NEXT_STEP", 70: "READY"
+        }
         
         self.log("🔍 Monitoring ADwin sweep progress...")
         
-        while time.time() - start_time < total_wait_time:
-            try:
-                # Check heartbeat
-                current_heartbeat = self.adwin.get_int_var(25)
-                if last_heartbeat is not None and current_heartbeat == last_heartbeat:
-                    self.log(f"⚠️  Warning: ADwin heartbeat not advancing ({current_heartbeat})")
-                last_heartbeat = current_heartbeat
-                
-                # Check state
-                current_state = self.adwin.get_int_var(26)
-                if last_state is not None and current_state != last_state:
-                    state_names = {
-                        255: "IDLE", 10: "PREP", 20: "PREPARE", 30: "ISSUE_STEP",
-                        31: "SETTLE", 32: "OPEN_WINDOW", 33: "DWELL", 34: "CLOSE_WINDOW",
-                        35: "NEXT_STEP", 70: "READY"
-                    }
-                    state_name = state_names.get(current_state, f"UNKNOWN({current_state})")
-                    self.log(f"   State: {current_state} ({state_name})")
-                last_state = current_state
-                
-                # Check if ready (sweep complete)
-                ready_flag = self.adwin.get_int_var(20)
-                if ready_flag == 1:
-                    elapsed = time.time() - start_time
-                    self.log(f"✅ Sweep completed early at {elapsed:.2f}s (expected {total_wait_time:.2f}s)")
-                    break
-                    
-            except Exception as e:
-                self.log(f"⚠️  Error monitoring ADwin: {e}")
-            
-            time.sleep(check_interval)
+        def report(snapshot):
+            # heartbeat (Par_25), state (Par_26) and ready flag (Par_20) of the same transfer
+            heartbeat, state = snapshot.pars[25], snapshot.pars[26]
+            if last['heartbeat'] is not None and heartbeat == last['heartbeat']:
+                self.log(f"⚠️  Warning: ADwin heartbeat not advancing ({heartbeat})")
+            if last['state'] is not None and state != last['state']:
+                state_name = state_names.get(state, f"UNKNOWN({state})")
+                self.log(f"   State: {state} ({state_name})")
+            last.update(heartbeat=heartbeat, state=state)
+            return snapshot.pars[20] == 1
+        
+        try:
+            self.adwin.wait_until(report, timeout=total_wait_time, poll_schedule=[0.5], pars=[20, 25, 26])
+            elapsed = time.time() - start_time
+            self.log(f"✅ Sweep completed early at {elapsed:.2f}s (expected {total_wait_time:.2f}s)")
+        except TimeoutError:
+            pass
         
         # Final status check
         try:
-            final_heartbeat = self.adwin.get_int_var(25)
-            final_state = self.adwin.get_int_var(26)
-            final_ready = self.adwin.get_int_var(20)
-            self.log(f"🔍 Final status: heartbeat={final_heartbeat}, state={final_state}, ready={final_ready}")
+            final = self.adwin.snapshot(pars=[20, 25, 26], fpars=[])
+            self.log(f"🔍 Final status: heartbeat={final.pars[25]}, state={final.pars[26]}, ready={final.pars[20]}")
         except Exception as e:
             self.log(f"⚠️  Could not get final ADwin status: {e}")
     
@@ -29,7 +29,7 @@ from src.core.parameter import Parameter
 from src.Controller.sg384 import SG384Generator
 from src.Controller.adwin_gold import AdwinGoldDevice
 from src.Controller.nanodrive import MCLNanoDrive
-from src.core.adwin_helpers import setup_adwin_for_odmr, read_adwin_odmr_data
+from src.core.adwin_helpers import setup_adwin_for_odmr, read_adwin_odmr_data, digits_to_volts
 
 
 class ODMRSweepContinuousMultiExperiment(Experiment):
@@ -230,10 +230,7 @@ class ODMRSweepContinuousMultiExperiment(Experiment):
             time.sleep(0.1)
         except Exception:
             pass
-        try:
-            self.adwin.clear_process(1)
-        except Exception:
-            pass
+        # the sweep counter stays loaded between runs, load_process skips it if the binary did not change
         
         # Store parameters for later use
         # Convert directly from seconds to microseconds (no intermediate ms step)
@@ -494,8 +491,8 @@ class ODMRSweepContinuousMultiExperiment(Experiment):
         """Cleanup experiment resources."""
         # Stop Adwin process
         if self.adwin and self.adwin.is_connected:
+            # keeps the binary in process 1 for the next run
             self.adwin.stop_process(1)
-            self.adwin.clear_process(1)
         
         # Disable microwave sweep and output
         if self.microwave and self.microwave.is_connected:
@@ -585,21 +582,12 @@ class ODMRSweepContinuousMultiExperiment(Experiment):
         # Wait for heartbeat to start advancing
         self.log("⏳ Waiting for ADwin heartbeat to start...")
         initial_hb = self.adwin.get_int_var(25)
-        start_time = time.time()
-        
-        while time.time() - start_time < 1.0:  # Wait up to 1 second
-            try:
-                current_hb = self.adwin.get_int_var(25)
-                if current_hb > initial_hb:
-                    self.log(f"✅ ADwin heartbeat advancing: {initial_hb} → {current_hb}")
-                    break
-                time.sleep(0.01)  # 10ms polling
-            except Exception as e:
-                self.log(f"⚠️  Transient Get_Par error (tolerated): {e}")
-                time.sleep(0.01)
-        else:
+        try:
+            snapshot = self.adwin.wait_until(lambda s: s.pars[25] > initial_hb, timeout=1.0, pars=[25])
+        except TimeoutError:
             self.log("❌ ADwin heartbeat not advancing after 1s - process not running!")
             return np.zeros(self.n_points), np.zeros(self.n_points)
+        self.log(f"✅ ADwin heartbeat advancing: {initial_hb} → {snapshot.pars[25]}")
         
         # Clear any stale ready flags first
         self.log("🧹 Clearing any stale ready flags...")
@@ -618,35 +606,29 @@ class ODMRSweepContinuousMultiExperiment(Experiment):
         self.log(f"   Expected {self.n_points} points, timeout: {timeout:.1f}s")
         
         t0 = time.time()
-        last_hb = self.adwin.get_int_var(25)
-        
-        while True:
-            try:
-                ready = self.adwin.get_int_var(20)  # ready flag
-                hb = self.adwin.get_int_var(25)     # heartbeat
-                state = self.adwin.get_int_var(26)  # current state
-                elapsed = time.time() - t0
-                
-                if ready == 1:
-                    self.log(f"✅ Sweep ready after {elapsed:.2f}s!")
-                    break
-                    
-                # Check if heartbeat is still advancing (after 100ms grace period)
-                if hb <= last_hb and elapsed > 0.1:
-                    self.log(f"⚠️  Heartbeat stalled at {hb}!")
-                    
-                last_hb = hb
-                time.sleep(0.05)
-            except Exception as e:
-                self.log(f"⚠️  Transient Get_Par error (tolerated): {e}")
-                time.sleep(0.05)  # Continue polling despite error
-
-            if elapsed > timeout:
-                self.log(f"❌ Timeout after {elapsed:.1f}s (expected ~{self.n_points * per_point_s:.1f}s)")
-                return np.zeros(self.n_points), np.zeros(self.n_points)
+        heartbeat = {'last': self.adwin.get_int_var(25), 'stalled': False}
+        
+        def sweep_ready(snapshot):
+            # ready flag, heartbeat and state come from the same transfer
+            if snapshot.pars[20] == 1:
+                return True
+            # Check if heartbeat is still advancing (after 100ms grace period)
+            if snapshot.pars[25] <= heartbeat['last'] and time.time() - t0 > 0.1 and not heartbeat['stalled']:
+                self.log(f"⚠️  Heartbeat stalled at {snapshot.pars[25]} (state {snapshot.pars[26]})!")
+                heartbeat['stalled'] = True
+            heartbeat['last'] = snapshot.pars[25]
+            return False
         
-        # Read arrays
-        n_points = self.adwin.get_int_var(21)
+        try:
+            # Par_20 ready flag, Par_21 number of points, Par_25 heartbeat, Par_26 state
+            snapshot = self.adwin.wait_until(sweep_ready, timeout=timeout, pars=[20, 21, 25, 26])
+        except TimeoutError:
+            self.log(f"❌ Timeout after {time.time() - t0:.1f}s (expected ~{self.n_points * per_point_s:.1f}s)")
+            return np.zeros(self.n_points), np.zeros(self.n_points)
+        self.log(f"✅ Sweep ready after {time.time() - t0:.2f}s!")
+        
+        # Read arrays, the number of points was read together with the ready flag
+        n_points = snapshot.pars[21]
         if n_points <= 0:
             self.log("❌ n_points <= 0 — nothing to read.")
             return np.zeros(self.n_points), np.zeros(self.n_points)
@@ -655,18 +637,11 @@ class ODMRSweepContinuousMultiExperiment(Experiment):
         
         # Read the data arrays
         try:
-            counts = self.adwin.read_probes('int_array', 1, n_points)  # Data_1
-            dac_digits = self.adwin.read_probes('int_array', 2, n_points)  # Data_2
-            
-            # Compute volts from DAC digits
-            volts = []
-            for d in dac_digits:
-                d_int = int(d)
-                if 0 <= d_int <= 65535:
-                    volt = (d_int * 20.0 / 65535.0) - 10.0
-                    volts.append(volt)
-                else:
-                    volts.append(0.0)  # Invalid digit
+            counts = self.adwin.read_data(1, n_points)  # Data_1
+            dac_digits = self.adwin.read_data(2, n_points)  # Data_2
+            
+            # Compute volts from DAC digits, invalid digits become 0 V
+            volts = digits_to_volts(dac_digits)
             
             self.log(f"✅ Read {len(counts)} counts, {len(volts)} volts")
             
@@ -682,10 +657,6 @@ class ODMRSweepContinuousMultiExperiment(Experiment):
             self.log(f"   This indicates ADwin sweep did not complete properly")
             return np.zeros(self.n_points), np.zeros(self.n_points)
         
-        # Convert to numpy arrays
-        counts = np.array(counts)
-        volts = np.array(volts)
-        
         # Clear ready flag for next sweep
         self.adwin.set_int_var(20, 0)
         
@@ -12,6 +12,7 @@ import re
 from dataclasses import dataclass
 import numpy as np
 
+from src.core.unit_utils import convert_magnitude
 from .sequence_description import (
     SequenceDescription, PulseDescription, LoopDescription, ConditionalDescription,
     PulseShape, TimingType, MarkerDescription, VariableDescription
@@ -503,19 +504,11 @@ class SequenceTextParser:
         value = float(match.group(1))
         unit = match.group(2) or "s"
         
-        # Convert to seconds
-        unit_multipliers = {
-            "ns": 1e-9,
-            "μs": 1e-6,
-            "us": 1e-6,
-            "ms": 1e-3,
-            "s": 1.0
-        }
-        
-        if unit not in unit_multipliers:
+        # Convert to seconds, the factor is cached after the first pulse with this unit
+        try:
+            return convert_magnitude(value, unit, "s")
+        except ValueError:
             raise ParseError(f"Unknown time unit: {unit}")
-        
-        return value * unit_multipliers[unit]
 
     def _parse_amplitude_expression(self, amplitude: str) -> float:
         amplitude = amplitude.strip().lower()
@@ -820,10 +813,7 @@ class SequenceTextParser:
             value = float(match.group(1))
             unit = match.group(2)
             # Convert timing to seconds
-            unit_multipliers = {
-                "ns": 1e-9, "μs": 1e-6, "us": 1e-6, "ms": 1e-3, "s": 1.0
-            }
-            return value * unit_multipliers[unit], unit
+            return convert_magnitude(value, unit, "s"), unit
         
         # Check for voltage units
         voltage_pattern = r"([\d.]+)\s*V"
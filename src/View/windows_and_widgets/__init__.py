@@ -16,6 +16,7 @@ from .widgets import AQuISSQTreeItem,MatplotlibWidget,PyQtgraphWidget,PyQtCoordi
 from .load_dialog import LoadDialog
 from .load_dialog_probes import LoadDialogProbes
 from .export_dialog import ExportDialog
+from .device_metrics_dialog import DeviceMetricsDialog
 
 # Import parameter widget components (optional)
 try:
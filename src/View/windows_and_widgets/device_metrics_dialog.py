@@ -0,0 +1,75 @@
+"""
+Device Metrics Dialog
+
+Diagnostics window that shows the call counts and latency percentiles of all devices recorded by
+src.core.device_metrics, so the instrument round trips that limit an experiment can be spotted from
+the GUI. The table refreshes periodically while the dialog is open.
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QDialog, QHBoxLayout, QPlainTextEdit, QPushButton, QVBoxLayout
+
+from src.core.device_metrics import get_device_metrics
+
+
+class DeviceMetricsDialog(QDialog):
+    """
+    Non-modal dialog with a text table of the device call statistics.
+    """
+
+    REFRESH_INTERVAL = 1000  # ms
+
+    def __init__(self, parent=None, metrics=None):
+        super().__init__(parent)
+        self.metrics = metrics if metrics is not None else get_device_metrics()
+        self.setWindowTitle('Device Metrics')
+        self.resize(1000, 400)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.NoWrap)
+        font = QFont('Courier')
+        font.setStyleHint(QFont.Monospace)
+        self.text.setFont(font)
+
+        self.btn_refresh = QPushButton('Refresh')
+        self.btn_reset = QPushButton('Reset')
+        self.btn_refresh.clicked.connect(self.refresh)
+        self.btn_reset.clicked.connect(self.reset)
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.btn_reset)
+        buttons.addWidget(self.btn_refresh)
+        layout = QVBoxLayout()
+        layout.addWidget(self.text)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def refresh(self):
+        lines = self.metrics.format_table()
+        if len(lines) == 1:
+            lines.append('no device calls recorded yet')
+        self.text.setPlainText('\n'.join(lines))
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.timer.start(self.REFRESH_INTERVAL)
+        super().showEvent(event)
+
+    def closeEvent(self, event):
+        self.timer.stop()
+        super().closeEvent(event)
@@ -97,10 +97,11 @@ class ExportDialog(QDialog, Ui_Dialog):
         """
         try:
             self.list_experiment_model.removeRows(0, self.list_experiment_model.rowCount())
+            # the classes are listed from the plugin manifest, only the exported ones are imported
             if self.cmb_select_type.currentText() == 'Experiment':
-                self.available = find_experiments_in_python_files(folder)
+                self.available = find_experiments_in_python_files(folder, use_manifest=True)
             elif self.cmb_select_type.currentText() == 'Device':
-                self.available = find_devices_in_python_files(folder)
+                self.available = find_devices_in_python_files(folder, use_manifest=True)
             self.fill_list(self.list_experiment, self.available.keys())
             for key in self.available.keys():
                 self.error_array.update({key: ''})
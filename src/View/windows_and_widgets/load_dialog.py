@@ -98,7 +98,7 @@ Returns:
         self.tree_infile_model.itemChanged.connect(self.name_changed)
         self.tree_loaded_model.itemChanged.connect(self.name_changed)
 
-        self.cmb_looping_variable.addItems(['Loop', 'Parameter Sweep'])
+        self.cmb_looping_variable.addItems(['Loop', 'Parameter Sweep', 'N-D Parameter Sweep'])
 
 
     def name_changed(self, changed_item):
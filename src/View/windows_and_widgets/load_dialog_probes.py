@@ -23,6 +23,7 @@ from PyQt5 import QtGui
 from PyQt5.uic import loadUiType
 
 from src.core.read_write_functions import load_aqs_file
+from src.core.probe import probe_options
 
 # load the basic old_View either from .ui file or from precompiled .py file
 try:
@@ -59,12 +60,12 @@ Returns:
         # create models for tree structures, the models reflect the data
         self.tree_infile_model = QtGui.QStandardItemModel()
         self.tree_infile.setModel(self.tree_infile_model)
-        QtGui.QStandardItemModel().reset()
 
         self.tree_infile_model.setHorizontalHeaderLabels(['Device', 'Probe'])
         self.tree_loaded_model = QtGui.QStandardItemModel()
         self.tree_loaded.setModel(self.tree_loaded_model)
-        self.tree_loaded_model.setHorizontalHeaderLabels(['Device', 'Probe'])
+        # the refresh interval of the selected probes can be edited, empty for the interval of ReadProbes
+        self.tree_loaded_model.setHorizontalHeaderLabels(['Device', 'Refresh interval [s]'])
         # connect the buttons
         self.btn_open.clicked.connect(self.open_file_dialog)
 
@@ -72,9 +73,14 @@ Returns:
         #   - elements_old: the old elements (experiments, devices) that have been passed to the dialog
         #   - elements_from_file: the elements from the file that had been opened
         print(('adsada', probes_old))
+        #   - refresh_intervals: {(device_name, probe_name): refresh interval in s} of the probes that have one
         self.elements_selected = {}
+        self.refresh_intervals = {}
         for device_name, p in probes_old.items():
             self.elements_selected.update( {device_name: ','.join(list(p.keys()))})
+            for probe_name, probe in p.items():
+                if getattr(probe, 'refresh_interval', None) is not None:
+                    self.refresh_intervals[(device_name, probe_name)] = probe.refresh_interval
         if os.path.isfile(filename):
             self.elements_from_file = self.load_elements(filename)
         else:
@@ -91,13 +97,17 @@ Returns:
         self.tree_loaded_model.itemChanged.connect(self.item_dragged_and_dropped)
 
 
-    def item_dragged_and_dropped(self):
+    def item_dragged_and_dropped(self, item=None):
         """
 
         adds and removes probes from the trees when they are dragged and dropped
 
         """
 
+        if item is not None and item.column() == 1:
+            self.refresh_interval_edited(item)
+            return
+
         index = None
         self.tree_infile_model.itemChanged.disconnect()
         self.tree_loaded_model.itemChanged.disconnect()
@@ -144,6 +154,31 @@ Returns:
         self.tree_infile_model.itemChanged.connect(self.item_dragged_and_dropped)
         self.tree_loaded_model.itemChanged.connect(self.item_dragged_and_dropped)
 
+    def refresh_interval_edited(self, item):
+        """
+        stores the refresh interval that was entered for a selected probe
+        """
+        parent = item.parent()
+        if parent is None:
+            return
+        key = (str(parent.text()), str(parent.child(item.row(), 0).text()))
+        text = str(item.text()).strip()
+        try:
+            interval = float(text) if text else None
+            if interval is not None and interval <= 0:
+                raise ValueError
+        except ValueError:
+            print("Warning: the refresh interval must be a positive number of seconds, got '{:s}'".format(text))
+            interval = self.refresh_intervals.get(key)
+            self.tree_loaded_model.itemChanged.disconnect()
+            item.setText('' if interval is None else str(interval))
+            self.tree_loaded_model.itemChanged.connect(self.item_dragged_and_dropped)
+            return
+        if interval is None:
+            self.refresh_intervals.pop(key, None)
+        else:
+            self.refresh_intervals[key] = interval
+
     def show_info(self):
         """
         displays the doc string of the selected element
@@ -195,7 +230,14 @@ Returns:
         """
         input_data = load_aqs_file(filename)
         if isinstance(input_data, dict) and 'probes' in input_data:
-            return input_data['probes']
+            elements = {}
+            for device_name, probes in input_data['probes'].items():
+                options = probe_options(probes)
+                elements[device_name] = ','.join(options.keys())
+                for probe_name, probe_settings in options.items():
+                    if probe_settings.get('refresh_interval') is not None:
+                        self.refresh_intervals[(device_name, probe_name)] = probe_settings['refresh_interval']
+            return elements
         else:
             return {}
 
@@ -214,11 +256,8 @@ Returns:
         def removeAll(tree):
 
             if tree.model().rowCount() > 0:
-                for i in range(0, tree.model().rowCount()):
-                    item = tree.model().item(i)
-                    del item
-                    tree.model().removeRows(0, tree.model().rowCount())
-                    tree.model().reset()
+                # QStandardItemModel.reset() does not exist in Qt5, removing the rows resets the view
+                tree.model().removeRows(0, tree.model().rowCount())
 
         def add_probe(tree, device, probes):
             item = QtGui.QStandardItem(device)
@@ -229,7 +268,13 @@ Returns:
                 child_name.setDragEnabled(True)
                 child_name.setSelectable(True)
                 child_name.setEditable(False)
-                item.appendRow(child_name)
+                if tree is self.tree_loaded:
+                    interval = self.refresh_intervals.get((device, probe))
+                    child_interval = QtGui.QStandardItem('' if interval is None else str(interval))
+                    child_interval.setEditable(True)
+                    item.appendRow([child_name, child_interval])
+                else:
+                    item.appendRow(child_name)
             tree.model().appendRow(item)
 
         removeAll(tree)
@@ -239,12 +284,22 @@ Returns:
             # tree.setFirstColumnSpanned(index, self.tree_infile.rootIndex(), True)
         tree.expandAll()
 
-    def getValues(self):
+    def get_values(self):
         """
         Returns: the selected elements
         """
         print(('self.elements_selected', self.elements_selected))
-        return self.elements_selected
+        values = {}
+        for device_name, probes in self.elements_selected.items():
+            probe_names = probes.split(',')
+            if any((device_name, probe_name) in self.refresh_intervals for probe_name in probe_names):
+                # same format as Probe.to_dict for probes with their own refresh interval
+                values[device_name] = {probe_name: {'refresh_interval': self.refresh_intervals[(device_name, probe_name)]}
+                                       if (device_name, probe_name) in self.refresh_intervals else {}
+                                       for probe_name in probe_names}
+            else:
+                values[device_name] = probes
+        return values
 
 if __name__ == '__main__':
     import sys
@@ -255,7 +310,7 @@ if __name__ == '__main__':
     dialog.show()
     dialog.raise_()
     if dialog.exec_():
-        probes = dialog.getValues()
+        probes = dialog.get_values()
 
         print(probes)
 
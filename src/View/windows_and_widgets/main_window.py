@@ -25,12 +25,15 @@ from PyQt5 import QtCore
 from PyQt5.QtWidgets import QSizePolicy
 from PyQt5.QtCore import QThread, pyqtSlot, Qt, QSignalBlocker
 from src.core import Parameter, Device, Experiment, Probe
+from src.core.probe import probes_to_dict
 from src.core.experiment_iterator import ExperimentIterator
 from src.core.read_probes import ReadProbes
-from src.View.windows_and_widgets import AQuISSQTreeItem, LoadDialog, LoadDialogProbes, ExportDialog, PyQtgraphWidget, PyQtCoordinatesBar
+from src.core.probe_history import ProbeLogger
+from src.View.windows_and_widgets import AQuISSQTreeItem, LoadDialog, LoadDialogProbes, ExportDialog, PyQtgraphWidget, PyQtCoordinatesBar, DeviceMetricsDialog
 from src.Model.experiments.select_points import SelectPoints
 from src.core.read_write_functions import load_aqs_file
 from src.core.helper_functions import get_project_root
+from src.core import tracing
 from src.config_store import load_config, merge_config, save_config
 from pathlib import Path
 from src.config_paths import resolve_paths
@@ -115,6 +118,46 @@ class CustomEventFilter(QtCore.QObject):
         return QtWidgets.QWidget.eventFilter(QObject, QEvent)
 
 
+class DeviceUpdateSignals(QtCore.QObject):
+    """signals of a DeviceUpdateWorker, delivered on the GUI thread"""
+    finished = QtCore.pyqtSignal(object, object)  # worker, result of the update
+    failed = QtCore.pyqtSignal(object, str)  # worker, error message
+
+
+class DeviceUpdateWorker(QtCore.QRunnable):
+    """
+    Applies a settings update from the GUI to a device on a thread pool. The update waits while an experiment
+    uses the device (see src.core.device_arbiter), on the GUI thread this would freeze the window.
+
+    Args:
+        item: tree item that was changed
+        device: device that is updated
+        path_to_device: path of the parameter in the device settings
+        requested_value: value entered by the user
+        old_value: value before the update
+        function: called with args on the worker thread, its return value is sent with finished
+    """
+
+    def __init__(self, item, device, path_to_device, requested_value, old_value, function, *args):
+        super().__init__()
+        self.item = item
+        self.device = device
+        self.path_to_device = path_to_device
+        self.requested_value = requested_value
+        self.old_value = old_value
+        self.function = function
+        self.args = args
+        self.signals = DeviceUpdateSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self, str(e))
+        else:
+            self.signals.finished.emit(self, result)
+
+
 class MainWindow(QMainWindow, Ui_MainWindow):
     # application_path = os.path.abspath(os.path.join(os.path.expanduser("~"), 'Experiments\\AQuISS_default_save_location'))
     #
@@ -151,6 +194,10 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # Initialize recursion guard
         self._updating_parameters = False
 
+        # device updates from the trees run here, one at a time so they reach the devices in order
+        self._device_update_pool = QtCore.QThreadPool(self)
+        self._device_update_pool.setMaxThreadCount(1)
+
         # 1) Resolve your application folders from config_file:
         if config_file is None:
             # default to config.json in src directory
@@ -330,6 +377,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.actionSaveWorkspace.triggered.connect(self.btn_clicked)
             self.actionLoadWorkspace.triggered.connect(self.btn_clicked)
 
+            # diagnostics window with the call counts and latencies of the devices
+            self.actionDeviceMetrics = QtWidgets.QAction('Device Metrics...', self)
+            self.actionDeviceMetrics.triggered.connect(self.show_device_metrics)
+            if hasattr(self, 'menuHelp'):
+                self.menuHelp.addAction(self.actionDeviceMetrics)
+
             self.btn_load_devices.clicked.connect(self.btn_clicked)
             self.btn_load_experiments.clicked.connect(self.btn_clicked)
             self.btn_load_probes.clicked.connect(self.btn_clicked)
@@ -491,6 +544,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         
         self.experiment_thread.quit()
         self.read_probes.quit()
+        if getattr(self, 'probe_logger', None) is not None:
+            self.probe_logger.close()
         event.accept()
 
         print('\n\n======================================================')
@@ -546,18 +601,18 @@ class MainWindow(QMainWindow, Ui_MainWindow):
     def set_probe_file_name(self, checked):
         """
         sets the filename to which the probe logging function will write
+        the readings are written to an HDF5 file by a ProbeLogger on a background thread
         Args:
             checked: boolean (True: opens file) (False: closes file)
         """
         if checked:
-            file_name = os.path.join(self.gui_settings['probes_log_folder'], '{:s}_probes.csv'.format(datetime.datetime.now().strftime('%y%m%d-%H_%M_%S')))
+            file_name = os.path.join(self.gui_settings['probes_log_folder'], '{:s}_probes.h5'.format(datetime.datetime.now().strftime('%y%m%d-%H_%M_%S')))
             if os.path.isfile(file_name) == False:
-                self.probe_file = open(file_name, 'a')
-                new_values = self.read_probes.probes_values
-                header = ','.join(list(np.array([['{:s} ({:s})'.format(p, instr) for p in list(p_dict.keys())] for instr, p_dict in new_values.items()]).flatten()))
-                self.probe_file.write('{:s}\n'.format(header))
-        else:
-            self.probe_file.close()
+                names = ProbeLogger.names_from_values(self.read_probes.probes_values)
+                self.probe_logger = ProbeLogger(file_name, names)
+        elif getattr(self, 'probe_logger', None) is not None:
+            self.probe_logger.close()
+            self.probe_logger = None
 
     def switch_tab(self):
         """
@@ -577,22 +632,22 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
                 # Show original contents again
                 self.restore_layout_contents()
-        if self.current_experiment is None:
-            if current_tab == 'Probes':
-                self.read_probes.start()
-                self.read_probes.updateProgress.connect(self.update_probes)
-            else:
-                try:
-                    self.read_probes.updateProgress.disconnect()
-                    self.read_probes.quit()
-                except TypeError:
-                    pass
+        # probe reads wait for the device arbiter, so the probes can be read while an experiment runs
+        if current_tab == 'Probes':
+            self.read_probes.start()
+            self.read_probes.updateProgress.connect(self.update_probes)
+        else:
+            try:
+                self.read_probes.updateProgress.disconnect()
+                self.read_probes.quit()
+            except TypeError:
+                pass
 
             if current_tab == 'Devices':
-                self.refresh_devices()
-
-        else:
-            self.log('updating probes / devices disabled while experiment is running!')
+                if self.current_experiment is None:
+                    self.refresh_devices()
+                else:
+                    self.log('updating devices disabled while experiment is running!')
 
     def update_display_choice(self, new_display_choice):
         print("update_display_choice called")
@@ -1088,6 +1143,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 gui_logger.info(f"Validating experiment: {experiment.name}")
                 self.update_experiment_from_item(experiment_item)
                 experiment.is_valid()
+                predicted_duration = experiment.predicted_duration()
+                if predicted_duration is not None:
+                    self.lbl_time_estimate.setText('estimated duration: {:s}'.format(
+                        str(datetime.timedelta(seconds=int(predicted_duration)))))
+                else:
+                    self.lbl_time_estimate.setText('estimated duration: unknown (no previous runs)')
                 experiment.plot_validate([self.pyqtgraphwidget_1.graph, self.pyqtgraphwidget_2.graph])
                 #i dont think these two lines are necessary since pyqtgraph auto updates when plot_validate is called
                 self.pyqtgraphwidget_1.update()
@@ -1721,32 +1782,21 @@ class MainWindow(QMainWindow, Ui_MainWindow):
                 for element in path_to_device:
                     dictator = {element: dictator}
 
-                try:
-                    # Use the enhanced feedback system if available
-                    if hasattr(device, 'get_feedback_only'):
-                        # Get detailed feedback about the update
-                        # Note: get_feedback_only already updates the device internally
-                        feedback = device.get_feedback_only(dictator)
-                        
-                        # Process feedback for each parameter
-                        for param_name, param_feedback in feedback.items():
-                            self._process_parameter_feedback(item, param_feedback, device.name, path_to_device)
-                    else:
-                        # Fallback to old method for devices without enhanced feedback
-                        self._update_device_with_validation(device, dictator, item, path_to_device)
-                        
-                        # Get actual value after update (in case device clamped it)
-                        actual_value = device.settings
-                        for element in path_to_device_copy:
-                            actual_value = actual_value[element]
-                        
-                        # Provide user feedback based on what happened
-                        self._provide_parameter_feedback(item, requested_value, actual_value, old_value, device.name)
-                    
-                except Exception as e:
-                    # Handle validation errors gracefully
-                    self._handle_parameter_error(item, str(e), device.name)
-                    return
+                # the device is updated on a worker, the feedback is shown when the update is done
+                # (_device_update_finished, _device_update_failed)
+                if hasattr(device, 'get_feedback_only'):
+                    # Get detailed feedback about the update
+                    # Note: get_feedback_only already updates the device internally
+                    worker = DeviceUpdateWorker(item, device, path_to_device, requested_value, old_value,
+                                                device.get_feedback_only, dictator)
+                else:
+                    # Fallback to old method for devices without enhanced feedback
+                    worker = DeviceUpdateWorker(item, device, path_to_device, requested_value, old_value,
+                                                self._update_device_with_validation, device, dictator, item,
+                                                path_to_device)
+                worker.signals.finished.connect(self._device_update_finished)
+                worker.signals.failed.connect(self._device_update_failed)
+                self._device_update_pool.start(worker)
                 
             elif treeWidget == self.tree_experiments:
                 gui_logger.debug("Updating parameters from tree_experiments")
@@ -1780,6 +1830,51 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             # Always reset the recursion guard
             self._updating_parameters = False
 
+    @pyqtSlot(object, object)
+    def _device_update_finished(self, worker, feedback):
+        """
+        Shows the feedback of a device update that finished on the worker thread.
+
+        Args:
+            worker: DeviceUpdateWorker of the update
+            feedback: feedback dictionary of get_feedback_only, None for devices without it
+        """
+        item, device = worker.item, worker.device
+        self._updating_parameters = True
+        try:
+            if feedback is not None:
+                # Process feedback for each parameter
+                for param_name, param_feedback in feedback.items():
+                    self._process_parameter_feedback(item, param_feedback, device.name, worker.path_to_device)
+            else:
+                # Get actual value after update (in case device clamped it)
+                actual_value = device.settings
+                for element in reversed(worker.path_to_device):
+                    actual_value = actual_value[element]
+
+                # Provide user feedback based on what happened
+                self._provide_parameter_feedback(item, worker.requested_value, actual_value, worker.old_value,
+                                                 device.name)
+        except RuntimeError as e:
+            # the tree was rebuilt while the device was updated
+            gui_logger.debug(f"No feedback for {device.name}, the tree item was removed: {e}")
+        finally:
+            self._updating_parameters = False
+
+    @pyqtSlot(object, str)
+    def _device_update_failed(self, worker, error_message):
+        """
+        Shows the error of a device update that failed on the worker thread.
+        """
+        self._updating_parameters = True
+        try:
+            # Handle validation errors gracefully
+            self._handle_parameter_error(worker.item, error_message, worker.device.name)
+        except RuntimeError as e:
+            gui_logger.debug(f"No feedback for {worker.device.name}, the tree item was removed: {e}")
+        finally:
+            self._updating_parameters = False
+
     def _update_device_with_validation(self, device, settings_dict, item, path_to_device):
         """
         Update device with parameter validation and error handling.
@@ -1801,7 +1896,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             else:
                 gui_logger.warning(f"Device {type(device).__name__} does not have validate_parameter method")
             
-            # Update the device
+            # Update the device, waits for the calls of a running experiment (see src.core.device_arbiter)
+            status = device.busy_status
+            if status['busy']:
+                gui_logger.info(f"Device {device.name} is busy ({status['priority']}: {status['operation']}), "
+                                f"the update is applied when it is free")
             device.update(settings_dict)
             
         except Exception as e:
@@ -2210,7 +2309,8 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         """
         gui_logger.info(f"Plotting experiment: {experiment.name}")
         try:
-            experiment.plot([self.pyqtgraphwidget_1.graph, self.pyqtgraphwidget_2.graph])
+            with tracing.span('MainWindow.plot_experiment', 'gui', experiment=experiment.name):
+                experiment.plot([self.pyqtgraphwidget_1.graph, self.pyqtgraphwidget_2.graph])
             gui_logger.debug("Experiment plot completed successfully")
             #self.matplotlibwidget_1.draw()
             #self.matplotlibwidget_2.draw()
@@ -2219,6 +2319,15 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             gui_logger.error(f"Traceback: {traceback.format_exc()}")
 
 
+    def show_device_metrics(self):
+        """
+        opens the diagnostics window with the device call statistics, or raises it if it is already open
+        """
+        if getattr(self, '_device_metrics_dialog', None) is None:
+            self._device_metrics_dialog = DeviceMetricsDialog(self)
+        self._device_metrics_dialog.show()
+        self._device_metrics_dialog.raise_()
+
     @pyqtSlot(int)
     def update_status(self, progress):
         """
@@ -2297,6 +2406,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         else:
             for x in range(probe_count):
                 topLvlItem = self.tree_probes.topLevelItem(x)
+                topLvlItem.setText(1, self._device_busy_text(topLvlItem.name))
                 for child_id in range(topLvlItem.childCount()):
                     child = topLvlItem.child(child_id)
                     child.value = new_values[topLvlItem.name][child.name]
@@ -2307,9 +2417,20 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             self.matplotlibwidget_1.draw()
 
 
-        if self.chk_probe_log.isChecked():
-            data = ','.join(list(np.array([[str(p) for p in list(p_dict.values())] for instr, p_dict in new_values.items()]).flatten()))
-            self.probe_file.write('{:s}\n'.format(data))
+        if self.chk_probe_log.isChecked() and getattr(self, 'probe_logger', None) is not None:
+            self.probe_logger.log(new_values)
+
+    def _device_busy_text(self, device_name):
+        """
+        returns 'busy (<priority>: <operation>)' if another thread is using the device, '' otherwise, without waiting for the device
+        """
+        probes = self.read_probes.probes.get(device_name, {})
+        if not probes:
+            return ''
+        status = next(iter(probes.values())).device.busy_status
+        if not status['busy']:
+            return ''
+        return 'busy ({:s}: {:s})'.format(status['priority'], status['operation'])
 
     def update_experiment_from_item(self, item):
         """
@@ -2782,10 +2903,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             for exp in self.experiments.values():
                 exp_dict.update(exp.to_dict())
 
-            probe_dict = {
-                dev: ",".join(self.probes[dev].keys())
-                for dev in self.probes
-            }
+            probe_dict = probes_to_dict(self.probes)
 
             # 3) Merge everything
             merged = merge_config(
@@ -690,34 +690,8 @@ class NumberClampDelegate(QtWidgets.QStyledItemDelegate):
         Returns:
             dict: Tolerance configuration or None for default
         """
-        device_name = device.__class__.__name__.lower()
-        
-        # Device-specific tolerances
-        tolerances = {
-            'mclnanodrive': {
-                'x_pos': {'type': 'absolute', 'value': 0.01},  # 0.01 microns
-                'y_pos': {'type': 'absolute', 'value': 0.01},  # 0.01 microns  
-                'z_pos': {'type': 'absolute', 'value': 0.01},  # 0.01 microns
-            },
-            'sg384generator': {
-                'frequency': {'type': 'relative', 'value': 0.0001},  # 0.01% (very precise for frequency)
-                'sweep_center_frequency': {'type': 'relative', 'value': 0.0001},
-                'sweep_max_frequency': {'type': 'relative', 'value': 0.0001},
-                'sweep_min_frequency': {'type': 'relative', 'value': 0.0001},
-                'power': {'type': 'absolute', 'value': 0.1},  # 0.1 dBm
-                'phase': {'type': 'absolute', 'value': 0.1},   # 0.1 degrees
-            },
-            'adwingolddevice': {
-                # ADwin parameters are typically very precise
-                'delay': {'type': 'absolute', 'value': 0.001},  # 0.001 seconds
-            }
-        }
-        
-        # Check if device has specific tolerance for this parameter
-        if device_name in tolerances and param_name in tolerances[device_name]:
-            return tolerances[device_name][param_name]
-        
-        # Check if device has a general tolerance method
+        # the tolerances are defined by the device classes (_PARAMETER_TOLERANCES), they are also used
+        # by the differential updates of Device to decide which settings have to be sent
         if hasattr(device, 'get_parameter_tolerance'):
             try:
                 return device.get_parameter_tolerance(param_name)
@@ -0,0 +1,155 @@
+"""
+Adaptive Sweep Sampling
+
+Chooses the values of a 1D parameter sweep while the sweep runs. A coarse, uniformly spaced pass
+is measured first. The remaining point budget is then spent one point at a time on the midpoint of
+the most informative interval between two measured points, so narrow features (an ODMR dip, a
+Rabi fringe) get resolved without spending most of the run in flat regions.
+
+An interval is scored by the length of the measured curve across it in normalized units, which is
+large where the data changes a lot and also keeps very wide intervals from being ignored. With a
+fit function the change is replaced by the residual of that fit (from
+src.Model.data_processing.fit_functions) at the two ends of the interval, which focuses points where
+the model does not describe the data yet.
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+FIT_FUNCTIONS = ['none', 'gaussian', 'lorentzian']
+
+
+def _scalar(value) -> Optional[np.ndarray]:
+    """returns the measured value as a float array, None if there is nothing to score"""
+    if value is None:
+        return None
+    try:
+        value = np.asarray(value, dtype=float)
+    except (TypeError, ValueError):
+        return None
+    if value.size == 0:
+        return None
+    return value.ravel()
+
+
+def get_fit_residual_function(name: str) -> Optional[Callable]:
+    """
+    Returns a function (x, y) -> residuals for one of FIT_FUNCTIONS, or None for 'none'.
+    """
+    if name == 'none':
+        return None
+    from src.Model.data_processing import fit_functions
+
+    if name == 'gaussian':
+        def residuals(x, y):
+            params = fit_functions.fit_gaussian(x, y, fit_functions.guess_gaussian_parameter(x, y))
+            return y - fit_functions.gaussian(x, *params)
+    elif name == 'lorentzian':
+        def residuals(x, y):
+            params = fit_functions.fit_lorentzian(x, y, fit_functions.get_lorentzian_fit_starting_values(x, y))
+            return y - fit_functions.lorentzian(x, *params)
+    else:
+        raise ValueError('unknown fit function ' + name)
+    return residuals
+
+
+class AdaptiveSampler1D:
+    """
+    Picks the next value of an adaptive 1D sweep.
+
+    Use it as an iterator and report the measured value of each point with tell() before asking for
+    the next one.
+
+    Args:
+        min_value, max_value: sweep range
+        num_points: total number of points, including the coarse pass
+        coarse_points: number of uniformly spaced points measured first (at least 2)
+        fit_function: one of FIT_FUNCTIONS or a function (x, y) -> residuals
+        min_step: intervals narrower than this are not subdivided
+    """
+
+    def __init__(self, min_value: float, max_value: float, num_points: int, coarse_points: int = 5,
+                 fit_function: str = 'none', min_step: float = 0.0):
+        assert max_value > min_value
+        self.min_value = float(min_value)
+        self.max_value = float(max_value)
+        self.num_points = int(num_points)
+        self.coarse_values = np.linspace(min_value, max_value, max(2, min(coarse_points, num_points))).tolist()
+        if callable(fit_function):
+            self.fit_residuals = fit_function
+        else:
+            self.fit_residuals = get_fit_residual_function(fit_function)
+        self.min_step = min_step
+
+        self.values = []  # measured sweep values in the order they were run
+        self.measured = []  # measured data for each value
+
+    def tell(self, value: float, measured):
+        """
+        Report the data measured at value. measured can be a number or an array, None if not available.
+        """
+        self.values.append(float(value))
+        self.measured.append(_scalar(measured))
+
+    def _sorted_points(self) -> Tuple[np.ndarray, List]:
+        order = np.argsort(self.values)
+        return np.array(self.values)[order], [self.measured[k] for k in order]
+
+    def interval_scores(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the left edges of the intervals between measured points and their scores.
+        """
+        x, y = self._sorted_points()
+        widths = np.diff(x) / (self.max_value - self.min_value)
+
+        changes = np.zeros(len(widths))
+        if all(value is not None for value in y) and len(set(value.size for value in y)) == 1:
+            y = np.array(y)
+            span = np.ptp(y, axis=0)
+            span[span == 0] = 1.
+            y = y / span
+
+            residuals = None
+            if self.fit_residuals is not None and y.shape[1] == 1:
+                try:
+                    residuals = np.abs(self.fit_residuals(x, y[:, 0]))
+                except Exception:
+                    # fit did not converge, fall back to the change of the data
+                    residuals = None
+            if residuals is not None:
+                changes = 0.5 * (residuals[:-1] + residuals[1:])
+            else:
+                changes = np.sqrt(np.mean(np.diff(y, axis=0) ** 2, axis=1))
+
+        scores = np.sqrt(widths ** 2 + changes ** 2)
+        scores[np.diff(x) < 2 * max(self.min_step, 1e-12 * (self.max_value - self.min_value))] = -1
+        return x[:-1], scores
+
+    def next_value(self) -> Optional[float]:
+        """
+        Returns the next sweep value or None when the point budget is used up.
+        """
+        if len(self.values) >= self.num_points:
+            return None
+        if len(self.values) < len(self.coarse_values):
+            return self.coarse_values[len(self.values)]
+
+        x, _ = self._sorted_points()
+        _, scores = self.interval_scores()
+        best = int(np.argmax(scores))
+        if scores[best] < 0:
+            # every interval is already at the minimum step
+            return None
+        return float(0.5 * (x[best] + x[best + 1]))
+
+    def __iter__(self):
+        while True:
+            value = self.next_value()
+            if value is None:
+                return
+            yield value
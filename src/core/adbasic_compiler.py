@@ -3,19 +3,40 @@ ADbasic Compiler Module
 
 This module provides functionality to compile ADbasic (.bas) files to ADwin binary (.TB*) files
 using the ADbasic compiler running under Wine on macOS/Linux.
+
+Compiled files are cached: every output directory keeps a manifest (.adbasic_cache.json) with a hash of
+the source file, the files it includes, the process number and the compiler that produced each .TB* file.
+Compiling a source that did not change since its .TB* file was built returns the existing file without
+running the compiler. Directories are compiled in parallel, one compiler process per file.
 """
 
 import os
+import re
+import hashlib
 import subprocess
 import tempfile
 import shutil
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 import logging
 
 logger = logging.getLogger(__name__)
 
+CACHE_MANIFEST = ".adbasic_cache.json"
+CACHE_VERSION = 1
+
+_INCLUDE_PATTERN = re.compile(r'^\s*#include\s+["<]?([^"\'>\s]+)', re.IGNORECASE | re.MULTILINE)
+
+# the manifests are read and written by the threads of compile_directory
+_manifest_lock = threading.Lock()
+
+
+def _file_sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
 
 class ADbasicCompiler:
     """
@@ -145,7 +166,8 @@ class ADbasicCompiler:
                     output_dir: Optional[str] = None,
                     process_number: Optional[int] = None,
                     verbose: bool = False,
-                    apply_license: bool = True) -> str:
+                    apply_license: bool = True,
+                    use_cache: bool = True) -> str:
         """
         Compile an ADbasic source file to an ADwin binary file.
         
@@ -155,6 +177,8 @@ class ADbasicCompiler:
             process_number: Process number (1-10) for the output file. If None, tries to detect from source.
             verbose: Whether to print verbose output
             apply_license: Whether to apply license before compilation
+            use_cache: Whether to return the existing output if it was compiled from the same source,
+                includes, process number and compiler
             
         Returns:
             Path to the compiled .TB* file
@@ -171,10 +195,6 @@ class ADbasicCompiler:
         if not source_path.suffix.lower() == '.bas':
             raise ValueError(f"Source file must have .bas extension: {source_file}")
         
-        # Apply license if requested and available
-        if apply_license and self.license_info:
-            self._apply_license()
-        
         # Determine output directory
         if output_dir is None:
             output_dir = source_path.parent
@@ -193,6 +213,19 @@ class ADbasicCompiler:
         output_filename = f"{source_path.stem}.TB{process_number}"
         output_path = output_dir / output_filename
         
+        # Reuse the output of an earlier compilation of the same source
+        cache_key = self.cache_key(source_path, process_number)
+        if use_cache:
+            cached_path = self._cached_output(output_dir, output_filename, cache_key)
+            if cached_path is not None:
+                if verbose:
+                    logger.info(f"{source_file} is unchanged, using {cached_path}")
+                return str(cached_path)
+        
+        # Apply license if requested and available
+        if apply_license and self.license_info:
+            self._apply_license()
+        
         # Build compiler command
         cmd = [self.compiler_path, str(source_path)]
         
@@ -258,6 +291,8 @@ class ADbasicCompiler:
                     else:
                         raise FileNotFoundError(f"Compilation succeeded but output file not found: {output_path}")
             
+            self._store_output(output_dir, output_filename, cache_key, source_path, output_path)
+            
             if has_license_error:
                 logger.info(f"Successfully compiled {source_file} to {output_path} (with license warnings)")
             else:
@@ -267,6 +302,129 @@ class ADbasicCompiler:
         except subprocess.TimeoutExpired:
             raise subprocess.TimeoutExpired(cmd, 60, "Compilation timed out")
     
+    def cache_key(self, source_file, process_number: int) -> str:
+        """
+        Hash of everything that determines the compiled file: the source, the files it includes (recursively),
+        the process number, the compiler binary and whether a license is used.
+        
+        Args:
+            source_file: Path to the .bas source file
+            process_number: Process number (1-10) of the output file
+            
+        Returns:
+            Hex digest of the SHA-256 hash
+        """
+        source_path = Path(source_file)
+        digest = hashlib.sha256()
+        digest.update(f"cache_version={CACHE_VERSION};process={process_number};".encode())
+        try:
+            compiler_stat = os.stat(self.compiler_path)
+            digest.update(f"compiler={self.compiler_path}:{compiler_stat.st_size}:{compiler_stat.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"compiler={self.compiler_path};".encode())
+        license_key = self.license_info.get('license_key') if self.license_info else None
+        digest.update(f"licensed={license_key is not None};".encode())
+        
+        pending = [source_path]
+        visited = set()
+        while pending:
+            path = pending.pop(0)
+            if path in visited:
+                continue
+            visited.add(path)
+            content = path.read_bytes()
+            digest.update(f"file={path.name}:{len(content)};".encode())
+            digest.update(content)
+            for include in _INCLUDE_PATTERN.findall(content.decode('latin-1')):
+                include_path = self._find_include(include, path.parent)
+                if include_path is None:
+                    # an include of the compiler installation that is not on this machine, hash the name only
+                    logger.debug(f"Include file {include} of {path} not found")
+                    digest.update(f"include={include};".encode())
+                else:
+                    pending.append(include_path)
+        return digest.hexdigest()
+    
+    def _find_include(self, include: str, source_dir: Path) -> Optional[Path]:
+        """Find an included file next to the source or in the include directories of the ADwin installation."""
+        name = include.replace('\\', '/')
+        search_dirs = [source_dir,
+                       Path(self.adwin_dir) / "Include",
+                       Path(self.adwin_dir) / "Inc",
+                       Path(self.adwin_dir) / "lib"]
+        for directory in search_dirs:
+            candidate = directory / name
+            if candidate.is_file():
+                return candidate.resolve()
+            # ADbasic sources are written on Windows, where file names are not case sensitive
+            parent = candidate.parent
+            if parent.is_dir():
+                for entry in parent.iterdir():
+                    if entry.name.lower() == candidate.name.lower() and entry.is_file():
+                        return entry.resolve()
+        return None
+    
+    def _load_manifest(self, output_dir: Path) -> Dict[str, Any]:
+        manifest_path = Path(output_dir) / CACHE_MANIFEST
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            return manifest if isinstance(manifest, dict) else {}
+        except (OSError, ValueError):
+            return {}
+    
+    def _cached_output(self, output_dir: Path, output_filename: str, cache_key: str) -> Optional[Path]:
+        """Return the output file if the manifest says it was compiled with cache_key and it was not changed since."""
+        with _manifest_lock:
+            entry = self._load_manifest(output_dir).get(output_filename)
+        if not entry or entry.get('key') != cache_key:
+            return None
+        output_path = Path(output_dir) / entry.get('output', output_filename)
+        if not output_path.is_file() or _file_sha256(output_path) != entry.get('output_sha256'):
+            return None
+        return output_path
+    
+    def _store_output(self, output_dir: Path, output_filename: str, cache_key: str,
+                      source_path: Path, output_path: Path):
+        """Record in the manifest of output_dir that output_path was compiled from source_path."""
+        manifest_path = Path(output_dir) / CACHE_MANIFEST
+        with _manifest_lock:
+            manifest = self._load_manifest(output_dir)
+            manifest[output_filename] = {
+                'key': cache_key,
+                'source': str(source_path),
+                'output': Path(output_path).name,
+                'output_sha256': _file_sha256(Path(output_path)),
+            }
+            try:
+                temp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+                with open(temp_path, 'w') as f:
+                    json.dump(manifest, f, indent=2)
+                os.replace(temp_path, manifest_path)
+            except OSError as e:
+                logger.warning(f"Could not update compile cache {manifest_path}: {e}")
+    
+    def is_up_to_date(self, source_file: str, output_dir: Optional[str] = None,
+                      process_number: Optional[int] = None) -> bool:
+        """
+        Check if compile_file would reuse the existing output of source_file instead of compiling it.
+        
+        Args:
+            source_file: Path to the .bas source file
+            output_dir: Directory of the output file. If None, uses the same directory as source.
+            process_number: Process number (1-10). If None, tries to detect from source.
+            
+        Returns:
+            True if the output exists and was compiled from the current source, includes and compiler
+        """
+        source_path = Path(source_file)
+        output_dir = source_path.parent if output_dir is None else Path(output_dir)
+        if process_number is None:
+            process_number = self._detect_process_number(source_path)
+        output_filename = f"{source_path.stem}.TB{process_number}"
+        return self._cached_output(output_dir, output_filename,
+                                   self.cache_key(source_path, process_number)) is not None
+    
     def _detect_process_number(self, source_path: Path) -> int:
         """
         Try to detect the process number from the ADbasic source file.
@@ -312,15 +470,19 @@ class ADbasicCompiler:
                          source_dir: str, 
                          output_dir: Optional[str] = None,
                          verbose: bool = False,
-                         apply_license: bool = True) -> Dict[str, str]:
+                         apply_license: bool = True,
+                         use_cache: bool = True,
+                         max_workers: Optional[int] = None) -> Dict[str, str]:
         """
-        Compile all .bas files in a directory.
+        Compile all .bas files in a directory. The files are independent, so they are compiled in parallel.
         
         Args:
             source_dir: Directory containing .bas files
             output_dir: Directory to place output files. If None, uses source_dir.
             verbose: Whether to print verbose output
             apply_license: Whether to apply license before compilation
+            use_cache: Whether to reuse outputs of unchanged sources
+            max_workers: Number of files compiled at the same time. If None, uses the number of CPUs.
             
         Returns:
             Dictionary mapping source files to output files
@@ -342,13 +504,24 @@ class ADbasicCompiler:
             logger.warning(f"No .bas files found in {source_dir}")
             return results
         
-        for bas_file in bas_files:
+        # Apply the license once instead of once per file
+        if apply_license and self.license_info:
+            self._apply_license()
+        
+        def compile_one(bas_file):
             try:
-                output_file = self.compile_file(str(bas_file), output_dir, verbose=verbose, apply_license=apply_license)
-                results[str(bas_file)] = output_file
+                return self.compile_file(str(bas_file), output_dir, verbose=verbose, apply_license=False,
+                                         use_cache=use_cache)
             except Exception as e:
                 logger.error(f"Failed to compile {bas_file}: {e}")
-                results[str(bas_file)] = None
+                return None
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(bas_files)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='adbasic') as executor:
+            for bas_file, output_file in zip(bas_files, executor.map(compile_one, bas_files)):
+                results[str(bas_file)] = output_file
         
         return results
     
@@ -11,6 +11,7 @@ License: GPL v2
 """
 
 from pathlib import Path
+import numpy as np
 from typing import Optional, Dict, Any
 from src.core.helper_functions import get_project_root
 
@@ -308,31 +309,32 @@ def read_adwin_sweep_odmr_data(adwin_instance) -> Dict[str, Any]:
         - 'sweep_direction': Current sweep direction (Par_5)
     """
     try:
-        # Read parameters from ADwin using the correct method
+        # Read Par_1 to Par_10 with one transfer, so they all belong to the same step
+        pars = adwin_instance.snapshot(pars=range(1, 11), fpars=[]).pars
+        
         # Par_1: Current counter value
-        counts = adwin_instance.get_int_var(1)
+        counts = pars[1]
         
         # Par_4: Current step index
-        step_index = adwin_instance.get_int_var(4)
+        step_index = pars[4]
         
         # Par_5: Current sweep direction
-        sweep_direction = adwin_instance.get_int_var(5)
+        sweep_direction = pars[5]
         
         # Par_6: Current voltage output (as integer, needs conversion)
-        voltage_raw = adwin_instance.get_int_var(6)
-        voltage = float(voltage_raw) / 1000.0  # Convert from millivolts to volts
+        voltage = float(pars[6]) / 1000.0  # Convert from millivolts to volts
         
         # Par_7: Sweep complete flag
-        sweep_complete = adwin_instance.get_int_var(7)
+        sweep_complete = pars[7]
         
         # Par_8: Total counts for current step
-        total_counts = adwin_instance.get_int_var(8)
+        total_counts = pars[8]
         
         # Par_9: Sweep cycle counter
-        sweep_cycle = adwin_instance.get_int_var(9)
+        sweep_cycle = pars[9]
         
         # Par_10: Data ready flag
-        data_ready = adwin_instance.get_int_var(10)
+        data_ready = pars[10]
         
         # Read data arrays if sweep is complete
         forward_counts = None
@@ -342,19 +344,19 @@ def read_adwin_sweep_odmr_data(adwin_instance) -> Dict[str, Any]:
         
         if sweep_complete and data_ready:
             # Get number of steps from Par_3
-            num_steps = adwin_instance.get_int_var(3)
+            num_steps = pars[3]
             
             # Read forward sweep data
-            forward_counts = adwin_instance.read_probes('int_array', 1, num_steps)
-            forward_voltages = adwin_instance.read_probes('int_array', 3, num_steps)
+            forward_counts = adwin_instance.read_data(1, num_steps)
+            forward_voltages = adwin_instance.read_data(3, num_steps)
             
             # Read reverse sweep data
-            reverse_counts = adwin_instance.read_probes('int_array', 2, num_steps)
-            reverse_voltages = adwin_instance.read_probes('int_array', 4, num_steps)
+            reverse_counts = adwin_instance.read_data(2, num_steps)
+            reverse_voltages = adwin_instance.read_data(4, num_steps)
             
             # Convert voltages from millivolts to volts
-            forward_voltages = [float(v) / 1000.0 for v in forward_voltages]
-            reverse_voltages = [float(v) / 1000.0 for v in reverse_voltages]
+            forward_voltages = forward_voltages / 1000.0
+            reverse_voltages = reverse_voltages / 1000.0
         
         return {
             'counts': counts,
@@ -390,6 +392,90 @@ def read_adwin_sweep_odmr_data(adwin_instance) -> Dict[str, Any]:
         }
 
 
+# MAX_VALUES of ODMR_List_Stepper.bas: Data_1 holds the counts of all points of all sweeps
+ODMR_LIST_MAX_VALUES = 100000
+
+
+def setup_adwin_for_list_odmr(adwin_instance, num_points: int, integration_time_ms: float = 10.0,
+                             settle_time_ms: float = 1.0, num_sweeps: int = 1, trigger_channel: int = 21,
+                             trigger_pulse_us: int = 10) -> None:
+    """
+    Setup ADwin for stepped ODMR with the SG384 in list mode, using the ODMR_List_Stepper script.
+
+    The ADwin counts photons at every list point and then pulses a digital output wired to the SG384
+    trigger input, which steps the SG384 to the next frequency of its list. No frequency is set over the
+    network during the scan.
+
+    Args:
+        adwin_instance: ADwinGold instance
+        num_points: Number of points in the SG384 list
+        integration_time_ms: Counting time per point in milliseconds
+        settle_time_ms: Wait after each trigger before counting in milliseconds
+        num_sweeps: Number of passes through the list
+        trigger_channel: Digital output connected to the SG384 trigger input
+        trigger_pulse_us: Width of the trigger pulse in microseconds
+
+    Raises:
+        ValueError: if num_points or num_sweeps is below 1 or the counts of all sweeps do not fit into
+            the ODMR_LIST_MAX_VALUES elements of Data_1
+    """
+    if num_points < 1 or num_sweeps < 1:
+        raise ValueError(f"Need at least one point and one sweep, got {num_points} points and {num_sweeps} sweeps")
+    if num_points * num_sweeps > ODMR_LIST_MAX_VALUES:
+        raise ValueError(f"{num_points} points x {num_sweeps} sweeps exceed the {ODMR_LIST_MAX_VALUES} counts "
+                         f"ODMR_List_Stepper can store, reduce the steps or averages")
+
+    # Stop and clear process 1 (ODMR_List_Stepper uses process 1)
+    adwin_instance.stop_process(1)
+
+    # Load ODMR List Stepper script
+    stepper_binary_path = get_adwin_binary_path('ODMR_List_Stepper.TB1')
+    adwin_instance.update({
+        'process_1': {
+            'load': str(stepper_binary_path),
+            'delay': 3000,  # 10 µs between points, the script sleeps for the settle and dwell times
+            'running': False
+        }
+    })
+
+    adwin_instance.set_int_var(1, num_points)
+    adwin_instance.set_int_var(2, int(settle_time_ms * 1000))
+    adwin_instance.set_int_var(3, int(integration_time_ms * 1000))
+    adwin_instance.set_int_var(4, num_sweeps)
+    adwin_instance.set_int_var(5, trigger_channel)
+    adwin_instance.set_int_var(6, trigger_pulse_us)
+
+
+def read_adwin_list_odmr_data(adwin_instance, num_points: int, num_sweeps: int = 1) -> Dict[str, Any]:
+    """
+    Read data from ADwin list mode ODMR experiment using ODMR_List_Stepper.
+
+    Args:
+        adwin_instance: ADwinGold instance
+        num_points: Number of points in the SG384 list
+        num_sweeps: Number of passes through the list
+
+    Returns:
+        Dictionary containing:
+        - 'ready': All sweeps are done (Par_20)
+        - 'points_done': Points measured in the current sweep (Par_21)
+        - 'sweeps_done': Completed sweeps (Par_22)
+        - 'counts': Counts with shape (num_sweeps, num_points) if ready, else None
+    """
+    pars = adwin_instance.snapshot(pars=[20, 21, 22], fpars=[]).pars
+    ready = bool(pars[20])
+    counts = None
+    if ready:
+        counts = adwin_instance.read_data(1, num_points * num_sweeps).astype(float)
+        counts = counts.reshape(num_sweeps, num_points)
+    return {
+        'ready': ready,
+        'points_done': pars[21],
+        'sweeps_done': pars[22],
+        'counts': counts
+    }
+
+
 def setup_adwin_for_fm_odmr(adwin_instance, integration_time_ms: float = 1.0, 
                            num_cycles: int = 10, modulation_rate_hz: float = 1000.0) -> None:
     """
@@ -460,4 +546,67 @@ def read_adwin_fm_odmr_data(adwin_instance) -> Dict[str, Any]:
         'modulation_rate': adwin_instance.get_float_var(12) if sweep_data['data_ready'] else None
     }
     
-    return fm_data 
\ No newline at end of file
+    return fm_data 
+
+
+# ADwin Gold II analog inputs and outputs: 16 bit over -10 V to +10 V
+ADWIN_MAX_DIGITS = 65535
+ADWIN_VOLTAGE_RANGE = 20.0
+ADWIN_VOLTAGE_OFFSET = -10.0
+
+
+def digits_to_volts(digits, out: Optional[np.ndarray] = None, invalid: float = 0.0) -> np.ndarray:
+    """
+    Convert ADwin DAC/ADC digits to volts for a whole array at once.
+
+    Args:
+        digits: Digits (0 to 65535), e.g. an int32 array read with read_data
+        out: Optional float64 array of the same length that receives the volts
+        invalid: Voltage reported for digits outside 0 to 65535
+
+    Returns:
+        Array of voltages (out if given)
+    """
+    digits = np.asarray(digits)
+    out = np.multiply(digits, ADWIN_VOLTAGE_RANGE / ADWIN_MAX_DIGITS, out=out, dtype=np.float64)
+    out += ADWIN_VOLTAGE_OFFSET
+    out[(digits < 0) | (digits > ADWIN_MAX_DIGITS)] = invalid
+    return out
+
+
+def volts_to_digits(volts, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert volts to ADwin DAC digits for a whole array at once, rounded like VoltsToDigits in the
+    ADbasic scripts and clipped to 0 to 65535.
+
+    Args:
+        volts: Voltages in V
+        out: Optional int32 array of the same length that receives the digits
+
+    Returns:
+        Array of digits as int32 (out if given)
+    """
+    digits = np.rint((np.asarray(volts, dtype=np.float64) - ADWIN_VOLTAGE_OFFSET) *
+                     (ADWIN_MAX_DIGITS / ADWIN_VOLTAGE_RANGE))
+    np.clip(digits, 0, ADWIN_MAX_DIGITS, out=digits)
+    if out is None:
+        return digits.astype(np.int32)
+    out[...] = digits
+    return out
+
+
+def counts_to_rate(counts, integration_time_s: float, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Convert photon counts per bin to count rates in counts/s for a whole array at once.
+
+    Args:
+        counts: Counts per integration window
+        integration_time_s: Length of the integration window in seconds
+        out: Optional float64 array of the same length that receives the rates
+
+    Returns:
+        Array of count rates in Hz (out if given)
+    """
+    if integration_time_s <= 0:
+        raise ValueError(f"Integration time must be positive, got {integration_time_s}")
+    return np.divide(counts, integration_time_s, out=out, dtype=np.float64)
@@ -0,0 +1,285 @@
+"""
+ADwin FIFO Streaming
+
+FifoStream drains a FIFO array of an ADbasic process (Dim Data_# [size] As Long As Fifo) on a background
+thread while the process is running, instead of waiting for the run to finish and reading a Data_ array.
+The elements are read straight into a preallocated NumPy ring buffer (AdwinGoldDevice.read_fifo_into), so
+a stream can run for hours with a fixed amount of memory.
+
+Consumers get the data in two ways:
+    - subscribers are called on the reader thread with every chunk that arrived, for live plots and analysis
+    - read() blocks until the next records arrived and returns them, for experiments that process the data
+      point by point or sweep by sweep
+
+A record is record_size consecutive FIFO elements, e.g. (signal, reference) pairs written by the ADbasic
+process one after the other. Records are never split between chunks.
+
+Overruns are counted, reported with a warning and passed on to the subscribers:
+    - fifo_overruns: the ADwin FIFO had no free elements when it was polled, the process may have overwritten
+      data that was not read yet (make the FIFO larger or poll faster)
+    - lost_records: read() fell behind by more than the capacity of the ring buffer, the oldest records were
+      overwritten before they were read
+
+Example:
+    with adwin.stream_fifo(3, record_size=2) as stream:
+        stream.subscribe(lambda chunk: plot(chunk.data[:, 0]))
+        adwin.start_process(1)
+        data = stream.read(1000, timeout=60)   # next 1000 (signal, reference) pairs, shape (1000, 2)
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+import numpy as np
+
+from src.core.device_arbiter import current_priority, device_priority
+
+
+class StreamChunk(NamedTuple):
+    """records that arrived with one FIFO read"""
+    data: np.ndarray  # copy of the records, shape (n,) or (n, record_size)
+    first_record: int  # index of the first record since the stream started
+    timestamp: float  # time of the read in seconds since the epoch
+    fifo_full: bool  # the ADwin FIFO was full before this read, records may have been lost
+
+
+class FifoStream:
+    """
+    Reads a FIFO of the ADwin on a background thread into a NumPy ring buffer.
+
+    Args:
+        device: AdwinGoldDevice (anything with fifo_levels, read_fifo_into and clear_fifo)
+        fifo_id: number of the FIFO array, Data_#
+        dtype: int32 for Long, float32 for Float and float64 for Float64 FIFOs
+        record_size: number of elements that form one record
+        capacity: number of records the ring buffer holds
+        chunk_size: maximum number of records per FIFO read
+        poll_interval: time in s to wait when the FIFO was empty
+        clear: clear the FIFO when the stream starts, discarding data of an earlier run
+    """
+
+    def __init__(self, device, fifo_id: int, dtype=np.int32, record_size: int = 1, capacity: int = 1000000,
+                 chunk_size: int = 10000, poll_interval: float = 0.005, clear: bool = True):
+        assert record_size >= 1 and capacity >= 1 and chunk_size >= 1
+        self.device = device
+        self.fifo_id = fifo_id
+        self.record_size = int(record_size)
+        self.capacity = int(capacity)
+        self.chunk_size = int(chunk_size)
+        self.poll_interval = poll_interval
+        self.clear = clear
+
+        self.fifo_overruns = 0
+        self.lost_records = 0
+        self.error = None
+
+        self._buffer = np.empty(self.capacity * self.record_size, dtype=dtype)
+        self._written = 0  # elements written to the ring buffer since the start
+        self._read_position = 0  # elements consumed by read()
+        self._subscribers = []
+        self._condition = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._running = False
+
+    # ------------------------------------------------------------------
+    # control
+    # ------------------------------------------------------------------
+    def start(self) -> 'FifoStream':
+        """
+        Starts the reader thread. It accesses the device with the priority of the calling thread.
+        """
+        if self._thread is not None:
+            return self
+        if self.clear:
+            self.device.clear_fifo(self.fifo_id)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, args=(current_priority(),),
+                                        name=f'adwin_fifo_{self.fifo_id}', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0):
+        """
+        Stops the reader thread after it read what is left in the FIFO.
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def __enter__(self) -> 'FifoStream':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    # ------------------------------------------------------------------
+    # consumers
+    # ------------------------------------------------------------------
+    def subscribe(self, callback: Callable[[StreamChunk], None]) -> Callable[[StreamChunk], None]:
+        """
+        Calls callback(chunk) on the reader thread for every chunk that arrives, returns callback.
+        Callbacks should be quick (e.g. emit a Qt signal), the FIFO is not read while they run.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable[[StreamChunk], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @property
+    def num_records(self) -> int:
+        """records received since the start"""
+        return self._written // self.record_size
+
+    def _shape(self, data: np.ndarray) -> np.ndarray:
+        return data if self.record_size == 1 else data.reshape(-1, self.record_size)
+
+    def _copy(self, start: int, stop: int) -> np.ndarray:
+        """copies elements start to stop (positions since the start of the stream) out of the ring buffer"""
+        size = len(self._buffer)
+        first, last = start % size, stop % size
+        if stop - start == 0:
+            return self._buffer[:0].copy()
+        if first < last:
+            return self._buffer[first:last].copy()
+        return np.concatenate((self._buffer[first:], self._buffer[:last]))
+
+    def wait(self, num_records: int, timeout: Optional[float] = None) -> bool:
+        """
+        Waits until num_records records were received since the start, returns False if that did not happen
+        within timeout s or the stream stopped before.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self.num_records >= num_records or not self._running, timeout) and \
+                self.num_records >= num_records
+
+    def read(self, num_records: int, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        Waits for the next num_records records that were not returned by read() yet and returns them.
+
+        Args:
+            num_records: number of records, at most the capacity
+            timeout: maximum time to wait in s, None to wait as long as the stream runs
+
+        Returns:
+            copy of the records, shape (num_records,) or (num_records, record_size)
+
+        Raises:
+            TimeoutError: if the records did not arrive in time
+            RuntimeError: if the stream stopped before the records arrived
+        """
+        assert 0 <= num_records <= self.capacity
+        needed = num_records * self.record_size
+        with self._condition:
+            arrived = self._condition.wait_for(
+                lambda: self._written - self._read_position >= needed or not self._running, timeout)
+            self._skip_overwritten()
+            if self._written - self._read_position < needed:
+                if not arrived:
+                    raise TimeoutError(f'{self.num_records - self._read_position // self.record_size} of '
+                                       f'{num_records} records arrived from Data_{self.fifo_id} in {timeout} s')
+                raise RuntimeError(f'stream of Data_{self.fifo_id} stopped'
+                                   + (f': {self.error}' if self.error is not None else ''))
+            data = self._copy(self._read_position, self._read_position + needed)
+            self._read_position += needed
+        return self._shape(data)
+
+    def _skip_overwritten(self):
+        """moves the read position past records that were overwritten before they were read"""
+        lost = self._written - len(self._buffer) - self._read_position
+        if lost > 0:
+            self._read_position += lost
+            self.lost_records += lost // self.record_size
+            print(f"Warning: {lost // self.record_size} records of Data_{self.fifo_id} were overwritten "
+                  f"before they were read, increase the capacity of the stream")
+
+    def available(self) -> int:
+        """records that arrived and were not returned by read() yet"""
+        with self._condition:
+            return min(self._written - self._read_position, len(self._buffer)) // self.record_size
+
+    def latest(self, num_records: Optional[int] = None) -> np.ndarray:
+        """
+        Returns a copy of the most recent records (all records in the ring buffer if None), oldest first.
+        Does not change what read() returns.
+        """
+        with self._condition:
+            stored = min(self._written, len(self._buffer))
+            if num_records is not None:
+                stored = min(stored, num_records * self.record_size)
+            return self._shape(self._copy(self._written - stored, self._written))
+
+    def status(self) -> Dict:
+        return {
+            'fifo_id': self.fifo_id,
+            'running': self._running,
+            'records': self.num_records,
+            'available': self.available(),
+            'fifo_overruns': self.fifo_overruns,
+            'lost_records': self.lost_records,
+            'error': None if self.error is None else str(self.error),
+        }
+
+    # ------------------------------------------------------------------
+    # reader thread
+    # ------------------------------------------------------------------
+    def _run(self, priority: int):
+        try:
+            with device_priority(priority):
+                while not self._stop.is_set():
+                    if self._read_chunk() == 0:
+                        self._stop.wait(self.poll_interval)
+                # what the process wrote until the stop
+                while self._read_chunk() > 0:
+                    pass
+        except Exception as e:
+            self.error = e
+            print(f"Warning: stream of Data_{self.fifo_id} stopped: {e}")
+        finally:
+            with self._condition:
+                self._running = False
+                self._condition.notify_all()
+
+    def _read_chunk(self) -> int:
+        """reads what is in the FIFO, at most chunk_size records and up to the end of the ring buffer"""
+        used, free = self.device.fifo_levels(self.fifo_id)
+        fifo_full = used > 0 and free == 0
+        if fifo_full:
+            if self.fifo_overruns == 0:
+                print(f"Warning: FIFO Data_{self.fifo_id} of the ADwin is full, data may have been lost")
+            self.fifo_overruns += 1
+
+        size = len(self._buffer)
+        offset = self._written % size
+        length = min(used, self.chunk_size * self.record_size, size - offset)
+        length -= length % self.record_size
+        if length <= 0:
+            return 0
+
+        with self._condition:
+            view = self.device.read_fifo_into(self.fifo_id, self._buffer, offset, length)
+            first_record = self.num_records
+            self._written += length
+            chunk_data = self._shape(view.copy()) if self._subscribers else None
+            self._condition.notify_all()
+
+        if chunk_data is not None:
+            chunk = StreamChunk(chunk_data, first_record, time.time(), fifo_full)
+            for callback in list(self._subscribers):
+                try:
+                    callback(chunk)
+                except Exception as e:
+                    print(f"Warning: stream subscriber {callback} failed: {e}")
+        return length
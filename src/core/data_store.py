@@ -0,0 +1,225 @@
+"""
+Preallocated Data Store
+
+A dictionary for Experiment.data whose fields are declared up front with a name, shape and dtype.
+The arrays are allocated once when the experiment sets up its scan, so filling in a line or a point
+writes into existing memory instead of growing Python lists and converting them with np.array at
+the end. The store keeps track of how many rows of each field have been written, which gives the
+fill progress of the scan, and hands read-only views to plotting and saving code.
+
+Because DataStore is a dict, existing code that indexes self.data keeps working. Entries that are
+not declared fields (e.g. a fit result or variable length traces) can be stored as usual.
+
+Example:
+    self.data = DataStore([
+        DataField('x_pos', (Nx,)),
+        DataField('count_img', (Nx, Ny), fill_value=0)
+    ])
+    for i, x in enumerate(x_array):
+        ...
+        self.data.append('x_pos', x)
+        self.data.write('count_img', i, counts)
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+class DataField:
+    """
+    Declaration of one field of a DataStore.
+
+    Args:
+        name: key of the field in the store
+        shape: full shape of the field, the first axis is the axis that is filled row by row
+        dtype: NumPy dtype of the field
+        fill_value: value of rows that have not been written, defaults to nan for floats and 0 otherwise
+        info: description of the field
+    """
+
+    def __init__(self, name: str, shape: Tuple[int, ...] = (), dtype=float, fill_value=None, info: str = ''):
+        self.name = name
+        self.shape = (int(shape),) if np.isscalar(shape) else tuple(int(n) for n in shape)
+        self.dtype = np.dtype(dtype)
+        if fill_value is None:
+            fill_value = np.nan if self.dtype.kind in 'fc' else 0
+        self.fill_value = fill_value
+        self.info = info
+
+    @property
+    def num_rows(self) -> int:
+        """number of rows along the first axis, 1 for scalar fields"""
+        return self.shape[0] if self.shape else 1
+
+    def allocate(self) -> np.ndarray:
+        return np.full(self.shape, self.fill_value, dtype=self.dtype)
+
+    def __repr__(self):
+        return "DataField('{:s}', {:s}, {:s})".format(self.name, str(self.shape), str(self.dtype))
+
+
+class DataStore(dict):
+    """
+    Experiment data with preallocated, typed fields.
+
+    Args:
+        fields: DataField declarations
+    """
+
+    def __init__(self, fields: Iterable[DataField] = ()):
+        super().__init__()
+        self._fields = {}
+        self._filled = {}
+        for field in fields:
+            self.declare(field)
+
+    def declare(self, field: DataField) -> np.ndarray:
+        """
+        Add a field and allocate its array.
+
+        Returns:
+            the preallocated array
+        """
+        array = field.allocate()
+        self._fields[field.name] = field
+        self._filled[field.name] = 0
+        dict.__setitem__(self, field.name, array)
+        return array
+
+    @property
+    def fields(self):
+        """dictionary of the declared fields"""
+        return dict(self._fields)
+
+    def __setitem__(self, key, value):
+        if key in self._fields:
+            # copy into the existing array so views that were handed out stay valid
+            array = dict.__getitem__(self, key)
+            if np.shape(value) != array.shape:
+                raise ValueError("cannot assign value of shape {:s} to field {:s} of shape {:s}".format(
+                    str(np.shape(value)), key, str(array.shape)))
+            np.copyto(array, value, casting='unsafe')
+            self._filled[key] = self._fields[key].num_rows
+        else:
+            dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._fields.pop(key, None)
+        self._filled.pop(key, None)
+
+    # ------------------------------------------------------------------
+    # writing
+    # ------------------------------------------------------------------
+    def write(self, name: str, index, value):
+        """
+        Write value into field name at index (anything NumPy accepts, the first entry selects the row).
+        Rows up to the highest written row count as filled.
+        """
+        array = dict.__getitem__(self, name)
+        array[index] = value
+
+        field = self._fields[name]
+        if not field.shape:
+            self._filled[name] = 1
+            return
+        row = index[0] if isinstance(index, tuple) else index
+        if isinstance(row, slice):
+            last = row.indices(field.num_rows)[1]
+        else:
+            last = int(row) % field.num_rows + 1
+        self._filled[name] = max(self._filled[name], last)
+
+    def append(self, name: str, value):
+        """
+        Write value into the next row of field name.
+
+        Raises:
+            IndexError: if all rows of the field are already filled
+        """
+        row = self._filled[name]
+        if row >= self._fields[name].num_rows:
+            raise IndexError("field {:s} is full ({:d} rows)".format(name, row))
+        self.write(name, row, value)
+
+    def reset(self):
+        """
+        Set all fields back to their fill value and their fill counters to zero.
+        """
+        for name, field in self._fields.items():
+            dict.__getitem__(self, name).fill(field.fill_value)
+            self._filled[name] = 0
+
+    # ------------------------------------------------------------------
+    # reading
+    # ------------------------------------------------------------------
+    def filled(self, name: str) -> int:
+        """number of rows of field name that have been written"""
+        return self._filled[name]
+
+    @property
+    def progress(self) -> float:
+        """fraction of all declared rows that have been written, between 0 and 1"""
+        total = sum(field.num_rows for field in self._fields.values())
+        if total == 0:
+            return 1.
+        return sum(self._filled.values()) / total
+
+    @property
+    def is_full(self) -> bool:
+        return all(self._filled[name] >= field.num_rows for name, field in self._fields.items())
+
+    def view(self, name: str, filled_only: bool = True) -> np.ndarray:
+        """
+        Read-only view of a field, without copying.
+
+        Args:
+            name: field name
+            filled_only: if True only the rows written so far are returned
+        """
+        array = dict.__getitem__(self, name)
+        if filled_only and self._fields[name].shape:
+            array = array[:self._filled[name]]
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def views(self, filled_only: bool = True) -> dict:
+        """
+        Plain dictionary with read-only views of the fields and the other entries of the store.
+        """
+        return {key: self.view(key, filled_only) if key in self._fields else value for key, value in self.items()}
+
+    @property
+    def extras(self) -> dict:
+        """entries of the store that are not declared fields"""
+        return {key: value for key, value in self.items() if key not in self._fields}
+
+    def copy(self) -> 'DataStore':
+        """
+        Independent copy of the store, including the fill counters.
+        """
+        new = DataStore(self._fields.values())
+        for name in self._fields:
+            np.copyto(dict.__getitem__(new, name), dict.__getitem__(self, name))
+        new._filled = dict(self._filled)
+        for key, value in self.extras.items():
+            dict.__setitem__(new, key, value)
+        return new
+
+    def __reduce__(self):
+        # pickle and deepcopy through the fields instead of the dict contents
+        return (_rebuild_data_store, (list(self._fields.values()), dict(self), dict(self._filled)))
+
+
+def _rebuild_data_store(fields, contents, filled):
+    store = DataStore()
+    store._fields = {field.name: field for field in fields}
+    store._filled = filled
+    dict.update(store, contents)
+    return store
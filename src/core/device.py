@@ -18,7 +18,121 @@ import traceback
 from copy import deepcopy
 from importlib import import_module
 from src.core.helper_functions import module_name_from_path
+from src.core.plugin_registry import get_plugin_registry
 from src.core.read_write_functions import save_aqs_file
+from src.core import tracing
+from src.core.device_metrics import get_device_metrics
+from src.core.device_arbiter import PROBE, current_priority, get_arbiter
+import functools
+import numbers
+import threading
+import time
+
+import numpy as np
+
+_active_calls = threading.local()  # (device id, operation) of the instrumented calls running on this thread
+
+
+def settings_match(confirmed, requested, tolerance=None):
+    """
+    checks if a requested setting equals the value the instrument holds already
+
+    Args:
+        confirmed: value last written to the instrument
+        requested: new value
+        tolerance: None for exact comparison of numbers, or {'type': 'absolute', 'value': x} or
+            {'type': 'relative', 'value': x, 'absolute_fallback': y} (y is used if requested is 0)
+
+    Returns: True if the new value does not have to be sent
+    """
+    if hasattr(confirmed, 'magnitude') and hasattr(requested, 'magnitude'):
+        try:
+            confirmed, requested = confirmed.magnitude, requested.to(confirmed.units).magnitude
+        except Exception:
+            return False
+    if isinstance(confirmed, bool) or isinstance(requested, bool):
+        return type(confirmed) == type(requested) and confirmed == requested
+    if isinstance(confirmed, numbers.Real) and isinstance(requested, numbers.Real):
+        if tolerance is None:
+            return confirmed == requested
+        difference = abs(requested - confirmed)
+        if tolerance['type'] == 'relative':
+            if requested != 0:
+                return difference / abs(requested) <= tolerance['value']
+            return difference <= tolerance.get('absolute_fallback', 1e-6)
+        if tolerance['type'] == 'absolute':
+            return difference <= tolerance['value']
+        return confirmed == requested
+    if type(confirmed) != type(requested):
+        return False
+    if isinstance(confirmed, (list, tuple, np.ndarray)):
+        try:
+            return bool(np.array_equal(confirmed, requested))
+        except Exception:
+            return False
+    try:
+        return bool(confirmed == requested)
+    except Exception:
+        return False
+
+
+def _instrument(class_name, method_name, method):
+    """
+    wraps a hardware access method of a device class so every call holds the device arbiter, is counted in the
+    device metrics and, if tracing is enabled, recorded as a span. Only the outermost call is counted when an
+    override calls super() or read_probes() calls itself for every probe.
+    """
+    span_name = class_name + '.' + method_name
+    metrics = get_device_metrics()
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        active = getattr(_active_calls, 'calls', None)
+        if active is None:
+            active = _active_calls.calls = set()
+        key = (id(self), method_name)
+        if key in active:
+            with tracing.span(span_name, 'device'):
+                return method(self, *args, **kwargs)
+
+        active.add(key)
+        error = False
+        # wait for the device, calls of other threads are served in the order of their priority
+        arbiter = get_arbiter(self)
+        arbiter.acquire(operation=method_name)
+        differential = (method_name == 'update' and self._DIFFERENTIAL_UPDATES and len(args) == 1 and
+                        isinstance(args[0], dict) and self.__dict__.get('_settings_initialized', False))
+        operation = method_name
+        start = time.perf_counter()
+        try:
+            if differential:
+                changed = self._changed_settings(args[0])
+                if not changed:
+                    # the instrument holds all values already, counted separately from the updates that were sent
+                    operation = 'update_skipped'
+                    return None
+                args = (changed,)
+            with tracing.span(span_name, 'device'):
+                result = method(self, *args, **kwargs)
+            if differential and self._update_reached_instrument():
+                self._confirm_settings(changed)
+            return result
+        except BaseException:
+            error = True
+            if differential:
+                # the instrument state is unknown after a failed write
+                self.forget_confirmed_settings(list(args[0].keys()))
+            raise
+        finally:
+            active.discard(key)
+            metrics.record(self.__dict__.get('_name', class_name), operation, time.perf_counter() - start, error)
+            if method_name == 'update':
+                # the cached probe values may have been changed by the update
+                self.clear_probe_cache()
+            arbiter.release()
+
+    wrapper.__traced__ = True
+    return wrapper
 
 
 class Device:
@@ -34,6 +148,31 @@ class Device:
     """
     _DEFAULT_SETTINGS = Parameter("default", 0, int, "some int parameter")
 
+    # counted in the device metrics (src.core.device_metrics) and recorded as spans when tracing is enabled
+    _TRACED_METHODS = ('update', 'read_probes', '_read_probes_many')
+
+    # default time in s for which read_probes_many returns cached probe values, 0 reads the device every time
+    _PROBE_CACHE_TTL = 0.
+
+    # differential updates: update only forwards the settings that differ from the values last written to the
+    # instrument (the confirmed settings). Drivers that write to the instrument outside of update have to call
+    # forget_confirmed_settings for the settings they change.
+    _DIFFERENTIAL_UPDATES = False
+    # settings that are always forwarded, e.g. triggers that act every time they are written
+    _ALWAYS_SEND = ()
+    # {setting: settings whose confirmed value is lost when setting is written}, None instead of a list forgets all
+    _INVALIDATES = {}
+    # {setting: {'type': 'absolute' or 'relative', 'value': tolerance}} within which a value counts as unchanged
+    _PARAMETER_TOLERANCES = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # wrap the hardware access methods that the subclass overrides, so device waits show up in metrics and traces
+        for method_name in cls._TRACED_METHODS:
+            method = cls.__dict__.get(method_name)
+            if callable(method) and not getattr(method, '__traced__', False):
+                setattr(cls, method_name, _instrument(cls.__name__, method_name, method))
+
     @classmethod
     def _get_base_settings(cls):
         """
@@ -408,6 +547,184 @@ class Device:
 
             return value
 
+    def read_probes_many(self, keys=None, max_age=None):
+        """
+        reads several probes at once, values read less than max_age seconds ago are taken from the probe cache,
+        so the GUI, the probe thread and experiments reading the same value at the same time share one read
+
+        Drivers that can read several values in one transaction (e.g. one bulk transfer or one query chain)
+        override _read_probes_many instead of this method.
+
+        Args:
+            keys: names of the probes, all probes if None
+            max_age: maximum age in s of cached values, probe_cache_ttl if None, 0 to read all values again
+
+        Returns: dictionary {key: value} in the order of keys
+        """
+        if keys is None:
+            keys = list(self._PROBES.keys())
+        if max_age is None:
+            max_age = self.probe_cache_ttl
+
+        cache = self.__dict__.setdefault('_probe_cache', {})
+        values = {}
+        missing = []
+        if max_age > 0:
+            now = time.monotonic()
+            for key in keys:
+                cached = cache.get(key)
+                if cached is not None and now - cached[0] <= max_age:
+                    values[key] = cached[1]
+                else:
+                    missing.append(key)
+        else:
+            missing = list(keys)
+
+        if missing:
+            read_time = time.monotonic()
+            if current_priority() == PROBE:
+                # probe polling: merge with the reads of other threads that wait for the device as well
+                new_values = get_arbiter(self).read_coalesced(missing, self._read_probes_many)
+            else:
+                new_values = self._read_probes_many(missing)
+            for key in missing:
+                cache[key] = (read_time, new_values[key])
+            values.update(new_values)
+        return {key: values[key] for key in keys}
+
+    def _read_probes_many(self, keys):
+        """
+        reads the probes in keys from the device and returns {key: value}, one read_probes call per key.
+        Override this method to read several probes in one transaction.
+        """
+        return {key: self.read_probes(key) for key in keys}
+
+    @property
+    def probe_cache_ttl(self):
+        """
+        time in s for which read_probes_many and probe attributes (device.probe_name) return cached values
+        """
+        return self.__dict__.get('_probe_cache_ttl', self._PROBE_CACHE_TTL)
+
+    @probe_cache_ttl.setter
+    def probe_cache_ttl(self, value):
+        assert value >= 0, 'the probe cache time has to be positive'
+        self.__dict__['_probe_cache_ttl'] = float(value)
+
+    def clear_probe_cache(self):
+        """
+        forgets the cached probe values, called after every update of the settings
+        """
+        self.__dict__.get('_probe_cache', {}).clear()
+
+    def get_parameter_tolerance(self, param_name):
+        """
+        returns the tolerance within which a value of the setting param_name counts as unchanged, None for exact comparison
+        """
+        return self._PARAMETER_TOLERANCES.get(param_name)
+
+    def _changed_settings(self, settings, path=()):
+        """
+        returns the part of settings that differs from the confirmed settings, nested settings are compared per entry.
+        The unchanged values are stored in the settings without being sent.
+        """
+        confirmed = self.__dict__.setdefault('_confirmed_settings', {})
+        statistics = self.__dict__.setdefault('_update_statistics', {'sent': 0, 'skipped': 0})
+        changed, unchanged = {}, {}
+        for key, value in settings.items():
+            key_path = path + (key,)
+            if isinstance(value, dict) and value:
+                changed_part = self._changed_settings(value, key_path)
+                if changed_part:
+                    changed[key] = changed_part
+                continue
+            if (key not in self._ALWAYS_SEND and key_path in confirmed and
+                    settings_match(confirmed[key_path], value, self.get_parameter_tolerance(key))):
+                unchanged[key] = value
+            else:
+                changed[key] = value
+        # settings that the instrument loses when a changed setting is written have to be sent again
+        for key in [key for key in changed if key in self._INVALIDATES]:
+            invalidated = self._INVALIDATES[key]
+            for other in (list(unchanged) if invalidated is None else invalidated):
+                if other in unchanged:
+                    changed[other] = unchanged.pop(other)
+        statistics['sent'] += sum(1 for value in changed.values() if not isinstance(value, dict))
+        statistics['skipped'] += len(unchanged)
+        if unchanged:
+            if path:
+                target = self._settings
+                for key in path:
+                    target = target[key]
+                target.update(unchanged)
+            else:
+                self._settings.update(unchanged)
+        return changed
+
+    def _update_reached_instrument(self):
+        """
+        returns False if the last update did not write to the instrument (e.g. because it is not connected), then
+        its settings are not recorded as confirmed. Override in drivers that skip writes.
+        """
+        return True
+
+    def _in_update(self):
+        """
+        True while the calling thread runs update of this device, used by drivers to recognize writes made outside
+        of update, after which the confirmed settings no longer hold
+        """
+        return (id(self), 'update') in getattr(_active_calls, 'calls', ())
+
+    def _confirm_settings(self, settings, path=()):
+        """
+        records the settings that were written to the instrument by update
+        """
+        confirmed = self.__dict__.setdefault('_confirmed_settings', {})
+        # settings written together are all valid afterwards, the driver takes care of the order
+        for key in settings:
+            if key in self._INVALIDATES:
+                self.forget_confirmed_settings(self._INVALIDATES[key])
+        for key, value in settings.items():
+            key_path = path + (key,)
+            if isinstance(value, dict) and value:
+                self._confirm_settings(value, key_path)
+            elif key not in self._ALWAYS_SEND:
+                confirmed[key_path] = deepcopy(value)
+
+    def forget_confirmed_settings(self, keys=None):
+        """
+        forgets the values last written to the instrument, so the next update sends them again
+
+        Args:
+            keys: top level setting names or paths (tuples) whose values are forgotten (including nested settings),
+                all settings if None
+        """
+        confirmed = self.__dict__.get('_confirmed_settings')
+        if not confirmed:
+            return
+        if keys is None:
+            confirmed.clear()
+            return
+        prefixes = [key if isinstance(key, tuple) else (key,) for key in keys]
+        for key_path in list(confirmed):
+            if any(key_path[:len(prefix)] == prefix for prefix in prefixes):
+                del confirmed[key_path]
+
+    @property
+    def update_statistics(self):
+        """
+        number of settings sent to the instrument and skipped because the instrument already held them,
+        counted by differential updates
+        """
+        return dict(self.__dict__.get('_update_statistics', {'sent': 0, 'skipped': 0}))
+
+    @property
+    def busy_status(self):
+        """
+        who is using the device right now, returns immediately, see src.core.device_arbiter.DeviceArbiter.status
+        """
+        return get_arbiter(self).status()
+
     @property
     def is_connected(self):
         '''
@@ -432,6 +749,8 @@ class Device:
         # Only intercept probe-related attributes, not normal attributes
         if '_PROBES' in self.__dict__ and name in self._PROBES:
             try:
+                if self.probe_cache_ttl > 0:
+                    return self.read_probes_many([name])[name]
                 return self.read_probes(name)
             except:
                 # If probe reading fails, still raise AttributeError
@@ -552,7 +871,9 @@ class Device:
                 ...
                 }
 
-            where name_of_class is either a class or a dictionary of the form {class: name_of__class, filepath: path_to_instr_file}
+            where name_of_class is either a class, the name of a device class in the plugin registry
+            (src.core.plugin_registry) or a dictionary of the form {class: name_of__class, filepath: path_to_instr_file},
+            without filepath the module is found in the plugin registry
 
             devices: dictionary of form
 
@@ -597,11 +918,16 @@ class Device:
                 elif isinstance(device_class_name, dict):
                     if 'settings' in device_class_name:
                         device_settings = device_class_name['settings']
-                    device_filepath = str(device_class_name['filepath'])
-                    device_class_name = str(device_class_name['class'])
-                    path_to_module, _ = module_name_from_path(device_filepath, verbose=False)
-                    module = import_module(path_to_module)
-                    class_of_device = getattr(module, device_class_name)
+                    if 'filepath' in device_class_name:
+                        device_filepath = str(device_class_name['filepath'])
+                        device_class_name = str(device_class_name['class'])
+                        path_to_module, _ = module_name_from_path(device_filepath, verbose=False)
+                        module = import_module(path_to_module)
+                        class_of_device = getattr(module, device_class_name)
+                    else:
+                        # class of the project, the plugin registry knows its module
+                        device_class_name = str(device_class_name['class'])
+                        class_of_device = get_plugin_registry().load_class(device_class_name, 'device')
                     try:
                         if device_settings is None:
                             # this creates an instance of the class with default settings
@@ -617,6 +943,18 @@ class Device:
                         if raise_errors:
                             raise e
                         continue
+                elif isinstance(device_class_name, str):
+                    # name of a device class of the project, imported on demand by the plugin registry
+                    try:
+                        class_of_device = get_plugin_registry().load_class(device_class_name, 'device')
+                        device_instance = class_of_device(name=device_name)
+                    except Exception as e:
+                        loaded_failed[device_name] = e
+                        print('loading ' + device_name + ' failed:')
+                        print(traceback.format_exc())
+                        if raise_errors:
+                            raise e
+                        continue
                 elif isinstance(device_class_name, Device):
                     class_of_device = device_class_name.__class__
                     device_filepath = os.path.dirname(inspect.getfile(class_of_device))
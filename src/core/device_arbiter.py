@@ -0,0 +1,270 @@
+"""
+Device Access Arbiter
+
+The probe thread (ReadProbes), the experiment thread and GUI parameter edits can all talk to the same
+Device instance. Every device gets a DeviceArbiter, a reentrant priority lock that the instrumented
+hardware methods of Device (update, read_probes, _read_probes_many) acquire for the outermost call.
+When the device is released, the waiting call with the highest priority goes next, so experiment
+commands are served before queued GUI edits and probe reads (a call that is already running on the
+instrument is never interrupted).
+
+The priority of a call is the priority of the thread that makes it. Threads are at GUI priority unless
+they enter device_priority(): Experiment.run runs _function at EXPERIMENT priority, ReadProbes reads at
+PROBE priority. Probe reads that queue behind a busy device are coalesced: reads of the same device that
+arrive while one is waiting are merged into one read of all their probes.
+
+status() reports who is using a device without waiting for it, so the GUI can show busy devices.
+
+Example:
+    with device_priority(EXPERIMENT):
+        sg384.update({'frequency': 2.87e9})      # goes before any queued probe read
+
+    get_arbiter(sg384).status()  # {'busy': True, 'priority': 'experiment', 'operation': 'update', ...}
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# lower numbers go first
+EXPERIMENT = 0
+GUI = 1
+PROBE = 2
+PRIORITY_NAMES = {EXPERIMENT: 'experiment', GUI: 'gui', PROBE: 'probe'}
+
+_thread_priority = threading.local()
+
+
+def current_priority() -> int:
+    """
+    Returns the device access priority of the calling thread, GUI if it was not set.
+    """
+    return getattr(_thread_priority, 'value', GUI)
+
+
+@contextmanager
+def device_priority(priority: int):
+    """
+    Context manager that sets the device access priority of the calling thread.
+    """
+    assert priority in PRIORITY_NAMES, priority
+    previous = getattr(_thread_priority, 'value', None)
+    _thread_priority.value = priority
+    try:
+        yield
+    finally:
+        if previous is None:
+            del _thread_priority.value
+        else:
+            _thread_priority.value = previous
+
+
+class _ReadBatch:
+    """probe reads of one device merged into a single read"""
+
+    def __init__(self):
+        self.keys = {}  # ordered set
+        self.started = False
+        self.done = threading.Event()
+        self.values = None
+        self.error = None
+
+
+class DeviceArbiter:
+    """
+    Reentrant priority lock of one device.
+
+    Args:
+        name: name of the device, used in status messages
+    """
+
+    def __init__(self, name: str = ''):
+        self.name = name
+        self._condition = threading.Condition()
+        self._owner = None  # thread ident
+        self._depth = 0
+        self._priority = None
+        self._operation = None
+        self._since = None
+        self._waiting = []  # heap of (priority, sequence number, thread ident)
+        self._sequence = itertools.count()
+        self._batch = None
+        self.num_coalesced = 0  # probe reads that were served by the read of another caller
+
+    # ------------------------------------------------------------------
+    # locking
+    # ------------------------------------------------------------------
+    def acquire(self, priority: Optional[int] = None, operation: str = '', timeout: Optional[float] = None) -> bool:
+        """
+        Waits until the device is free and no call with a higher priority is waiting, then takes it.
+        The thread that holds the device can acquire it again.
+
+        Args:
+            priority: EXPERIMENT, GUI or PROBE, the priority of the calling thread if None
+            operation: description of the call shown by status()
+            timeout: maximum time to wait in s, None waits forever
+
+        Returns:
+            True if the device was acquired, False if the timeout expired
+        """
+        if priority is None:
+            priority = current_priority()
+        ident = threading.get_ident()
+        with self._condition:
+            if self._owner == ident:
+                self._depth += 1
+                return True
+
+            entry = (priority, next(self._sequence), ident)
+            heapq.heappush(self._waiting, entry)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while self._owner is not None or self._waiting[0] is not entry:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    # the next waiter may be able to go now
+                    self._condition.notify_all()
+                    return False
+                self._condition.wait(remaining)
+
+            heapq.heappop(self._waiting)
+            self._owner = ident
+            self._depth = 1
+            self._priority = priority
+            self._operation = operation
+            self._since = time.monotonic()
+            return True
+
+    def release(self):
+        with self._condition:
+            if self._owner != threading.get_ident():
+                raise RuntimeError('device {:s} released by a thread that does not hold it'.format(self.name))
+            self._depth -= 1
+            if self._depth == 0:
+                self._owner = None
+                self._priority = None
+                self._operation = None
+                self._since = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def access(self, priority: Optional[int] = None, operation: str = ''):
+        """
+        Context manager that holds the device, see acquire.
+        """
+        self.acquire(priority, operation)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @property
+    def held_by_current_thread(self) -> bool:
+        return self._owner == threading.get_ident()
+
+    # ------------------------------------------------------------------
+    # coalesced probe reads
+    # ------------------------------------------------------------------
+    def read_coalesced(self, keys: List[str], read: Callable[[List[str]], Dict], priority: Optional[int] = None) -> Dict:
+        """
+        Reads probes with read(keys) while holding the device. Calls that arrive while another call is still
+        waiting for the device join its read instead of queuing a read of their own.
+
+        Args:
+            keys: names of the probes
+            read: function that reads a list of probes and returns {key: value}
+            priority: priority of the read, the priority of the calling thread if None
+
+        Returns:
+            {key: value} for keys
+        """
+        if self.held_by_current_thread:
+            return read(list(keys))
+
+        with self._condition:
+            batch = self._batch
+            leader = batch is None or batch.started
+            if leader:
+                batch = self._batch = _ReadBatch()
+            else:
+                self.num_coalesced += 1
+            batch.keys.update(dict.fromkeys(keys))
+
+        if leader:
+            try:
+                with self.access(priority, 'read_probes'):
+                    with self._condition:
+                        # later calls start a new batch
+                        batch.started = True
+                        if self._batch is batch:
+                            self._batch = None
+                    batch.values = read(list(batch.keys))
+            except BaseException as e:
+                batch.error = e
+                raise
+            finally:
+                with self._condition:
+                    batch.started = True
+                    if self._batch is batch:
+                        self._batch = None
+                batch.done.set()
+        else:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+        return {key: batch.values[key] for key in keys}
+
+    # ------------------------------------------------------------------
+    # status
+    # ------------------------------------------------------------------
+    @property
+    def is_busy(self) -> bool:
+        return self._owner is not None
+
+    def status(self) -> Dict:
+        """
+        Returns who is using the device, without waiting for it.
+
+        Returns:
+            dictionary with the keys busy, priority (name of the priority of the current call), operation,
+            duration (time in s the device has been held) and waiting (number of queued calls per priority)
+        """
+        with self._condition:
+            waiting = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._waiting:
+                waiting[PRIORITY_NAMES[priority]] += 1
+            busy = self._owner is not None
+            return {
+                'busy': busy,
+                'priority': PRIORITY_NAMES[self._priority] if busy else None,
+                'operation': self._operation if busy else None,
+                'duration': time.monotonic() - self._since if busy else 0.,
+                'waiting': waiting
+            }
+
+
+_arbiters = weakref.WeakKeyDictionary()
+_arbiters_lock = threading.Lock()
+
+
+def get_arbiter(device) -> DeviceArbiter:
+    """
+    Returns the arbiter of a device instance, created on first use. The arbiters are kept outside of the
+    device so devices can still be copied and pickled.
+    """
+    arbiter = _arbiters.get(device)
+    if arbiter is None:
+        with _arbiters_lock:
+            arbiter = _arbiters.get(device)
+            if arbiter is None:
+                arbiter = _arbiters[device] = DeviceArbiter(getattr(device, 'name', ''))
+    return arbiter
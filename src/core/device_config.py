@@ -12,6 +12,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 from .device import Device
 from .helper_functions import module_name_from_path
+from .plugin_registry import get_plugin_registry
 from importlib import import_module
 
 
@@ -135,22 +136,23 @@ class DeviceConfigManager:
                 raise ValueError("Device class not specified in config")
             
             if not device_filepath:
-                raise ValueError("Device filepath not specified in config")
-            
-            # Import the module
-            # Resolve relative filepath to absolute path relative to project root
-            if not Path(device_filepath).is_absolute():
-                from .helper_functions import get_project_root
-                project_root = get_project_root()
-                absolute_filepath = project_root / device_filepath
+                # a class of the project, the plugin registry finds its module without importing the others
+                device_class = get_plugin_registry().load_class(device_class_name, 'device')
             else:
-                absolute_filepath = Path(device_filepath)
-            
-            module_path, _ = module_name_from_path(str(absolute_filepath), verbose=False)
-            module = import_module(module_path)
-            
-            # Get the device class
-            device_class = getattr(module, device_class_name)
+                # Import the module
+                # Resolve relative filepath to absolute path relative to project root
+                if not Path(device_filepath).is_absolute():
+                    from .helper_functions import get_project_root
+                    project_root = get_project_root()
+                    absolute_filepath = project_root / device_filepath
+                else:
+                    absolute_filepath = Path(device_filepath)
+
+                module_path, _ = module_name_from_path(str(absolute_filepath), verbose=False)
+                module = import_module(module_path)
+
+                # Get the device class
+                device_class = getattr(module, device_class_name)
             
             if not issubclass(device_class, Device):
                 raise ValueError(f"{device_class_name} is not a Device subclass")
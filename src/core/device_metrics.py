@@ -0,0 +1,209 @@
+"""
+Device Call Metrics
+
+Counts the calls of the hardware access methods of every device (update, read_probes) and keeps a
+latency histogram per device and operation, so it is easy to see which instrument round trips limit
+an experiment. The Device base class records into the shared registry automatically, see
+Device.__init_subclass__.
+
+The histograms use logarithmically spaced bins from 1 us to 1000 s (BINS_PER_DECADE bins per decade),
+which keeps recording O(1) and memory constant while percentiles are accurate to about 12%.
+
+Usage:
+    from src.core.device_metrics import get_device_metrics
+
+    metrics = get_device_metrics()
+    metrics.summary()                     # {device: {operation: {'count', 'mean', 'p50', 'p90', 'p99', ...}}}
+    print(metrics.format_table())
+
+    before = metrics.snapshot()
+    ...                                   # run something
+    metrics.format_table(since=before)    # only the calls made in between
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+BINS_PER_DECADE = 20
+MIN_LATENCY = 1e-6  # s, lower edge of the first bin, faster calls are counted in the first bin
+MAX_LATENCY = 1e3  # s, slower calls are counted in the last bin
+NUM_BINS = int(round(BINS_PER_DECADE * math.log10(MAX_LATENCY / MIN_LATENCY)))
+BIN_EDGES = MIN_LATENCY * 10 ** (np.arange(NUM_BINS + 1) / BINS_PER_DECADE)
+
+
+class LatencyHistogram:
+    """
+    Call counter with a log-binned histogram of the call durations.
+    """
+
+    __slots__ = ('counts', 'count', 'errors', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.counts = np.zeros(NUM_BINS, dtype=np.int64)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.
+        self.min = math.inf
+        self.max = 0.
+
+    def add(self, seconds: float, error: bool = False):
+        """
+        Add a call that took seconds, error marks a call that raised an exception.
+        """
+        if seconds > MIN_LATENCY:
+            index = min(int(math.log10(seconds / MIN_LATENCY) * BINS_PER_DECADE), NUM_BINS - 1)
+        else:
+            index = 0
+        self.counts[index] += 1
+        self.count += 1
+        self.errors += bool(error)
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def copy(self) -> 'LatencyHistogram':
+        histogram = LatencyHistogram()
+        histogram.counts = self.counts.copy()
+        histogram.count = self.count
+        histogram.errors = self.errors
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        return histogram
+
+    def subtract(self, earlier: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        Returns the histogram of the calls made after earlier, a copy of this histogram at an earlier time.
+        min and max can not be recovered and are those of all calls.
+        """
+        histogram = self.copy()
+        histogram.counts -= earlier.counts
+        histogram.count -= earlier.count
+        histogram.errors -= earlier.errors
+        histogram.total -= earlier.total
+        return histogram
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the q-th percentile (0 to 100) of the call durations in seconds, interpolated within a bin.
+        """
+        if self.count == 0:
+            return math.nan
+        rank = q / 100. * self.count
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, max(rank, 1e-12)))
+        index = min(index, NUM_BINS - 1)
+        below = cumulative[index - 1] if index > 0 else 0
+        fraction = (rank - below) / self.counts[index] if self.counts[index] else 0.
+        # geometric interpolation matches the logarithmic bins
+        value = BIN_EDGES[index] * (BIN_EDGES[index + 1] / BIN_EDGES[index]) ** fraction
+        return float(min(max(value, self.min), self.max))
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'total': self.total,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max if self.count else math.nan
+        }
+
+
+class DeviceMetrics:
+    """
+    Registry of the latency histograms of all devices, keyed by (device name, operation).
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, device: str, operation: str, seconds: float, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get((device, operation))
+            if histogram is None:
+                histogram = self._histograms[(device, operation)] = LatencyHistogram()
+            histogram.add(seconds, error)
+
+    def histogram(self, device: str, operation: str) -> Optional[LatencyHistogram]:
+        """
+        Returns a copy of the histogram of one device and operation, None if it was never called.
+        """
+        with self._lock:
+            histogram = self._histograms.get((device, operation))
+            return histogram.copy() if histogram is not None else None
+
+    def snapshot(self) -> Dict[Tuple[str, str], LatencyHistogram]:
+        """
+        Returns a copy of all histograms, pass it as since to summary() to get the calls made afterwards.
+        """
+        with self._lock:
+            return {key: histogram.copy() for key, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self, device: Optional[str] = None,
+                since: Optional[Dict[Tuple[str, str], LatencyHistogram]] = None) -> Dict[str, Dict[str, Dict]]:
+        """
+        Returns {device: {operation: statistics}} with the count, error count, total, mean, p50, p90, p99 and
+        max duration in seconds.
+
+        Args:
+            device: only return this device
+            since: snapshot(), only count the calls made after it
+        """
+        result = {}
+        for (device_name, operation), histogram in sorted(self.snapshot().items()):
+            if device is not None and device_name != device:
+                continue
+            if since is not None and (device_name, operation) in since:
+                histogram = histogram.subtract(since[(device_name, operation)])
+            if histogram.count == 0:
+                continue
+            result.setdefault(device_name, {})[operation] = histogram.summary()
+        return result
+
+    def format_table(self, device: Optional[str] = None,
+                     since: Optional[Dict[Tuple[str, str], LatencyHistogram]] = None) -> List[str]:
+        """
+        Returns the summary as lines of a text table with the durations in ms, slowest total first.
+        """
+        rows = [(device_name, operation, statistics)
+                for device_name, operations in self.summary(device, since).items()
+                for operation, statistics in operations.items()]
+        rows.sort(key=lambda row: -row[2]['total'])
+        lines = ['{:<24s} {:<24s} {:>8s} {:>6s} {:>10s} {:>10s} {:>10s} {:>10s} {:>10s} {:>10s}'.format(
+            'device', 'operation', 'calls', 'errors', 'total [s]', 'mean [ms]', 'p50 [ms]', 'p90 [ms]', 'p99 [ms]',
+            'max [ms]')]
+        for device_name, operation, statistics in rows:
+            lines.append('{:<24s} {:<24s} {:>8d} {:>6d} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+                device_name[:24], operation[:24], statistics['count'], statistics['errors'], statistics['total'],
+                1e3 * statistics['mean'], 1e3 * statistics['p50'], 1e3 * statistics['p90'], 1e3 * statistics['p99'],
+                1e3 * statistics['max']))
+        return lines
+
+
+_device_metrics = DeviceMetrics()
+
+
+def get_device_metrics() -> DeviceMetrics:
+    """
+    Returns the registry that all devices record into.
+    """
+    return _device_metrics
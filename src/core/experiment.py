@@ -21,6 +21,14 @@ from src.core.device import Device
 from src.core.parameter import Parameter
 from src.core.read_write_functions import save_aqs_file, load_aqs_file
 from src.core.helper_functions import module_name_from_path, MatlabSaver, get_configured_data_folder, get_project_root
+from src.core.save_pipeline import get_save_pipeline, snapshot
+from src.core.hdf5_store import HDF5DataStore
+from src.core.data_store import DataStore
+from src.core.timing_model import get_timing_model, duration_features
+from src.core import tracing
+from src.core.device_metrics import get_device_metrics
+from src.core.device_arbiter import EXPERIMENT, device_priority
+from src.core.plugin_registry import get_plugin_registry
 
 from collections import deque
 import os
@@ -64,6 +72,8 @@ class Experiment(QObject):
 
     RAW_DATA_DIR = 'raw_data'  # dir name for rawdata
     SUBEXPERIMENT_DATA_DIR = 'subexperiments_data'  # dir name for subexperiment data
+    BACKGROUND_SAVE = True  # write output files on the save pipeline instead of the experiment thread
+    _TIMING_KEYS = None  # settings that determine the duration, None means all duration related numeric settings
 
     def __init__(self, name=None, settings=None, devices=None, sub_experiments =None, log_function=None, data_path=None):
         """
@@ -136,11 +146,61 @@ class Experiment(QObject):
             'subexperiment_exec_duration': {}
         }
 
+        # pipeline used for background saving, None means the shared pipeline
+        self._save_pipeline = None
+        # only the outermost experiment waits for the background saves at the end of run
+        self._flush_saves_on_finish = True
+
+        # incremental HDF5 store, created by open_store() from within _function
+        self.store = None
+
+        # timing model used for duration predictions, None means the shared model
+        self._timing_model = None
+        self._predicted_duration = None
 
     @property
     def data_path(self):
         return self._data_path
 
+    @property
+    def save_pipeline(self):
+        """
+        :return: the SavePipeline that writes the output files of this experiment in the background
+        """
+        if self._save_pipeline is None:
+            return get_save_pipeline()
+        return self._save_pipeline
+
+    @save_pipeline.setter
+    def save_pipeline(self, pipeline):
+        self._save_pipeline = pipeline
+
+    @property
+    def timing_model(self):
+        """
+        :return: the TimingModel that records the run durations of this experiment
+        """
+        if self._timing_model is None:
+            return get_timing_model()
+        return self._timing_model
+
+    @timing_model.setter
+    def timing_model(self, model):
+        self._timing_model = model
+
+    def timing_features(self):
+        """
+        :return: dictionary with the settings that determine how long the experiment takes, see _TIMING_KEYS
+        """
+        return duration_features(self.settings, self._TIMING_KEYS)
+
+    def predicted_duration(self):
+        """
+        predicts how long a run with the current settings takes from the durations of previous runs
+        :return: duration in seconds, None if there is no history for this experiment
+        """
+        return self.timing_model.predict_experiment(self)
+
     @data_path.setter
     def data_path(self, path):
         # check is path is a valid path string
@@ -415,10 +475,14 @@ class Experiment(QObject):
         """
         elapsed_time = (datetime.datetime.now() - self.start_time).total_seconds()
         # safety to avoid devision by zero
-        if self.progress == 0:
+        if not self.progress:
             self.progress = 1
 
         estimated_total_time = 100. / self.progress * elapsed_time
+        if self._predicted_duration is not None:
+            # trust the prediction from previous runs at the start and the extrapolation towards the end
+            weight = min(max(self.progress / 100., 0.), 1.)
+            estimated_total_time = weight * estimated_total_time + (1 - weight) * self._predicted_duration
 
         return datetime.timedelta(seconds=max(estimated_total_time - elapsed_time, 0))
 
@@ -460,51 +524,82 @@ class Experiment(QObject):
         executes the experiment
         :return: boolean if execution of experiment finished succesfully
         """
-        self.log_data.clear()
-        self._plot_refresh = True  # flag that requests that plot axes are refreshed when self.plot is called next time
-        self.is_running = True
-        self.start_time = datetime.datetime.now()
-
-        self._current_subexperiment_stage = {
-            'current_subexperiment': None,
-            'subexperiment_exec_count': {},
-            'subexperiment_exec_duration': {}
-        }
-
-        # update the datapath of the subexperiments, connect their progress signal to the receive slot
-        for subexperiment in list(self.experiments.values()):
-            subexperiment.data_path = os.path.join(self.filename(create_if_not_existing=False), self.SUBEXPERIMENT_DATA_DIR)
-            subexperiment.updateProgress.connect(self._receive_signal)
-            subexperiment.started.connect(lambda: self._set_current_subexperiment(True))
-            subexperiment.finished.connect(lambda: self._set_current_subexperiment(False))
-            self._current_subexperiment_stage['subexperiment_exec_count'].update({subexperiment.name: 0})
-            self._current_subexperiment_stage['subexperiment_exec_duration'].update({subexperiment.name: datetime.timedelta(0)})
-
-            # todo: 20230801GD (search for this to find related todos) need to test this:
-            # do we need to connect the log functions of the subexperiment to the mother experiment?, e.g
-            # subexperiment.log.connect(self.log)
-
-        self.log('starting experiment {:s} at {:s} on {:s}'.format(self.name, self.start_time.strftime('%H:%M:%S'),
-                                                               self.start_time.strftime('%d/%m/%y')))
-        self._abort = False
+        trace_start = tracing.trace_timestamp()
+        with tracing.span(self.name + '.setup', 'experiment'):
+            self.log_data.clear()
+            self._plot_refresh = True  # flag that requests that plot axes are refreshed when self.plot is called next time
+            self.is_running = True
+            self.start_time = datetime.datetime.now()
+
+            self._current_subexperiment_stage = {
+                'current_subexperiment': None,
+                'subexperiment_exec_count': {},
+                'subexperiment_exec_duration': {}
+            }
+
+            # update the datapath of the subexperiments, connect their progress signal to the receive slot
+            for subexperiment in list(self.experiments.values()):
+                subexperiment.data_path = os.path.join(self.filename(create_if_not_existing=False), self.SUBEXPERIMENT_DATA_DIR)
+                subexperiment.updateProgress.connect(self._receive_signal)
+                subexperiment.started.connect(lambda: self._set_current_subexperiment(True))
+                subexperiment.finished.connect(lambda: self._set_current_subexperiment(False))
+                subexperiment._flush_saves_on_finish = False
+                self._current_subexperiment_stage['subexperiment_exec_count'].update({subexperiment.name: 0})
+                self._current_subexperiment_stage['subexperiment_exec_duration'].update({subexperiment.name: datetime.timedelta(0)})
+
+                # todo: 20230801GD (search for this to find related todos) need to test this:
+                # do we need to connect the log functions of the subexperiment to the mother experiment?, e.g
+                # subexperiment.log.connect(self.log)
+
+            self.log('starting experiment {:s} at {:s} on {:s}'.format(self.name, self.start_time.strftime('%H:%M:%S'),
+                                                                   self.start_time.strftime('%d/%m/%y')))
+            self._abort = False
+            device_metrics_start = get_device_metrics().snapshot()
+            try:
+                self._predicted_duration = self.predicted_duration()
+            except Exception as e:
+                self._predicted_duration = None
+                self.log('could not predict the duration: {:s}'.format(str(e)))
 
-        # saves standard to disk
-        if self.settings['save']:
-            self.save_aqs()
+            # saves standard to disk
+            if self.settings['save']:
+                self.save_aqs()
 
         self.started.emit()
 
-        self._function()
+        try:
+            # device calls of the experiment go before queued probe reads and GUI edits
+            with tracing.span(self.name + '._function', 'experiment'), device_priority(EXPERIMENT):
+                self._function()
+        finally:
+            # write the rows that are still buffered, also if the experiment crashed
+            self.close_store()
         self.end_time = datetime.datetime.now()
+        if not self._abort:
+            # only complete runs are representative for the duration
+            self.timing_model.record_experiment(self, self.excecution_time.total_seconds())
         self.log('experiment {:s} finished at {:s} on {:s}'.format(self.name, self.end_time.strftime('%H:%M:%S'),
                                                                self.end_time.strftime('%d/%m/%y')))
+        # the device call statistics of this run go to the info file, but are not printed
+        device_calls = get_device_metrics().format_table(since=device_metrics_start)
+        if len(device_calls) > 1:
+            self.log_data.append('device calls during this run:')
+            self.log_data.extend(device_calls)
 
         # saves standard to disk
         if self.settings['save']:
-            self.save_data()
-            self.save_log()
-            self.save_image_to_disk()
-            self.save_data_to_matlab()
+            if self.BACKGROUND_SAVE:
+                with tracing.span(self.name + '.queue_save', 'save'):
+                    self.queue_save()
+            else:
+                with tracing.span(self.name + '.save_data', 'save'):
+                    self.save_data()
+                with tracing.span(self.name + '.save_log', 'save'):
+                    self.save_log()
+                with tracing.span(self.name + '.save_image_to_disk', 'save'):
+                    self.save_image_to_disk()
+                with tracing.span(self.name + '.save_data_to_matlab', 'save'):
+                    self.save_data_to_matlab()
 
         success = not self._abort
 
@@ -513,9 +608,51 @@ class Experiment(QObject):
             subexperiment.started.disconnect()
             subexperiment.updateProgress.disconnect()
             subexperiment.finished.disconnect()
+            subexperiment._flush_saves_on_finish = True
+
+        # wait for the files of this experiment and its subexperiments before reporting that we are done
+        if self._flush_saves_on_finish:
+            # the durations of this run and its subexperiments are written once, with the other files
+            self.save_pipeline.submit(self.timing_model.flush, description='timing history')
+            with tracing.span(self.name + '.flush_saves', 'save'):
+                errors = self.save_pipeline.flush()
+            for description, err in errors:
+                self.log('background save {:s} failed: {:s}'.format(description, str(err)))
+            # the spans of this run and its subexperiments, including the saves
+            if self.settings['save'] and tracing.is_tracing_enabled():
+                self.save_trace(since=trace_start)
         self.is_running = False
         self.finished.emit()
 
+    def open_store(self, flush_every=10, compression='gzip', write_settings=True):
+        """
+        opens an incremental HDF5 store (filename ending in .h5) in the data folder of this run. Call this from
+        _function and append rows with self.store.append(name, row) while the experiment runs. The store is closed
+        automatically when _function returns.
+
+        Args:
+            flush_every: number of rows buffered per dataset before they are written to disk
+            compression: HDF5 compression filter ('gzip', 'lzf' or None)
+            write_settings: if True the settings of the experiment are stored in the file
+
+        Returns: the HDF5DataStore, also available as self.store
+
+        """
+        self.close_store()
+        filename = self.filename('.h5', create_if_not_existing=True)
+        self.store = HDF5DataStore(filename, flush_every=flush_every, compression=compression)
+        if write_settings:
+            self.store.write_settings(self.settings)
+        return self.store
+
+    def close_store(self):
+        """
+        flushes and closes the HDF5 store opened with open_store, does nothing if no store is open
+        """
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
     def stop(self):
         """
         stops itself and all the subexperiment
@@ -637,12 +774,46 @@ class Experiment(QObject):
 
         return dictator
 
-    def save_data(self, filename=None, data_tag=None, verbose=False):
+    def queue_save(self):
+        """
+        hands the standard output files (data, log, matlab and plot images) to the save pipeline
+        data, settings and log are snapshotted here so the experiment can continue to modify them while the
+        files are written. The plots are rendered on the calling thread, because _plot reads the live
+        experiment, only encoding and writing the images happens in the background.
+        Returns:
+
+        """
+        pipeline = self.save_pipeline
+
+        # filenames depend on the tag, which e.g. the ExperimentIterator changes between runs
+        self.filename(create_if_not_existing=True)
+        data_filename = self.filename('.csv')
+        log_filename = self.filename('-info.txt')
+        matlab_filename = self.filename('.mat')
+        image_filenames = [self.check_filename(self.filename('-plt1.png')),
+                           self.check_filename(self.filename('-plt2.png'))]
+
+        # like save_data, only the most recent dataset of a deque is saved
+        data = snapshot(self.data[-1] if isinstance(self.data, deque) else self.data)
+        settings = snapshot(self.settings)
+        log_data = list(self.log_data)
+
+        pipeline.submit(self.save_data, data_filename, data=data, description='{:s} data'.format(self.name))
+        pipeline.submit(self.save_log, log_filename, log_data=log_data, description='{:s} log'.format(self.name))
+        pipeline.submit(self.save_data_to_matlab, matlab_filename, data=data, settings=settings,
+                        description='{:s} matlab'.format(self.name))
+
+        for image_filename, image in zip(image_filenames, self._render_images()):
+            if image is not None:
+                pipeline.submit(image.save, image_filename, description='{:s} image'.format(self.name))
+
+    def save_data(self, filename=None, data_tag=None, verbose=False, data=None):
         """
         saves the experiment data to a file
         filename: target filename, if not provided, it is created from internal function
         data_tag: string, if provided save only the data that matches the tag, otherwise save all data
         verbose: if true print additional info to std out
+        data: data to save, if not provided self.data is saved
         Returns:
 
         """
@@ -674,14 +845,35 @@ class Experiment(QObject):
         if not os.path.exists(os.path.dirname(filename)):
             os.makedirs(os.path.dirname(filename))
 
-        # if deque object, take the last dataset, which is the most recent
-        if isinstance(self.data, deque):
-            data = self.data[-1]
-        elif isinstance(self.data, dict):
+        if data is None:
             data = self.data
+
+        # if deque object, take the last dataset, which is the most recent
+        if isinstance(data, deque):
+            data = data[-1]
+        elif isinstance(data, dict):
+            pass
         else:
             raise TypeError("experiment data variable has an invalid datatype! Must be deque or dict.")
 
+        if isinstance(data, DataStore) and data_tag is None:
+            # the shapes of declared fields are known, write the filled rows of each field to its own file
+            for key in data.fields:
+                value = data.view(key)
+                if value.ndim > 2:
+                    value = value.reshape(value.shape[0], -1)
+                if value.size == 0:
+                    print('warning! Data ({:s}) seems to be empty. Not saved'.format(key))
+                    continue
+                df = pd.DataFrame(value if value.ndim > 0 else [value])
+                df.to_csv(filename.replace('.csv', '-{:s}.csv'.format(key)), index=False)
+            # the remaining entries are saved as a normal data dictionary
+            data = data.extras
+            if not data:
+                return
+        elif isinstance(data, DataStore):
+            data = data.views()
+
         if data_tag is None:
             if verbose:
                 print('data_tag is None')
@@ -744,23 +936,43 @@ class Experiment(QObject):
             else:
                 df.to_csv(filename, index=False)
 
-    def save_log(self, filename=None):
+    def save_log(self, filename=None, log_data=None):
         """
         save log to file
+        Args:
+            filename: target filename, if not provided, it is created from internal function
+            log_data: log lines to save, if not provided self.log_data is saved
         Returns:
 
         """
         if filename is None:
             filename = self.filename('-info.txt')
+        if log_data is None:
+            log_data = self.log_data
         filename = self.check_filename(filename)
         # filename = self.check_filename(filename)
         # windows can't deal with long filenames so we have to use the prefix '\\\\?\\'
         # if len(filename.split('\\\\?\\')) == 1:
         #     filename = '\\\\?\\' + filename
         with open(filename, 'w', encoding='utf-8') as outfile:
-            for item in self.log_data:
+            for item in log_data:
                 outfile.write("%s\n" % item)
 
+    def save_trace(self, filename=None, since=None):
+        """
+        saves the recorded tracing spans in the Chrome trace event format, see src.core.tracing
+        Args:
+            filename: target filename, if not provided, it is created from internal function
+            since: only spans that started at or after this tracing.trace_timestamp() are saved
+        Returns: number of spans saved
+
+        """
+        if filename is None:
+            self.filename(create_if_not_existing=True)
+            filename = self.filename('-trace.json')
+        filename = self.check_filename(filename)
+        return tracing.export_chrome_trace(filename, since=since)
+
     def save_aqs(self, filename=None):
         """
         saves the experiment settings to a file: filename is filename is not provided, it is created from internal function
@@ -817,6 +1029,41 @@ class Experiment(QObject):
 
         """
 
+        # create and save images
+        if (filename_1 is None):
+            filename_1 = self.filename('-plt1.png')
+
+        if (filename_2 is None):
+            filename_2 = self.filename('-plt2.png')
+
+        # windows can't deal with long filenames so we have to use the prefix '\\\\?\\'
+        # if len(filename_1.split('\\\\?\\')) == 1:
+        #     filename_1 = '\\\\?\\' + filename_1
+        # if len(filename_2.split('\\\\?\\')) == 1:
+        #     filename_2 = '\\\\?\\' + filename_2
+
+        filename_1 = self.check_filename(filename_1)
+        filename_2 = self.check_filename(filename_2)
+
+        if os.path.exists(os.path.dirname(filename_1)) is False:
+            os.makedirs(os.path.dirname(filename_1))
+        if os.path.exists(os.path.dirname(filename_2)) is False:
+            os.makedirs(os.path.dirname(filename_2))
+
+        image_1, image_2 = self._render_images()
+
+        if filename_1 is not None and image_1 is not None:
+            image_1.save(filename_1)
+        if filename_2 is not None and image_2 is not None:
+            image_2.save(filename_2)
+
+    def _render_images(self):
+        """
+        renders the two experiment plots using the experiments plot function
+        Returns: a list with a QImage for each of the two figures, None if the figure is empty
+
+        """
+
         def check_nonempty(graph):
             """
             takes a GrachicsLayoutWidget (a graph) and checks if the plots it contains have data
@@ -841,42 +1088,20 @@ class Experiment(QObject):
                                     return False
             return True
 
-        # create and save images
-        if (filename_1 is None):
-            filename_1 = self.filename('-plt1.png')
-
-        if (filename_2 is None):
-            filename_2 = self.filename('-plt2.png')
-
-        # windows can't deal with long filenames so we have to use the prefix '\\\\?\\'
-        # if len(filename_1.split('\\\\?\\')) == 1:
-        #     filename_1 = '\\\\?\\' + filename_1
-        # if len(filename_2.split('\\\\?\\')) == 1:
-        #     filename_2 = '\\\\?\\' + filename_2
-
-        filename_1 = self.check_filename(filename_1)
-        filename_2 = self.check_filename(filename_2)
-
-        if os.path.exists(os.path.dirname(filename_1)) is False:
-            os.makedirs(os.path.dirname(filename_1))
-        if os.path.exists(os.path.dirname(filename_2)) is False:
-            os.makedirs(os.path.dirname(filename_2))
-
         graph_1 = pg.GraphicsLayoutWidget()  #graph is the space/object you add plots to
-        scene_1 = graph_1.scene()            #scene houses all the plots; we want to save all plots if nonempty
-
         graph_2 = pg.GraphicsLayoutWidget()
-        scene_2 = graph_2.scene()
 
         self.force_update()
         self.plot([graph_1, graph_2])
 
-        if filename_1 is not None and not check_nonempty(graph_1):
-            exporter = ImageExporter(scene_1)
-            exporter.export(filename_1)
-        if filename_2 is not None and not check_nonempty(graph_2):
-            exporter = ImageExporter(scene_2)
-            exporter.export(filename_2)
+        images = []
+        for graph in [graph_1, graph_2]:
+            if check_nonempty(graph):
+                images.append(None)
+            else:
+                #scene houses all the plots; we want to save all plots if nonempty
+                images.append(ImageExporter(graph.scene()).export(toBytes=True))
+        return images
 
     def save(self, filename):
         """
@@ -894,12 +1119,25 @@ class Experiment(QObject):
         with open(filename, 'w', encoding='utf-8') as outfile:
             outfile.write(pickle.dumps(self.__dict__))
 
-    def save_data_to_matlab(self, filename=None):
+    def save_data_to_matlab(self, filename=None, data=None, settings=None):
+        """
+        saves the experiment data and settings as a matlab struct
+        Args:
+            filename: target filename, if not provided, it is created from internal function
+            data: data to save, if not provided self.data is saved
+            settings: settings to save, if not provided self.settings is saved
+        """
         if filename is None:
             filename = self.filename('.mat')
         filename = self.check_filename(filename)
+        if data is None:
+            data = self.data
+        if settings is None:
+            settings = self.settings
+        if isinstance(data, DataStore):
+            data = data.views()
 
-        tag = self.settings['tag']
+        tag = settings['tag']
         if ' ' in tag or '.' in tag or '+' in tag or '-' in tag:
             good_tag = tag.replace(' ', '_').replace('.', '_').replace('+', 'P').replace('-', 'M')
             #matlab structs cant include spaces, dots, or plus/minus so replace with other characters
@@ -910,7 +1148,7 @@ class Experiment(QObject):
         good_tag = 'data_' + good_tag
 
         mat_saver = MatlabSaver(tag=good_tag)
-        mat_saver.add_experiment_data(self.data,self.settings)
+        mat_saver.add_experiment_data(data, settings)
         structured_data = mat_saver.get_structured_data()
         savemat(filename, structured_data)
 
@@ -1452,6 +1690,12 @@ class Experiment(QObject):
         #     pass
         # print('module', module_path)
 
+        if experiment_filepath is None and module_path == package + '.experiments':
+            # import only the module that defines the class, found by the plugin registry without importing anything
+            entry = get_plugin_registry().find(experiment_class_name, 'experiment')
+            if entry is not None:
+                module_path, module_file = module_name_from_path(entry['filepath'], verbose=False)
+
         # appends path to this module to the python path if it is not present so it can be used
         if module_file and (module_file not in sys.path):
             sys.path.append(module_file)
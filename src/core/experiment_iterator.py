@@ -12,7 +12,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
-import copy
 
 from src.core import Parameter, Experiment
 import numpy as np
@@ -25,6 +24,9 @@ from src.core import helper_functions as hf
 import importlib
 from functools import reduce
 from src.core.helper_functions import MatlabSaver
+from src.core.sweep_result_store import SweepResultStore
+from src.core.sweep_order import grid_points
+from src.core.adaptive_sweep import AdaptiveSampler1D, FIT_FUNCTIONS
 from scipy.io import savemat
 
 import random
@@ -49,7 +51,8 @@ class ExperimentIterator(Experiment):
     _number_of_classes = 0  # keeps track of the number of dynamically created ExperimentIterator classes that have been created
     _class_list = []  # list of current dynamically created ExperimentIterator classes
 
-    ITER_TYPES = ['loop', 'sweep']
+    ITER_TYPES = ['loop', 'sweep', 'nd_sweep']
+    ND_SWEEP_AXES = 3  # number of axes offered in the settings of an N-D sweep
 
     def __init__(self, experiments, name=None, settings=None, devices=None, log_function=None, data_path=None):
         """
@@ -88,11 +91,15 @@ class ExperimentIterator(Experiment):
                 iterator_type = 'loop'
             elif experiment_settings['iterator_type'] == 'Parameter Sweep':
                 iterator_type = 'sweep'
+            elif experiment_settings['iterator_type'] == 'N-D Parameter Sweep':
+                iterator_type = 'nd_sweep'
             else:
                 raise TypeError('unknown iterator type')
         else:
             # asign the correct iterator experiment type
-            if 'sweep_param' in experiment_settings:
+            if 'sweep_axes' in experiment_settings:
+                iterator_type = 'nd_sweep'
+            elif 'sweep_param' in experiment_settings:
                 iterator_type = 'sweep'
             elif 'num_loops' in experiment_settings:
                 iterator_type = 'loop'
@@ -156,15 +163,36 @@ class ExperimentIterator(Experiment):
 
                 return experiment_list, parameter_list
 
-            param_values = get_sweep_parameters()
-
-            print('GD parameters before', param_values)
-            if self.settings['sweep_range']['randomize'] == True:
-                np.random.shuffle(param_values)
-            print('GD parameters after', param_values)
-
-            for i, value in enumerate(param_values):
-                self.iterator_progress = float(i) / len(param_values)
+            adaptive = self.settings['stepping_mode'] == 'adaptive'
+            if adaptive:
+                # the values are picked while the sweep runs, param_values collects them for the scan info
+                sampler = self.get_adaptive_sampler()
+                sweep_values = sampler
+                param_values = []
+                num_points = sampler.num_points
+                self.data = SweepResultStore(np.full(num_points, np.nan))
+            else:
+                param_values = get_sweep_parameters()
+
+                print('GD parameters before', param_values)
+                if self.settings['sweep_range']['randomize'] == True:
+                    np.random.shuffle(param_values)
+                print('GD parameters after', param_values)
+                sweep_values = param_values
+                num_points = len(param_values)
+
+                # settings are stored as differences to a shared base and data arrays go into one cube per key
+                self.data = SweepResultStore(param_values)
+            # one list shared by the scan info of all points
+            all_values = param_values if adaptive else list(param_values)
+
+            for i, value in enumerate(sweep_values):
+                if self._abort:
+                    break
+                if adaptive:
+                    param_values.append(value)
+                    self.data.sweep_values[i] = value
+                self.iterator_progress = float(i) / num_points
                 previous_data = None
 
                 experiment_list, parameter_list = get_experiment_and_settings_from_str(self.settings['sweep_param'])
@@ -179,7 +207,7 @@ class ExperimentIterator(Experiment):
                 update_dict = reduce(lambda y, x: {x: y}, reversed(parameter_list),
                                      curr_type(value))  # creates nested dictionary from list
 
-                experiment.settings.update(update_dict)
+                experiment.settings.update_validated(update_dict)
                 parameter_name = parameter_list[-1]
                 if np.abs(value) < 1000:
                     self.log('setting parameter {:s} to {:.3g}'.format(self.settings['sweep_param'], value))
@@ -206,20 +234,104 @@ class ExperimentIterator(Experiment):
                         self.log('starting {:s}'.format(experiment_name))
                         tag = self.experiments[experiment_name].settings['tag']
                         self.experiments[experiment_name].settings['tag'] = '{:s}_{:s}_{:0.3e}'.format(tag, parameter_name,value)
-                        #ensure settings and data are deepcopys so multiple iterations dont change old values
-                        settings = copy.deepcopy(self.experiments[experiment_name].settings)
+                        #the store keeps only the settings that differ from the first point, so later iterations dont change old values
+                        point_tag = self.experiments[experiment_name].settings['tag']
+                        point_settings = self.data.add_settings(experiment_name, point_tag, self.experiments[experiment_name].settings)
                         self.experiments[experiment_name].run()
 
                         it_level_str = f'_iterator_{self.iterator_level}'
-                        python_scan_info_dic = {'scan_parameter'+it_level_str:parameter_name,'scan_current_value'+it_level_str:value, 'scan_all_values'+it_level_str:list(param_values)}
-                        data = copy.deepcopy(self.experiments[experiment_name].data)
+                        python_scan_info_dic = {'scan_parameter'+it_level_str:parameter_name,'scan_current_value'+it_level_str:value, 'scan_all_values'+it_level_str:all_values}
 
                         #adds to self.data a key of the current experiment tage with a value that is a lsit of [data, settings, scan_infor] for current experiment
-                        self.data[self.experiments[experiment_name].settings['tag']] = [data, settings, python_scan_info_dic]
+                        self.data.add_point(experiment_name, i, point_tag, self.experiments[experiment_name].data,
+                                            point_settings, python_scan_info_dic)
 
                         self.experiments[experiment_name].settings['tag'] = tag
                         previous_data = self.experiments[experiment_name].data
 
+                if adaptive:
+                    sampler.tell(value, self._get_adaptive_score_value())
+
+            if adaptive:
+                all_values.sort()
+
+        elif self.iterator_type == 'nd_sweep':
+
+            axes = self.get_sweep_axes()
+            if len(axes) == 0:
+                self.log('No sweep axis enabled')
+                return
+
+            if self.settings['combination'] == 'grid':
+                shape = [len(axis['values']) for axis in axes]
+                points = grid_points(shape, [axis['settle_time'] for axis in axes], self.settings['point_order'])
+                cube_axes = {axis['sweep_param']: axis['values'] for axis in axes}
+            else:
+                # zipped axes step together, the cube has a single axis labelled with the point number
+                points = [(i,) * len(axes) for i in range(len(axes[0]['values']))]
+                cube_axes = {'point': np.arange(len(points))}
+
+            it_level_str = f'_iterator_{self.iterator_level}'
+            all_values = [list(axis['values']) for axis in axes]
+            point_values = [[axis['values'][index[k]] for k, axis in enumerate(axes)] for index in points]
+            self.data = SweepResultStore(point_values, axes=cube_axes)
+
+            current_index = [None] * len(axes)
+            for i, index in enumerate(points):
+                if self._abort:
+                    break
+                self.iterator_progress = float(i) / len(points)
+                previous_data = None
+                values = point_values[i]
+
+                # only touch the parameters that change, in serpentine order this is a single one
+                settle_time = 0.
+                for k, axis in enumerate(axes):
+                    if index[k] != current_index[k]:
+                        axis['experiment'].settings.update_validated(axis['update'](values[k]))
+                        self.log('setting parameter {:s} to {:.3g}'.format(axis['sweep_param'], values[k]))
+                        settle_time = max(settle_time, axis['settle_time'])
+                current_index = list(index)
+                # the changed axes settle at the same time, wait for the slowest one
+                if settle_time > 0:
+                    sleep(settle_time)
+
+                store_index = index if self.settings['combination'] == 'grid' else index[0]
+                point_str = '_'.join('{:s}_{:0.3e}'.format(axis['parameter_name'], value) for axis, value in zip(axes, values))
+                python_scan_info_dic = {}
+                for k, axis in enumerate(axes):
+                    # keys stay within the 31 characters matlab allows for field names
+                    axis_str = it_level_str + '_{:d}'.format(k)
+                    python_scan_info_dic.update({'scan_parameter' + axis_str: axis['parameter_name'],
+                                                 'scan_current_value' + axis_str: values[k],
+                                                 'scan_all_values' + axis_str: all_values[k]})
+
+                for experiment_name in sorted_experiment_names:
+                    if self._abort:
+                        break
+                    j = i if self.settings['run_all_first'] else (i + 1)
+
+                    curr_experiment_exec_freq = self.settings['experiment_execution_freq'][experiment_name]
+                    if curr_experiment_exec_freq != 0 and (j % curr_experiment_exec_freq == 0):
+
+                        if previous_data is not None:
+                            if 'inherit_data' in self.experiments[experiment_name].settings and self.experiments[experiment_name].settings['inherit_data']:
+                                common_keys = self.experiments[experiment_name].data.keys() & previous_data.keys()
+                                for key in common_keys:
+                                    self.experiments[experiment_name].data[key] = previous_data[key]
+
+                        self.log('starting {:s}'.format(experiment_name))
+                        tag = self.experiments[experiment_name].settings['tag']
+                        self.experiments[experiment_name].settings['tag'] = '{:s}_{:s}'.format(tag, point_str)
+                        point_tag = self.experiments[experiment_name].settings['tag']
+                        point_settings = self.data.add_settings(experiment_name, point_tag, self.experiments[experiment_name].settings)
+                        self.experiments[experiment_name].run()
+
+                        self.data.add_point(experiment_name, store_index, point_tag, self.experiments[experiment_name].data,
+                                            point_settings, python_scan_info_dic)
+
+                        self.experiments[experiment_name].settings['tag'] = tag
+                        previous_data = self.experiments[experiment_name].data
 
         elif self.iterator_type == 'loop':
 
@@ -307,6 +419,124 @@ class ExperimentIterator(Experiment):
         else:
             raise TypeError('wrong iterator type')
 
+    def get_adaptive_sampler(self):
+        """
+        Returns the AdaptiveSampler1D for a sweep with stepping_mode 'adaptive'. N/value_step is the total number of points.
+        """
+        sweep_range = self.settings['sweep_range']
+        adaptive_settings = self.settings['adaptive']
+        if sweep_range['randomize']:
+            self.log('randomize is ignored for adaptive sweeps')
+        return AdaptiveSampler1D(sweep_range['min_value'], sweep_range['max_value'], int(sweep_range['N/value_step']),
+                                 coarse_points=adaptive_settings['coarse_points'],
+                                 fit_function=adaptive_settings['fit_function'],
+                                 min_step=adaptive_settings['min_step'])
+
+    def _get_adaptive_score_value(self):
+        """
+        Returns the data under the score key of the first subexperiment that has it, None if no subexperiment has it.
+        """
+        score_key = self.settings['adaptive']['score_key']
+        if score_key == '':
+            return None
+        for experiment in self.experiments.values():
+            data = experiment.data
+            if isinstance(data, deque):
+                data = data[-1] if len(data) > 0 else {}
+            if isinstance(data, dict) and score_key in data:
+                return data[score_key]
+        return None
+
+    def get_sweep_axes(self):
+        """
+        Resolves the enabled axes of an N-D sweep once, so the sweep loop does not have to traverse the
+        experiment tree and the settings for every point.
+
+        Returns:
+            list of dictionaries with the keys
+                sweep_param: path of the parameter, e.g. experiment.param.subparam or experiment->subexperiment.parameter
+                parameter_name: name of the parameter
+                values: values of the axis
+                settle_time: time in s waited after a change of this parameter, the slowest axis is the outer loop
+                experiment: the experiment that owns the parameter
+                update: function that returns the nested settings dictionary for a value
+        """
+        axes = []
+        for axis_settings in self.settings['sweep_axes'].values():
+            if axis_settings['sweep_param'] == 'none' or axis_settings['N'] < 1:
+                continue
+
+            split_trace = axis_settings['sweep_param'].split('.')
+            experiment_list = split_trace[0].split('->')
+            parameter_list = split_trace[1:]
+
+            experiment = self
+            for experiment_name in experiment_list:
+                experiment = experiment.experiments[experiment_name]
+
+            # traverse nested dict to get type of variable
+            curr_type = type(reduce(lambda x, y: x[y], parameter_list, experiment.settings))
+
+            def update(value, parameter_list=parameter_list, curr_type=curr_type):
+                # creates nested dictionary from list
+                return reduce(lambda y, x: {x: y}, reversed(parameter_list), curr_type(value))
+
+            axes.append({
+                'sweep_param': axis_settings['sweep_param'],
+                'parameter_name': parameter_list[-1],
+                'values': np.linspace(axis_settings['min_value'], axis_settings['max_value'], int(axis_settings['N']),
+                                      endpoint=True).tolist(),
+                'settle_time': axis_settings['settle_time'],
+                'experiment': experiment,
+                'update': update
+            })
+
+        if self.settings['combination'] == 'zip' and len(set(len(axis['values']) for axis in axes)) > 1:
+            raise ValueError('zipped sweep axes need the same number of values')
+        return axes
+
+    def _planned_iterations(self):
+        """
+        :return: number of iterations the iterator will run with the current settings
+        """
+        if self.iterator_type == 'loop':
+            return self.settings['num_loops']
+        elif self.iterator_type == 'sweep':
+            sweep_range = self.settings['sweep_range']
+            if self.settings['stepping_mode'] == 'value_step':
+                return int((sweep_range['max_value'] - sweep_range['min_value']) / sweep_range['N/value_step']) + 1
+            return int(sweep_range['N/value_step'])
+        elif self.iterator_type == 'nd_sweep':
+            sizes = [int(axis['N']) for axis in self.settings['sweep_axes'].values()
+                     if axis['sweep_param'] != 'none' and axis['N'] >= 1]
+            if not sizes:
+                return 0
+            return int(np.prod(sizes)) if self.settings['combination'] == 'grid' else max(sizes)
+        raise KeyError('unknown iterator type ' + str(self.iterator_type))
+
+    def predicted_duration(self):
+        """
+        predicts the duration from previous runs of this iterator, if there are none from the predicted durations
+        of the subexperiments times the number of iterations
+        :return: duration in seconds, None if it can not be predicted
+        """
+        prediction = super().predicted_duration()
+        if prediction is not None:
+            return prediction
+        sub_predictions = [experiment.predicted_duration() for experiment in self.experiments.values()]
+        if not sub_predictions or any(sub_prediction is None for sub_prediction in sub_predictions):
+            return None
+        return self._planned_iterations() * sum(sub_predictions)
+
+    def _predicted_subexperiment_duration(self, subexperiment_name):
+        """
+        :return: predicted duration of a subexperiment in seconds, 0 if unknown
+        """
+        try:
+            return self.experiments[subexperiment_name].predicted_duration() or 0.
+        except Exception:
+            return 0.
+
     def _estimate_progress(self):
         """
         estimates the current progress that is then used in _receive_signal
@@ -338,10 +568,12 @@ class ExperimentIterator(Experiment):
                 # len(np.linspace(sweep_range['min_value'], sweep_range['max_value'],
                 #                                        (sweep_range['max_value'] - sweep_range['min_value']) /
                 #                                        sweep_range['N/value_step'] + 1, endpoint=True))
-            elif self.settings['stepping_mode'] == 'N':
+            elif self.settings['stepping_mode'] in ('N', 'adaptive'):
                 num_iterations = sweep_range['N/value_step']
             else:
                 raise KeyError('unknown key' + self.settings['stepping_mode'])
+        elif self.iterator_type == 'nd_sweep':
+            num_iterations = max(self.data.num_points, 1) if isinstance(self.data, SweepResultStore) else 1
 
         else:
             print('unknown iterator type in Iterator receive signal - can\'t estimate ramining time')
@@ -377,14 +609,20 @@ class ExperimentIterator(Experiment):
                         remaining_time = current_subexperiment.remaining_time.total_seconds()
                         current_subexperiment_exec_duration = remaining_time + current_subexperiment_elapsed_time
                     else:
-                        current_subexperiment_exec_duration = 1.0  # Default 1 second if we can't estimate
+                        # duration of previous runs, 1 second if we can't estimate
+                        current_subexperiment_exec_duration = (self._predicted_subexperiment_duration(
+                            current_subexperiment.name) if current_subexperiment else 0.) or 1.0
 
                 # ==== get typical duration of one loop iteration ======================
                 remaining_experiments = 0  # experiment that remain to be executed for the first time
                 for subexperiment_name, duration in self._current_subexperiment_stage['subexperiment_exec_duration'].items():
-                    if duration.total_seconds() == 0.0:
+                    duration_seconds = duration.total_seconds()
+                    if duration_seconds == 0.0:
+                        # not executed yet in this run, use the duration of previous runs if there are any
+                        duration_seconds = self._predicted_subexperiment_duration(subexperiment_name)
+                    if duration_seconds == 0.0:
                         remaining_experiments += 1
-                    loop_execution_time += duration.total_seconds()
+                    loop_execution_time += duration_seconds
                     # add the times of the subexperiments that have been executed in the current loop
                     # ignore the current subexperiment, because that will be taken care of later
                     if self._current_subexperiment_stage['subexperiment_exec_count'].get(subexperiment_name, 0) == loop_index \
@@ -452,12 +690,17 @@ class ExperimentIterator(Experiment):
             # Return default value if calculation fails
             return 1
 
-    def save_data_to_matlab(self, filename=None):
+    def save_data_to_matlab(self, filename=None, data=None, settings=None):
+        if data is None:
+            data = self.data
+        if settings is None:
+            settings = self.settings
+
         if self.iterator_type == 'loop':
             #for loop the experiment data is averaged so its structure is similar to a single experiment; default to normal behavior
-            Experiment.save_data_to_matlab(self)
+            Experiment.save_data_to_matlab(self, filename, data=data, settings=settings)
 
-        elif self.iterator_type == 'sweep': #for sweeps need more complex structure
+        elif self.iterator_type in ('sweep', 'nd_sweep'): #for sweeps need more complex structure
             #does not include the settings of each iterator level as the important info is in the inherited scan info
             def extract_data(dic, current_level, target_level, inherited_scan_info=None):
                 it_level_str = f'_iterator_{target_level-current_level+1}'
@@ -476,9 +719,13 @@ class ExperimentIterator(Experiment):
                     scan_var_all_values = current_level_scan_info_raw.get('scan_all_values' + it_level_str)
 
                     updated_scan_info = dict(inherited_scan_info)
-                    updated_scan_info['scan_parameter' + it_level_str] = scan_variable
-                    updated_scan_info['scan_current_value' + it_level_str] = scan_var_current_value
-                    updated_scan_info['scan_all_values' + it_level_str] = scan_var_all_values
+                    if scan_variable is not None:
+                        updated_scan_info['scan_parameter' + it_level_str] = scan_variable
+                        updated_scan_info['scan_current_value' + it_level_str] = scan_var_current_value
+                        updated_scan_info['scan_all_values' + it_level_str] = scan_var_all_values
+                    # N-D sweeps have one set of scan keys per axis
+                    updated_scan_info.update({k: v for k, v in current_level_scan_info_raw.items()
+                                              if k.endswith(tuple(it_level_str + '_{:d}'.format(n) for n in range(ExperimentIterator.ND_SWEEP_AXES)))})
 
                     if current_level < target_level:
 
@@ -501,7 +748,7 @@ class ExperimentIterator(Experiment):
                 filename = self.filename('.mat')
             filename = self.check_filename(filename)
 
-            tag = self.settings['tag']
+            tag = settings['tag']
             if ' ' in tag or '.' in tag or '+' in tag or '-' in tag:
                 good_tag = tag.replace(' ', '_').replace('.', '_').replace('+', 'P').replace('-', 'M')
                 # matlab structs cant include spaces, dots, or plus/minus so replace with other characters
@@ -512,10 +759,10 @@ class ExperimentIterator(Experiment):
             good_tag = 'data_' + good_tag
 
             mat_saver = MatlabSaver(tag=good_tag)
-            data_tuples = extract_data(self.data, current_level=1, target_level=self.iterator_level)
+            data_tuples = extract_data(data, current_level=1, target_level=self.iterator_level)
             #print('data_tuples',data_tuples)
-            for data, settings, combined_scan_info in data_tuples:
-                mat_saver.add_experiment_data(data, settings, iterator_info_dic=combined_scan_info)
+            for point_data, point_settings, combined_scan_info in data_tuples:
+                mat_saver.add_experiment_data(point_data, point_settings, iterator_info_dic=combined_scan_info)
 
             structured_data = mat_saver.get_structured_data()
             savemat(filename, structured_data)
@@ -565,7 +812,7 @@ class ExperimentIterator(Experiment):
                         'can\'t plot average experiment data because experiment.plot function doens\'t take data as optional argument. Plotting last data set instead')))
                     print((str(err)))
                     last_experiment.plot(figure_list)
-            elif self.iterator_type == 'sweep':
+            elif self.iterator_type in ('sweep', 'nd_sweep'):
                 #for sweep just plot last experiment with its own data
                 last_experiment._plot(axes_list)
 
@@ -592,7 +839,7 @@ class ExperimentIterator(Experiment):
                         'can\'t plot average experiment data because experiment.plot function doens\'t take data as optional argument. Plotting last data set instead')))
                     print((str(err)))
                     last_experiment._plot(axes_list) #_plot here as we dont have the figure_list and _plot is triggered
-            elif self.iterator_type == 'sweep':
+            elif self.iterator_type in ('sweep', 'nd_sweep'):
                 # for sweep just plot last experiment with its own data
                 last_experiment._plot(axes_list)
 
@@ -747,7 +994,41 @@ class ExperimentIterator(Experiment):
                                           Parameter('N/value_step', 0, float,
                                                     'either number of steps or parameter value step, depending on mode'),
                                           Parameter('randomize', False, bool, 'randomize the sweep parameters')]),
-                Parameter('stepping_mode', 'N', ['N', 'value_step'], 'Switch between number of steps and step amount'),
+                Parameter('stepping_mode', 'N', ['N', 'value_step', 'adaptive'],
+                          'Switch between number of steps and step amount, adaptive refines a coarse pass with N points in total'),
+                Parameter('adaptive', [
+                    Parameter('coarse_points', 5, int, 'number of uniformly spaced points measured first'),
+                    Parameter('score_key', '', str, 'data key used to find the informative intervals, empty refines the widest intervals'),
+                    Parameter('fit_function', 'none', FIT_FUNCTIONS, 'if not none, intervals are scored by the residual of this fit to score_key'),
+                    Parameter('min_step', 0.0, float, 'intervals narrower than this are not subdivided')
+                ]),
+                Parameter('run_all_first', True, bool, 'Run all experiments with nonzero frequency in first pass')
+            ]
+
+        elif iterator_type == 'nd_sweep':
+
+            sweep_params = populate_sweep_param(sub_experiments, [])
+
+            sweep_axes = []
+            for k in range(ExperimentIterator.ND_SWEEP_AXES):
+                sweep_axes.append(Parameter('axis_{:d}'.format(k), [
+                    Parameter('sweep_param', sweep_params[0] if k == 0 else 'none', ['none'] + sweep_params,
+                              'variable over which to sweep, none disables the axis'),
+                    Parameter('min_value', 0, float, 'min parameter value'),
+                    Parameter('max_value', 0, float, 'max parameter value'),
+                    Parameter('N', 0, int, 'number of values'),
+                    Parameter('settle_time', 0.0, float,
+                              'time in s to wait after this parameter changed before measuring, the slowest axis changes least often', units='s')
+                ]))
+
+            experiment_default_settings = [
+                Parameter('experiment_order', experiment_order),
+                Parameter('experiment_execution_freq', experiment_execution_freq),
+                Parameter('sweep_axes', sweep_axes),
+                Parameter('combination', 'grid', ['grid', 'zip'],
+                          'grid: every combination of the axis values, zip: step all axes together'),
+                Parameter('point_order', 'serpentine', ['serpentine', 'raster'],
+                          'serpentine reverses the inner axes on alternate passes so consecutive points differ in one parameter'),
                 Parameter('run_all_first', True, bool, 'Run all experiments with nonzero frequency in first pass')
             ]
         else:
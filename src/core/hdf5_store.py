@@ -0,0 +1,225 @@
+"""
+Incremental HDF5 Data Store
+
+Experiments append rows (a scan line, a sweep trace, a single value) to resizable, chunked and
+compressed HDF5 datasets while they run, instead of writing everything once _function returns.
+Rows are buffered in memory and written every `flush_every` rows, so an aborted or crashed run
+keeps everything up to the last flush and the buffered history stays bounded.
+
+The file is switched to SWMR (single writer, multiple reader) mode on the first flush, so a
+second process can follow the data live with load_store(). Because HDF5 does not allow new
+datasets once SWMR is active, all datasets have to be declared (or receive their first row)
+before the first flush. Settings are written with the struct helpers of src.core.struct_hdf5.
+
+Example:
+    store = experiment.open_store(flush_every=10)
+    store.declare('count_img', row_shape=(Ny,))
+    for row in rows:
+        store.append('count_img', row)
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+from typing import Dict, Optional, Tuple
+
+import h5py
+import numpy as np
+
+from src.core.struct_hdf5 import _write_value, parameter_to_mystruct
+
+
+class HDF5DataStore:
+    """
+    Append-as-you-go HDF5 storage for experiment data.
+
+    Args:
+        filename: path of the .h5 file, an existing file is overwritten
+        flush_every: number of rows buffered per dataset before they are written to disk
+        compression: HDF5 compression filter ('gzip', 'lzf' or None)
+        compression_opts: compression level for gzip
+        swmr: if True the file is switched to SWMR mode on the first flush so it can be read live
+    """
+
+    def __init__(self, filename, flush_every: int = 10, compression: Optional[str] = 'gzip',
+                 compression_opts: Optional[int] = 4, swmr: bool = True):
+        assert flush_every >= 1
+        self.filename = str(filename)
+        self.flush_every = flush_every
+        self.compression = compression
+        self.compression_opts = compression_opts if compression == 'gzip' else None
+        self.swmr = swmr
+
+        self._file = h5py.File(self.filename, 'w', libver='latest')
+        self._datasets = {}
+        self._buffers = {}
+        self._swmr_started = False
+
+    # ------------------------------------------------------------------
+    # setup
+    # ------------------------------------------------------------------
+    def declare(self, name: str, row_shape: Tuple[int, ...] = (), dtype='f8', chunk_rows: Optional[int] = None):
+        """
+        Create an empty dataset that grows along its first axis.
+
+        Args:
+            name: dataset name
+            row_shape: shape of a single row, () for one value per row
+            dtype: NumPy dtype of the dataset
+            chunk_rows: number of rows per HDF5 chunk, defaults to flush_every
+        """
+        if name in self._datasets:
+            raise KeyError(f"dataset {name} already declared")
+        if self._swmr_started:
+            raise RuntimeError(f"cannot declare dataset {name}: the file is already in SWMR mode, "
+                               f"declare all datasets before the first flush")
+
+        row_shape = tuple(int(n) for n in row_shape)
+        if chunk_rows is None:
+            chunk_rows = self.flush_every
+
+        dataset = self._file.create_dataset(
+            name,
+            shape=(0,) + row_shape,
+            maxshape=(None,) + row_shape,
+            dtype=dtype,
+            chunks=(chunk_rows,) + row_shape,
+            compression=self.compression,
+            compression_opts=self.compression_opts
+        )
+        self._datasets[name] = dataset
+        self._buffers[name] = []
+        return dataset
+
+    def write_settings(self, settings, root_name: str = 'settings'):
+        """
+        Store experiment settings (a Parameter or dict) in a group of the file.
+        Has to be called before the first flush.
+        """
+        if self._swmr_started:
+            raise RuntimeError('settings have to be written before the first flush')
+        _write_value(self._file, root_name, parameter_to_mystruct(settings))
+
+    # ------------------------------------------------------------------
+    # writing
+    # ------------------------------------------------------------------
+    def append(self, name: str, row):
+        """
+        Append a single row. Undeclared datasets are created from the first row.
+
+        Args:
+            name: dataset name
+            row: value or array with the row shape of the dataset
+        """
+        if name not in self._datasets:
+            row = np.asarray(row)
+            self.declare(name, row.shape, row.dtype)
+
+        dataset = self._datasets[name]
+        row = np.asarray(row, dtype=dataset.dtype)
+        if row.shape != dataset.shape[1:]:
+            raise ValueError(f"row of shape {row.shape} does not match dataset {name} with rows of shape {dataset.shape[1:]}")
+
+        buffer = self._buffers[name]
+        buffer.append(row)
+        if len(buffer) >= self.flush_every:
+            self._flush_dataset(name)
+
+    def extend(self, name: str, rows):
+        """
+        Append several rows at once.
+        """
+        for row in rows:
+            self.append(name, row)
+
+    def _flush_dataset(self, name):
+        buffer = self._buffers[name]
+        if not buffer:
+            return
+        self._start_swmr()
+
+        dataset = self._datasets[name]
+        start = dataset.shape[0]
+        dataset.resize(start + len(buffer), axis=0)
+        dataset[start:] = np.stack(buffer)
+        self._buffers[name] = []
+        dataset.flush()
+
+    def _start_swmr(self):
+        if self.swmr and not self._swmr_started:
+            self._file.swmr_mode = True
+        self._swmr_started = True
+
+    def flush(self):
+        """
+        Write all buffered rows to disk.
+        """
+        for name in self._datasets:
+            self._flush_dataset(name)
+        self._file.flush()
+
+    def close(self):
+        """
+        Flush the remaining rows and close the file.
+        """
+        if not self.is_open:
+            return
+        self.flush()
+        self._file.close()
+
+    # ------------------------------------------------------------------
+    # reading
+    # ------------------------------------------------------------------
+    @property
+    def is_open(self) -> bool:
+        return bool(self._file)
+
+    @property
+    def names(self):
+        return list(self._datasets.keys())
+
+    def num_rows(self, name: str) -> int:
+        """
+        Returns the number of rows of a dataset, including the rows not yet flushed.
+        """
+        return self._datasets[name].shape[0] + len(self._buffers[name])
+
+    def read(self, name: str) -> np.ndarray:
+        """
+        Returns all rows of a dataset, including the rows not yet flushed.
+        """
+        dataset = self._datasets[name]
+        rows = dataset[()]
+        if self._buffers[name]:
+            rows = np.concatenate([rows, np.stack(self._buffers[name])])
+        return rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def load_store(filename) -> Dict[str, np.ndarray]:
+    """
+    Read the datasets of a store. Works while the writing experiment is still running,
+    in that case all rows flushed so far are returned.
+
+    Args:
+        filename: path of the .h5 file
+
+    Returns:
+        dictionary with the dataset names as keys and the rows as arrays, datasets in groups are
+        returned with their path, e.g. 'sg384/power'
+    """
+    datasets = {}
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset) and not name.startswith('settings/'):
+            datasets[name] = obj[()]
+
+    with h5py.File(str(filename), 'r', libver='latest', swmr=True) as f:
+        f.visititems(visit)
+    return datasets
@@ -13,6 +13,8 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 
+import re
+
 from src import ur
 
 
@@ -21,7 +23,97 @@ class ValidationError(Exception):
     pass
 
 
+_NOT_VALIDATED = object()  # valid_values of keys that are not in the valid values of a Parameter
+
+
+def _compile_type_check(valid_values):
+    """
+    Returns a function check(value) that gives the same result as Parameter.is_valid(value, valid_values),
+    with the decisions that only depend on valid_values taken once.
+    """
+    if isinstance(valid_values, type):
+        if valid_values is float:
+            def check(value):
+                value_type = type(value)
+                return value_type is float or value is None or value_type is int or hasattr(value, 'magnitude')
+        elif valid_values is Parameter:
+            def check(value):
+                return value is None or isinstance(value, dict)
+        else:
+            def check(value):
+                return type(value) is valid_values or value is None
+        return check
+
+    if isinstance(valid_values, dict):
+        checks = {}  # key: (valid values, check) of the nested values
+
+        def check(value):
+            # like is_valid, an empty dictionary is not valid
+            if not isinstance(value, dict) or not value:
+                return False
+            for key, nested_value in value.items():
+                nested_valid_values = valid_values.get(key, _NOT_VALIDATED)
+                if nested_valid_values is _NOT_VALIDATED:
+                    return False
+                entry = checks.get(key)
+                if entry is None or entry[0] is not nested_valid_values:
+                    entry = checks[key] = (nested_valid_values, _compile_type_check(nested_valid_values))
+                if not entry[1](nested_value):
+                    return False
+            return True
+        return check
+
+    if isinstance(valid_values, list):
+        try:
+            choices = frozenset(valid_values)
+        except TypeError:
+            choices = None
+
+        def check(value):
+            if choices is not None:
+                try:
+                    return value in choices
+                except TypeError:
+                    pass  # unhashable values are compared with each choice
+            return value in valid_values
+        return check
+
+    return lambda value: Parameter.is_valid(value, valid_values)
+
+
+def _rule_errors(rules, value):
+    """returns the messages of the range, pattern and custom rules that value violates"""
+    error_messages = []
+    if 'range' in rules:
+        range_rule = rules['range']
+        if range_rule.get('min') is not None and value < range_rule['min']:
+            error_messages.append(f"Value {value} is below minimum {range_rule['min']}")
+        if range_rule.get('max') is not None and value > range_rule['max']:
+            error_messages.append(f"Value {value} is above maximum {range_rule['max']}")
+    if 'pattern' in rules and isinstance(value, str):
+        if not re.match(rules['pattern'], value):
+            error_messages.append(f"Value '{value}' does not match pattern '{rules['pattern']}'")
+    if 'custom' in rules:
+        if not rules['custom'](value):
+            error_messages.append(f"Value {value} failed custom validation")
+    return error_messages
+
+
+def _rebuild_parameter(state, contents):
+    parameter = Parameter.__new__(Parameter)
+    for attribute, value in state.items():
+        setattr(parameter, attribute, value)
+    parameter._validators = {}
+    dict.update(parameter, contents)
+    return parameter
+
+
 class Parameter(dict):
+    # the metadata is stored in slots instead of an instance __dict__, settings trees contain many Parameters
+    __slots__ = ('name', '_valid_values', '_info', '_visible', '_units', '_pint_quantity', '_original_units',
+                 '_original_magnitude', '_validation_rules', '_conversion_cache', '_validation_cache',
+                 '_cache_max_size', '_validators')
+
     def __init__(self, name, value=None, valid_values=None, info=None, visible=False, units=None,
                  min_value=None, max_value=None, pattern=None, validator=None):
         """
@@ -50,6 +142,9 @@ class Parameter(dict):
         self._conversion_cache = {}
         self._validation_cache = {}
         self._cache_max_size = 100
+        # compiled validator of each key: {key: (valid values, rules, validate)}, see _validator
+        self._validators = {}
+        self._validation_rules = {}
 
         if isinstance(name, str):
             self._init_single_parameter(name, value, valid_values, info, visible, units,
@@ -189,19 +284,8 @@ class Parameter(dict):
             key: Dictionary key
             value: Dictionary value
         """
-        # Use enhanced validation if available
-        if hasattr(self, '_validation_rules') and key in self._validation_rules:
-            self._validate_value(key, value, self.valid_values.get(key, type(value)))
-        elif key in self.valid_values:
-            message = f"{value} (of type {type(value)}) is not valid for {key}"
-            assert self.is_valid(value, self.valid_values[key]), message
-
-        # Handle nested Parameter objects
-        if isinstance(value, dict) and key in self and isinstance(self[key], Parameter):
-            # Update nested Parameter object
-            self[key].update(value)
-        else:
-            super().__setitem__(key, value)
+        self._check(key, value)
+        self._store(key, value)
 
     def update(self, *args):
         """
@@ -211,6 +295,115 @@ class Parameter(dict):
             for (key, value) in d.items():
                 self.__setitem__(key, value)
 
+    def update_validated(self, values):
+        """
+        Bulk update for settings that are set many times, e.g. by sweeps and device updates.
+        All values are validated before the first one is assigned, so an invalid value leaves the
+        Parameter unchanged, and nested values are not validated a second time when they are assigned.
+
+        Args:
+            values: dictionary of values, nested dictionaries update nested Parameters
+
+        Raises:
+            AssertionError or ValidationError: like assigning the invalid value with __setitem__
+        """
+        for key, value in values.items():
+            self._check(key, value)
+        for key, value in values.items():
+            self._store(key, value)
+
+    def _validator(self, key):
+        """
+        Returns the compiled validator of key, a function that raises if a value is not valid for key,
+        None if values of key are not validated. Validators are compiled on first use and again when the
+        valid values or the validation rules of key are replaced.
+        """
+        valid_values = self._valid_values.get(key, _NOT_VALIDATED)
+        rules = self._validation_rules.get(key)
+        entry = self._validators.get(key)
+        if entry is None or entry[0] is not valid_values or entry[1] is not rules:
+            if entry is not None:
+                # cached results of the old rules are not valid anymore
+                for cache_key in [cache_key for cache_key in self._validation_cache if cache_key[0] == key]:
+                    del self._validation_cache[cache_key]
+            entry = self._validators[key] = (valid_values, rules, self._compile_validator(key, valid_values, rules))
+        return entry[2]
+
+    def _compile_validator(self, key, valid_values, rules):
+        if rules is not None:
+            if valid_values is _NOT_VALIDATED:
+                # like _validate_value with the type of the value as valid values, i.e. only the rules count
+                type_check = None
+            else:
+                type_check = _compile_type_check(valid_values)
+
+            def validate(value):
+                try:
+                    cache_key = (key, type(value), value)
+                    if self._validation_cache.get(cache_key):
+                        return
+                except TypeError:
+                    cache_key = None  # unhashable values, e.g. arrays, are not cached
+                error_messages = _rule_errors(rules, value)
+                if type_check is not None and not type_check(value):
+                    error_messages.append(f"Value {value} (of type {type(value)}) is not valid for {key}")
+                if error_messages:
+                    raise ValidationError(f"Validation failed for {key}: {'; '.join(error_messages)}")
+                if cache_key is not None:
+                    if len(self._validation_cache) >= self._cache_max_size:
+                        del self._validation_cache[next(iter(self._validation_cache))]
+                    self._validation_cache[cache_key] = True
+            return validate
+
+        if valid_values is _NOT_VALIDATED:
+            return None
+
+        type_check = _compile_type_check(valid_values)
+
+        def validate(value):
+            if not type_check(value):
+                raise AssertionError(f"{value} (of type {type(value)}) is not valid for {key}")
+        return validate
+
+    def _check(self, key, value):
+        """raises if value can not be assigned to key, including the values of nested Parameters"""
+        validate = self._validator(key)
+        if validate is not None:
+            validate(value)
+        if isinstance(value, dict):
+            current = dict.get(self, key)
+            if isinstance(current, Parameter):
+                if validate is not None and self._valid_values.get(key) is current._valid_values:
+                    # the nested types were checked by validate, only the rules of the nested Parameter remain
+                    current._check_rules(value)
+                else:
+                    for nested_key, nested_value in value.items():
+                        current._check(nested_key, nested_value)
+
+    def _check_rules(self, values):
+        for key, value in values.items():
+            if key in self._validation_rules:
+                self._validator(key)(value)
+            if isinstance(value, dict):
+                current = dict.get(self, key)
+                if isinstance(current, Parameter):
+                    current._check_rules(value)
+
+    def _store(self, key, value):
+        """assigns a value that passed _check, dictionaries update nested Parameters"""
+        current = dict.get(self, key)
+        if isinstance(value, dict) and isinstance(current, Parameter):
+            for nested_key, nested_value in value.items():
+                current._store(nested_key, nested_value)
+        else:
+            dict.__setitem__(self, key, value)
+
+    def __reduce__(self):
+        # copy and pickle the metadata without the compiled validators, the values are restored without validation
+        state = {attribute: getattr(self, attribute) for attribute in self.__slots__
+                 if attribute != '_validators' and hasattr(self, attribute)}
+        return (_rebuild_parameter, (state, dict(self)))
+
     @property
     def visible(self):
         """
@@ -325,30 +518,24 @@ class Parameter(dict):
         if key is None or not self.is_pint_quantity(key):
             return self[key]
         
-        # Check cache first
+        # Check cache first, the cached result is only used while the value has not been replaced
+        value = self[key]
         cache_key = f"{key}_{target_units}"
-        if cache_key in self._conversion_cache:
-            return self._conversion_cache[cache_key]
-            
-        from src import ur
-        
-        # Convert string to pint unit if needed
-        if isinstance(target_units, str):
-            try:
-                target_units = getattr(ur, target_units)
-            except AttributeError:
-                raise ValueError(f"Unknown unit: {target_units}")
-        
-        # Perform conversion
-        result = self[key].to(target_units)
+        cached = self._conversion_cache.get(cache_key)
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        # the conversion factor is cached by the unit converter, pint only parses the units once
+        from src.core.unit_utils import get_unit_converter
+        result = get_unit_converter().to(value, target_units)
         
         # Cache result
-        if len(self._conversion_cache) >= self._cache_max_size:
+        if len(self._conversion_cache) >= self._cache_max_size and cache_key not in self._conversion_cache:
             # Remove oldest entry (simple LRU)
             oldest_key = next(iter(self._conversion_cache))
             del self._conversion_cache[oldest_key]
         
-        self._conversion_cache[cache_key] = result
+        self._conversion_cache[cache_key] = (value, result)
         return result
     
     def set_value_with_units(self, value, units=None, key=None):
@@ -515,65 +702,17 @@ class Parameter(dict):
         Raises:
             ValidationError: If validation fails
         """
-        # Check cache first
-        cache_key = f"{key}_{value}_{type(value)}"
-        if cache_key in self._validation_cache:
-            if not self._validation_cache[cache_key]:
-                raise ValidationError(f"Value {value} failed cached validation for {key}")
-            return
-        
-        # Perform validation
-        is_valid = True
-        error_messages = []
-        
-        # Get validation rules for this key
-        rules = getattr(self, '_validation_rules', {}).get(key, {})
-        
-        # Range validation
-        if 'range' in rules:
-            range_rule = rules['range']
-            if range_rule.get('min') is not None and value < range_rule['min']:
-                is_valid = False
-                error_messages.append(f"Value {value} is below minimum {range_rule['min']}")
-            if range_rule.get('max') is not None and value > range_rule['max']:
-                is_valid = False
-                error_messages.append(f"Value {value} is above maximum {range_rule['max']}")
-        
-        # Pattern validation
-        if 'pattern' in rules and isinstance(value, str):
-            import re
-            if not re.match(rules['pattern'], value):
-                is_valid = False
-                error_messages.append(f"Value '{value}' does not match pattern '{rules['pattern']}'")
-        
-        # Custom validation
-        if 'custom' in rules:
-            validator = rules['custom']
-            if not validator(value):
-                is_valid = False
-                error_messages.append(f"Value {value} failed custom validation")
-        
-        # Existing type validation
+        error_messages = _rule_errors(self._validation_rules.get(key, {}), value)
         if not self.is_valid(value, valid_values):
-            is_valid = False
             error_messages.append(f"Value {value} (of type {type(value)}) is not valid for {key}")
-        
-        # Cache result
-        if len(self._validation_cache) >= self._cache_max_size:
-            # Remove oldest entry (simple LRU)
-            oldest_key = next(iter(self._validation_cache))
-            del self._validation_cache[oldest_key]
-        
-        self._validation_cache[cache_key] = is_valid
-        
-        # Raise error if validation failed
-        if not is_valid:
+        if error_messages:
             raise ValidationError(f"Validation failed for {key}: {'; '.join(error_messages)}")
     
     def clear_cache(self):
         """Clear all caches."""
         self._conversion_cache.clear()
         self._validation_cache.clear()
+        self._validators.clear()
     
     def get_cache_stats(self):
         """Get cache statistics for monitoring."""
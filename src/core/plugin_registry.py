@@ -0,0 +1,356 @@
+"""
+Lazy Plugin Registry
+
+Lists the device and experiment classes of the project without importing their modules. The python
+files in the plugin folders (src/Controller for devices, src/Model/experiments for experiments) are
+parsed with the ast module, which finds the class names, base classes, docstrings, whether a class
+defines _DEFAULT_SETTINGS and the keys of its _DEVICES / _EXPERIMENTS dictionaries. Importing the
+drivers is slow (ctypes DLL loaders, large drivers such as Proteus) and can fail on computers
+without the hardware libraries, so a module is only imported when one of its classes is loaded.
+
+The result of the scan is cached in a JSON manifest. A file is parsed again only when its size or
+modification time changed and its content hash differs from the cached one.
+
+Usage:
+    from src.core.plugin_registry import get_plugin_registry
+
+    registry = get_plugin_registry()
+    registry.entries('device')                    # {class name: entry} without importing anything
+    sg384_class = registry.load_class('SG384Generator')
+    device = registry.create('SG384Generator', name='sg384')
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import ast
+import hashlib
+import json
+import os
+import sys
+import threading
+from importlib import import_module
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.core.helper_functions import module_name_from_path
+
+MANIFEST_VERSION = 1
+KINDS = ('device', 'experiment')
+# classes that make a class a device or an experiment, subclasses of scanned classes are found transitively
+ROOT_CLASSES = {'device': {'Device'}, 'experiment': {'Experiment', 'ExperimentIterator'}}
+
+SRC_FOLDER = Path(__file__).resolve().parent.parent
+DEFAULT_FOLDERS = {'device': [SRC_FOLDER / 'Controller'], 'experiment': [SRC_FOLDER / 'Model' / 'experiments']}
+DEFAULT_MANIFEST = SRC_FOLDER / '__pycache__' / 'plugin_manifest.json'
+
+
+def _base_name(node) -> str:
+    """returns the last part of a base class expression, e.g. Device for src.core.Device"""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript):
+        return _base_name(node.value)
+    return ''
+
+
+def _literal_keys(node) -> Optional[List[str]]:
+    """returns the string keys of a dictionary literal, None if the value is not a dictionary literal"""
+    if not isinstance(node, ast.Dict):
+        return None
+    return [key.value for key in node.keys if isinstance(key, ast.Constant) and isinstance(key.value, str)]
+
+
+def scan_file(filepath) -> List[Dict]:
+    """
+    Parses a python file and returns a description of each top level class.
+
+    Returns:
+        list of dictionaries with the keys class, bases, info, lineno, has_default_settings,
+        device_keys, experiment_keys (None if they are not a dictionary literal)
+    """
+    with open(filepath, 'rb') as infile:
+        tree = ast.parse(infile.read(), filename=str(filepath))
+
+    classes = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        entry = {
+            'class': node.name,
+            'bases': [_base_name(base) for base in node.bases],
+            'info': ast.get_docstring(node),
+            'lineno': node.lineno,
+            'has_default_settings': False,
+            'device_keys': None,
+            'experiment_keys': None
+        }
+        for statement in node.body:
+            if isinstance(statement, ast.Assign):
+                targets = [target.id for target in statement.targets if isinstance(target, ast.Name)]
+                value = statement.value
+            elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+                targets, value = [statement.target.id], statement.value
+            else:
+                continue
+            if '_DEFAULT_SETTINGS' in targets:
+                entry['has_default_settings'] = True
+            if '_DEVICES' in targets:
+                entry['device_keys'] = _literal_keys(value)
+            if '_EXPERIMENTS' in targets:
+                entry['experiment_keys'] = _literal_keys(value)
+        classes.append(entry)
+    return classes
+
+
+def _file_hash(filepath) -> str:
+    with open(filepath, 'rb') as infile:
+        return hashlib.sha1(infile.read()).hexdigest()
+
+
+def _is_inside(filepath, folder: Path) -> bool:
+    try:
+        Path(filepath).relative_to(folder)
+        return True
+    except ValueError:
+        return False
+
+
+def _python_files(folder: Path) -> Iterable[Path]:
+    """python files in folder and its subfolders, skipping the same files as find_exportable_in_python_files"""
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d != '__pycache__')
+        for filename in sorted(files):
+            if filename.endswith('.py') and '__init__' not in filename and 'setup' not in filename:
+                yield Path(root) / filename
+
+
+class PluginRegistry:
+    """
+    Manifest of the device and experiment classes in a set of folders.
+
+    Args:
+        folders: {'device': [folders], 'experiment': [folders]} that contain the plugins
+        manifest: JSON file used as cache, None to scan every time
+    """
+
+    def __init__(self, folders: Optional[Dict[str, List]] = None, manifest=DEFAULT_MANIFEST):
+        folders = folders if folders is not None else DEFAULT_FOLDERS
+        self.folders = {kind: [Path(folder).resolve() for folder in folders.get(kind, [])] for kind in KINDS}
+        self.manifest = Path(manifest) if manifest is not None else None
+        self._files = {}  # filepath: {'mtime', 'size', 'hash', 'classes'}
+        self._entries = None
+        self._lock = threading.RLock()
+        self.num_scanned = 0  # files parsed by the last refresh, the others came from the manifest
+        self._refreshed = False
+        self._load_manifest()
+
+    def add_folder(self, kind: str, folder):
+        """
+        Adds a folder with plugins of kind ('device' or 'experiment'), it is scanned by the next lookup.
+        """
+        assert kind in KINDS, kind
+        folder = Path(folder).resolve()
+        with self._lock:
+            if folder not in self.folders[kind]:
+                self.folders[kind].append(folder)
+                self._entries = None
+                self._refreshed = False
+
+    def _load_manifest(self):
+        if self.manifest is None or not self.manifest.exists():
+            return
+        try:
+            with open(self.manifest, 'r') as infile:
+                content = json.load(infile)
+            if content.get('version') == MANIFEST_VERSION:
+                self._files = content['files']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: could not read plugin manifest {self.manifest}: {e}")
+
+    def _save_manifest(self):
+        if self.manifest is None:
+            return
+        try:
+            self.manifest.parent.mkdir(parents=True, exist_ok=True)
+            tmp_name = str(self.manifest) + '.tmp'
+            with open(tmp_name, 'w') as outfile:
+                json.dump({'version': MANIFEST_VERSION, 'files': self._files}, outfile)
+            os.replace(tmp_name, self.manifest)
+        except OSError as e:
+            print(f"Warning: could not write plugin manifest {self.manifest}: {e}")
+
+    def refresh(self):
+        """
+        Scans the files that are new or changed since the manifest was written and updates the manifest.
+        """
+        with self._lock:
+            files = {}
+            changed = False
+            self.num_scanned = 0
+            for folder in {folder for kind_folders in self.folders.values() for folder in kind_folders}:
+                for filepath in _python_files(folder):
+                    key = str(filepath)
+                    stat = filepath.stat()
+                    cached = self._files.get(key)
+                    if cached is not None and cached['mtime'] == stat.st_mtime and cached['size'] == stat.st_size:
+                        files[key] = cached
+                        continue
+
+                    file_hash = _file_hash(filepath)
+                    if cached is not None and cached['hash'] == file_hash:
+                        # touched but not modified
+                        files[key] = dict(cached, mtime=stat.st_mtime, size=stat.st_size)
+                        changed = True
+                        continue
+
+                    try:
+                        classes = scan_file(filepath)
+                    except (SyntaxError, ValueError) as e:
+                        print(f"Warning: could not parse {filepath}: {e}")
+                        classes = []
+                    self.num_scanned += 1
+                    files[key] = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': file_hash, 'classes': classes}
+                    changed = True
+
+            changed = changed or set(files) != set(self._files)
+            self._files = files
+            self._entries = None
+            self._refreshed = True
+            if changed:
+                self._save_manifest()
+
+    def _resolve(self) -> Dict[str, Dict[str, Dict]]:
+        """assigns each class to a kind by following the base classes"""
+        if not self._refreshed:
+            self.refresh()
+
+        classes = {}
+        for filepath, file_info in self._files.items():
+            for entry in file_info['classes']:
+                # the first definition wins, like the first match of find_exportable_in_python_files
+                classes.setdefault(entry['class'], dict(entry, filepath=filepath))
+
+        entries = {kind: {} for kind in KINDS}
+        for kind in KINDS:
+            folders = self.folders[kind]
+            members = set(ROOT_CLASSES[kind])
+            # transitive closure over the base classes known from the scan
+            while True:
+                new = {name for name, entry in classes.items()
+                       if name not in members and members.intersection(entry['bases'])}
+                if not new:
+                    break
+                members |= new
+            for name in members - ROOT_CLASSES[kind]:
+                entry = classes[name]
+                if any(_is_inside(entry['filepath'], folder) for folder in folders):
+                    entries[kind][name] = entry
+        return entries
+
+    def entries(self, kind: str) -> Dict[str, Dict]:
+        """
+        Returns {class name: entry} of all classes of kind ('device' or 'experiment') without importing them.
+        An entry has the keys class, filepath, bases, info, lineno, has_default_settings, device_keys and
+        experiment_keys.
+        """
+        assert kind in KINDS, kind
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._resolve()
+            return dict(self._entries[kind])
+
+    def find(self, class_name: str, kind: Optional[str] = None) -> Optional[Dict]:
+        """
+        Returns the entry of a class, None if it is not in the registry.
+        """
+        for registry_kind in (KINDS if kind is None else (kind,)):
+            entry = self.entries(registry_kind).get(class_name)
+            if entry is not None:
+                return entry
+        return None
+
+    def export_dict(self, kind: str, folder=None) -> Dict[str, Dict]:
+        """
+        Returns the classes of kind in the format of src.tools.export_default.find_exportable_in_python_files,
+        optionally only those in folder.
+        """
+        folder = Path(folder).resolve() if folder is not None else None
+        return {name: {'class': name, 'filepath': entry['filepath'], 'info': entry['info'], 'devices': {},
+                       'experiments': {}}
+                for name, entry in self.entries(kind).items()
+                if folder is None or _is_inside(entry['filepath'], folder)}
+
+    def load_class(self, class_name: str, kind: Optional[str] = None):
+        """
+        Imports the module of a class and returns the class.
+        """
+        entry = self.find(class_name, kind)
+        if entry is None:
+            raise ImportError('{:s} is not in the plugin registry'.format(class_name))
+        module_name, path = module_name_from_path(entry['filepath'])
+        if path is not None and path not in sys.path:
+            sys.path.append(path)
+        return getattr(import_module(module_name), class_name)
+
+    def create(self, class_name: str, kind: Optional[str] = None, **kwargs):
+        """
+        Imports the class and returns an instance created with kwargs.
+        """
+        return self.load_class(class_name, kind)(**kwargs)
+
+
+_plugin_registry = None
+_plugin_registry_lock = threading.Lock()
+
+
+def get_plugin_registry() -> PluginRegistry:
+    """
+    Returns the registry of the project's devices and experiments, refreshed once per session.
+    """
+    global _plugin_registry
+    with _plugin_registry_lock:
+        if _plugin_registry is None:
+            _plugin_registry = PluginRegistry()
+            _plugin_registry.refresh()
+        return _plugin_registry
+
+
+def lazy_attributes(package_name: str, attributes: Dict[str, str], fallbacks: Optional[Dict[str, Any]] = None):
+    """
+    Returns the module level __getattr__ and __dir__ functions (PEP 562) for a package that exports classes
+    of its submodules without importing them, the submodule is imported the first time the class is used.
+
+    Args:
+        package_name: __name__ of the package
+        attributes: {exported name: module that defines it}, relative module names are resolved in the package
+        fallbacks: {exported name: value} used instead if importing the module raises an ImportError,
+                   e.g. a mock device for a driver whose hardware library is not installed
+
+    Usage, in the __init__.py of the package:
+        __getattr__, __dir__ = lazy_attributes(__name__, {'ODMRSteppedExperiment': '.odmr_stepped'})
+    """
+    package_globals = sys.modules[package_name].__dict__
+    fallbacks = fallbacks or {}
+
+    def __getattr__(name):
+        module_name = attributes.get(name)
+        if module_name is None:
+            raise AttributeError('module {:s} has no attribute {:s}'.format(package_name, name))
+        try:
+            value = getattr(import_module(module_name, package_name), name)
+        except ImportError:
+            if name not in fallbacks:
+                raise
+            value = fallbacks[name]
+        # later lookups find the class directly and skip __getattr__
+        package_globals[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(package_globals) | set(attributes))
+
+    return __getattr__, __dir__
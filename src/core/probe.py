@@ -15,18 +15,49 @@
 
 from src.core.device import Device
 #from src.Controller import ExampleDevice
-from collections import deque
+from src.core.probe_history import ProbeHistory
 from src.core.read_write_functions import save_aqs_file
 
 
+def probe_options(probes):
+    """
+    returns the probes of one device in a probe dictionary as {probe_name: options}
+
+    Args:
+        probes: comma separated probe names 'probe1,probe2' or {probe_name: options}, where options holds the
+            optional keyword arguments of Probe, e.g. {'refresh_interval': 0.5}
+    """
+    if isinstance(probes, dict):
+        return {probe_name: dict(options or {}) for probe_name, options in probes.items()}
+    return {probe_name: {} for probe_name in probes.split(',') if probe_name}
+
+
+def probes_to_dict(probes):
+    """
+    returns the probe dictionary that load_and_append reads for {device_name: {probe_name: probe_instance}}: the
+    probes of a device as comma separated names, or as {probe_name: options} if one of them has a refresh interval
+    """
+    dictator = {}
+    for device_name, device_probes in probes.items():
+        if all(probe.refresh_interval is None for probe in device_probes.values()):
+            dictator[device_name] = ','.join(device_probes.keys())
+        else:
+            dictator[device_name] = {probe_name: {} if probe.refresh_interval is None
+                                     else {'refresh_interval': probe.refresh_interval}
+                                     for probe_name, probe in device_probes.items()}
+    return dictator
+
+
 class Probe(object):
 
-    def __init__(self, device, probe_name, name=None, info=None, buffer_length=100):
+    def __init__(self, device, probe_name, name=None, info=None, buffer_length=100, refresh_interval=None):
         """
         creates a probe...
         Args:
             name (optinal):  name of probe, if not provided take name of function
             settings (optinal): a Parameter object that contains all the information needed in the script
+            buffer_length (optional): number of readings kept in the history (buffer) of the probe
+            refresh_interval (optional): time in s between reads by ReadProbes, if not provided the interval of ReadProbes
         """
 
         assert isinstance(device, Device)
@@ -45,8 +76,9 @@ class Probe(object):
         self.info = info
         self.device = device
         self.probe_name = probe_name
+        self.refresh_interval = refresh_interval
 
-        self.buffer = deque(maxlen=buffer_length)
+        self.buffer = ProbeHistory(buffer_length)
 
     @property
     def value(self):
@@ -54,11 +86,35 @@ class Probe(object):
         reads the value from the device
         """
 
-        value = getattr(self.device, self.probe_name)
+        value = self.device.read_probes_many([self.probe_name])[self.probe_name]
         self.buffer.append(value)
 
         return value
 
+    @staticmethod
+    def read_values(probes):
+        """
+        reads the values of several probes with one read_probes_many call per device
+
+        Args:
+            probes: dictionary {name: probe instance}
+
+        Returns: dictionary {name: value}
+        """
+        by_device = {}
+        for name, probe in probes.items():
+            by_device.setdefault(id(probe.device), []).append((name, probe))
+
+        values = {}
+        for device_probes in by_device.values():
+            device = device_probes[0][1].device
+            device_values = device.read_probes_many(list({probe.probe_name: None for _, probe in device_probes}))
+            for name, probe in device_probes:
+                value = device_values[probe.probe_name]
+                probe.buffer.append(value)
+                values[name] = value
+        return {name: values[name] for name in probes}
+
     def __str__(self):
         output_string = '{:s} (class type: {:s})\n'.format(self.name, self.__class__.__name__)
         return output_string
@@ -72,9 +128,12 @@ class Probe(object):
         assert isinstance(value, str)
         self._name = value
 
-    def plot(self, axes):
-        axes.plot(self.buffer)
-        axes.hold(False)
+    def plot(self, axes, max_points=1000):
+        """
+        plots a min/max decimated view of the probe history with at most max_points points
+        """
+        self.buffer.plot(axes, max_points)
+        axes.set_ylabel(self.name)
 
     def to_dict(self):
         """
@@ -84,7 +143,10 @@ class Probe(object):
         """
 
         # dictator = {self.name: {'probe_name': self.probe_name, 'device_name': self.device.name}}
-        dictator = {self.device.name: self.probe_name}
+        if self.refresh_interval is None:
+            dictator = {self.device.name: self.probe_name}
+        else:
+            dictator = {self.device.name: {self.probe_name: {'refresh_interval': self.refresh_interval}}}
 
         return dictator
 
@@ -113,6 +175,12 @@ class Probe(object):
 
             where probe1_of_device1 is a valid name of a probe in device of class device1_name
 
+            or, for probes with their own read interval,
+
+                probe_dict = {
+                    device1_name : {probe1_of_device1: {'refresh_interval': 0.5}, probe2_of_device1: {}, ...}
+                }
+
             # optional arguments (as key value pairs):
             #     probe_name
             #     device_name
@@ -176,12 +244,13 @@ class Probe(object):
             if not device_name in updated_probes:
                 updated_probes.update({device_name: {}})
 
-            for probe_name in probe_names.split(','):
+            for probe_name, options in probe_options(probe_names).items():
                 if probe_name in updated_probes[device_name]:
                     loaded_failed[probe_name] = ValueError(
                         'failed to load probe {:s} already exists. Did not load!'.format(probe_name))
                 else:
-                    probe_instance = Probe(updated_devices[device_name], probe_name)
+                    probe_instance = Probe(updated_devices[device_name], probe_name,
+                                           refresh_interval=options.get('refresh_interval'))
                     updated_probes[device_name].update({probe_name: probe_instance})
 
         return updated_probes, loaded_failed, updated_devices
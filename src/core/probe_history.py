@@ -0,0 +1,270 @@
+"""
+Probe History and Probe Logging
+
+ProbeHistory keeps the most recent readings of a probe in a preallocated, timestamped NumPy ring
+buffer. Appending a reading is a constant time array assignment, and plots ask for a min/max
+decimated view with a bounded number of points, so long temperature, laser power or count rate
+histories can be displayed at every refresh without copying or drawing the whole history.
+
+ProbeLogger writes probe readings to an HDF5 file (see src.core.hdf5_store) on a background
+thread. The GUI thread only puts the readings on a queue, the file is written and flushed by the
+logger thread, and the file can be followed live with load_store().
+
+Example:
+    history = ProbeHistory(capacity=10000)
+    history.append(4.2)
+    times, values = history.decimated(max_points=1000)
+
+    logger = ProbeLogger('probes.h5', ['sg384/power', 'adwin/count_rate'])
+    logger.log({'sg384': {'power': -10.0}, 'adwin': {'count_rate': 1e4}})
+    logger.close()
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.hdf5_store import HDF5DataStore
+
+
+def _as_float(value) -> float:
+    """probe readings that are not numbers (strings, None, arrays) are stored as NaN"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class ProbeHistory:
+    """
+    Fixed size ring buffer of timestamped probe readings.
+
+    Iterating over the history or indexing it returns the readings in the order they were appended,
+    like the deque it replaces. Readings that can not be converted to float are stored as NaN.
+
+    Args:
+        capacity: maximum number of readings, the oldest reading is overwritten when the buffer is full
+    """
+
+    def __init__(self, capacity: int = 100):
+        assert capacity >= 1
+        self.capacity = int(capacity)
+        self._times = np.full(self.capacity, np.nan)
+        self._values = np.full(self.capacity, np.nan)
+        self._next = 0  # index the next reading is written to
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def maxlen(self) -> int:
+        return self.capacity
+
+    def append(self, value, timestamp: Optional[float] = None):
+        """
+        Adds a reading.
+
+        Args:
+            value: probe reading
+            timestamp: time of the reading in seconds since the epoch, defaults to now
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._times[self._next] = timestamp
+            self._values[self._next] = _as_float(value)
+            self._next = (self._next + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+    def clear(self):
+        with self._lock:
+            self._next = 0
+            self._count = 0
+
+    def _ordered(self, array: np.ndarray) -> np.ndarray:
+        # the oldest reading is at _next once the buffer is full
+        if self._count < self.capacity:
+            return array[:self._count].copy()
+        return np.concatenate((array[self._next:], array[:self._next]))
+
+    def data(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns copies of the times and values of all readings, oldest first.
+        """
+        with self._lock:
+            return self._ordered(self._times), self._ordered(self._values)
+
+    @property
+    def times(self) -> np.ndarray:
+        return self.data()[0]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.data()[1]
+
+    @property
+    def latest(self) -> Optional[float]:
+        with self._lock:
+            if self._count == 0:
+                return None
+            return float(self._values[self._next - 1])
+
+    def decimated(self, max_points: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns a view of the history with at most max_points points for plotting.
+
+        The readings are split into max_points // 2 bins and the minimum and maximum of each bin are
+        kept in the order they occurred, so spikes and the envelope of the signal stay visible.
+
+        Args:
+            max_points: maximum number of points returned
+
+        Returns:
+            times, values
+        """
+        assert max_points >= 2
+        times, values = self.data()
+        if len(values) <= max_points:
+            return times, values
+
+        # ceil so that no more than max_points // 2 bins are needed, the last bin is padded with NaN
+        bin_size = -(-len(values) // (max_points // 2))
+        num_bins = -(-len(values) // bin_size)
+        binned = np.full(num_bins * bin_size, np.nan)
+        binned[:len(values)] = values
+        binned = binned.reshape(num_bins, bin_size)
+        edges = np.arange(num_bins) * bin_size
+        index_min = np.argmin(np.where(np.isnan(binned), np.inf, binned), axis=1) + edges
+        index_max = np.argmax(np.where(np.isnan(binned), -np.inf, binned), axis=1) + edges
+        index_min = np.minimum(index_min, len(values) - 1)
+        index_max = np.minimum(index_max, len(values) - 1)
+
+        index = np.sort(np.stack((index_min, index_max), axis=1), axis=1).ravel()
+        return times[index], values[index]
+
+    def plot(self, axes, max_points: int = 1000):
+        """
+        Plots the decimated history against the time in seconds relative to the latest reading.
+        """
+        times, values = self.decimated(max_points)
+        axes.clear()
+        if len(times) > 0:
+            axes.plot(times - times[-1], values)
+        axes.set_xlabel('time (s)')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self):
+        return iter(self.values.tolist())
+
+    def __getitem__(self, item):
+        return self.values[item]
+
+    def __repr__(self):
+        return '{:s}({:d}/{:d})'.format(self.__class__.__name__, self._count, self.capacity)
+
+
+class ProbeLogger:
+    """
+    Logs probe readings to an HDF5 file on a background thread.
+
+    The file has a dataset 'time' with the time of each row in seconds since the epoch and one dataset
+    '<device>/<probe>' per probe. Rows are written every flush_every readings and at the latest every
+    flush_interval seconds, so a crash loses at most the readings of that interval.
+
+    Args:
+        filename: path of the .h5 file, an existing file is overwritten
+        names: probe dataset names '<device>/<probe>', fixed for the lifetime of the file
+        flush_every: number of rows buffered before they are written
+        flush_interval: maximum time in s between flushes
+        max_pending: maximum number of readings waiting for the writer, further readings are dropped
+    """
+
+    _STOP = object()
+
+    def __init__(self, filename, names: List[str], flush_every: int = 100, flush_interval: float = 5.0,
+                 max_pending: int = 10000):
+        self.filename = str(filename)
+        self.names = list(names)
+        self.flush_interval = flush_interval
+        self.num_dropped = 0
+        self.error = None
+
+        self._store = HDF5DataStore(self.filename, flush_every=flush_every)
+        self._store.declare('time')
+        for name in self.names:
+            self._store.declare(name)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='probe_logger', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def names_from_values(probes_values: Dict[str, Dict]) -> List[str]:
+        """
+        Returns the dataset names for the nested {device: {probe: value}} dictionary of ReadProbes.
+        """
+        return ['{:s}/{:s}'.format(device, probe) for device, values in probes_values.items() for probe in values]
+
+    def log(self, probes_values: Dict[str, Dict], timestamp: Optional[float] = None):
+        """
+        Queues a set of readings for writing, returns immediately.
+
+        Args:
+            probes_values: {device: {probe: value}}, probes that are missing are logged as NaN
+            timestamp: time of the readings in seconds since the epoch, defaults to now
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        row = [_as_float(probes_values.get(device, {}).get(probe))
+               for device, probe in (name.split('/', 1) for name in self.names)]
+        try:
+            self._queue.put_nowait((timestamp, row))
+        except queue.Full:
+            self.num_dropped += 1
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                break
+            try:
+                if item is not None:
+                    timestamp, row = item
+                    self._store.append('time', timestamp)
+                    for name, value in zip(self.names, row):
+                        self._store.append(name, value)
+                if time.monotonic() - last_flush >= self.flush_interval:
+                    self._store.flush()
+                    last_flush = time.monotonic()
+            except Exception as e:
+                self.error = e
+                print(f"Warning: probe logger stopped writing {self.filename}: {e}")
+                break
+        try:
+            self._store.close()
+        except Exception as e:
+            print(f"Warning: could not close probe log {self.filename}: {e}")
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread.is_alive()
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Writes the queued readings and closes the file.
+        """
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
@@ -14,12 +14,26 @@
 # Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 
 
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 from PyQt5.QtCore import pyqtSignal, QThread
 from src.core import Device,Probe
-from src.Controller import ExampleDevice
+from src.core.device_arbiter import PROBE, device_priority
 
 
 class ReadProbes(QThread):
+    """
+    Reads the probes in the background. The devices are read in parallel on a small thread pool, one read
+    per device at a time, so a slow instrument does not delay the others. Every probe is read with its own
+    period (Probe.refresh_interval, refresh_interval of the thread if not set). A device whose read takes
+    longer than device_timeout is reported and skipped until the read returns, its last values are kept.
+    The reads run at PROBE priority (src.core.device_arbiter), so they wait while an experiment uses the
+    device instead of competing with it, and probe polling can keep running during experiments.
+
+    The values are collected in probes_values and updateProgress is emitted at most every
+    min_update_interval seconds when new values arrived, so the GUI updates the probe tree in batches.
+    """
     # This is the signal that will be emitted during the processing.
     # By including int as an argument, it lets the signal know to expect
     # an integer argument when emitting.
@@ -27,20 +41,30 @@ class ReadProbes(QThread):
 
     _DEFAULT_SETTINGS = None
 
+    MAX_WORKERS = 8
+    POLL_INTERVAL = 0.1  # s, longest time without checking for the stop flag
+
     updateProgress = pyqtSignal(int)
 
-    def __init__(self, probes, refresh_interval=2.0):
+    def __init__(self, probes, refresh_interval=2.0, device_timeout=10.0, min_update_interval=0.2):
         """
         probes: dictionary of probes where keys are device names and values are dictonaries where key is probe name and value is Probe objects
-        refresh_interval: time between reads in s
+        refresh_interval: time between reads in s of the probes without their own refresh_interval
+        device_timeout: time in s after which a read of a device counts as hung
+        min_update_interval: shortest time in s between two updateProgress signals
         """
         assert isinstance(probes, dict)
         assert isinstance(refresh_interval, float)
 
         self.refresh_interval = refresh_interval
+        self.device_timeout = device_timeout
+        self.min_update_interval = min_update_interval
         self._running = False
         self.probes = probes
-        self.probes_values = None
+        # placeholders until the first values arrive, so the GUI can build the probe tree right away
+        self.probes_values = {device_name: {probe_name: None for probe_name in probe}
+                              for device_name, probe in probes.items()}
+        self.timed_out_devices = set()
         self._stop = False
 
         QThread.__init__(self)
@@ -51,20 +75,75 @@ class ReadProbes(QThread):
         """
         if self.probes is None:
             self._stop = True
-        while True:
-
-            if self._stop:
-                break
-
-            self.probes_values = {
-                device_name:
-                    {probe_name: probe_instance.value for probe_name, probe_instance in probe.items()}
-                for device_name, probe in self.probes.items()
-            }
-
-            self.updateProgress.emit(1)
-
-            self.msleep(int(1e3 * self.refresh_interval))
+        if self._stop or not self.probes:
+            return
+
+        probes = {device_name: dict(probe) for device_name, probe in self.probes.items()}
+        values = {device_name: dict(self.probes_values.get(device_name, {})) for device_name in probes}
+        next_read = {(device_name, probe_name): 0. for device_name, probe in probes.items() for probe_name in probe}
+        pending = {}  # device name: (future, start time)
+        changed = False
+        last_update = 0.
+
+        executor = ThreadPoolExecutor(max_workers=min(len(probes), self.MAX_WORKERS))
+        try:
+            while not self._stop:
+                now = time.monotonic()
+
+                for device_name, (future, start_time) in list(pending.items()):
+                    if future.done():
+                        del pending[device_name]
+                        self.timed_out_devices.discard(device_name)
+                        try:
+                            values[device_name].update(future.result())
+                            changed = True
+                        except Exception as e:
+                            print(f"Warning: reading the probes of {device_name} failed: {e}")
+                    elif now - start_time > self.device_timeout and device_name not in self.timed_out_devices:
+                        self.timed_out_devices.add(device_name)
+                        print(f"Warning: reading the probes of {device_name} takes longer than "
+                              f"{self.device_timeout} s, the other probes are read in the meantime")
+
+                for device_name, probe in probes.items():
+                    if device_name in pending:
+                        continue
+                    due = {probe_name: probe_instance for probe_name, probe_instance in probe.items()
+                           if next_read[(device_name, probe_name)] <= now}
+                    if due:
+                        for probe_name, probe_instance in due.items():
+                            next_read[(device_name, probe_name)] = now + self._probe_interval(probe_instance)
+                        pending[device_name] = (executor.submit(self._read_values, due), now)
+
+                if changed and now - last_update >= self.min_update_interval:
+                    self.probes_values = {device_name: dict(probe_values) for device_name, probe_values in values.items()}
+                    self.updateProgress.emit(1)
+                    changed = False
+                    last_update = now
+
+                # wait until a read finishes, the next probe is due or the next batch can be sent to the GUI
+                idle_devices = [device_name for device_name in probes if device_name not in pending]
+                next_due = min([next_read[(device_name, probe_name)] for device_name in idle_devices
+                                for probe_name in probes[device_name]], default=now + self.POLL_INTERVAL)
+                if changed:
+                    next_due = min(next_due, last_update + self.min_update_interval)
+                timeout = min(max(next_due - time.monotonic(), 0.), self.POLL_INTERVAL)
+                running = [future for future, _ in pending.values() if not future.done()]
+                if running and len(running) == len(pending):
+                    wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                elif not pending:
+                    time.sleep(timeout)
+        finally:
+            # hung reads can not be interrupted, their threads end when the device returns
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def _read_values(probes):
+        with device_priority(PROBE):
+            return Probe.read_values(probes)
+
+    def _probe_interval(self, probe):
+        interval = getattr(probe, 'refresh_interval', None)
+        return self.refresh_interval if interval is None else interval
 
     def start(self, *args, **kwargs):
         """
@@ -82,6 +161,7 @@ class ReadProbes(QThread):
 
 
 if __name__ == '__main__':
+    from src.Controller import ExampleDevice
 
     devices = {'inst_dummy': ExampleDevice}
 
@@ -16,7 +16,7 @@
 
 import yaml, json
 import os, inspect
-from importlib import import_module
+from importlib.util import find_spec
 import platform
 from typing import Optional, Dict, Any
 from src.config_store import load_config, save_config, merge_config
@@ -24,21 +24,34 @@ from pathlib import Path
 
 def import_sub_modules(module_type):
     """
-    imports all the module_type from additional modules that contain module_type
+    registers the module_type folders of additional packages with the plugin registry, so their classes are found
+    and imported on demand like the ones of the project (see src.core.plugin_registry)
     This name of those modules is in the config file that is located in the main directory
     module_type: str that specifies the type of module to be loaded (experiments / devices)
 
-    :return: module_list: a list with modules that contain module_type
+    :return: folder_list: a list with the folders that contain module_type
     """
+    from src.core.plugin_registry import get_plugin_registry
 
     assert module_type in ('experiments', 'devices')
 
     path_to_config = '/'.join(
         os.path.normpath(os.path.dirname(inspect.getfile(import_sub_modules))).split('\\')[0:-2]) + '/config.txt'
     module_list = get_config_value('EXPERIMENT_MODULES', path_to_config).split(';')
-    module_list = [import_module(module_name + module_type) for module_name in module_list]
 
-    return module_list
+    registry = get_plugin_registry()
+    kind = 'experiment' if module_type == 'experiments' else 'device'
+    folder_list = []
+    for module_name in module_list:
+        # finds the package without importing its modules
+        spec = find_spec(module_name + module_type)
+        if spec is None or not spec.submodule_search_locations:
+            raise ImportError('No package named ' + module_name + module_type)
+        for folder in spec.submodule_search_locations:
+            registry.add_folder(kind, folder)
+            folder_list.append(folder)
+
+    return folder_list
 
 
 def get_config_value(name, path_to_file='config.txt'):
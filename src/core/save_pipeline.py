@@ -0,0 +1,184 @@
+"""
+Background Save Pipeline
+
+This module provides a small persistence service that writes experiment output files
+(CSV, .mat, log and plot images) on a worker pool, so that the experiment thread does not
+wait on the disk between sweep points or loop iterations.
+
+Experiments hand the pipeline a snapshot of their data, settings and log. The number of
+jobs that may be queued is bounded: once the limit is reached, submitting blocks until a
+worker frees a slot (backpressure), which keeps memory bounded when the disk is slower than
+the acquisition. flush() is a barrier that waits for everything submitted so far.
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from copy import deepcopy
+from functools import partial
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from src.core.data_store import DataStore
+from src.core import tracing
+
+
+def snapshot(value: Any) -> Any:
+    """
+    Make an independent copy of experiment data so it can be written while the experiment
+    keeps modifying the original.
+
+    NumPy arrays are copied with a plain memory copy, containers are copied recursively and
+    everything else falls back to deepcopy.
+
+    Args:
+        value: data, settings or any nested combination of dicts, lists and arrays
+
+    Returns:
+        A copy of value that shares no mutable state with the original
+    """
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    if isinstance(value, (int, float, complex, str, bytes, bool)) or value is None:
+        return value
+    if isinstance(value, DataStore):
+        copy = value.copy()
+        for key, item in value.extras.items():
+            copy[key] = snapshot(item)
+        return copy
+    if type(value) is dict:
+        return {key: snapshot(item) for key, item in value.items()}
+    if type(value) is list:
+        return [snapshot(item) for item in value]
+    if type(value) is tuple:
+        return tuple(snapshot(item) for item in value)
+    if isinstance(value, deque):
+        return deque((snapshot(item) for item in value), maxlen=value.maxlen)
+    return deepcopy(value)
+
+
+class SavePipeline:
+    """
+    Runs save jobs on a pool of worker threads.
+
+    Args:
+        max_workers: number of threads writing files in parallel
+        max_pending: maximum number of jobs queued or running; submit() blocks beyond this
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 16):
+        assert max_workers >= 1
+        assert max_pending >= 1
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='save_pipeline')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._errors = []
+
+    def submit(self, function: Callable, *args, description: Optional[str] = None, **kwargs):
+        """
+        Queue a save job. Blocks while max_pending jobs are already queued or running.
+
+        Args:
+            function: callable that writes the output
+            *args, **kwargs: arguments passed to function
+            description: text used when reporting a failure of this job
+
+        Returns:
+            concurrent.futures.Future of the job
+        """
+        if description is None:
+            description = getattr(function, '__name__', str(function))
+
+        self._slots.acquire()
+        try:
+            # shows the background writes on the worker thread when tracing is enabled
+            future = self._executor.submit(self._run_job, description,
+                                           partial(tracing.traced(description, 'save')(function), *args, **kwargs))
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(partial(self._job_done, description))
+        return future
+
+    def _run_job(self, description, job):
+        # the failure is recorded on the worker before the future completes, so a flush that returns
+        # after the job finished always reports it (done callbacks run only after the waiters are woken)
+        try:
+            return job()
+        except BaseException as error:
+            print(f"Warning: background save '{description}' failed: {error}")
+            with self._lock:
+                self._errors.append((description, error))
+            raise
+
+    def _job_done(self, description, future):
+        with self._lock:
+            self._pending.discard(future)
+        self._slots.release()
+
+    @property
+    def pending_count(self) -> int:
+        """number of jobs that are queued or running"""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, timeout: Optional[float] = None) -> List[Tuple[str, BaseException]]:
+        """
+        Wait until every job submitted before this call has finished.
+
+        Args:
+            timeout: maximum time to wait in seconds, None waits indefinitely
+
+        Returns:
+            list of (description, exception) for the jobs that failed since the last flush
+
+        Raises:
+            TimeoutError: if the jobs did not finish within timeout
+        """
+        with self._lock:
+            pending = list(self._pending)
+
+        done, not_done = wait(pending, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"{len(not_done)} save jobs still running after {timeout} s")
+
+        with self._lock:
+            self._pending.difference_update(done)
+            errors = self._errors
+            self._errors = []
+        return errors
+
+    def shutdown(self, wait_for_jobs: bool = True):
+        """
+        Stop the worker threads.
+
+        Args:
+            wait_for_jobs: if True, finish the queued jobs first
+        """
+        self._executor.shutdown(wait=wait_for_jobs)
+
+
+_save_pipeline = None
+_save_pipeline_lock = threading.Lock()
+
+
+def get_save_pipeline() -> SavePipeline:
+    """
+    Returns the pipeline shared by all experiments, creating it on first use.
+    """
+    global _save_pipeline
+    with _save_pipeline_lock:
+        if _save_pipeline is None:
+            _save_pipeline = SavePipeline()
+        return _save_pipeline
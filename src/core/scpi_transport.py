@@ -0,0 +1,397 @@
+"""
+SCPI Transport
+
+Persistent connections to message based instruments (SG384 and other microwave generators, the
+Agilent 8596E spectrum analyzer, the Windfreak SynthUSBII). A transport keeps its TCP socket or VISA
+session open between commands and reconnects automatically when the connection broke. A connection that
+was closed by the instrument is reopened before a message is written. A message that failed after it may
+have reached the instrument is only sent again for queries, commands like *TRG must not run twice.
+
+Round trips are the main cost of talking to these instruments, so a transport can
+    - batch commands: inside `with transport.batch():` writes are collected and sent as one
+      separator-joined message when the block ends, followed by a single error query
+    - pipeline queries: query_many sends all queries in one write and then reads the responses,
+      instead of waiting for every response before sending the next query (sockets only, GPIB
+      instruments report an interrupted query when a new command arrives before the response was read)
+
+LAN transports are shared: devices that address the same instrument get the same transport from
+get_transport, the transport lock serializes their messages.
+
+Example:
+    transport = get_transport(('LAN', '192.168.2.217', 5025),
+                              lambda: SocketTransport(('192.168.2.217', 5025), error_query='LERR?'))
+    with transport.batch():
+        transport.write('FREQ 2.87e9')
+        transport.write('AMPR -10')
+    frequency, power = transport.query_many(['FREQ?', 'AMPR?'])
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Hashable, List, Optional
+
+
+class ScpiError(IOError):
+    """the instrument reported an error for the commands of a batch"""
+
+
+class ScpiTransport:
+    """
+    Base class of the transports, subclasses implement opening, closing, writing and reading a line.
+
+    Args:
+        separator: joins the commands of a batch into one message, None sends them one by one
+        error_query: query that returns the error of the instrument (0 or +0,"No error" if there is none),
+            sent once at the end of a batch, None to not check
+        min_interval: shortest time in s between two writes, for instruments that drop commands arriving too fast
+    """
+
+    PIPELINE = False  # whether query_many may send all queries before reading the responses
+
+    def __init__(self, separator: Optional[str] = ';', error_query: Optional[str] = None, min_interval: float = 0.):
+        self.separator = separator
+        self.error_query = error_query
+        self.min_interval = min_interval
+        self.num_messages = 0  # messages written, batches and pipelined queries count once
+        self._lock = threading.RLock()
+        self._batch = None
+        self._last_write = 0.
+        self._is_open = False
+
+    # ------------------------------------------------------------------
+    # connection, implemented by the subclasses
+    # ------------------------------------------------------------------
+    def _open(self):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def _write_raw(self, message: str):
+        raise NotImplementedError
+
+    def _read_line(self) -> str:
+        raise NotImplementedError
+
+    def _query_raw(self, command: str) -> str:
+        self._write_raw(command)
+        return self._read_line()
+
+    def _write_pipelined(self, commands: List[str]):
+        raise NotImplementedError
+
+    def _connection_alive(self) -> bool:
+        """checked before every message, subclasses that can detect a closed connection override it"""
+        return True
+
+    @property
+    def is_open(self) -> bool:
+        return self._is_open
+
+    def open(self):
+        with self._lock:
+            if not self._is_open:
+                self._open()
+                self._is_open = True
+
+    def close(self):
+        with self._lock:
+            if self._is_open:
+                self._is_open = False
+                try:
+                    self._close()
+                except OSError:
+                    pass
+
+    def _call(self, function, *args, retry: bool = False):
+        """
+        runs function on an open connection. A connection that broke while idle is reopened before anything
+        is written. If function fails, the connection is closed and function is only run again if retry is
+        True (queries), because the message may already have reached the instrument.
+        """
+        self.open()
+        if not self._connection_alive():
+            self.close()
+            self.open()
+        try:
+            return function(*args)
+        except OSError:
+            self.close()
+            if not retry:
+                raise
+        self.open()
+        return function(*args)
+
+    def _wait_interval(self):
+        if self.min_interval > 0:
+            remaining = self._last_write + self.min_interval - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def _send(self, message: str):
+        self._wait_interval()
+        self._call(self._write_raw, message)
+        self._last_write = time.monotonic()
+        self.num_messages += 1
+
+    # ------------------------------------------------------------------
+    # commands
+    # ------------------------------------------------------------------
+    def write(self, command: str):
+        """
+        Sends a command, inside batch() the command is sent when the batch ends.
+        """
+        with self._lock:
+            if self._batch is not None:
+                self._batch.append(command)
+            else:
+                self._send(command)
+
+    def write_many(self, commands: List[str]):
+        """
+        Sends several commands, as one message if the transport has a separator.
+        """
+        with self._lock:
+            if self._batch is not None:
+                self._batch.extend(commands)
+            elif self.separator is None:
+                for command in commands:
+                    self._send(command)
+            elif commands:
+                self._send(self.separator.join(commands))
+
+    def query(self, command: str) -> str:
+        """
+        Sends a query and returns the response without the line termination. Commands of a running
+        batch are sent first, so the response reflects them.
+        """
+        with self._lock:
+            self.flush()
+            self._wait_interval()
+            response = self._call(self._query_raw, command, retry=True)
+            self._last_write = time.monotonic()
+            self.num_messages += 1
+            return response.strip()
+
+    def query_many(self, commands: List[str]) -> List[str]:
+        """
+        Sends several queries and returns their responses in the same order. Socket transports send all
+        queries in one write and then read the responses.
+        """
+        with self._lock:
+            self.flush()
+            if not self.PIPELINE or len(commands) < 2:
+                return [self.query(command) for command in commands]
+
+            def pipelined():
+                self._write_pipelined(commands)
+                return [self._read_line().strip() for _ in commands]
+
+            self._wait_interval()
+            responses = self._call(pipelined, retry=True)
+            self._last_write = time.monotonic()
+            self.num_messages += 1
+            return responses
+
+    # ------------------------------------------------------------------
+    # batches
+    # ------------------------------------------------------------------
+    @contextmanager
+    def batch(self, check_errors: bool = True):
+        """
+        Collects the writes of the block and sends them as one message at its end, then queries the error
+        of the instrument once (if the transport has an error_query). Nested batches join the outer batch.
+
+        Raises:
+            ScpiError: if the instrument reports an error after the batch
+        """
+        with self._lock:
+            if self._batch is not None:
+                yield self
+                return
+            self._batch = []
+            try:
+                yield self
+            except BaseException:
+                self._batch = None
+                raise
+            commands, self._batch = self._batch, None
+            self.write_many(commands)
+            if check_errors and commands:
+                self.check_errors()
+
+    def flush(self):
+        """
+        Sends the commands collected by a running batch.
+        """
+        with self._lock:
+            if self._batch:
+                commands, self._batch = self._batch, None
+                try:
+                    self.write_many(commands)
+                finally:
+                    self._batch = []
+
+    def check_errors(self):
+        """
+        Queries the error of the instrument and raises ScpiError if there is one.
+        """
+        if self.error_query is None:
+            return
+        response = self.query(self.error_query)
+        try:
+            code = int(response.split(',')[0])
+        except ValueError:
+            print(f"Warning: could not interpret the error response '{response}' to {self.error_query}")
+            return
+        if code != 0:
+            raise ScpiError(f"instrument reported error {response}")
+
+
+class SocketTransport(ScpiTransport):
+    """
+    SCPI over a persistent TCP socket (LAN instruments, usually port 5025).
+
+    Args:
+        address: (host, port)
+        timeout: socket timeout in s for sending and receiving
+        connection_timeout: timeout in s for connecting
+        terminator: line termination of messages and responses
+    """
+
+    PIPELINE = True
+
+    def __init__(self, address, timeout: float = 5.0, connection_timeout: float = 10.0, terminator: str = '\n',
+                 **kwargs):
+        super().__init__(**kwargs)
+        self.address = tuple(address)
+        self.timeout = timeout
+        self.connection_timeout = connection_timeout
+        self.terminator = terminator
+        self._socket = None
+        self._buffer = b''
+
+    def _open(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.connection_timeout)
+        sock.connect(self.address)
+        sock.settimeout(self.timeout)
+        self._socket = sock
+        self._buffer = b''
+
+    def _close(self):
+        sock, self._socket = self._socket, None
+        if sock is not None:
+            sock.close()
+
+    def _connection_alive(self) -> bool:
+        # a readable socket without pending data was closed by the instrument
+        if self._socket is None:
+            return False
+        try:
+            self._socket.setblocking(False)
+            try:
+                return self._socket.recv(1, socket.MSG_PEEK) != b''
+            finally:
+                self._socket.settimeout(self.timeout)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def _write_raw(self, message: str):
+        self._socket.sendall((message + self.terminator).encode())
+
+    def _write_pipelined(self, commands: List[str]):
+        self._socket.sendall(''.join(command + self.terminator for command in commands).encode())
+
+    def _read_line(self) -> str:
+        terminator = self.terminator.encode()
+        while terminator not in self._buffer:
+            data = self._socket.recv(4096)
+            if not data:
+                raise ConnectionError(f"connection to {self.address} closed by the instrument")
+            self._buffer += data
+        line, self._buffer = self._buffer.split(terminator, 1)
+        return line.decode()
+
+
+class VisaTransport(ScpiTransport):
+    """
+    SCPI over a VISA session (GPIB, RS232 or USB), the termination is handled by VISA.
+
+    Args:
+        resource: open pyvisa resource, or None to open resource_name
+        resource_name: VISA resource string, e.g. GPIB0::18::INSTR, used to (re)open the session
+        query_delay: time in s between writing a query and reading the response
+    """
+
+    def __init__(self, resource=None, resource_name: Optional[str] = None, query_delay: float = 0., **kwargs):
+        super().__init__(**kwargs)
+        assert resource is not None or resource_name is not None
+        self.resource = resource
+        self.resource_name = resource_name
+        self.query_delay = query_delay
+        self._is_open = resource is not None
+
+    def _open(self):
+        import pyvisa
+        self.resource = pyvisa.ResourceManager().open_resource(self.resource_name)
+
+    def _close(self):
+        if self.resource_name is not None and self.resource is not None:
+            self.resource.close()
+
+    def _call(self, function, *args, retry: bool = False):
+        if self.resource_name is None:
+            # a session handed over by the driver can not be reopened here
+            return function(*args)
+        return super()._call(function, *args, retry=retry)
+
+    def _write_raw(self, message: str):
+        self.resource.write(message)
+
+    def _read_line(self) -> str:
+        return self.resource.read()
+
+    def _query_raw(self, command: str) -> str:
+        if self.query_delay:
+            return self.resource.query(command, delay=self.query_delay)
+        return self.resource.query(command)
+
+
+_transports = {}  # key: [transport, number of users]
+_transports_lock = threading.Lock()
+
+
+def get_transport(key: Hashable, factory: Callable[[], ScpiTransport]) -> ScpiTransport:
+    """
+    Returns the shared transport for key (e.g. ('LAN', host, port)), created with factory on first use.
+    Every call has to be matched by a release_transport call.
+    """
+    with _transports_lock:
+        entry = _transports.get(key)
+        if entry is None:
+            entry = _transports[key] = [factory(), 0]
+        entry[1] += 1
+        return entry[0]
+
+
+def release_transport(transport: ScpiTransport):
+    """
+    Gives up a transport returned by get_transport, the connection is closed when the last user released it.
+    """
+    with _transports_lock:
+        for key, entry in list(_transports.items()):
+            if entry[0] is transport:
+                entry[1] -= 1
+                if entry[1] <= 0:
+                    del _transports[key]
+                    transport.close()
+                return
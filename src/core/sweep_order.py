@@ -0,0 +1,95 @@
+"""
+Sweep Point Ordering
+
+Helpers that decide in which order the points of a multi-parameter grid are measured.
+
+Changing some parameters is much more expensive than others (moving the nanodrive in z, changing
+the SG384 power or waiting for a temperature to settle versus changing a pulse length). The axis
+with the largest settle time is therefore made the outermost loop, so it changes as rarely as
+possible. In serpentine order the inner axes run back and forth instead of jumping back to their
+first value, so consecutive points differ in exactly one parameter by one step.
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import itertools
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def nesting_order(settle_times: Sequence[float]) -> List[int]:
+    """
+    Returns the axis indices from the outermost to the innermost loop, i.e. sorted by decreasing settle
+    time. Axes with equal settle times keep their order.
+    """
+    return sorted(range(len(settle_times)), key=lambda k: -settle_times[k])
+
+
+def raster_order(shape: Sequence[int]) -> List[Tuple[int, ...]]:
+    """
+    Returns all indices of a grid of the given shape, the last axis runs fastest and restarts at 0.
+    """
+    return list(itertools.product(*[range(n) for n in shape]))
+
+
+def serpentine_order(shape: Sequence[int]) -> List[Tuple[int, ...]]:
+    """
+    Returns all indices of a grid of the given shape in boustrophedon order: the last axis runs fastest
+    and every inner axis reverses its direction whenever an outer axis steps.
+    """
+    if len(shape) == 0:
+        return [()]
+    inner = serpentine_order(shape[1:])
+    points = []
+    for i in range(shape[0]):
+        for index in (inner if i % 2 == 0 else reversed(inner)):
+            points.append((i,) + index)
+    return points
+
+
+def grid_points(shape: Sequence[int], settle_times: Optional[Sequence[float]] = None,
+                order: str = 'serpentine') -> List[Tuple[int, ...]]:
+    """
+    Returns the indices of all grid points in measurement order.
+
+    Args:
+        shape: number of values of each axis
+        settle_times: time the hardware needs after a change of each axis, the slowest axis becomes the outer loop
+        order: 'serpentine' or 'raster'
+
+    Returns:
+        list of index tuples, with the axes in the order of shape
+    """
+    if settle_times is None:
+        settle_times = [0.] * len(shape)
+    assert len(settle_times) == len(shape)
+
+    nesting = nesting_order(settle_times)
+    nested_shape = [shape[k] for k in nesting]
+    if order == 'serpentine':
+        nested_points = serpentine_order(nested_shape)
+    elif order == 'raster':
+        nested_points = raster_order(nested_shape)
+    else:
+        raise ValueError('unknown point order ' + order)
+
+    points = []
+    for nested_index in nested_points:
+        index = [0] * len(shape)
+        for position, k in enumerate(nesting):
+            index[k] = nested_index[position]
+        points.append(tuple(index))
+    return points
+
+
+def count_changes(points: Sequence[Tuple[int, ...]]) -> np.ndarray:
+    """
+    Returns how often each axis changes its value when the points are measured in the given order.
+    """
+    points = np.asarray(points)
+    if len(points) < 2:
+        return np.zeros(points.shape[1] if points.ndim == 2 else 0, dtype=int)
+    return np.sum(np.diff(points, axis=0) != 0, axis=0)
@@ -0,0 +1,216 @@
+"""
+Sweep Result Store
+
+Storage for the per-point results of an ExperimentIterator sweep. It replaces the deepcopy of the
+full settings and data of the subexperiment at every sweep point.
+
+- Settings: the settings of the first point are kept as a shared base. Every point only stores the
+  leaves that differ from the base (typically the tag and the swept parameter). The settings of a
+  point share all unchanged sub-dictionaries with the base, only the path to a changed leaf is copied.
+- Data: NumPy arrays are written into one preallocated cube per data key with the sweep point as
+  first axis, allocated the first time the key is seen. Every point keeps a read-only view into the
+  cube instead of its own array. Other values (numbers, fit results, lists) are copied as before.
+
+The store is a dictionary with the same layout the iterator always used, i.e.
+{tag: [data, settings, scan_info]}, so saving and plotting code does not change.
+
+For N-dimensional sweeps the cube has one axis per swept parameter, labelled with the parameter
+name and its values (see labelled_cube).
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import copy
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+def _to_plain_dict(value: Any) -> Any:
+    """recursively turns Parameters and other dict subclasses into plain, independent dicts"""
+    if isinstance(value, dict):
+        return {key: _to_plain_dict(item) for key, item in value.items()}
+    return copy.deepcopy(value)
+
+
+def _flatten(dic: dict, prefix: Tuple = ()) -> Dict[Tuple, Any]:
+    """returns {path: leaf value} for a nested dictionary"""
+    flat = {}
+    for key, value in dic.items():
+        if isinstance(value, dict) and value:
+            flat.update(_flatten(value, prefix + (key,)))
+        else:
+            flat[prefix + (key,)] = value
+    return flat
+
+
+def _is_equal(a, b) -> bool:
+    try:
+        return bool(a == b) and type(a) == type(b)
+    except (ValueError, TypeError):
+        # e.g. arrays, count them as changed
+        return False
+
+
+def _apply_diff(base: dict, diff: Dict[Tuple, Any]) -> dict:
+    """returns base with diff applied; unchanged sub-dictionaries are shared with base"""
+    result = dict(base)
+    for path, value in diff.items():
+        node = result
+        for key in path[:-1]:
+            node[key] = dict(node.get(key, {}))
+            node = node[key]
+        node[path[-1]] = value
+    return result
+
+
+class SweepResultStore(dict):
+    """
+    Dictionary {tag: [data, settings, scan_info]} filled by ExperimentIterator sweeps.
+
+    Args:
+        sweep_values: the values of the sweep parameter in the order in which they are run
+        axes: for N-dimensional sweeps, dictionary {parameter: values} with one entry per cube axis
+    """
+
+    def __init__(self, sweep_values=(), axes=None):
+        super().__init__()
+        self.sweep_values = np.array(sweep_values, dtype=float)
+        if axes is None:
+            axes = {'sweep_value': self.sweep_values}
+        self.axes = {name: np.asarray(values) for name, values in axes.items()}
+        self.shape = tuple(len(values) for values in self.axes.values())
+        # per subexperiment name: base settings, settings diff per tag, and data cubes per data key
+        self._base_settings = {}
+        self._settings_diffs = {}
+        self._cubes = {}
+
+    @property
+    def num_points(self) -> int:
+        return int(np.prod(self.shape))
+
+    def _is_valid_index(self, index) -> bool:
+        index = index if isinstance(index, tuple) else (index,)
+        return len(index) == len(self.shape) and all(0 <= i < n for i, n in zip(index, self.shape))
+
+    def add_point(self, experiment_name: str, index: int, tag: str, data, settings, scan_info: dict):
+        """
+        Store the result of one sweep point.
+
+        Args:
+            experiment_name: name of the subexperiment that produced the data
+            index: position of the point in the cube, an int for 1D sweeps or a tuple with one entry per axis
+            tag: key under which the point is stored
+            data: data of the subexperiment, arrays are copied into the cube of their key
+            settings: settings of the point as returned by add_settings
+            scan_info: scan parameter information of the iterator
+        """
+        if isinstance(data, dict):
+            point_data = {key: self._add_value(experiment_name, key, index, value) for key, value in data.items()}
+        else:
+            # e.g. a deque of datasets, no cube layout possible
+            point_data = copy.deepcopy(data)
+
+        dict.__setitem__(self, tag, [point_data, settings, scan_info])
+
+    def add_settings(self, experiment_name: str, tag: str, settings) -> dict:
+        """
+        Record the settings of a sweep point. Call this before the subexperiment runs, in case it changes its settings.
+
+        Args:
+            experiment_name: name of the subexperiment
+            tag: key under which the point will be stored
+            settings: current settings of the subexperiment
+
+        Returns:
+            the settings of the point as a nested dict that shares the unchanged parts with the base settings
+        """
+        if experiment_name not in self._base_settings:
+            self._base_settings[experiment_name] = _to_plain_dict(settings)
+            self._settings_diffs[experiment_name] = {}
+        base = self._base_settings[experiment_name]
+        flat_base = _flatten(base)
+
+        diff = {path: copy.deepcopy(value) for path, value in _flatten(settings).items()
+                if path not in flat_base or not _is_equal(flat_base[path], value)}
+        self._settings_diffs[experiment_name][tag] = diff
+        return _apply_diff(base, diff)
+
+    def _add_value(self, experiment_name, key, index, value):
+        if not isinstance(value, np.ndarray) or value.dtype == object:
+            return copy.deepcopy(value)
+
+        cubes = self._cubes.setdefault(experiment_name, {})
+        cube = cubes.get(key)
+        valid_index = self._is_valid_index(index)
+        if cube is None and valid_index:
+            cube = np.full(self.shape + value.shape, np.nan if value.dtype.kind in 'fc' else 0, dtype=value.dtype)
+            cubes[key] = cube
+        if cube is None or cube.shape[len(self.shape):] != value.shape or cube.dtype != value.dtype or not valid_index:
+            # shape changed between points (e.g. number of fit peaks), keep a private copy for this point
+            return value.copy()
+
+        cube[index] = value
+        view = cube[index].view()
+        view.flags.writeable = False
+        return view
+
+    def settings_diff(self, experiment_name: str, tag: str) -> Dict[Tuple, Any]:
+        """
+        Returns the settings of point tag that differ from the base settings as {path: value}.
+        """
+        return self._settings_diffs[experiment_name][tag]
+
+    def base_settings(self, experiment_name: str) -> dict:
+        """
+        Returns the settings shared by all points of experiment_name.
+        """
+        return self._base_settings[experiment_name]
+
+    def cube(self, experiment_name: str, key: str, sort: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Returns the sweep values and the data cube of key, with the sweep point as first axis.
+
+        Args:
+            experiment_name: name of the subexperiment
+            key: data key
+            sort: if True the points are sorted by sweep value (e.g. for randomized sweeps), this copies the cube
+
+        Returns:
+            (sweep_values, cube) where cube is None if key was not stored as a cube
+        """
+        cube = self._cubes.get(experiment_name, {}).get(key)
+        values = self.sweep_values
+        if sort:
+            assert len(self.shape) == 1, 'sorting is only possible for 1D sweeps'
+            order = np.argsort(values)
+            return values[order], None if cube is None else cube[order]
+        if cube is None:
+            return values, None
+        view = cube.view()
+        view.flags.writeable = False
+        return values, view
+
+    def labelled_cube(self, experiment_name: str, key: str) -> Tuple[dict, Optional[np.ndarray]]:
+        """
+        Returns the axes {parameter: values} and the read-only data cube of key. The first axes of the cube
+        follow the order of the axes dictionary, the remaining axes are the shape of the data itself.
+        """
+        cube = self._cubes.get(experiment_name, {}).get(key)
+        if cube is not None:
+            cube = cube.view()
+            cube.flags.writeable = False
+        return dict(self.axes), cube
+
+    def __reduce__(self):
+        state = (self._base_settings, self._settings_diffs, self._cubes)
+        return (_rebuild_sweep_result_store, (self.sweep_values, self.axes, dict(self), state))
+
+
+def _rebuild_sweep_result_store(sweep_values, axes, contents, state):
+    store = SweepResultStore(sweep_values, axes)
+    store._base_settings, store._settings_diffs, store._cubes = state
+    dict.update(store, contents)
+    return store
@@ -0,0 +1,222 @@
+"""
+Experiment Timing Model
+
+Keeps a history of how long experiments took, keyed by the experiment class and the settings that
+determine the duration (number of points, averages, integration times, ...). The history is stored
+in a JSON file so predictions are available before the first iteration of a run, e.g. for the time
+estimate in the GUI or to plan an overnight queue. Runs are recorded in memory, the file is written by
+flush(), which the top-level experiment queues on the save pipeline when it finishes (and at exit), so the
+sub-experiments of a sweep do not rewrite the file after every point.
+
+Prediction, in order of preference:
+    1. runs with exactly the same duration settings: mean of the most recent durations
+    2. enough runs with different settings: power law fit log(duration) ~ sum_k a_k log(setting_k)
+    3. otherwise the run with the closest settings
+
+Which settings matter can be set per experiment class with the class attribute _TIMING_KEYS (a list
+of setting paths like 'averages' or 'sweep_range.N/value_step'). If it is not set, all numeric
+settings whose names look duration related are used (see DURATION_KEYWORDS).
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import atexit
+import datetime
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# settings whose names match this pattern are used as features if an experiment does not define _TIMING_KEYS.
+# The keywords have to be whole words of the snake_case name (num_points, integration_time, N, repetitions_per_point),
+# so names like report_interval, timeout or noise_level are not matched.
+DURATION_KEYWORDS = re.compile(r'(?:^|_)(?:n|(?:num|number|point|average|avg|count|integration|time|duration|step|'
+                               r'resolution|rep|repetition|loop|sample|iteration|length)s?)(?:_|$)',
+                               re.IGNORECASE)
+
+MAX_RECORDS_PER_EXPERIMENT = 200
+EXACT_MATCH_RUNS = 5
+
+
+def _flatten_numeric(settings, prefix='') -> Dict[str, float]:
+    flat = {}
+    for key, value in settings.items():
+        path = prefix + str(key)
+        if isinstance(value, dict):
+            flat.update(_flatten_numeric(value, path + '.'))
+        elif isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+            flat[path] = float(value)
+    return flat
+
+
+def duration_features(settings, keys: Optional[List[str]] = None) -> Dict[str, float]:
+    """
+    Returns the settings that determine the duration of an experiment as {path: value}.
+
+    Args:
+        settings: settings of the experiment (Parameter or dict)
+        keys: setting paths to use, if None all numeric settings with duration related names are used
+    """
+    flat = _flatten_numeric(settings)
+    if keys is not None:
+        return {key: flat[key] for key in keys if key in flat}
+    return {key: value for key, value in flat.items() if DURATION_KEYWORDS.search(key.split('.')[-1])}
+
+
+class TimingModel:
+    """
+    Run-history database that predicts experiment durations.
+
+    Args:
+        filename: JSON file with the history, None keeps the history in memory only
+    """
+
+    def __init__(self, filename=None):
+        self.filename = Path(filename) if filename is not None else None
+        self._lock = threading.Lock()
+        self._history = {}
+        self._dirty = False
+        if self.filename is not None and self.filename.exists():
+            try:
+                with open(self.filename, 'r') as infile:
+                    self._history = json.load(infile)
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not read timing history {self.filename}: {e}")
+
+    def record(self, experiment_class: str, features: Dict[str, float], duration: float):
+        """
+        Add the duration in seconds of a finished run. The history is written to disk by flush().
+        """
+        with self._lock:
+            records = self._history.setdefault(experiment_class, [])
+            records.append({'features': dict(features), 'duration': float(duration), 'timestamp': time.time()})
+            del records[:-MAX_RECORDS_PER_EXPERIMENT]
+            self._dirty = True
+
+    def flush(self):
+        """
+        Write the history to disk if runs were recorded since the last flush.
+        """
+        with self._lock:
+            if self.filename is None or not self._dirty:
+                return
+            content = json.dumps(self._history)
+            self._dirty = False
+        try:
+            self.filename.parent.mkdir(parents=True, exist_ok=True)
+            # write to a temporary file first so a crash never leaves a corrupt history
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.filename.parent), suffix='.tmp')
+            with os.fdopen(fd, 'w') as outfile:
+                outfile.write(content)
+            os.replace(tmp_name, self.filename)
+        except OSError as e:
+            with self._lock:
+                self._dirty = True
+            print(f"Warning: could not write timing history {self.filename}: {e}")
+
+    def num_records(self, experiment_class: str) -> int:
+        return len(self._history.get(experiment_class, []))
+
+    def predict(self, experiment_class: str, features: Dict[str, float]) -> Optional[float]:
+        """
+        Returns the predicted duration in seconds, None if there is no history for experiment_class.
+        """
+        with self._lock:
+            records = list(self._history.get(experiment_class, []))
+        if not records:
+            return None
+
+        exact = [record['duration'] for record in records if record['features'] == features]
+        if exact:
+            return float(np.mean(exact[-EXACT_MATCH_RUNS:]))
+
+        keys = sorted(features.keys())
+        usable = [record for record in records if all(key in record['features'] for key in keys)]
+        if not usable:
+            return float(np.mean([record['duration'] for record in records[-EXACT_MATCH_RUNS:]]))
+
+        x = np.array([[record['features'][key] for key in keys] for record in usable], dtype=float)
+        y = np.array([record['duration'] for record in usable], dtype=float)
+        target = np.array([features[key] for key in keys], dtype=float)
+
+        # power law fit over the features that are positive and vary in the history
+        varying = [k for k in range(len(keys)) if np.all(x[:, k] > 0) and target[k] > 0 and np.ptp(x[:, k]) > 0]
+        if varying and len(usable) >= len(varying) + 2 and np.all(y > 0):
+            design = np.column_stack([np.ones(len(usable)), np.log(x[:, varying])])
+            coefficients = np.linalg.lstsq(design, np.log(y), rcond=None)[0]
+            prediction = np.exp(coefficients[0] + np.dot(coefficients[1:], np.log(target[varying])))
+            if np.isfinite(prediction):
+                return float(prediction)
+
+        # closest run in log space
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distance = np.nansum(np.abs(np.log(np.abs(x) + 1e-12) - np.log(np.abs(target) + 1e-12)), axis=1)
+        return float(y[int(np.argmin(distance))])
+
+    def predict_experiment(self, experiment) -> Optional[float]:
+        """
+        Returns the predicted duration of an experiment instance in seconds, None if unknown.
+        """
+        return self.predict(type(experiment).__name__, experiment.timing_features())
+
+    def record_experiment(self, experiment, duration: float):
+        """
+        Add the duration of a finished run of an experiment instance.
+        """
+        self.record(type(experiment).__name__, experiment.timing_features(), duration)
+
+
+def queue_schedule(experiments, start=None):
+    """
+    Predicts when each experiment of a queue that runs back to back finishes, e.g. to check whether an
+    overnight queue fits before the morning.
+
+    Args:
+        experiments: experiment instances in the order they will run
+        start: datetime when the queue starts, defaults to now
+
+    Returns:
+        list of (experiment, predicted end datetime), the end is None for this and all following
+        experiments once a duration can not be predicted
+    """
+    end = start if start is not None else datetime.datetime.now()
+    schedule = []
+    for experiment in experiments:
+        duration = experiment.predicted_duration() if end is not None else None
+        end = end + datetime.timedelta(seconds=duration) if duration is not None else None
+        schedule.append((experiment, end))
+    return schedule
+
+
+_timing_model = None
+_timing_model_lock = threading.Lock()
+
+
+def get_timing_model() -> TimingModel:
+    """
+    Returns the timing model shared by all experiments. The history is kept next to the configured data folder.
+    """
+    global _timing_model
+    with _timing_model_lock:
+        if _timing_model is None:
+            from src.core.helper_functions import get_configured_data_folder
+            _timing_model = TimingModel(get_configured_data_folder() / 'timing_history.json')
+            atexit.register(_timing_model.flush)
+        return _timing_model
+
+
+def set_timing_model(model: TimingModel):
+    """
+    Replace the shared timing model, e.g. with an in-memory model for tests.
+    """
+    global _timing_model
+    with _timing_model_lock:
+        _timing_model = model
@@ -0,0 +1,215 @@
+"""
+Span Tracing
+
+Lightweight instrumentation that records where the wall-clock time of a run goes. A span is a named
+interval with a start time, a duration, the thread it ran on and optional arguments. Spans nest by
+time on each thread, so a trace viewer shows hardware waits in Device.update/read_probes next to
+Python overhead in Experiment.run and plotting in the GUI.
+
+Usage:
+    from src.core import tracing
+
+    tracing.enable_tracing()
+    with tracing.span('acquire', category='experiment', line=3):
+        ...
+
+    @tracing.traced(category='analysis')
+    def fit(...):
+        ...
+
+    tracing.export_chrome_trace('run.json')  # open in chrome://tracing or https://ui.perfetto.dev
+
+Experiment.run writes the spans of each saved run to <run>-trace.json next to its data while tracing is on.
+
+Tracing is off by default (set the environment variable AQUISS_TRACE=1 to switch it on at import).
+When it is off span() returns a shared no-op context manager and traced functions only check a flag,
+so the instrumentation can stay in hot paths.
+
+Author: Gurudev Dutt <gdutt@pitt.edu>
+Created: 2026
+License: GPL v2
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+MAX_EVENTS = 1000000  # events beyond this are dropped so a forgotten trace can not fill the memory
+
+_enabled = os.environ.get('AQUISS_TRACE', '0') not in ('', '0', 'false', 'False')
+_events = []
+_thread_names = {}
+_dropped = 0
+_lock = threading.Lock()
+_origin_ns = time.perf_counter_ns()
+
+
+def enable_tracing(clear: bool = True):
+    """
+    Switches tracing on.
+
+    Args:
+        clear: discard the spans recorded so far
+    """
+    global _enabled
+    if clear:
+        clear_trace()
+    _enabled = True
+
+
+def disable_tracing():
+    """
+    Switches tracing off, the recorded spans are kept until clear_trace() or the next enable_tracing().
+    """
+    global _enabled
+    _enabled = False
+
+
+def is_tracing_enabled() -> bool:
+    return _enabled
+
+
+def clear_trace():
+    global _dropped
+    with _lock:
+        _events.clear()
+        _thread_names.clear()
+        _dropped = 0
+
+
+def _record(name: str, category: str, start_ns: int, end_ns: int, args: Optional[Dict]):
+    global _dropped
+    thread = threading.current_thread()
+    event = {
+        'name': name,
+        'cat': category,
+        'ph': 'X',
+        'ts': (start_ns - _origin_ns) / 1000.,
+        'dur': (end_ns - start_ns) / 1000.,
+        'pid': os.getpid(),
+        'tid': thread.ident
+    }
+    if args:
+        event['args'] = {key: value if isinstance(value, (int, float, str, bool, type(None))) else repr(value)
+                         for key, value in args.items()}
+    with _lock:
+        if len(_events) >= MAX_EVENTS:
+            _dropped += 1
+            return
+        _events.append(event)
+        _thread_names.setdefault(thread.ident, thread.name)
+
+
+class _Span:
+    __slots__ = ('name', 'category', 'args', '_start_ns')
+
+    def __init__(self, name: str, category: str, args: Optional[Dict]):
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start_ns = 0
+
+    def __enter__(self):
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is not None:
+            self.args = dict(self.args or {}, error=exc_type.__name__)
+        _record(self.name, self.category, self._start_ns, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, category: str = '', **args):
+    """
+    Context manager that records the enclosed block as a span.
+
+    Args:
+        name: name of the span as shown in the trace viewer
+        category: category for filtering, e.g. 'experiment', 'device', 'gui'
+        **args: values attached to the span
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = '') -> Callable:
+    """
+    Decorator that records every call of the function as a span.
+
+    Args:
+        name: name of the span, defaults to the qualified name of the function
+        category: category of the span
+    """
+    def decorator(function):
+        span_name = name if name is not None else function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(span_name, category, None):
+                return function(*args, **kwargs)
+
+        wrapper.__traced__ = True
+        return wrapper
+    return decorator
+
+
+def trace_timestamp() -> float:
+    """
+    Returns the current time on the clock of the trace events ('ts', in us), e.g. to export the spans of one run.
+    """
+    return (time.perf_counter_ns() - _origin_ns) / 1000.
+
+
+def get_trace_events() -> List[Dict]:
+    """
+    Returns a copy of the recorded spans as Chrome trace events.
+    """
+    with _lock:
+        return list(_events)
+
+
+def export_chrome_trace(filename, since: Optional[float] = None) -> int:
+    """
+    Writes the recorded spans in the Chrome trace event format.
+
+    Args:
+        filename: path of the JSON file
+        since: only write the spans that started at or after this trace_timestamp()
+
+    Returns:
+        number of spans written
+    """
+    with _lock:
+        events = [event for event in _events if since is None or event['ts'] >= since]
+        thread_names = dict(_thread_names)
+        dropped = _dropped
+    pid = os.getpid()
+    metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+                for tid, thread_name in thread_names.items()]
+    trace = {'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}
+    if dropped:
+        trace['otherData'] = {'dropped_events': dropped}
+        print(f"Warning: {dropped} trace events were dropped after reaching MAX_EVENTS")
+    with open(filename, 'w') as outfile:
+        json.dump(trace, outfile)
+    return len(events)
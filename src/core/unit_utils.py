@@ -6,11 +6,149 @@ This module provides utilities for working with pint units, including:
 - Common unit prefixes (kHz, MHz, GHz, etc.)
 - Unit conversion helpers
 - Unit display formatting
+- A cache of conversion factors (UnitConverter) for conversions in loops
+
+Converting with pint parses the units and builds the conversion for every call, which is slow when
+timing values or arrays are converted many times, e.g. ns/us/ms delays for the ADwin and the AWG.
+The shared UnitConverter asks pint once per (source unit, target unit) pair for the conversion factor
+and afterwards only multiplies. Units with an offset (degC, degF) or logarithmic units (dBm) can not be
+converted with a factor and always go through pint.
+
+Usage:
+    from src.core.unit_utils import convert_magnitude, get_unit_converter
+
+    delays_us = convert_magnitude(np.array([100, 250, 500]), 'ns', 'us')
+    frequency = get_unit_converter().to(2.87e9 * ur.Hz, 'GHz')
 """
 
+import numbers
+
+import numpy as np
+
 from src import ur
 
 
+class UnitConverter:
+    """
+    Converts magnitudes and pint quantities with cached conversion factors.
+
+    Args:
+        registry: pint UnitRegistry of the units, the project wide ur by default
+    """
+
+    def __init__(self, registry=ur):
+        self.registry = registry
+        self._units = {}  # unit name: pint Unit
+        self._factors = {}  # (source unit, target unit): factor, None if the conversion is not a multiplication
+
+    def unit(self, unit):
+        """
+        Returns the pint Unit for a unit name or unit.
+
+        Raises:
+            ValueError: if the unit is not known to the registry
+        """
+        cached = self._units.get(unit)
+        if cached is not None:
+            return cached
+        if isinstance(unit, str):
+            try:
+                parsed = self.registry.Unit(unit)
+            except (AttributeError, ValueError, TypeError) as e:
+                # pint raises UndefinedUnitError (an AttributeError) for unknown names
+                raise ValueError(f"Unknown unit: {unit}") from e
+        else:
+            parsed = self.registry.Unit(unit)
+        self._units[unit] = parsed
+        return parsed
+
+    def factor(self, source, target):
+        """
+        Returns the factor that converts magnitudes in source units to target units, None if the conversion
+        needs an offset or is not linear.
+
+        Raises:
+            ValueError: if one of the units is unknown
+            pint.DimensionalityError: if the units can not be converted into each other
+        """
+        key = (source, target)
+        try:
+            return self._factors[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # unhashable unit descriptions are not cached
+            return self._compute_factor(source, target)
+        factor = self._factors[key] = self._compute_factor(source, target)
+        return factor
+
+    def _compute_factor(self, source, target):
+        source_unit, target_unit = self.unit(source), self.unit(target)
+        Quantity = self.registry.Quantity
+        zero = Quantity(0.0, source_unit).to(target_unit).magnitude
+        if zero != 0:
+            return None
+        factor = Quantity(1.0, source_unit).to(target_unit).magnitude
+        # a linear conversion also maps 2 to 2 * factor, this excludes logarithmic units
+        if not np.isclose(Quantity(2.0, source_unit).to(target_unit).magnitude, 2 * factor, rtol=1e-12, atol=0):
+            return None
+        return factor
+
+    def convert(self, value, source, target):
+        """
+        Converts a magnitude (number or NumPy array) from source to target units.
+        """
+        factor = self.factor(source, target)
+        if factor is None:
+            return self.registry.Quantity(value, self.unit(source)).to(self.unit(target)).magnitude
+        if factor == 1:
+            return value
+        if isinstance(value, (numbers.Number, np.ndarray)):
+            return value * factor
+        return np.asarray(value) * factor
+
+    def to(self, quantity, target):
+        """
+        Returns the pint quantity converted to target units, like quantity.to(target).
+        """
+        if getattr(quantity, '_REGISTRY', None) is not self.registry:
+            return quantity.to(target)
+        factor = self.factor(quantity.units, target)
+        if factor is None:
+            return quantity.to(self.unit(target))
+        return self.registry.Quantity(quantity.magnitude * factor, self.unit(target))
+
+    def clear(self):
+        self._units.clear()
+        self._factors.clear()
+
+
+_unit_converter = UnitConverter()
+
+
+def get_unit_converter():
+    """
+    Returns the UnitConverter of the project wide unit registry.
+    """
+    return _unit_converter
+
+
+def conversion_factor(source, target):
+    """
+    Returns the cached factor from source to target units, None for units with an offset.
+    The factor is computed by pint and can differ from the decimal constant in the last bit (s -> ns gives
+    999999999.9999999), round instead of truncating with int() when converting to samples or clock cycles.
+    """
+    return _unit_converter.factor(source, target)
+
+
+def convert_magnitude(value, source, target):
+    """
+    Converts a number or NumPy array from source to target units, e.g. convert_magnitude(delays, 'ns', 'us').
+    """
+    return _unit_converter.convert(value, source, target)
+
+
 def get_common_units_for_dimensionality(dimensionality):
     """
     Get common units for a given dimensionality.
@@ -63,49 +201,8 @@ def convert_to_common_unit(value, target_unit_name):
     """
     if not hasattr(value, 'magnitude') or not hasattr(value, 'units'):
         return value
-    
-    # Handle common frequency prefixes
-    if target_unit_name == 'kHz':
-        return value.to(1e3 * ur.Hz)
-    elif target_unit_name == 'MHz':
-        return value.to(1e6 * ur.Hz)
-    elif target_unit_name == 'GHz':
-        return value.to(1e9 * ur.Hz)
-    elif target_unit_name == 'THz':
-        return value.to(1e12 * ur.Hz)
-    
-    # Handle common voltage prefixes
-    elif target_unit_name == 'mV':
-        return value.to(1e-3 * ur.V)
-    elif target_unit_name == 'kV':
-        return value.to(1e3 * ur.V)
-    
-    # Handle common power prefixes
-    elif target_unit_name == 'mW':
-        return value.to(1e-3 * ur.W)
-    elif target_unit_name == 'kW':
-        return value.to(1e3 * ur.W)
-    
-    # Handle common current prefixes
-    elif target_unit_name == 'mA':
-        return value.to(1e-3 * ur.A)
-    elif target_unit_name == 'kA':
-        return value.to(1e3 * ur.A)
-    
-    # Handle common resistance prefixes
-    elif target_unit_name == 'mohm':
-        return value.to(1e-3 * ur.ohm)
-    elif target_unit_name == 'kohm':
-        return value.to(1e3 * ur.ohm)
-    elif target_unit_name == 'Mohm':
-        return value.to(1e6 * ur.ohm)
-    
-    # Try to get from ur module
-    try:
-        target_unit = getattr(ur, target_unit_name)
-        return value.to(target_unit)
-    except AttributeError:
-        raise ValueError(f"Unknown unit: {target_unit_name}")
+
+    return _unit_converter.to(value, target_unit_name)
 
 
 def format_unit_display(value, target_unit_name=None):
@@ -33,13 +33,14 @@ import numpy as np
 
 
 
-def find_exportable_in_python_files(folder_name, class_type, verbose = True):
+def find_exportable_in_python_files(folder_name, class_type, verbose = True, use_manifest = False):
     """
     load all the devices or experiment objects that are located in folder_name and
     return a dictionary with the experiment class name and path_to_python_file
     Args:
         folder_name (string): folder in which to search for class objects / or name of module
         class_type (string or class): class type for which to look for
+        use_manifest (bool): find the classes by parsing the files (src.core.plugin_registry) instead of importing them
 
     Returns:
         a dictionary with the class name and path_to_python_file:
@@ -56,6 +57,9 @@ def find_exportable_in_python_files(folder_name, class_type, verbose = True):
         except ImportError:
             raise ImportError('could not find module ' + folder_name)
 
+    if use_manifest:
+        return find_exportable_in_manifest(folder_name, class_type)
+
     subdirs = [_os_module.path.join(folder_name, x) for x in _os_module.listdir(folder_name) if
                _os_module.path.isdir(_os_module.path.join(folder_name, x)) and not x.startswith('.')]
 
@@ -90,11 +94,30 @@ def find_exportable_in_python_files(folder_name, class_type, verbose = True):
 
     return classes_dict
 
-def find_experiments_in_python_files(folder_name, verbose = False):
-    return find_exportable_in_python_files(folder_name, 'Experiment', verbose)
+def find_exportable_in_manifest(folder_name, class_type):
+    """
+    same as find_exportable_in_python_files but without importing the python files, the classes are found with the
+    plugin registry. Classes that derive from devices or experiments of the project are also found in other folders.
+    """
+    from src.core.plugin_registry import DEFAULT_FOLDERS, PluginRegistry, get_plugin_registry
+
+    if not isinstance(class_type, str):
+        class_type = class_type.__name__
+    kind = 'device' if class_type.lower() == 'device' else 'experiment'
+
+    folder = Path(folder_name).resolve()
+    default_folders = [default_folder.resolve() for default_folder in DEFAULT_FOLDERS[kind]]
+    if any(folder == default_folder or default_folder in folder.parents for default_folder in default_folders):
+        registry = get_plugin_registry()
+    else:
+        registry = PluginRegistry({kind: [folder] + default_folders}, manifest=None)
+    return registry.export_dict(kind, folder)
+
+def find_experiments_in_python_files(folder_name, verbose = False, use_manifest = False):
+    return find_exportable_in_python_files(folder_name, 'Experiment', verbose, use_manifest)
 
-def find_devices_in_python_files(folder_name, verbose = False):
-    return find_exportable_in_python_files(folder_name, 'Device', verbose)
+def find_devices_in_python_files(folder_name, verbose = False, use_manifest = False):
+    return find_exportable_in_python_files(folder_name, 'Device', verbose, use_manifest)
 
 def get_device_name_mapping():
     """
@@ -233,4 +233,14 @@ def mock_sg384_device():
     mock_device.set_modulation_function.return_value = None
     mock_device.update.return_value = None
     
-    return mock_device
\ No newline at end of file
+    return mock_device
+
+
+@pytest.fixture(autouse=True)
+def in_memory_timing_model():
+    """Keep the run durations of test experiments out of the timing history in the data folder."""
+    from src.core.timing_model import TimingModel, set_timing_model
+
+    set_timing_model(TimingModel())
+    yield
+    set_timing_model(None)
@@ -0,0 +1,114 @@
+"""
+Tests for the adaptive stepping mode of ExperimentIterator sweeps.
+"""
+
+import datetime
+
+import numpy as np
+from scipy.io import loadmat
+
+from src.core import Parameter
+from src.core.adaptive_sweep import AdaptiveSampler1D
+from src.core.experiment import Experiment
+from src.core.experiment_iterator import ExperimentIterator
+
+
+def dip(x, center=7.0, width=0.3):
+    return 1.0 - 0.5 / (1 + ((x - center) / width) ** 2)
+
+
+def run_sampler(sampler, function):
+    for value in sampler:
+        sampler.tell(value, function(value))
+    return np.array(sampler.values)
+
+
+def test_coarse_pass_then_budget():
+    sampler = AdaptiveSampler1D(0, 10, num_points=12, coarse_points=5)
+    values = run_sampler(sampler, lambda x: 0.0)
+    assert np.allclose(values[:5], np.linspace(0, 10, 5))
+    assert len(values) == 12
+    assert len(set(values)) == 12
+
+
+def test_points_concentrate_on_feature():
+    sampler = AdaptiveSampler1D(0, 10, num_points=40, coarse_points=11)
+    values = run_sampler(sampler, dip)
+    refined = values[11:]
+    near_dip = np.sum(np.abs(refined - 7.0) < 1.5)
+    assert near_dip > len(refined) / 2
+
+
+def test_array_data_and_missing_data():
+    sampler = AdaptiveSampler1D(0, 10, num_points=8, coarse_points=3)
+    values = run_sampler(sampler, lambda x: np.array([x, 2 * x]))
+    assert len(values) == 8
+
+    # without data the widest intervals are split, which gives a uniform refinement
+    sampler = AdaptiveSampler1D(0, 8, num_points=5, coarse_points=3)
+    values = run_sampler(sampler, lambda x: None)
+    assert sorted(values) == [0, 2, 4, 6, 8]
+
+
+def test_fit_residual_scoring():
+    calls = []
+
+    def residuals(x, y):
+        # a flat model, the residual is largest around the dip
+        calls.append(len(x))
+        return y - np.median(y)
+
+    sampler = AdaptiveSampler1D(0, 10, num_points=30, coarse_points=15, fit_function=residuals)
+    values = run_sampler(sampler, dip)
+    assert len(values) == 30
+    assert calls[0] == 15
+    assert np.sum(np.abs(values[15:] - 7.0) < 1.5) > 7
+
+
+def test_min_step_stops_refinement():
+    sampler = AdaptiveSampler1D(0, 1, num_points=100, coarse_points=3, min_step=0.2)
+    values = run_sampler(sampler, lambda x: x ** 2)
+    assert len(values) < 100
+    assert np.min(np.diff(np.sort(values))) >= 0.2
+
+
+class DipExperiment(Experiment):
+    _DEFAULT_SETTINGS = [
+        Parameter('frequency', 0.0, float, 'frequency')
+    ]
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        self.data = {'contrast': np.array([dip(self.settings['frequency'])])}
+
+
+def test_adaptive_sweep_in_iterator(tmp_path):
+    sweep_class = type('DipAdaptiveSweep', (ExperimentIterator,), {
+        '_EXPERIMENTS': {'dip': DipExperiment},
+        '_DEVICES': {},
+        '_DEFAULT_SETTINGS': ExperimentIterator.get_default_settings(
+            {'dip': DipExperiment}, [Parameter('dip', 0, int, '')], [Parameter('dip', 1, int, '')], 'sweep')
+    })
+    iterator = sweep_class(experiments={'dip': DipExperiment(name='dip')}, name='adaptive', settings={
+        'sweep_param': 'dip.frequency',
+        'sweep_range': {'min_value': 0, 'max_value': 10, 'N/value_step': 25},
+        'stepping_mode': 'adaptive',
+        'adaptive': {'coarse_points': 11, 'score_key': 'contrast'}
+    })
+    iterator._function()
+
+    assert len(iterator.data) == 25
+    values, cube = iterator.data.cube('dip', 'contrast', sort=True)
+    assert np.all(np.diff(values) > 0)
+    assert np.allclose(cube[:, 0], dip(values))
+
+    # every point reports the final sorted list of values
+    scan_info = next(iter(iterator.data.values()))[2]
+    assert scan_info['scan_all_values_iterator_1'] == sorted(scan_info['scan_all_values_iterator_1'])
+    assert len(scan_info['scan_all_values_iterator_1']) == 25
+
+    iterator.start_time = datetime.datetime.now()
+    filename = str(tmp_path / 'adaptive.mat')
+    iterator.save_data_to_matlab(filename)
+    assert 'data_adaptive' in loadmat(filename)
@@ -0,0 +1,140 @@
+"""
+Tests for the compile cache and the parallel directory compilation of ADbasicCompiler.
+
+The ADbasic compiler is replaced by a script that writes <name>.TB<process number> next to the source
+and logs every run, so the tests run without Wine and an ADwin installation.
+"""
+
+import os
+import stat
+import sys
+
+import pytest
+
+from src.core.adbasic_compiler import ADbasicCompiler, CACHE_MANIFEST
+
+FAKE_COMPILER = """\
+#!{python}
+import os, re, sys, time
+source = sys.argv[1]
+text = open(source).read()
+process = re.search(r'Process_Number\\s*=\\s*(\\d+)', text).group(1)
+start = time.time()
+time.sleep({delay})
+stem = os.path.splitext(os.path.basename(source))[0]
+with open(stem + '.TB' + process, 'w') as f:
+    f.write('compiled ' + str(hash(text)))
+with open({log!r}, 'a') as f:
+    f.write('%s %f %f\\n' % (stem, start, time.time()))
+"""
+
+SOURCE = """\
+'<ADbasic Header, Headerversion 001.001>
+' Process_Number                 = {process}
+'<Header End>
+#Include ADwinGoldII.inc
+#Include counter.inc
+Event:
+  Par_1 = {value}
+"""
+
+
+@pytest.fixture
+def compiler_factory(tmp_path):
+    adwin_dir = tmp_path / 'adwin'
+    (adwin_dir / 'bin').mkdir(parents=True)
+    (adwin_dir / 'Include').mkdir()
+    (adwin_dir / 'Include' / 'ADwinGoldII.inc').write_text("' Gold II definitions\n")
+    log = tmp_path / 'compiler.log'
+
+    def make(delay=0.0):
+        compiler_path = adwin_dir / 'bin' / 'adbasic-mac'
+        compiler_path.write_text(FAKE_COMPILER.format(python=sys.executable, delay=delay, log=str(log)))
+        compiler_path.chmod(compiler_path.stat().st_mode | stat.S_IXUSR)
+        return ADbasicCompiler(adwin_dir=str(adwin_dir), license_file=str(tmp_path / 'no_license.json'))
+
+    def runs():
+        if not log.exists():
+            return []
+        return [line.split() for line in log.read_text().splitlines()]
+
+    make.runs = runs
+    make.adwin_dir = adwin_dir
+    return make
+
+
+def write_source(directory, name, process=1, value=1):
+    (directory / 'counter.inc').write_text("' counter helpers\n")
+    path = directory / f'{name}.bas'
+    path.write_text(SOURCE.format(process=process, value=value))
+    return path
+
+
+def test_unchanged_source_reuses_output(tmp_path, compiler_factory):
+    compiler = compiler_factory()
+    source = write_source(tmp_path, 'counter', process=2)
+
+    output = compiler.compile_file(str(source))
+    assert output == str(tmp_path / 'counter.TB2')
+    assert (tmp_path / CACHE_MANIFEST).exists()
+    assert compiler.is_up_to_date(str(source))
+
+    assert compiler.compile_file(str(source)) == output
+    assert len(compiler_factory.runs()) == 1
+
+    # use_cache=False always runs the compiler
+    compiler.compile_file(str(source), use_cache=False)
+    assert len(compiler_factory.runs()) == 2
+
+
+@pytest.mark.parametrize('change', ['source', 'include', 'installed_include', 'process', 'output'])
+def test_changes_invalidate_cache(tmp_path, compiler_factory, change):
+    compiler = compiler_factory()
+    source = write_source(tmp_path, 'counter')
+    compiler.compile_file(str(source))
+
+    if change == 'source':
+        write_source(tmp_path, 'counter', value=2)
+    elif change == 'include':
+        (tmp_path / 'counter.inc').write_text("' counter helpers, version 2\n")
+    elif change == 'installed_include':
+        (compiler_factory.adwin_dir / 'Include' / 'ADwinGoldII.inc').write_text("' Gold II definitions 2\n")
+    elif change == 'process':
+        write_source(tmp_path, 'counter', process=3)
+    else:
+        (tmp_path / 'counter.TB1').write_text('edited by hand')
+
+    assert not compiler.is_up_to_date(str(source))
+    compiler.compile_file(str(source))
+    assert len(compiler_factory.runs()) == 2
+    assert compiler.is_up_to_date(str(source))
+
+
+def test_output_without_manifest_entry_is_recompiled(tmp_path, compiler_factory):
+    compiler = compiler_factory()
+    source = write_source(tmp_path, 'counter')
+    (tmp_path / 'counter.TB1').write_text('of unknown origin')
+
+    assert not compiler.is_up_to_date(str(source))
+    compiler.compile_file(str(source))
+    assert len(compiler_factory.runs()) == 1
+
+
+def test_compile_directory_runs_in_parallel(tmp_path, compiler_factory):
+    compiler = compiler_factory(delay=0.5)
+    names = [f'process_{i}' for i in range(1, 5)]
+    for i, name in enumerate(names, start=1):
+        write_source(tmp_path, name, process=i)
+
+    results = compiler.compile_directory(str(tmp_path), max_workers=4)
+    assert sorted(os.path.basename(output) for output in results.values()) == \
+        [f'process_{i}.TB{i}' for i in range(1, 5)]
+
+    runs = compiler_factory.runs()
+    assert sorted(run[0] for run in runs) == names
+    # the compilations overlapped: every one started before the first one finished
+    assert max(float(run[1]) for run in runs) < min(float(run[2]) for run in runs)
+
+    # all outputs are cached, nothing is compiled again
+    assert compiler.compile_directory(str(tmp_path), max_workers=4) == results
+    assert len(compiler_factory.runs()) == 4
@@ -318,3 +318,219 @@ def test_adwin_hardware_process_loading():
             except:
                 pass
 
+
+
+def test_read_data_into_fallback(get_adwin):
+    '''
+    Test reading Data_ arrays into preallocated NumPy buffers through GetData_* of a mocked ADwin.
+    '''
+    get_adwin.adw.GetData_Long = Mock(return_value=[1, 2, 3, 4, 5])
+    get_adwin.adw.GetData_Double = Mock(return_value=[1.0, 2.0, 3.0, 4.0, 5.0])
+    buffer = np.full(8, -1, dtype=np.int32)
+    view = get_adwin.read_data_into(1, buffer, offset=2, length=5)
+    assert np.shares_memory(view, buffer)
+    assert buffer.tolist() == [-1, -1, 1, 2, 3, 4, 5, -1]
+    get_adwin.adw.GetData_Long.assert_called_with(1, 1, 5)
+
+    get_adwin.adw.GetFifo_Long = Mock(return_value=[7, 8])
+    assert get_adwin.read_fifo_into(3, buffer, offset=6, length=2).tolist() == [7, 8]
+    get_adwin.adw.GetFifo_Long.assert_called_with(3, 2)
+
+    data = get_adwin.read_data(2, 5, dtype=np.float64)
+    assert data.dtype == np.float64 and data.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+    with pytest.raises(TypeError):
+        get_adwin.read_data_into(1, np.empty(5, dtype=np.int64))
+    with pytest.raises(ValueError):
+        get_adwin.read_data_into(1, np.empty(5, dtype=np.int32), offset=3, length=5)
+    with pytest.raises(KeyError):
+        get_adwin.read_data_into(201, np.empty(5, dtype=np.int32))
+
+
+def test_read_data_into_driver():
+    '''
+    Test that read_data_into copies the arrays GetData_* and GetFifo_* of the ADwin package return into the buffer.
+    '''
+    import ctypes
+    import ADwin
+
+    source = np.arange(100, 110, dtype=np.int32)
+
+    class Dll:
+        def e_Get_Data(self, buffer, data_type, data_no, start, count, device_no, error_pointer):
+            assert data_type == ADwin.ADwin.ADWIN_DATATYPE_INT32
+            ctypes.memmove(buffer, source.ctypes.data + (start - 1) * 4, count * 4)
+
+        def e_Get_Fifo(self, buffer, data_type, fifo_no, count, device_no, error_pointer):
+            ctypes.memmove(buffer, source.ctypes.data, count * 4)
+
+    class DriverADwin(ADwin.ADwin):
+        def __init__(self, **kwargs):
+            self.dll = Dll()
+            self.DeviceNo = 1
+            self.raiseExceptions = True
+            self.useNumpyArrays = kwargs.get('useNumpyArrays', False)
+
+    with patch('src.Controller.adwin_gold.ADwin.ADwin', DriverADwin):
+        adwin = AdwinGoldDevice(boot=False)
+    buffer = np.zeros(6, dtype=np.int32)
+    adwin.read_data_into(3, buffer, offset=1, length=4, start=3)
+    assert buffer.tolist() == [0, 102, 103, 104, 105, 0]
+    assert adwin.read_data(3, 10).tolist() == source.tolist()
+    adwin.read_fifo_into(4, buffer, length=2)
+    assert buffer.tolist() == [100, 101, 103, 104, 105, 0]
+
+    adwin.adw.useNumpyArrays = True
+    assert adwin.read_data_into(3, buffer, length=3, start=8).tolist() == [107, 108, 109]
+
+
+def test_vectorized_conversions():
+    '''
+    Test the array conversions between digits, volts and count rates in adwin_helpers.
+    '''
+    from src.core.adwin_helpers import digits_to_volts, volts_to_digits, counts_to_rate
+
+    volts = digits_to_volts(np.array([0, 32768, 65535, 70000, -1], dtype=np.int32))
+    assert np.allclose(volts, [-10.0, 32768 * 20.0 / 65535.0 - 10.0, 10.0, 0.0, 0.0])
+    assert volts_to_digits([-10.0, 0.0, 10.0, 12.0]).tolist() == [0, 32768, 65535, 65535]
+    out = np.empty(3)
+    assert counts_to_rate([10, 20, 30], 0.01, out=out) is out
+    assert out.tolist() == [1000.0, 2000.0, 3000.0]
+    with pytest.raises(ValueError):
+        counts_to_rate([1], 0)
+
+
+def test_snapshot_reads_blocks(get_adwin):
+    '''
+    Test that snapshot reads the requested variables with one block transfer per type.
+    '''
+    get_adwin.adw.Get_Par_Block = Mock(side_effect=lambda start, count: list(range(start, start + count)))
+    get_adwin.adw.Get_FPar_Block = Mock(side_effect=lambda start, count: [0.5 * i for i in range(start, start + count)])
+    get_adwin.adw.Get_Par_All = Mock(return_value=list(range(100, 180)))
+
+    snapshot = get_adwin.snapshot(pars=[25, 20, 26], fpars=[1])
+    assert snapshot.pars == {20: 20, 25: 25, 26: 26}
+    assert snapshot.fpars == {1: 0.5}
+    get_adwin.adw.Get_Par_Block.assert_called_once_with(20, 7)
+    assert snapshot.timestamp > 0 and snapshot.duration >= 0
+
+    snapshot = get_adwin.snapshot(fpars=[])
+    assert len(snapshot.pars) == 80 and snapshot.pars[80] == 179 and snapshot.fpars == {}
+    with pytest.raises(KeyError):
+        get_adwin.snapshot(pars=[81])
+
+
+def test_wait_until(get_adwin):
+    '''
+    Test polling snapshots until a condition is met, with tolerated driver errors and a timeout.
+    '''
+    from ADwin import ADwinError
+
+    polls = []
+
+    def get_par_block(start, count):
+        polls.append(start)
+        if len(polls) == 2:
+            raise ADwinError('Get_Par_Block', 'Timeout', 2)
+        return [1 if len(polls) >= 4 else 0]
+
+    get_adwin.adw.Get_Par_Block = Mock(side_effect=get_par_block)
+    snapshot = get_adwin.wait_until(lambda s: s.pars[20] == 1, timeout=2, poll_schedule=[0.001], pars=[20])
+    assert snapshot.pars[20] == 1
+    assert len(polls) == 4
+
+    with pytest.raises(TimeoutError):
+        get_adwin.wait_until(lambda s: False, timeout=0.05, pars=[20])
+
+
+def test_load_process_residency(get_adwin, tmp_path):
+    '''
+    Test that a binary is only loaded when the content of its process slot changes.
+    '''
+    get_adwin.adw.Load_Process = Mock()
+    get_adwin.adw.Clear_Process = Mock()
+    counter = tmp_path / 'counter.TB1'
+    counter.write_bytes(b'counter v1')
+    copy = tmp_path / 'copy_of_counter.TB1'
+    copy.write_bytes(b'counter v1')
+
+    assert get_adwin.load_process(str(counter))
+    get_adwin.update({'process_1': {'load': str(copy)}})  # same binary from another file
+    assert not get_adwin.load_process(counter)
+    assert get_adwin.adw.Load_Process.call_count == 1
+    assert get_adwin.is_resident(str(counter))
+    assert get_adwin.resident_processes[1].filepath == str(counter)
+
+    # a changed binary is loaded after clearing the slot
+    counter.write_bytes(b'counter v2')
+    assert not get_adwin.is_resident(str(counter))
+    assert get_adwin.load_process(str(counter))
+    get_adwin.adw.Clear_Process.assert_called_once_with(1)
+    assert get_adwin.adw.Load_Process.call_count == 2
+
+    # force, clearing and rebooting load again
+    assert get_adwin.load_process(str(counter), force=True)
+    get_adwin.clear_process(1)
+    assert get_adwin.load_process(str(counter))
+    assert get_adwin.adw.Load_Process.call_count == 4
+    assert get_adwin._process_number('scan.TBA') == 10 and get_adwin._process_number('scan.bin') is None
+
+
+def test_warm_start(get_adwin):
+    '''
+    Test that a warm start stops the process, resets its variables and arrays and starts it again.
+    '''
+    adw = get_adwin.adw
+    adw.Stop_Process = Mock()
+    adw.Start_Process = Mock()
+    adw.Set_Par = Mock()
+    adw.Set_FPar = Mock()
+    adw.Process_Status = Mock(side_effect=[1, -1, 0])  # running, being stopped, stopped
+    adw.Data_Length = Mock(return_value=4)
+    adw.SetData_Long = Mock()
+
+    get_adwin.warm_start(2, pars=[20, 21], fpars=[1], data={1: np.int32})
+    adw.Stop_Process.assert_called_once_with(2)
+    assert adw.Process_Status.call_count == 3
+    assert [c.args for c in adw.Set_Par.call_args_list] == [(20, 0), (21, 0)]
+    adw.Set_FPar.assert_called_once_with(1, 0.0)
+    values, Data_id, start, count = adw.SetData_Long.call_args.args
+    assert values.tolist() == [0, 0, 0, 0] and (Data_id, start, count) == (1, 1, 4)
+    adw.Start_Process.assert_called_once_with(2)
+
+    adw.Process_Status = Mock(return_value=1)
+    with pytest.raises(TimeoutError):
+        get_adwin.warm_start(2, timeout=0.02)
+
+
+def test_prepare_process(get_adwin, tmp_path):
+    '''
+    Test that preparing a process keeps its binary loaded and resets it, and only reboots as a fallback.
+    '''
+    adw = get_adwin.adw
+    adw.Load_Process = Mock()
+    adw.Clear_Process = Mock()
+    adw.Start_Process = Mock()
+    adw.Set_Par = Mock()
+    adw.Process_Status = Mock(return_value=0)
+    get_adwin.reboot_adwin = Mock()
+    counter = tmp_path / 'Trial_Counter.TB1'
+    counter.write_bytes(b'counter')
+
+    assert not get_adwin.prepare_process(str(counter), pars=[1])
+    assert not get_adwin.prepare_process(counter, pars=[1])  # second run only resets
+    adw.Load_Process.assert_called_once_with(str(counter))
+    adw.Clear_Process.assert_not_called()
+    adw.Start_Process.assert_not_called()
+    assert adw.Set_Par.call_count == 2
+    get_adwin.reboot_adwin.assert_not_called()
+
+    assert get_adwin.prepare_process(str(counter), reboot=True)
+    get_adwin.reboot_adwin.assert_called_once()
+
+    adw.Process_Status = Mock(return_value=1)  # process does not stop
+    with patch.object(get_adwin, 'warm_start'):
+        assert get_adwin.prepare_process(str(counter), timeout=0.02)
+    assert get_adwin.reboot_adwin.call_count == 2
+    with pytest.raises(ValueError):
+        get_adwin.prepare_process(str(tmp_path / 'counter.bas'))
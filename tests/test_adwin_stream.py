@@ -0,0 +1,96 @@
+"""
+Tests for streaming ADwin FIFOs into a NumPy ring buffer.
+"""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.core.adwin_stream import FifoStream
+
+
+class FakeFifoDevice:
+    """ADwin FIFO Data_3 of a given size that the test fills like a running ADbasic process"""
+
+    def __init__(self, size=100):
+        self.size = size
+        self.fifo = []
+        self.lock = threading.Lock()
+        self.cleared = 0
+
+    def push(self, values):
+        with self.lock:
+            self.fifo.extend(values)
+
+    def fifo_levels(self, Data_id):
+        with self.lock:
+            return len(self.fifo), self.size - len(self.fifo)
+
+    def read_fifo_into(self, Data_id, out, offset=0, length=None):
+        with self.lock:
+            view = out[offset:offset + length]
+            view[:] = self.fifo[:length]
+            del self.fifo[:length]
+            return view
+
+    def clear_fifo(self, Data_id):
+        self.cleared += 1
+        with self.lock:
+            self.fifo = []
+
+
+def test_records_are_read_in_order_across_the_ring_buffer():
+    device = FakeFifoDevice()
+    device.push([-1, -1])  # left over from an earlier run, cleared when the stream starts
+    chunks = []
+    with FifoStream(device, 3, record_size=2, capacity=7, chunk_size=3, poll_interval=0.001) as stream:
+        stream.subscribe(chunks.append)
+        assert device.cleared == 1
+        for i in range(4):
+            device.push([i, 10 * i])
+        assert stream.read(4, timeout=2).tolist() == [[i, 10 * i] for i in range(4)]
+        for i in range(4, 10):
+            device.push([i, 10 * i])
+        assert stream.read(6, timeout=2).tolist() == [[i, 10 * i] for i in range(4, 10)]
+        with pytest.raises(TimeoutError):
+            stream.read(1, timeout=0.05)
+        device.push([10])  # half a record stays in the FIFO
+        assert stream.wait(10, timeout=0.1)
+        assert not stream.wait(11, timeout=0.05)
+
+    assert not stream.is_running
+    assert stream.num_records == 10
+    assert stream.latest(3)[:, 0].tolist() == [7, 8, 9]
+    streamed = np.concatenate([chunk.data for chunk in chunks])
+    assert streamed[:, 0].tolist() == list(range(10))
+    assert [chunk.first_record for chunk in chunks] == list(np.cumsum([0] + [len(c.data) for c in chunks[:-1]]))
+    assert all(len(chunk.data) <= 3 for chunk in chunks)
+
+
+def test_overruns_are_reported():
+    device = FakeFifoDevice(size=4)
+    device.push([1, 2, 3, 4])  # full FIFO
+    stream = FifoStream(device, 3, capacity=4, clear=False, poll_interval=0.001).start()
+    assert stream.wait(4, timeout=2)
+    device.push([5, 6, 7])
+    assert stream.wait(7, timeout=2)
+    stream.stop()
+    assert stream.fifo_overruns == 1
+    # read() fell behind by more than the capacity, the oldest records were overwritten
+    assert stream.read(4, timeout=0).tolist() == [4, 5, 6, 7]
+    assert stream.lost_records == 3
+    assert stream.status()['fifo_overruns'] == 1
+
+
+def test_errors_stop_the_stream():
+    device = FakeFifoDevice()
+
+    def broken(Data_id):
+        raise IOError('ADwin not responding')
+
+    device.fifo_levels = broken
+    stream = FifoStream(device, 3, poll_interval=0.001).start()
+    with pytest.raises(RuntimeError, match='not responding'):
+        stream.read(1, timeout=2)
+    assert isinstance(stream.error, IOError)
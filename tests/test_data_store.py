@@ -0,0 +1,127 @@
+"""
+Tests for the preallocated DataStore used as Experiment.data.
+"""
+
+import copy
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from src.core.data_store import DataField, DataStore
+from src.core.experiment import Experiment
+from src.core.parameter import Parameter
+from src.core.save_pipeline import snapshot
+
+
+@pytest.fixture
+def store():
+    return DataStore([
+        DataField('x_pos', (4,)),
+        DataField('img', (4, 3), fill_value=0),
+        DataField('counts', (4, 3), int)
+    ])
+
+
+def test_fields_are_preallocated(store):
+    assert store['x_pos'].shape == (4,)
+    assert np.all(np.isnan(store['x_pos']))
+    assert store['img'].dtype == np.float64
+    assert np.all(store['img'] == 0)
+    assert store['counts'].dtype == np.dtype(int)
+    assert store.progress == 0
+
+
+def test_write_is_in_place_and_tracks_progress(store):
+    img = store['img']
+    store.write('img', 1, [1, 2, 3])
+    store.append('x_pos', 0.5)
+
+    assert store['img'] is img
+    assert np.array_equal(img[1], [1, 2, 3])
+    assert store.filled('img') == 2
+    assert store.filled('x_pos') == 1
+    assert store.progress == pytest.approx(3 / 12)
+
+    for value in [1.5, 2.5, 3.5]:
+        store.append('x_pos', value)
+    with pytest.raises(IndexError):
+        store.append('x_pos', 4.5)
+
+
+def test_views_are_read_only_and_trimmed(store):
+    store.append('x_pos', 1.0)
+    store.append('x_pos', 2.0)
+
+    view = store.view('x_pos')
+    assert np.array_equal(view, [1.0, 2.0])
+    with pytest.raises(ValueError):
+        view[0] = 5
+
+    # views share memory with the store
+    store.append('x_pos', 3.0)
+    assert store.view('x_pos', filled_only=False)[2] == 3.0
+    assert store['x_pos'].flags.writeable
+
+
+def test_assignment_copies_into_field(store):
+    img = store['img']
+    store['img'] = np.ones((4, 3))
+    assert store['img'] is img
+    assert store.filled('img') == 4
+    with pytest.raises(ValueError):
+        store['img'] = np.ones((2, 3))
+
+    store['fit'] = [1, 2]
+    assert store.extras == {'fit': [1, 2]}
+
+
+def test_copy_and_pickle_are_independent(store):
+    store.append('x_pos', 1.0)
+    for copied in [store.copy(), copy.deepcopy(store), pickle.loads(pickle.dumps(store)), snapshot(store)]:
+        assert isinstance(copied, DataStore)
+        assert copied.filled('x_pos') == 1
+        store['x_pos'][0] = 7.0
+        assert copied['x_pos'][0] == 1.0
+        store['x_pos'][0] = 1.0
+
+
+class StoreExperiment(Experiment):
+    """Experiment that fills a DataStore line by line."""
+
+    _DEFAULT_SETTINGS = [
+        Parameter('lines', 3, int, 'number of lines')
+    ]
+
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        lines = self.settings['lines']
+        self.data = DataStore([
+            DataField('x_pos', (lines + 2,)),
+            DataField('count_img', (lines + 2, 4), fill_value=0)
+        ])
+        self.data['y_pos'] = np.arange(4)
+        for i in range(lines):
+            self.data.write('x_pos', i, i)
+            self.data.write('count_img', i, np.full(4, i))
+
+    def _render_images(self):
+        return [None, None]
+
+
+def test_experiment_saves_filled_rows(tmp_path):
+    experiment = StoreExperiment(settings={'path': str(tmp_path), 'save': True})
+    experiment.run()
+
+    raw_data = os.path.join(experiment.filename(), Experiment.RAW_DATA_DIR)
+    files = sorted(os.listdir(raw_data))
+    assert any(f.endswith('-x_pos.csv') for f in files)
+    assert any(f.endswith('-count_img.csv') for f in files)
+    assert os.path.exists(experiment.filename('.mat'))
+
+    loaded = Experiment.load_data(experiment.filename())
+    assert np.shape(loaded['count_img']) == (3, 4)
+    assert np.array_equal(np.ravel(loaded['x_pos']), [0, 1, 2])
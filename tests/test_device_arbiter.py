@@ -0,0 +1,135 @@
+"""
+Tests for the per-device priority lock and the coalescing of probe reads.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.core import Device, Parameter
+from src.core.device_arbiter import EXPERIMENT, GUI, PROBE, DeviceArbiter, device_priority, get_arbiter
+
+
+class CountingDevice(Device):
+    _DEFAULT_SETTINGS = Parameter([Parameter('frequency', 1.0, float, 'frequency')])
+    _PROBES = {'power': 'power', 'temperature': 'temperature', 'current': 'current'}
+
+    def __init__(self, name=None, settings=None):
+        self.bulk_reads = []
+        self.update_started = threading.Event()
+        self.update_release = threading.Event()
+        self.update_release.set()
+        super().__init__(name, settings)
+
+    def update(self, settings):
+        self.update_started.set()
+        self.update_release.wait(10)
+        super().update(settings)
+
+    def read_probes(self, key=None):
+        if key is None:
+            return self.read_probes_many()
+        return float(len(key))
+
+    def _read_probes_many(self, keys):
+        self.bulk_reads.append(list(keys))
+        return {key: self.read_probes(key) for key in keys}
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.005)
+
+
+def test_waiting_calls_are_served_by_priority():
+    arbiter = DeviceArbiter('sg384')
+    order = []
+
+    def call(priority):
+        with arbiter.access(priority, 'call'):
+            order.append(priority)
+
+    assert arbiter.acquire(GUI, 'edit')
+    assert arbiter.acquire(GUI, 'nested')  # reentrant
+    threads = []
+    try:
+        for priority in (PROBE, GUI, EXPERIMENT):
+            thread = threading.Thread(target=call, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            _wait_for(lambda: sum(arbiter.status()['waiting'].values()) == len(threads))
+        status = arbiter.status()
+        assert status['busy'] and status['priority'] == 'gui' and status['operation'] == 'edit'
+        assert status['waiting'] == {'experiment': 1, 'gui': 1, 'probe': 1}
+        arbiter.release()
+        assert arbiter.is_busy
+    finally:
+        while arbiter.held_by_current_thread:
+            arbiter.release()
+        for thread in threads:
+            thread.join(5)
+    assert order == [EXPERIMENT, GUI, PROBE]
+    assert not arbiter.status()['busy']
+
+
+def test_acquire_timeout():
+    arbiter = DeviceArbiter()
+    holder = threading.Thread(target=lambda: arbiter.acquire(EXPERIMENT))
+    holder.start()
+    holder.join()
+    assert arbiter.acquire(PROBE, timeout=0.05) is False
+    assert arbiter.status()['waiting']['probe'] == 0
+
+
+def test_probe_reads_wait_for_experiment_and_are_coalesced():
+    device = CountingDevice(name='adwin')
+    arbiter = get_arbiter(device)
+    results = {}
+
+    def experiment():
+        with device_priority(EXPERIMENT):
+            device.update({'frequency': 2.0})
+
+    def poll(key):
+        with device_priority(PROBE):
+            results[key] = device.read_probes_many([key, 'power'], max_age=0)
+
+    device.update_release.clear()
+    threads = [threading.Thread(target=experiment)]
+    try:
+        threads[0].start()
+        assert device.update_started.wait(5)
+        status = device.busy_status
+        assert status['busy'] and status['priority'] == 'experiment' and status['operation'] == 'update'
+
+        for key in ('temperature', 'current', 'power'):
+            threads.append(threading.Thread(target=poll, args=(key,)))
+            threads[-1].start()
+        _wait_for(lambda: arbiter.num_coalesced == 2)
+        assert device.bulk_reads == []
+    finally:
+        device.update_release.set()
+        for thread in threads:
+            thread.join(5)
+
+    assert device.settings['frequency'] == 2.0
+    assert len(device.bulk_reads) == 1
+    assert sorted(device.bulk_reads[0]) == ['current', 'power', 'temperature']
+    assert results['temperature'] == {'temperature': 11.0, 'power': 5.0}
+    assert results['current'] == {'current': 7.0, 'power': 5.0}
+    assert not device.busy_status['busy']
+
+
+def test_read_errors_reach_all_coalesced_callers():
+    arbiter = DeviceArbiter()
+
+    def failing_read(keys):
+        raise IOError('instrument not responding')
+
+    with pytest.raises(IOError):
+        arbiter.read_coalesced(['power'], failing_read, PROBE)
+    assert not arbiter.is_busy
+    assert arbiter.read_coalesced(['power'], lambda keys: {key: 1.0 for key in keys}, PROBE) == {'power': 1.0}
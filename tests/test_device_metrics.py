@@ -0,0 +1,107 @@
+"""
+Tests for the per-device call counters and latency histograms.
+"""
+
+import time
+
+import numpy as np
+import pytest
+
+from src.core import Device, Parameter
+from src.core.device_metrics import DeviceMetrics, LatencyHistogram, get_device_metrics
+from src.core.experiment import Experiment
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    get_device_metrics().reset()
+    yield
+    get_device_metrics().reset()
+
+
+class SlowDevice(Device):
+    _DEFAULT_SETTINGS = Parameter([Parameter('frequency', 1.0, float, 'frequency')])
+    _PROBES = {'power': 'measured power', 'temperature': 'temperature'}
+
+    def update(self, settings):
+        time.sleep(0.002)
+        super().update(settings)
+
+    def read_probes(self, key=None):
+        if key is None:
+            return {k: self.read_probes(k) for k in self._PROBES}
+        if key == 'temperature':
+            raise ValueError('sensor not connected')
+        return 1.0
+
+
+class FasterSlowDevice(SlowDevice):
+    def update(self, settings):
+        # calls the instrumented update of the parent class, which must not be counted again
+        super().update(settings)
+
+
+def test_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for seconds in np.linspace(0.001, 0.1, 1000):
+        histogram.add(seconds)
+    assert histogram.count == 1000
+    assert histogram.mean == pytest.approx(0.0505)
+    assert histogram.percentile(50) == pytest.approx(0.0505, rel=0.15)
+    assert histogram.percentile(90) == pytest.approx(0.0901, rel=0.15)
+    assert histogram.percentile(100) == pytest.approx(0.1)
+    assert histogram.percentile(0) >= 0.001
+
+    earlier = histogram.copy()
+    histogram.add(5.0, error=True)
+    since = histogram.subtract(earlier)
+    assert since.count == 1 and since.errors == 1
+    assert since.percentile(50) == pytest.approx(5.0, rel=0.15)
+
+
+def test_device_calls_are_counted_once():
+    device = FasterSlowDevice(name='mw')
+    for _ in range(5):
+        device.update({'frequency': 2.0})
+    assert device.read_probes('power') == 1.0
+    for key in (None, 'temperature'):
+        with pytest.raises(ValueError):
+            device.read_probes(key)
+
+    summary = get_device_metrics().summary('mw')
+    assert summary['mw']['update']['count'] == 5
+    assert summary['mw']['update']['p50'] >= 0.002
+    assert summary['mw']['read_probes']['count'] == 3
+    assert summary['mw']['read_probes']['errors'] == 2
+
+
+def test_summary_since_snapshot_and_table():
+    metrics = DeviceMetrics()
+    metrics.record('adwin', 'read_probes', 0.01)
+    before = metrics.snapshot()
+    metrics.record('adwin', 'read_probes', 0.02)
+    metrics.record('sg384', 'update', 0.5)
+    summary = metrics.summary(since=before)
+    assert summary['adwin']['read_probes']['count'] == 1
+    assert summary['sg384']['update']['count'] == 1
+
+    lines = metrics.format_table()
+    assert len(lines) == 3
+    assert lines[1].split()[0] == 'sg384'
+
+
+class MetricsExperiment(Experiment):
+    _DEFAULT_SETTINGS = []
+    _DEVICES = {'device': SlowDevice}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        self.devices['device'].update({'frequency': 3.0})
+
+
+def test_run_writes_device_calls_to_log():
+    experiment = MetricsExperiment(devices={'device': SlowDevice(name='slow')}, name='metrics')
+    experiment.run()
+    log = list(experiment.log_data)
+    assert 'device calls during this run:' in log
+    assert any(line.startswith('slow') and ' update ' in line for line in log)
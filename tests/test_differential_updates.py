@@ -0,0 +1,101 @@
+"""
+Tests for the differential device updates, which only send settings that differ from the confirmed state.
+"""
+
+import pytest
+
+from src.core import Device, Parameter
+from src.core.device import settings_match
+from src.core.device_metrics import get_device_metrics
+
+
+class RecordingDevice(Device):
+    _DEFAULT_SETTINGS = Parameter([
+        Parameter('frequency', 2.87e9, float, 'frequency in Hz'),
+        Parameter('power', -10.0, float, 'power in dBm'),
+        Parameter('phase', 0.0, float, 'phase in degrees'),
+        Parameter('clock', [
+            Parameter('mode', 'low', ['low', 'high'], 'clock mode'),
+            Parameter('pulse', False, bool, 'writing triggers a pulse')
+        ])
+    ])
+    _DIFFERENTIAL_UPDATES = True
+    _ALWAYS_SEND = ('pulse',)
+    _INVALIDATES = {'frequency': ('phase',)}
+    _PARAMETER_TOLERANCES = {'frequency': {'type': 'relative', 'value': 1e-4},
+                             'power': {'type': 'absolute', 'value': 0.1}}
+
+    def __init__(self, name=None, settings=None):
+        self.writes = []
+        self.fail = False
+        super().__init__(name, settings)
+
+    def update(self, settings):
+        super().update(settings)
+        if self._settings_initialized:
+            if self.fail:
+                raise IOError('instrument not responding')
+            self.writes.append(settings)
+
+
+def test_only_changed_settings_are_sent():
+    device = RecordingDevice(name='mw_diff')
+    device.update({'frequency': 2.8e9, 'power': -5.0})
+    device.update({'frequency': 2.8e9, 'power': -5.0})
+    device.update({'frequency': 2.8e9, 'power': -4.0})
+    assert device.writes == [{'frequency': 2.8e9, 'power': -5.0}, {'power': -4.0}]
+    assert device.update_statistics == {'sent': 3, 'skipped': 3}
+
+    summary = get_device_metrics().summary('mw_diff')['mw_diff']
+    assert summary['update']['count'] == 2
+    assert summary['update_skipped']['count'] == 1
+
+
+def test_tolerances_nested_settings_and_always_send():
+    device = RecordingDevice()
+    device.update({'power': -5.0, 'clock': {'mode': 'high', 'pulse': True}})
+    device.writes.clear()
+
+    # within the tolerance, the settings still show the requested value
+    device.update({'power': -5.05})
+    assert device.writes == []
+    assert device.settings['power'] == -5.05
+
+    device.update({'clock': {'mode': 'high', 'pulse': True}})
+    assert device.writes == [{'clock': {'pulse': True}}]
+
+
+def test_confirmed_settings_are_forgotten():
+    device = RecordingDevice()
+    device.update({'frequency': 2.8e9, 'phase': 90.0})
+    device.writes.clear()
+
+    # the instrument resets the phase when the frequency changes
+    device.update({'frequency': 2.9e9, 'phase': 90.0})
+    device.update({'phase': 90.0})
+    device.update({'frequency': 2.8e9})
+    device.update({'phase': 90.0})
+    assert device.writes == [{'frequency': 2.9e9, 'phase': 90.0}, {'frequency': 2.8e9}, {'phase': 90.0}]
+    device.writes.clear()
+
+    device.fail = True
+    with pytest.raises(IOError):
+        device.update({'frequency': 3.0e9})
+    device.fail = False
+    device.update({'frequency': 3.0e9, 'power': -10.0})
+    device.update({'frequency': 3.0e9, 'power': -10.0})
+    assert device.writes == [{'frequency': 3.0e9, 'power': -10.0}]
+    device.writes.clear()
+
+    device.forget_confirmed_settings()
+    device.update({'frequency': 3.0e9})
+    assert device.writes == [{'frequency': 3.0e9}]
+
+
+def test_settings_match():
+    assert settings_match(1.0, 1.0)
+    assert not settings_match(1.0, 1.0 + 1e-12)
+    assert settings_match(1e-7, 0.0, {'type': 'relative', 'value': 1e-3})
+    assert not settings_match(True, 1)
+    assert settings_match([1, 2, 3], [1, 2, 3])
+    assert not settings_match('low', 'high')
@@ -435,6 +435,37 @@ class TestGUIButtons:
         # Verify no crash occurred and button remains enabled
         assert main_window.btn_start_experiment.isEnabled()
         
+    def test_device_update_runs_on_worker(self, main_window, app):
+        """Test that a device update from the settings tree does not run on the GUI thread"""
+        from src.View.windows_and_widgets.main_window import DeviceUpdateWorker
+        gui_thread = QtCore.QThread.currentThread()
+        update_threads = []
+
+        mock_device = Mock()
+        mock_device.name = "TestDevice"
+        mock_device.settings = {"TestParameter": "new_value"}
+
+        def update(settings):
+            # like _update_device_with_validation, for devices without get_feedback_only
+            update_threads.append(QtCore.QThread.currentThread())
+
+        mock_item = Mock()
+        mock_item.name = "TestParameter"
+        feedback_threads = []
+        with patch.object(main_window, '_provide_parameter_feedback',
+                          side_effect=lambda *args: feedback_threads.append(QtCore.QThread.currentThread())):
+            worker = DeviceUpdateWorker(mock_item, mock_device, ["TestParameter"], "new_value", "old_value",
+                                        update, {"TestParameter": "new_value"})
+            worker.signals.finished.connect(main_window._device_update_finished)
+            worker.signals.failed.connect(main_window._device_update_failed)
+            main_window._device_update_pool.start(worker)
+            assert main_window._device_update_pool.waitForDone(5000)
+            QTest.qWait(100)
+
+        assert update_threads and update_threads[0] is not gui_thread
+        # the feedback is shown on the GUI thread
+        assert feedback_threads == [gui_thread]
+
     def test_gui_logging_functionality(self, main_window):
         """Test that GUI logging is working correctly"""
         import logging
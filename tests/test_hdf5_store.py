@@ -0,0 +1,122 @@
+"""
+Tests for the incremental HDF5 data store and its use from Experiment._function.
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+from src.core.experiment import Experiment
+from src.core.hdf5_store import HDF5DataStore, load_store
+from src.core.parameter import Parameter
+
+
+class LineScanExperiment(Experiment):
+    """Experiment that streams one row per line to the store."""
+
+    _DEFAULT_SETTINGS = [
+        Parameter('lines', 7, int, 'number of lines'),
+        Parameter('points', 4, int, 'points per line')
+    ]
+
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        self.open_store(flush_every=3)
+        self.store.declare('count_img', row_shape=(self.settings['points'],))
+        for i in range(self.settings['lines']):
+            self.store.append('count_img', np.full(self.settings['points'], i))
+        self.data = {'lines': self.settings['lines']}
+
+
+def test_append_flushes_every_n_rows(tmp_path):
+    filename = tmp_path / 'store.h5'
+    store = HDF5DataStore(filename, flush_every=3)
+    store.declare('line', row_shape=(2,))
+
+    store.append('line', [0, 1])
+    store.append('line', [2, 3])
+    assert store._datasets['line'].shape[0] == 0
+    assert store.num_rows('line') == 2
+
+    store.append('line', [4, 5])
+    assert store._datasets['line'].shape[0] == 3
+
+    store.append('line', [6, 7])
+    assert np.array_equal(store.read('line'), np.arange(8).reshape(4, 2))
+    store.close()
+
+    assert np.array_equal(load_store(filename)['line'], np.arange(8).reshape(4, 2))
+
+
+def test_datasets_are_chunked_and_compressed(tmp_path):
+    filename = tmp_path / 'store.h5'
+    with HDF5DataStore(filename, flush_every=5) as store:
+        store.declare('line', row_shape=(10,), dtype='i4')
+        store.extend('line', np.ones((12, 10)))
+
+    with h5py.File(filename, 'r') as f:
+        dataset = f['line']
+        assert dataset.chunks == (5, 10)
+        assert dataset.compression == 'gzip'
+        assert dataset.maxshape == (None, 10)
+        assert dataset.dtype == np.dtype('i4')
+        assert dataset.shape == (12, 10)
+
+
+def test_append_declares_from_first_row_and_checks_shape(tmp_path):
+    with HDF5DataStore(tmp_path / 'store.h5', flush_every=2) as store:
+        store.append('value', 1.5)
+        assert store._datasets['value'].shape == (0,)
+        with pytest.raises(ValueError):
+            store.append('value', [1.0, 2.0])
+
+        store.append('value', 2.5)
+        # the first flush switched the file to SWMR mode, no new datasets from now on
+        with pytest.raises(RuntimeError):
+            store.append('other', 1.0)
+
+
+def test_settings_are_stored(tmp_path):
+    filename = tmp_path / 'store.h5'
+    with HDF5DataStore(filename) as store:
+        store.write_settings({'tag': 'scan', 'points': 4})
+        store.append('value', 1.0)
+
+    with h5py.File(filename, 'r') as f:
+        assert 'settings' in f
+
+
+def test_second_process_reads_while_writing(tmp_path):
+    filename = tmp_path / 'store.h5'
+    store = HDF5DataStore(filename, flush_every=2)
+    store.declare('line', row_shape=(3,))
+    store.extend('line', np.ones((5, 3)))
+
+    reader = textwrap.dedent(f"""
+        from src.core.hdf5_store import load_store
+        print(load_store({str(filename)!r})['line'].shape[0])
+    """)
+    result = subprocess.run([sys.executable, '-c', reader], capture_output=True, text=True,
+                            cwd=Path(__file__).resolve().parents[1], timeout=60)
+    store.close()
+
+    assert result.returncode == 0, result.stderr
+    # the fifth row is still buffered in the writer
+    assert result.stdout.strip().splitlines()[-1] == '4'
+
+
+def test_experiment_streams_to_store(tmp_path):
+    experiment = LineScanExperiment(settings={'path': str(tmp_path), 'save': False})
+    experiment.run()
+
+    assert experiment.store is None
+    rows = load_store(experiment.filename('.h5'))['count_img']
+    assert rows.shape == (7, 4)
+    assert np.array_equal(rows[:, 0], np.arange(7))
@@ -595,6 +595,59 @@ class TestMCLNanoDriveHardware:
         print("Safe move_to method test passed")
 
 
+@pytest.fixture
+def waveform_nanodrive():
+    """NanoDrive on a mocked DLL for the waveform upload tests."""
+    with patch('src.Controller.nanodrive.windll') as mock_windll:
+        mock_dll = Mock()
+        mock_windll.LoadLibrary.return_value = mock_dll
+        mock_dll.MCL_GetHandleBySerial.return_value = 12345
+        mock_dll.MCL_SingleReadN.return_value = 0.0
+        mock_dll.MCL_Setup_LoadWaveFormN.return_value = 0
+        mock_dll.MCL_LoadWaveFormN.return_value = 0
+        yield MCLNanoDrive(settings={'serial': 2849})
+
+
+def test_numpy_waveform_is_passed_without_copy(waveform_nanodrive):
+    """Test that a float64 waveform reaches the DLL as a pointer to the array itself."""
+    nd = waveform_nanodrive
+    wf = np.linspace(0.0, 10.0, 50)
+
+    nd.update({'axis': 'y', 'num_datapoints': len(wf), 'load_waveform': wf})
+    pointer = nd.DLL.MCL_LoadWaveFormN.call_args.args[3]
+    assert ctypes.cast(pointer, ctypes.c_void_p).value == wf.ctypes.data
+    assert nd.settings['load_waveform'] == [0]  # arrays are not copied into the settings
+
+    nd.setup({'num_datapoints': len(wf), 'load_waveform': list(wf)}, axis='x')
+    pointer = nd.DLL.MCL_Setup_LoadWaveFormN.call_args.args[3]
+    assert np.ctypeslib.as_array(pointer, shape=(len(wf),)).tolist() == wf.tolist()
+
+
+def test_identical_waveform_is_set_up_once(waveform_nanodrive):
+    """Test that setting up the same waveform on an axis again does not upload it again."""
+    nd = waveform_nanodrive
+    setup = nd.DLL.MCL_Setup_LoadWaveFormN
+    wf = np.linspace(0.0, 10.0, 50)
+
+    for _ in range(3):
+        nd.setup({'num_datapoints': len(wf), 'load_waveform': wf}, axis='y')
+    assert setup.call_count == 1 and nd.set_load_waveform
+
+    nd.setup({'num_datapoints': len(wf), 'load_waveform': wf}, axis='x')  # other axis
+    nd.setup({'num_datapoints': len(wf), 'load_waveform': wf + 1.0}, axis='y')  # other values
+    nd.setup({'load_rate': 1.0, 'num_datapoints': len(wf), 'load_waveform': wf + 1.0}, axis='y')  # other rate
+    assert setup.call_count == 4
+
+    # a waveform loaded with update replaces the set up one
+    nd.update({'axis': 'y', 'num_datapoints': len(wf), 'load_waveform': wf})
+    nd.setup({'num_datapoints': len(wf), 'load_waveform': wf + 1.0}, axis='y')
+    assert setup.call_count == 5
+
+    nd.forget_waveforms()
+    nd.setup({'num_datapoints': len(wf), 'load_waveform': wf + 1.0}, axis='y')
+    assert setup.call_count == 6
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
@@ -131,15 +131,15 @@ class TestNanodriveAdwinConfocalPoint:
         mock_nanodrive = mock_devices['nanodrive']['instance']
         
         # Mock the binary file path
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Averagable_Trial_Counter.TB1')
             
             experiment.setup()
             
             # Check that adwin methods were called
-            mock_adwin.stop_process.assert_called_with(1)
-            mock_adwin.clear_process.assert_called_with(1)
-            mock_adwin.update.assert_called()
+            # the binary stays loaded and is reset instead of cleared and reloaded
+            mock_adwin.prepare_process.assert_called_once_with(str(mock_path.return_value), pars=[1, 2, 5])
+            mock_adwin.clear_process.assert_not_called()
             
             # Check that nanodrive methods were called
             mock_nanodrive.clock_functions.assert_called_with('Frame', reset=True)
@@ -151,7 +151,7 @@ class TestNanodriveAdwinConfocalPoint:
         experiment.cleanup()
         
         mock_adwin.stop_process.assert_called_with(1)
-        mock_adwin.clear_process.assert_called_with(1)
+        mock_adwin.clear_process.assert_not_called()
     
     def test_device_attributes(self, experiment):
         """Test that device attributes are correctly set."""
@@ -227,7 +227,7 @@ class TestMockHardwareIntegration:
         )
         
         # Test setup
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Averagable_Trial_Counter.TB1')
             experiment.setup()
         
@@ -238,8 +238,9 @@ class TestMockHardwareIntegration:
         mock_adwin = mock_devices['adwin']['instance']
         mock_nanodrive = mock_devices['nanodrive']['instance']
         
+        mock_adwin.prepare_process.assert_called()
         mock_adwin.stop_process.assert_called()
-        mock_adwin.clear_process.assert_called()
+        mock_adwin.clear_process.assert_not_called()
         mock_nanodrive.clock_functions.assert_called()
         # Note: update() is called in _function(), not in setup()
     
@@ -261,7 +262,7 @@ class TestMockHardwareIntegration:
         experiment._abort = False
         
         # Test that the experiment can be set up for continuous counting
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Averagable_Trial_Counter.TB1')
             experiment.setup()
         
@@ -286,7 +287,7 @@ class TestMockHardwareIntegration:
         experiment.settings['count_time'] = 1.0
         
         # Test that the experiment can be set up for single measurement
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_point.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Averagable_Trial_Counter.TB1')
             experiment.setup()
         
@@ -111,15 +111,15 @@ class TestNanodriveAdwinConfocalScanFast:
         mock_nanodrive = mock_devices['nanodrive']['instance']
         
         # Mock the binary file path
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_fast.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_fast.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/One_D_Scan.TB2')
             
             experiment.setup_scan()
             
             # Check that adwin methods were called
-            mock_adwin.stop_process.assert_called_with(2)
-            mock_adwin.clear_process.assert_called_with(2)
-            mock_adwin.update.assert_called()
+            # the binary stays loaded and is reset instead of cleared and reloaded
+            mock_adwin.prepare_process.assert_called_once_with(str(mock_path.return_value), data={1: np.int32}, reboot=False)
+            mock_adwin.clear_process.assert_not_called()
             
             # Check that nanodrive methods were called
             mock_nanodrive.clock_functions.assert_called_with('Frame', reset=True)
@@ -135,7 +135,7 @@ class TestNanodriveAdwinConfocalScanFast:
         experiment.after_scan()
         
         mock_adwin.stop_process.assert_called_with(2)
-        mock_adwin.clear_process.assert_called_with(2)
+        mock_adwin.clear_process.assert_not_called()
         mock_nanodrive.update.assert_called_with({'x_pos': 0.0, 'y_pos': 0.0})
     
     def test_after_scan_return_to_initial(self, experiment, mock_devices):
@@ -342,7 +342,7 @@ class TestMockHardwareIntegration:
         )
         
         # Test setup
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_fast.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_fast.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/One_D_Scan.TB2')
             experiment.setup_scan()
         
@@ -353,8 +353,9 @@ class TestMockHardwareIntegration:
         mock_adwin = mock_hardware_setup['adwin']['instance']
         mock_nanodrive = mock_hardware_setup['nanodrive']['instance']
         
+        mock_adwin.prepare_process.assert_called()
         mock_adwin.stop_process.assert_called()
-        mock_adwin.clear_process.assert_called()
+        mock_adwin.clear_process.assert_not_called()
         mock_nanodrive.clock_functions.assert_called()
         mock_nanodrive.update.assert_called()
 
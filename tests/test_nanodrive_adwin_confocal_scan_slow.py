@@ -112,15 +112,15 @@ class TestNanodriveAdwinConfocalScanSlow:
         mock_nanodrive = mock_devices['nanodrive']['instance']
         
         # Mock the binary file path
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Trial_Counter.TB1')
             
             experiment.setup_scan()
             
             # Check that adwin methods were called
-            mock_adwin.stop_process.assert_called_with(1)
-            mock_adwin.clear_process.assert_called_with(1)
-            mock_adwin.update.assert_called()
+            # the binary stays loaded and is reset instead of cleared and reloaded
+            mock_adwin.prepare_process.assert_called_once_with(str(mock_path.return_value), pars=[1], reboot=False)
+            mock_adwin.clear_process.assert_not_called()
             
             # Check that nanodrive methods were called
             mock_nanodrive.clock_functions.assert_called_with('Frame', reset=True)
@@ -136,7 +136,7 @@ class TestNanodriveAdwinConfocalScanSlow:
         experiment.after_scan()
         
         mock_adwin.stop_process.assert_called_with(1)
-        mock_adwin.clear_process.assert_called_with(1)
+        mock_adwin.clear_process.assert_not_called()
         mock_nanodrive.update.assert_called_with({'x_pos': 0.0, 'y_pos': 0.0})
     
     def test_after_scan_return_to_initial(self, experiment, mock_devices):
@@ -181,7 +181,7 @@ class TestNanodriveAdwinConfocalScanSlow:
         
         # Test z position below 0
         experiment.settings['z_pos'] = -10.0
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Trial_Counter.TB1')
             experiment.setup_scan()
             
@@ -190,7 +190,7 @@ class TestNanodriveAdwinConfocalScanSlow:
         
         # Test z position above 100
         experiment.settings['z_pos'] = 150.0
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Trial_Counter.TB1')
             experiment.setup_scan()
             
@@ -199,7 +199,7 @@ class TestNanodriveAdwinConfocalScanSlow:
         
         # Test z position in range
         experiment.settings['z_pos'] = 50.0
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Trial_Counter.TB1')
             experiment.setup_scan()
             
@@ -292,7 +292,7 @@ class TestMockHardwareIntegration:
         )
         
         # Test setup
-        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_binary_file_path') as mock_path:
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_adwin_binary_path') as mock_path:
             mock_path.return_value = Path('/fake/path/Trial_Counter.TB1')
             experiment.setup_scan()
         
@@ -303,8 +303,9 @@ class TestMockHardwareIntegration:
         mock_adwin = mock_hardware_setup['adwin']['instance']
         mock_nanodrive = mock_hardware_setup['nanodrive']['instance']
         
+        mock_adwin.prepare_process.assert_called()
         mock_adwin.stop_process.assert_called()
-        mock_adwin.clear_process.assert_called()
+        mock_adwin.clear_process.assert_not_called()
         mock_nanodrive.clock_functions.assert_called()
         mock_nanodrive.update.assert_called()
     
@@ -321,17 +322,13 @@ class TestMockHardwareIntegration:
         # Enable reboot
         experiment.settings['reboot_adwin'] = True
         
-        # Mock the _function method to test reboot
-        with patch.object(experiment, 'setup_scan'):
-            with patch.object(experiment, 'after_scan'):
-                # This would normally call _function, but we're testing the reboot logic
-                mock_adwin = mock_hardware_setup['adwin']['instance']
-                
-                # Simulate the reboot call that would happen in _function
-                if experiment.settings['reboot_adwin']:
-                    mock_adwin.reboot_adwin()
-                
-                mock_adwin.reboot_adwin.assert_called_once()
+        # The reboot is requested from prepare_process instead of the default warm start
+        mock_adwin = mock_hardware_setup['adwin']['instance']
+        with patch('src.Model.experiments.nanodrive_adwin_confocal_scan_slow.get_adwin_binary_path') as mock_path:
+            mock_path.return_value = Path('/fake/path/Trial_Counter.TB1')
+            experiment.setup_scan()
+
+        mock_adwin.prepare_process.assert_called_once_with(str(mock_path.return_value), pars=[1], reboot=True)
 
 
 class TestParameterValidation:
@@ -0,0 +1,119 @@
+"""
+Tests for the N-dimensional sweep of ExperimentIterator and the point ordering helpers.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+from scipy.io import loadmat
+
+from src.core import Parameter
+from src.core.experiment import Experiment
+from src.core.experiment_iterator import ExperimentIterator
+from src.core.sweep_order import count_changes, grid_points, raster_order, serpentine_order
+
+
+class SettingsRecorder(Experiment):
+    """Experiment that records the settings it was run with."""
+
+    _DEFAULT_SETTINGS = [
+        Parameter('power', 0.0, float, 'power in dBm'),
+        Parameter('position', [Parameter('z', 0.0, float, 'z position')]),
+        Parameter('points', 3, int, 'number of points')
+    ]
+
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def __init__(self, name=None, settings=None):
+        super().__init__(name=name, settings=settings)
+        self.history = []
+
+    def _function(self):
+        power = self.settings['power']
+        z = self.settings['position']['z']
+        self.history.append((power, z))
+        self.data = {'trace': np.full(self.settings['points'], power * 10 + z)}
+
+
+def make_sweep(**settings):
+    experiment = SettingsRecorder(name='recorder')
+    sweep_class = type('RecorderNDSweep', (ExperimentIterator,), {
+        '_EXPERIMENTS': {'recorder': SettingsRecorder},
+        '_DEVICES': {},
+        '_DEFAULT_SETTINGS': ExperimentIterator.get_default_settings(
+            {'recorder': SettingsRecorder}, [Parameter('recorder', 0, int, '')],
+            [Parameter('recorder', 1, int, '')], 'nd_sweep')
+    })
+    iterator = sweep_class(experiments={'recorder': experiment}, name='nd_sweep', settings=settings)
+    return iterator, experiment
+
+
+def test_serpentine_changes_one_axis_per_step():
+    points = serpentine_order([3, 2, 4])
+    assert len(points) == 24
+    assert len(set(points)) == 24
+    steps = np.abs(np.diff(np.array(points), axis=0))
+    assert np.all(steps.sum(axis=1) == 1)
+    assert raster_order([2, 2]) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+
+def test_slowest_axis_changes_least():
+    points = grid_points([4, 5], settle_times=[0.0, 2.0])
+    changes = count_changes(points)
+    assert changes[1] == 4
+    assert changes[0] == 15
+    assert sorted(points) == raster_order([4, 5])
+
+
+def test_iterator_type_detection():
+    assert ExperimentIterator.get_iterator_type({'iterator_type': 'N-D Parameter Sweep'}) == 'nd_sweep'
+    assert ExperimentIterator.get_iterator_type({'sweep_axes': {}, 'sweep_param': 'x'}) == 'nd_sweep'
+
+
+def test_grid_sweep_fills_labelled_cube(monkeypatch):
+    waits = []
+    monkeypatch.setattr('src.core.experiment_iterator.sleep', waits.append)
+    iterator, experiment = make_sweep(sweep_axes={
+        'axis_0': {'sweep_param': 'recorder.position.z', 'min_value': 0, 'max_value': 2, 'N': 3},
+        'axis_1': {'sweep_param': 'recorder.power', 'min_value': 1, 'max_value': 2, 'N': 2, 'settle_time': 1.0}
+    })
+    assert iterator.iterator_type == 'nd_sweep'
+    iterator._function()
+
+    assert len(experiment.history) == 6
+    # power has the larger settle time and only changes once
+    powers = [power for power, _ in experiment.history]
+    assert sum(a != b for a, b in zip(powers, powers[1:])) == 1
+    # the sweep waits for the power to settle at the first point and after its change
+    assert waits == [1.0, 1.0]
+
+    axes, cube = iterator.data.labelled_cube('recorder', 'trace')
+    assert list(axes.keys()) == ['recorder.position.z', 'recorder.power']
+    assert cube.shape == (3, 2, 3)
+    expected = np.add.outer(axes['recorder.position.z'], 10 * axes['recorder.power'])
+    assert np.allclose(cube[:, :, 0], expected)
+
+
+def test_zip_sweep_and_matlab_export(tmp_path):
+    iterator, experiment = make_sweep(combination='zip', sweep_axes={
+        'axis_0': {'sweep_param': 'recorder.position.z', 'min_value': 0, 'max_value': 3, 'N': 4},
+        'axis_1': {'sweep_param': 'recorder.power', 'min_value': 1, 'max_value': 4, 'N': 4}
+    })
+    iterator._function()
+    assert experiment.history == [(1.0, 0.0), (2.0, 1.0), (3.0, 2.0), (4.0, 3.0)]
+
+    iterator.start_time = datetime.datetime.now()
+    filename = str(tmp_path / 'sweep.mat')
+    iterator.save_data_to_matlab(filename)
+    assert 'data_nd_sweep' in loadmat(filename)
+
+
+def test_zip_sweep_requires_equal_lengths():
+    iterator, _ = make_sweep(combination='zip', sweep_axes={
+        'axis_0': {'sweep_param': 'recorder.position.z', 'N': 2},
+        'axis_1': {'sweep_param': 'recorder.power', 'N': 3}
+    })
+    with pytest.raises(ValueError):
+        iterator._function()
@@ -0,0 +1,80 @@
+"""
+Tests for the SG384 list mode scan of the stepped ODMR experiment, with mocked ADwin and SG384.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+
+from src.core.adwin_helpers import ODMR_LIST_MAX_VALUES, setup_adwin_for_list_odmr
+from src.Model.experiments.odmr_stepped import ODMRSteppedExperiment
+
+
+@pytest.fixture
+def experiment():
+    adwin = Mock()
+    microwave = Mock()
+    microwave.load_list.return_value = True
+    experiment = ODMRSteppedExperiment(devices={'microwave': microwave, 'adwin': adwin, 'nanodrive': None},
+                                       name='odmr_list',
+                                       settings={'frequency_range': {'start': 2.8e9, 'stop': 2.9e9, 'steps': 3},
+                                                 'microwave': {'list_mode': True, 'power': -5.0},
+                                                 'acquisition': {'averages': 2}})
+    experiment.logger = Mock()
+    experiment._generate_frequency_array()
+    experiment._initialize_data_arrays()
+    return experiment
+
+
+def snapshot(ready, points_done, sweeps_done):
+    return SimpleNamespace(pars={20: ready, 21: points_done, 22: sweeps_done}, fpars={})
+
+
+def test_list_scan_reads_counts_of_all_sweeps(experiment):
+    adwin, microwave = experiment.adwin, experiment.microwave
+    adwin.snapshot.side_effect = [snapshot(0, 1, 0), snapshot(0, 2, 1), snapshot(1, 3, 2)]
+    adwin.read_data.return_value = np.arange(6, dtype=np.int32)  # sweep 1: 0, 1, 2, sweep 2: 3, 4, 5
+    progress = []
+    experiment.updateProgress.connect(progress.append)
+
+    with patch('src.Model.experiments.odmr_stepped.time.sleep'):
+        experiment._run_list_scan()
+
+    frequencies, powers = microwave.load_list.call_args.args
+    assert np.allclose(frequencies, [2.8e9, 2.85e9, 2.9e9]) and powers.tolist() == [-5.0] * 3
+    microwave.enable_list.assert_called_once()
+    adwin.start_process.assert_called_once_with(1)
+    adwin.stop_process.assert_called_once_with(1)
+    microwave.disable_list.assert_called_once()
+    adwin.read_data.assert_called_once_with(1, 6)
+    assert experiment.counts_raw.tolist() == [[0, 3], [1, 4], [2, 5]]
+    assert experiment.counts.tolist() == [1.5, 2.5, 3.5]
+    assert progress == [16, 83]
+
+
+def test_list_scan_abort_stops_adwin_and_list(experiment):
+    experiment.adwin.snapshot.return_value = snapshot(0, 0, 0)
+    experiment._abort = True
+
+    experiment._run_list_scan()
+
+    experiment.adwin.stop_process.assert_called_once_with(1)
+    experiment.microwave.disable_list.assert_called_once()
+    experiment.adwin.read_data.assert_not_called()
+    assert not experiment.counts.any()
+
+
+def test_list_setup_rejects_scans_larger_than_data_1():
+    adwin = Mock()
+    with pytest.raises(ValueError):
+        setup_adwin_for_list_odmr(adwin, num_points=1001, num_sweeps=ODMR_LIST_MAX_VALUES // 1000)
+    with pytest.raises(ValueError):
+        setup_adwin_for_list_odmr(adwin, num_points=10, num_sweeps=0)
+    adwin.stop_process.assert_not_called()
+
+    # the binary is only built on the lab PC
+    with patch('src.core.adwin_helpers.get_adwin_binary_path', return_value='ODMR_List_Stepper.TB1'):
+        setup_adwin_for_list_odmr(adwin, num_points=1000, num_sweeps=ODMR_LIST_MAX_VALUES // 1000)
+    adwin.set_int_var.assert_any_call(4, 100)
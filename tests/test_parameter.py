@@ -764,5 +764,83 @@ class TestParameterPhase3Features:
         assert stats['conversion_cache_size'] <= 2
 
 
+
+class TestParameterCompiledValidation:
+    """Test the compiled validators and the bulk update."""
+
+    @staticmethod
+    def make_settings():
+        return Parameter([
+            Parameter('power', -10.0, float, 'Power', units='dBm'),
+            Parameter('mode', 'stepped', ['stepped', 'sweep'], 'Mode'),
+            Parameter('sweep', [
+                Parameter('start', 2.8e9, float, 'Start'),
+                Parameter('points', 10, int, 'Points')
+            ])
+        ])
+
+    def test_compiled_checks_match_is_valid(self):
+        """Test that assignment accepts and rejects the same values as is_valid."""
+        p = self.make_settings()
+        cases = [('power', 1), ('power', None), ('power', True), ('power', 'x'), ('mode', 'sweep'), ('mode', 'x'),
+                 ('sweep', {'points': 3}), ('sweep', {'points': 3.0}), ('sweep', {'other': 1}), ('sweep', {})]
+        for key, value in cases:
+            expected = Parameter.is_valid(value, p.valid_values[key])
+            try:
+                p[key] = value
+                accepted = True
+            except AssertionError:
+                accepted = False
+            assert accepted == expected, (key, value)
+
+    def test_update_validated_is_atomic(self):
+        """Test that update_validated changes nothing if one value is invalid."""
+        p = self.make_settings()
+        with pytest.raises(AssertionError):
+            p.update_validated({'power': 5.0, 'sweep': {'start': 2.9e9, 'points': 'many'}})
+        assert p['power'] == -10.0
+        assert p['sweep']['start'] == 2.8e9
+
+        p.update_validated({'power': 5.0, 'sweep': {'points': 20}})
+        assert p['power'] == 5.0
+        assert p['sweep']['points'] == 20
+        assert isinstance(p['sweep'], Parameter)
+
+    def test_validator_follows_replaced_valid_values(self):
+        """Test that replacing valid values or rules recompiles the validator."""
+        p = Parameter('voltage', 5.0, float, 'Voltage', min_value=0.0, max_value=10.0)
+        p['voltage'] = 8.0
+        p._validation_rules['voltage'] = {'range': {'min': 0.0, 'max': 6.0}}
+        with pytest.raises(ValidationError):
+            p['voltage'] = 8.0
+        p.valid_values['voltage'] = [1.0, 2.0]
+        with pytest.raises(ValidationError):
+            p['voltage'] = 3.0
+        p['voltage'] = 2.0
+
+    def test_array_values_are_not_cached(self):
+        """Test that unhashable values are validated without the cache."""
+        p = Parameter('trace', np.zeros(3), np.ndarray, 'Trace', validator=lambda value: len(value) < 5)
+        p['trace'] = np.ones(4)
+        with pytest.raises(ValidationError):
+            p['trace'] = np.ones(6)
+        assert p.get_cache_stats()['validation_cache_size'] == 0
+
+    def test_copy_keeps_metadata(self):
+        """Test that deepcopy restores the metadata and validation of the copy."""
+        import copy
+        import pickle
+        p = self.make_settings()
+        p['power'] = 1.0
+        for q in (copy.deepcopy(p), pickle.loads(pickle.dumps(p))):
+            assert q == p
+            assert q.units['power'] == 'dBm'
+            assert isinstance(q['sweep'], Parameter)
+            with pytest.raises(AssertionError):
+                q['sweep'] = {'points': 'many'}
+            q['sweep'] = {'points': 5}
+            assert p['sweep']['points'] == 10
+
+
 if __name__ == '__main__':
     pytest.main([__file__]) 
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Tests for the lazy plugin registry and its manifest cache.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from src.core.plugin_registry import PluginRegistry, lazy_attributes, scan_file
+
+DEVICE_FILE = '''
+from src.core import Device, Parameter
+
+class RegistryTestDevice(Device):
+    """device found by the scan"""
+    _DEFAULT_SETTINGS = Parameter([Parameter('frequency', 1.0, float, 'frequency')])
+    _PROBES = {}
+
+    def read_probes(self, key=None):
+        return None
+
+class DerivedRegistryTestDevice(RegistryTestDevice):
+    pass
+
+class Helper:
+    pass
+'''
+
+EXPERIMENT_FILE = '''
+from src.core import Experiment
+from registry_plugins.devices import RegistryTestDevice
+
+class RegistryTestExperiment(Experiment):
+    """experiment found by the scan"""
+    _DEFAULT_SETTINGS = []
+    _DEVICES = {'device': RegistryTestDevice}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        pass
+'''
+
+
+@pytest.fixture
+def plugin_folder(tmp_path, monkeypatch):
+    package = tmp_path / 'registry_plugins'
+    package.mkdir()
+    (package / '__init__.py').write_text('')
+    (package / 'devices.py').write_text(textwrap.dedent(DEVICE_FILE))
+    (package / 'experiments.py').write_text(textwrap.dedent(EXPERIMENT_FILE))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for name in [name for name in sys.modules if name.startswith('registry_plugins')]:
+        del sys.modules[name]
+
+
+def test_scan_file(plugin_folder):
+    classes = {entry['class']: entry for entry in scan_file(plugin_folder / 'experiments.py')}
+    entry = classes['RegistryTestExperiment']
+    assert entry['bases'] == ['Experiment']
+    assert entry['info'] == 'experiment found by the scan'
+    assert entry['has_default_settings']
+    assert entry['device_keys'] == ['device']
+    assert entry['experiment_keys'] == []
+
+
+def test_entries_follow_base_classes(plugin_folder):
+    registry = PluginRegistry({'device': [plugin_folder], 'experiment': [plugin_folder]}, manifest=None)
+    assert set(registry.entries('device')) == {'RegistryTestDevice', 'DerivedRegistryTestDevice'}
+    assert set(registry.entries('experiment')) == {'RegistryTestExperiment'}
+    assert registry.find('Helper') is None
+    assert 'registry_plugins.devices' not in sys.modules
+
+    exported = registry.export_dict('experiment', plugin_folder)
+    assert exported['RegistryTestExperiment']['filepath'] == str((plugin_folder / 'experiments.py').resolve())
+
+
+def test_manifest_is_reused_and_invalidated(plugin_folder, tmp_path):
+    folders = {'device': [plugin_folder], 'experiment': [plugin_folder]}
+    manifest = tmp_path / 'manifest.json'
+    registry = PluginRegistry(folders, manifest=manifest)
+    registry.refresh()
+    assert registry.num_scanned == 2 and manifest.exists()
+
+    registry = PluginRegistry(folders, manifest=manifest)
+    registry.refresh()
+    assert registry.num_scanned == 0
+    assert 'RegistryTestDevice' in registry.entries('device')
+
+    # touched but unchanged files are recognized by their hash
+    device_file = plugin_folder / 'devices.py'
+    stat = device_file.stat()
+    os.utime(device_file, (stat.st_atime, stat.st_mtime + 10))
+    registry = PluginRegistry(folders, manifest=manifest)
+    registry.refresh()
+    assert registry.num_scanned == 0
+
+    device_file.write_text(device_file.read_text().replace('DerivedRegistryTestDevice', 'RenamedDevice'))
+    registry = PluginRegistry(folders, manifest=manifest)
+    registry.refresh()
+    assert registry.num_scanned == 1
+    assert set(registry.entries('device')) == {'RegistryTestDevice', 'RenamedDevice'}
+
+
+def test_classes_are_imported_on_demand(plugin_folder):
+    registry = PluginRegistry({'device': [plugin_folder], 'experiment': [plugin_folder]}, manifest=None)
+    device = registry.create('RegistryTestDevice', name='device')
+    assert device.settings['frequency'] == 1.0
+    assert 'registry_plugins.devices' in sys.modules
+    assert 'registry_plugins.experiments' not in sys.modules
+    with pytest.raises(ImportError):
+        registry.load_class('Helper')
+
+
+def test_lazy_package_attributes(plugin_folder):
+    import registry_plugins
+    registry_plugins.__getattr__, registry_plugins.__dir__ = lazy_attributes(
+        'registry_plugins', {'RegistryTestExperiment': '.experiments'})
+    assert 'RegistryTestExperiment' in dir(registry_plugins)
+    assert 'registry_plugins.experiments' not in sys.modules
+    experiment_class = registry_plugins.RegistryTestExperiment
+    assert experiment_class.__name__ == 'RegistryTestExperiment'
+    assert 'RegistryTestExperiment' in vars(registry_plugins)
+    with pytest.raises(AttributeError):
+        registry_plugins.Missing
+
+
+def test_project_registry_finds_experiments():
+    import src.Model.experiments as experiments
+    registry = PluginRegistry(manifest=None)
+    entries = registry.entries('experiment')
+    assert 'ExampleExperiment' in entries
+    assert experiments.ExampleExperiment.__name__ == 'ExampleExperiment'
+
+
+def test_lazy_package_attribute_fallback(plugin_folder):
+    import registry_plugins
+    registry_plugins.__getattr__, registry_plugins.__dir__ = lazy_attributes(
+        'registry_plugins', {'MissingDriver': '.not_installed', 'OtherDriver': '.not_installed'},
+        fallbacks={'MissingDriver': 'mock'})
+    assert registry_plugins.MissingDriver == 'mock'
+    with pytest.raises(ImportError):
+        registry_plugins.OtherDriver
+
+
+def test_added_folder_is_scanned(plugin_folder, tmp_path):
+    registry = PluginRegistry({'device': [], 'experiment': []}, manifest=None)
+    assert registry.find('RegistryTestDevice') is None
+    registry.add_folder('device', plugin_folder)
+    assert registry.find('RegistryTestDevice', 'device') is not None
+
+
+def test_controller_package_imports_drivers_on_demand():
+    # in a new interpreter, the other tests import the drivers
+    code = ('import sys, src.Controller as controller; '
+            'assert "src.Controller.awg520" not in sys.modules; '
+            'assert controller.AWG520Device.__name__ == "AWG520Device"; '
+            'assert "src.Controller.awg520" in sys.modules; '
+            'assert "src.Controller.pulse_blaster" not in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=str(Path(__file__).resolve().parent.parent))
+
+
+def test_load_device_by_class_name():
+    from src.core import Device
+    devices, failed = Device.load_and_append({'example': 'ExampleDevice'})
+    assert not failed
+    assert type(devices['example']).__name__ == 'ExampleDevice'
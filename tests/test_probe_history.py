@@ -0,0 +1,64 @@
+"""
+Tests for the probe ring buffer and the background probe logger.
+"""
+
+import numpy as np
+import pytest
+
+from src.core.hdf5_store import load_store
+from src.core.probe_history import ProbeHistory, ProbeLogger
+
+
+def test_ring_buffer_keeps_latest_readings_in_order():
+    history = ProbeHistory(capacity=5)
+    for i in range(8):
+        history.append(i, timestamp=100.0 + i)
+    assert len(history) == 5
+    assert list(history) == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert history.latest == 7.0
+    assert history[0] == 3.0
+    np.testing.assert_array_equal(history.times, 100.0 + np.arange(3, 8))
+
+    history.append('not a number')
+    assert np.isnan(history.latest)
+    history.clear()
+    assert len(history) == 0 and history.latest is None
+
+
+def test_decimation_keeps_min_and_max():
+    history = ProbeHistory(capacity=10000)
+    values = np.sin(np.linspace(0, 20, 10000))
+    values[1234] = 5.0  # a spike has to survive the decimation
+    values[4321] = -5.0
+    values[777] = np.nan
+    for i, value in enumerate(values):
+        history.append(value, timestamp=float(i))
+
+    times, decimated = history.decimated(max_points=200)
+    assert len(decimated) <= 200
+    assert np.all(np.diff(times) >= 0)
+    assert np.nanmax(decimated) == 5.0 and np.nanmin(decimated) == -5.0
+    np.testing.assert_array_equal(decimated, values[times.astype(int)])
+
+    short = ProbeHistory(capacity=10)
+    short.append(1.0)
+    assert len(short.decimated(max_points=200)[1]) == 1
+
+
+def test_logger_writes_hdf5_in_background(tmp_path):
+    filename = tmp_path / 'probes.h5'
+    probes_values = {'sg384': {'power': None}, 'adwin': {'count_rate': None, 'temperature': None}}
+    names = ProbeLogger.names_from_values(probes_values)
+    assert names == ['sg384/power', 'adwin/count_rate', 'adwin/temperature']
+
+    logger = ProbeLogger(filename, names, flush_every=4)
+    for i in range(10):
+        logger.log({'sg384': {'power': -float(i)}, 'adwin': {'count_rate': 10.0 * i}}, timestamp=float(i))
+    logger.close(timeout=10)
+    assert not logger.is_running and logger.error is None
+
+    data = load_store(filename)
+    np.testing.assert_array_equal(data['time'], np.arange(10.0))
+    np.testing.assert_array_equal(data['sg384/power'], -np.arange(10.0))
+    np.testing.assert_array_equal(data['adwin/count_rate'], 10.0 * np.arange(10))
+    assert np.all(np.isnan(data['adwin/temperature']))
@@ -0,0 +1,65 @@
+"""
+Tests for the batched probe reads and the probe cache of the Device base class.
+"""
+
+from src.core import Device, Parameter, Probe
+
+
+class CountingDevice(Device):
+    _DEFAULT_SETTINGS = Parameter([Parameter('frequency', 1.0, float, 'frequency')])
+    _PROBES = {'power': 'measured power', 'temperature': 'temperature'}
+
+    def __init__(self, name=None, settings=None):
+        super().__init__(name, settings)
+        self.reads = []
+
+    def update(self, settings):
+        super().update(settings)
+
+    def read_probes(self, key=None):
+        self.reads.append(key)
+        return {'power': self.settings['frequency'], 'temperature': 4.0}[key]
+
+
+class BulkDevice(CountingDevice):
+    def _read_probes_many(self, keys):
+        self.reads.append(tuple(keys))
+        return {key: 2.0 for key in keys}
+
+
+def test_reads_every_time_without_ttl():
+    device = CountingDevice()
+    assert device.read_probes_many() == {'power': 1.0, 'temperature': 4.0}
+    assert device.read_probes_many(['temperature']) == {'temperature': 4.0}
+    assert device.reads == ['power', 'temperature', 'temperature']
+
+
+def test_ttl_cache_shares_reads():
+    device = CountingDevice()
+    device.probe_cache_ttl = 10.
+    device.read_probes_many(['power'])
+    assert device.read_probes_many(['temperature', 'power']) == {'temperature': 4.0, 'power': 1.0}
+    assert device.reads == ['power', 'temperature']
+
+    # reads through the probes also use the cache
+    probe = Probe(device, 'power')
+    assert probe.value == 1.0
+    assert device.reads == ['power', 'temperature']
+
+    device.read_probes_many(['power'], max_age=0)
+    assert device.reads == ['power', 'temperature', 'power']
+
+    # an update invalidates the cached values
+    device.update({'frequency': 3.0})
+    assert device.read_probes_many(['power']) == {'power': 3.0}
+    assert device.reads[-1] == 'power'
+
+
+def test_bulk_override_and_probe_values():
+    device = BulkDevice(name='bulk')
+    other = CountingDevice(name='other')
+    probes = {'p': Probe(device, 'power'), 't': Probe(device, 'temperature'), 'o': Probe(other, 'power')}
+    values = Probe.read_values(probes)
+    assert values == {'p': 2.0, 't': 2.0, 'o': 1.0}
+    assert device.reads == [('power', 'temperature')]
+    assert list(probes['t'].buffer) == [2.0]
@@ -0,0 +1,78 @@
+"""
+Tests for the concurrent probe scheduler of ReadProbes.
+"""
+
+import threading
+import time
+
+from src.core import Device, Parameter, Probe
+from src.core.probe import probes_to_dict
+from src.core.read_probes import ReadProbes
+
+
+class TimedDevice(Device):
+    _DEFAULT_SETTINGS = Parameter([Parameter('delay', 0.0, float, 'time a read takes')])
+    _PROBES = {'fast': 'fast probe', 'slow': 'slow probe'}
+
+    def __init__(self, name=None, settings=None):
+        super().__init__(name, settings)
+        self.reads = {'fast': 0, 'slow': 0}
+        self.release = threading.Event()
+        self.release.set()
+
+    def read_probes(self, key=None):
+        self.release.wait()
+        time.sleep(self.settings['delay'])
+        self.reads[key] += 1
+        return self.reads[key]
+
+
+def run_for(reader, seconds):
+    thread = threading.Thread(target=reader.run)
+    thread.start()
+    time.sleep(seconds)
+    reader._stop = True
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+
+
+def test_probes_are_read_with_their_own_period():
+    device = TimedDevice(name='dev')
+    probes = {'dev': {'fast': Probe(device, 'fast', refresh_interval=0.05), 'slow': Probe(device, 'slow')}}
+    reader = ReadProbes(probes, refresh_interval=10.0, min_update_interval=0.)
+    assert reader.probes_values == {'dev': {'fast': None, 'slow': None}}
+    run_for(reader, 0.6)
+    assert device.reads['slow'] == 1
+    assert device.reads['fast'] >= 5
+    assert reader.probes_values['dev'] == {'fast': device.reads['fast'], 'slow': 1}
+
+
+def test_hung_device_does_not_stall_the_others():
+    hung, fast = TimedDevice(name='hung'), TimedDevice(name='fast')
+    hung.release.clear()
+    probes = {'hung': {'fast': Probe(hung, 'fast', refresh_interval=0.05)},
+              'fast': {'fast': Probe(fast, 'fast', refresh_interval=0.05)}}
+    reader = ReadProbes(probes, refresh_interval=1.0, device_timeout=0.1, min_update_interval=0.)
+    try:
+        run_for(reader, 0.5)
+        assert fast.reads['fast'] >= 4
+        assert reader.timed_out_devices == {'hung'}
+        assert reader.probes_values['hung']['fast'] is None
+        assert reader.probes_values['fast']['fast'] >= 4
+    finally:
+        hung.release.set()
+
+
+def test_refresh_interval_is_saved_and_loaded():
+    device = TimedDevice(name='dev')
+    probes = {'dev': {'fast': Probe(device, 'fast', refresh_interval=0.05), 'slow': Probe(device, 'slow')}}
+    assert probes['dev']['slow'].to_dict() == {'dev': 'slow'}
+    probe_dict = probes['dev']['fast'].to_dict()
+    assert probe_dict == {'dev': {'fast': {'refresh_interval': 0.05}}}
+
+    loaded, failed, _ = Probe.load_and_append(probe_dict, {'dev': {}}, {'dev': device})
+    assert not failed and loaded['dev']['fast'].refresh_interval == 0.05
+    loaded, failed, _ = Probe.load_and_append({'dev': 'fast,slow'}, {'dev': {}}, {'dev': device})
+    assert not failed and [probe.refresh_interval for probe in loaded['dev'].values()] == [None, None]
+    assert probes_to_dict(loaded) == {'dev': 'fast,slow'}
+    assert probes_to_dict(probes) == {'dev': {'fast': {'refresh_interval': 0.05}, 'slow': {}}}
@@ -0,0 +1,133 @@
+"""
+Tests for the background save pipeline and its use in Experiment.run.
+"""
+
+import os
+import threading
+from collections import deque
+
+import numpy as np
+import pytest
+
+from src.core.experiment import Experiment
+from src.core.parameter import Parameter
+from src.core.save_pipeline import SavePipeline, snapshot
+
+
+class SavingExperiment(Experiment):
+    """Minimal experiment that produces array data."""
+
+    _DEFAULT_SETTINGS = [
+        Parameter('points', 5, int, 'number of points')
+    ]
+
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        self.data = {'x': np.arange(self.settings['points']),
+                     'counts': np.ones(self.settings['points'])}
+        self.log('acquired')
+
+    def _render_images(self):
+        # no plots, keeps the test independent of a QApplication
+        return [None, None]
+
+
+@pytest.fixture
+def pipeline():
+    pipeline = SavePipeline(max_workers=2, max_pending=2)
+    yield pipeline
+    pipeline.shutdown()
+
+
+def test_snapshot_is_independent():
+    original = {'a': np.zeros(3), 'b': [1, {'c': np.ones(2)}], 'd': deque([1, 2], maxlen=5)}
+    copy = snapshot(original)
+
+    original['a'][0] = 5
+    original['b'][1]['c'][0] = 7
+    original['d'].append(3)
+
+    assert copy['a'][0] == 0
+    assert copy['b'][1]['c'][0] == 1
+    assert list(copy['d']) == [1, 2]
+    assert copy['d'].maxlen == 5
+
+
+def test_flush_waits_for_jobs(pipeline):
+    results = []
+    release = threading.Event()
+
+    def job(value):
+        release.wait(5)
+        results.append(value)
+
+    pipeline.submit(job, 1)
+    pipeline.submit(job, 2)
+    assert pipeline.pending_count == 2
+
+    release.set()
+    assert pipeline.flush(timeout=5) == []
+    assert sorted(results) == [1, 2]
+    assert pipeline.pending_count == 0
+
+
+def test_submit_blocks_when_queue_is_full(pipeline):
+    release = threading.Event()
+    submitted = threading.Event()
+
+    for _ in range(pipeline.max_pending):
+        pipeline.submit(release.wait, 5)
+
+    def submit_one_more():
+        pipeline.submit(lambda: None)
+        submitted.set()
+
+    thread = threading.Thread(target=submit_one_more)
+    thread.start()
+    assert not submitted.wait(0.2)
+
+    release.set()
+    assert submitted.wait(5)
+    thread.join()
+    pipeline.flush(timeout=5)
+
+
+def test_flush_reports_errors(pipeline):
+    def failing_job():
+        raise IOError('disk full')
+
+    pipeline.submit(failing_job, description='failing')
+    errors = pipeline.flush(timeout=5)
+    assert len(errors) == 1
+    assert errors[0][0] == 'failing'
+    assert isinstance(errors[0][1], IOError)
+    assert pipeline.flush(timeout=5) == []
+
+
+def test_flush_reports_error_of_job_that_just_finished(pipeline):
+    def failing_job(index):
+        raise IOError(f'disk full {index}')
+
+    for index in range(50):
+        pipeline.submit(failing_job, index, description=f'failing {index}')
+        errors = pipeline.flush(timeout=5)
+        assert [description for description, _ in errors] == [f'failing {index}']
+
+
+def test_experiment_run_saves_in_background(tmp_path, pipeline):
+    experiment = SavingExperiment(settings={'path': str(tmp_path), 'save': True})
+    experiment.save_pipeline = pipeline
+    experiment.run()
+
+    # run only returns after the pipeline has been flushed
+    assert pipeline.pending_count == 0
+    data_folder = experiment.filename()
+    assert os.path.exists(os.path.join(data_folder, Experiment.RAW_DATA_DIR,
+                                       os.path.basename(experiment.filename('-x.csv'))))
+    assert os.path.exists(experiment.filename('-info.txt'))
+    assert os.path.exists(experiment.filename('.mat'))
+
+    loaded = Experiment.load_data(data_folder)
+    assert np.array_equal(loaded['x'], np.arange(5))
@@ -0,0 +1,201 @@
+"""
+Tests for the persistent SCPI transports, batching and pipelined queries.
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from src.core.scpi_transport import (ScpiError, SocketTransport, VisaTransport, get_transport,
+                                     release_transport)
+
+
+class FakeInstrument:
+    """SCPI server on localhost that answers queries and records the messages it receives"""
+
+    def __init__(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(5)
+        self.server.settimeout(0.1)
+        self.address = self.server.getsockname()
+        self.messages = []
+        self.connections = 0
+        self.error = 0
+        self.values = {'FREQ': '2870000000.0', 'AMPR': '-10.00', 'PHAS': '0.00'}
+        self._connection = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                connection, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            self.connections += 1
+            self._connection = connection
+            connection.settimeout(0.1)
+            buffer = b''
+            while not self._stop.is_set():
+                try:
+                    data = connection.recv(4096)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break
+                if not data:
+                    break
+                buffer += data
+                while b'\n' in buffer:
+                    line, buffer = buffer.split(b'\n', 1)
+                    self.messages.append(line.decode())
+                    for command in line.decode().split(';'):
+                        reply = self._handle(command.strip())
+                        if reply is not None:
+                            connection.sendall((reply + '\n').encode())
+            connection.close()
+
+    def _handle(self, command):
+        name = command.split(' ')[0]
+        if name == 'LERR?':
+            error, self.error = self.error, 0
+            return str(error)
+        if name.endswith('?'):
+            return self.values.get(name[:-1], '0')
+        if name not in self.values:
+            self.error = 110  # command not recognized
+        elif ' ' in command:
+            self.values[name] = command.split(' ', 1)[1]
+        return None
+
+    def drop_connection(self):
+        self._connection.shutdown(socket.SHUT_RDWR)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(5)
+        self.server.close()
+
+
+@pytest.fixture
+def instrument():
+    instrument = FakeInstrument()
+    yield instrument
+    instrument.stop()
+
+
+def test_connection_is_kept_open_and_reopened(instrument):
+    transport = SocketTransport(instrument.address, timeout=2.0)
+    try:
+        for i in range(5):
+            transport.write(f'FREQ {i}e9')
+            assert transport.query('FREQ?') == f'{i}e9'
+        assert instrument.connections == 1
+
+        instrument.drop_connection()
+        time.sleep(0.2)
+        assert transport.query('AMPR?') == '-10.00'
+        assert instrument.connections == 2
+    finally:
+        transport.close()
+
+
+def test_write_after_dropped_connection_is_sent_once(instrument):
+    transport = SocketTransport(instrument.address, timeout=2.0)
+    try:
+        transport.write('FREQ 1e9')
+        assert transport.query('FREQ?') == '1e9'
+        instrument.drop_connection()
+        time.sleep(0.2)
+        transport.write('*TRG')  # the closed connection is noticed before writing
+        assert transport.query('FREQ?') == '1e9'
+        assert instrument.messages.count('*TRG') == 1
+        assert instrument.connections == 2
+    finally:
+        transport.close()
+
+
+def test_only_queries_are_resent_after_a_failure(instrument):
+    class FlakyTransport(SocketTransport):
+        failures = 0
+
+        def _write_raw(self, message):
+            super()._write_raw(message)
+            if self.failures:
+                self.failures -= 1
+                raise socket.timeout('timed out')  # the message was sent, the instrument did not answer
+
+    transport = FlakyTransport(instrument.address, timeout=2.0)
+    try:
+        transport.failures = 1
+        with pytest.raises(socket.timeout):
+            transport.write('*TRG')
+        transport.failures = 1
+        assert transport.query('AMPR?') == '-10.00'
+        time.sleep(0.2)
+        assert instrument.messages.count('*TRG') == 1
+        assert instrument.messages.count('AMPR?') == 2
+    finally:
+        transport.close()
+
+
+def test_batch_is_one_message_with_one_error_check(instrument):
+    transport = SocketTransport(instrument.address, timeout=2.0, error_query='LERR?')
+    try:
+        with transport.batch():
+            transport.write('FREQ 3e9')
+            transport.write('AMPR -5')
+            transport.write('PHAS 90')
+        assert instrument.messages == ['FREQ 3e9;AMPR -5;PHAS 90', 'LERR?']
+        assert transport.num_messages == 2
+
+        with pytest.raises(ScpiError):
+            with transport.batch():
+                transport.write('FREQ 2e9')
+                transport.write('BOGUS 1')
+
+        # a query inside the batch sees the commands written before it
+        with transport.batch(check_errors=False):
+            transport.write('AMPR -3')
+            assert transport.query('AMPR?') == '-3'
+    finally:
+        transport.close()
+
+
+def test_queries_are_pipelined(instrument):
+    transport = SocketTransport(instrument.address, timeout=2.0)
+    try:
+        assert transport.query_many(['FREQ?', 'AMPR?', 'PHAS?']) == ['2870000000.0', '-10.00', '0.00']
+        assert transport.num_messages == 1
+    finally:
+        transport.close()
+
+
+def test_transports_are_shared_by_address():
+    transport = get_transport(('LAN', '10.0.0.1', 5025), lambda: SocketTransport(('10.0.0.1', 5025)))
+    same = get_transport(('LAN', '10.0.0.1', 5025), lambda: SocketTransport(('10.0.0.1', 5025)))
+    assert same is transport
+    release_transport(same)
+    release_transport(transport)
+    new = get_transport(('LAN', '10.0.0.1', 5025), lambda: SocketTransport(('10.0.0.1', 5025)))
+    assert new is not transport
+    release_transport(new)
+
+
+def test_visa_transport_spaces_commands():
+    class Resource:
+        def __init__(self):
+            self.times = []
+
+        def write(self, message):
+            self.times.append(time.monotonic())
+
+    resource = Resource()
+    transport = VisaTransport(resource, separator=None, min_interval=0.05)
+    transport.write_many(['f1000', 'a0', 'x1'])
+    assert len(resource.times) == 3
+    assert min(later - earlier for earlier, later in zip(resource.times, resource.times[1:])) >= 0.05
@@ -322,6 +322,28 @@ class TestSG384Generator:
         mock_sg384._set_sweep_deviation(1e6)
         mock_sg384._send.assert_called_with("SDEV 1000000.0")
     
+    def test_list_mode_upload_is_cached(self, mock_sg384):
+        """Test that a frequency list is only uploaded when it changed."""
+        mock_sg384._query.return_value = '1'
+        frequencies = [2.80e9, 2.85e9, 2.90e9]
+
+        assert mock_sg384.load_list(frequencies, powers=-10.0) is True
+        sent = [call.args[0] for call in mock_sg384._send.call_args_list]
+        mock_sg384._query.assert_called_once_with('LSTC? 3')
+        assert sent[-1] == 'LSTP 2,2900000000.0,N,N,N,-10.0,N,N,N,N,N,N,N,N,N,N'
+        assert len([command for command in sent if command.startswith('LSTP')]) == 3
+
+        # the same table only goes back to the first point
+        mock_sg384._send.reset_mock()
+        assert mock_sg384.load_list(frequencies, powers=-10.0) is False
+        mock_sg384._send.assert_called_once_with('LSTI 0')
+
+        assert mock_sg384.load_list(frequencies, powers=-5.0) is True
+        assert mock_sg384.load_list(frequencies, powers=-5.0, force=True) is True
+
+        with pytest.raises(ValueError):
+            mock_sg384.load_list([5.0e9])
+
     def test_update_method(self, mock_sg384):
         """Test the update method integration."""
         # Mock the dispatch_update method
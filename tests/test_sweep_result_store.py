@@ -0,0 +1,122 @@
+"""
+Tests for the copy-on-write result storage of ExperimentIterator sweeps.
+"""
+
+import copy
+
+import numpy as np
+import pytest
+
+from src.core import Parameter
+from src.core.experiment import Experiment
+from src.core.experiment_iterator import ExperimentIterator
+from src.core.sweep_result_store import SweepResultStore
+
+
+class TraceExperiment(Experiment):
+    """Experiment that refills the same array in place at every run."""
+
+    _DEFAULT_SETTINGS = [
+        Parameter('frequency', 2.87e9, float, 'frequency in Hz'),
+        Parameter('points', 5, int, 'number of points'),
+        Parameter('sub', [Parameter('gain', 1.0, float, 'gain')])
+    ]
+
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def __init__(self, name=None, settings=None):
+        super().__init__(name=name, settings=settings)
+        self.trace = np.zeros(self.settings['points'])
+        self.data = {'trace': self.trace, 'peak': 0.0}
+
+    def _function(self):
+        self.trace[:] = self.settings['frequency']
+        self.data['peak'] = float(self.settings['frequency'])
+
+
+class TraceSweep(ExperimentIterator):
+    _EXPERIMENTS = {'trace': TraceExperiment}
+    _DEFAULT_SETTINGS = [
+        Parameter('experiment_order', {'trace': 1}),
+        Parameter('experiment_execution_freq', {'trace': 1}),
+        Parameter('sweep_param', 'trace.frequency', ['trace.frequency'], 'variable over which to sweep'),
+        Parameter('sweep_range', [Parameter('min_value', 1.0, float, 'min parameter value'),
+                                  Parameter('max_value', 4.0, float, 'max parameter value'),
+                                  Parameter('N/value_step', 4, float, 'number of steps'),
+                                  Parameter('randomize', False, bool, 'randomize the sweep parameters')]),
+        Parameter('stepping_mode', 'N', ['N', 'value_step'], 'Switch between number of steps and step amount'),
+        Parameter('run_all_first', True, bool, 'Run all experiments with nonzero frequency in first pass')
+    ]
+    _DEVICES = {}
+
+
+def test_settings_share_base_and_store_diffs():
+    store = SweepResultStore([1.0, 2.0])
+    settings = Parameter([Parameter('tag', 'a', str, ''), Parameter('sub', [Parameter('gain', 1.0, float, '')]),
+                          Parameter('frequency', 1.0, float, '')])
+
+    first = store.add_settings('exp', 'a', settings)
+    settings['tag'] = 'b'
+    settings['frequency'] = 2.0
+    second = store.add_settings('exp', 'b', settings)
+
+    assert store.settings_diff('exp', 'a') == {}
+    assert store.settings_diff('exp', 'b') == {('tag',): 'b', ('frequency',): 2.0}
+    assert first['frequency'] == 1.0 and second['frequency'] == 2.0
+    # unchanged sub dictionaries are shared instead of copied
+    assert second['sub'] is store.base_settings('exp')['sub']
+    assert type(second) is dict
+
+
+def test_arrays_are_written_into_cube():
+    store = SweepResultStore([1.0, 2.0, 3.0])
+    trace = np.arange(4.0)
+    for i in range(3):
+        trace[:] = i
+        store.add_point('exp', i, 'p{:d}'.format(i), {'trace': trace, 'fit': [i]}, {}, {})
+
+    values, cube = store.cube('exp', 'trace')
+    assert cube.shape == (3, 4)
+    assert np.array_equal(cube[:, 0], [0, 1, 2])
+    assert np.array_equal(store['p1'][0]['trace'], np.ones(4))
+    assert np.shares_memory(store['p1'][0]['trace'], cube)
+    with pytest.raises(ValueError):
+        store['p1'][0]['trace'][0] = 5
+    assert store['p2'][0]['fit'] == [2]
+
+
+def test_shape_change_falls_back_to_copy():
+    store = SweepResultStore([1.0, 2.0])
+    store.add_point('exp', 0, 'a', {'peaks': np.zeros(2)}, {}, {})
+    store.add_point('exp', 1, 'b', {'peaks': np.ones(3)}, {}, {})
+    assert store['b'][0]['peaks'].shape == (3,)
+    assert np.array_equal(store['a'][0]['peaks'], np.zeros(2))
+
+
+def test_deepcopy_keeps_type():
+    store = SweepResultStore([1.0])
+    store.add_point('exp', 0, 'a', {'trace': np.zeros(2)}, store.add_settings('exp', 'a', {'x': 1}), {})
+    copied = copy.deepcopy(store)
+    assert isinstance(copied, SweepResultStore)
+    assert copied.settings_diff('exp', 'a') == {}
+    assert np.array_equal(copied['a'][0]['trace'], np.zeros(2))
+
+
+def test_sweep_keeps_each_point():
+    iterator = TraceSweep(experiments={'trace': TraceExperiment(name='trace')}, name='sweep')
+    iterator._function()
+
+    assert isinstance(iterator.data, SweepResultStore)
+    assert len(iterator.data) == 4
+    for tag, (data, settings, scan_info) in iterator.data.items():
+        value = scan_info['scan_current_value_iterator_1']
+        assert np.all(data['trace'] == value)
+        assert data['peak'] == value
+        assert settings['frequency'] == value
+        assert settings['tag'] == tag
+
+    values, cube = iterator.data.cube('trace', 'trace')
+    assert np.array_equal(cube[:, 0], values)
+    # the subexperiment settings are restored after the sweep
+    assert iterator.experiments['trace'].settings['tag'] == 'trace'
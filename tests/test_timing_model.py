@@ -0,0 +1,111 @@
+"""
+Tests for the persistent timing model that predicts experiment durations.
+"""
+
+import datetime
+
+import pytest
+
+from src.core import Parameter
+from src.core.experiment import Experiment
+from src.core.experiment_iterator import ExperimentIterator
+from src.core.timing_model import TimingModel, duration_features, queue_schedule
+
+
+class CountingExperiment(Experiment):
+    _DEFAULT_SETTINGS = [
+        Parameter('points', 10, int, 'number of points'),
+        Parameter('averages', 2, int, 'number of averages'),
+        Parameter('integration', [Parameter('time_per_pt', 0.1, float, 'integration time in s')]),
+        Parameter('power', -10.0, float, 'microwave power in dBm')
+    ]
+    _DEVICES = {}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        self.data = {'counts': self.settings['points']}
+
+
+def test_duration_features():
+    experiment = CountingExperiment(name='counting')
+    features = experiment.timing_features()
+    assert features == {'points': 10., 'averages': 2., 'integration.time_per_pt': 0.1}
+    assert duration_features(experiment.settings, ['averages', 'missing']) == {'averages': 2.}
+
+
+def test_duration_keywords_are_whole_words():
+    settings = {'N': 4, 'n': 4, 'num_points': 10, 'repetitions_per_point': 5, 'reps': 3, 'count_time': 0.1,
+                'settle_time': 0.01, 'report_interval': 1.0, 'timeout': 10.0, 'noise_level': 0.5, 'nv_index': 2,
+                'represent': 1, 'amplitude': 0.3}
+    assert set(duration_features(settings)) == {'N', 'n', 'num_points', 'repetitions_per_point', 'reps', 'count_time',
+                                                'settle_time'}
+
+
+def test_exact_match_and_persistence(tmp_path):
+    filename = tmp_path / 'timing.json'
+    model = TimingModel(filename)
+    assert model.predict('CountingExperiment', {'points': 10.}) is None
+
+    model.record('CountingExperiment', {'points': 10.}, 4.)
+    model.record('CountingExperiment', {'points': 10.}, 6.)
+    assert model.predict('CountingExperiment', {'points': 10.}) == pytest.approx(5.)
+    assert not filename.exists()  # written by flush, not by every record
+
+    model.flush()
+    reloaded = TimingModel(filename)
+    assert reloaded.num_records('CountingExperiment') == 2
+    assert reloaded.predict('CountingExperiment', {'points': 10.}) == pytest.approx(5.)
+
+
+def test_power_law_extrapolation():
+    model = TimingModel()
+    for points in [10, 20, 40]:
+        for averages in [1, 2]:
+            model.record('Scan', {'points': points, 'averages': averages}, 0.5 * points * averages)
+    assert model.predict('Scan', {'points': 100, 'averages': 3}) == pytest.approx(150., rel=1e-6)
+
+    # too little history for a fit, the closest run is used
+    model.record('Other', {'points': 10}, 3.)
+    assert model.predict('Other', {'points': 12}) == pytest.approx(3.)
+
+
+def test_run_records_and_predicts():
+    model = TimingModel()
+    experiment = CountingExperiment(name='counting')
+    experiment.timing_model = model
+    assert experiment.predicted_duration() is None
+
+    experiment.run()
+    assert model.num_records('CountingExperiment') == 1
+    assert experiment.predicted_duration() == pytest.approx(experiment.excecution_time.total_seconds())
+
+    # the prediction dominates the remaining time at the start of a run
+    experiment._predicted_duration = 100.
+    experiment.start_time = datetime.datetime.now()
+    experiment.progress = 1
+    assert experiment.remaining_time.total_seconds() == pytest.approx(99., abs=1.)
+
+
+def test_iterator_prediction_and_queue_schedule():
+    model = TimingModel()
+    model.record('CountingExperiment', CountingExperiment(name='counting').timing_features(), 2.)
+
+    loop_class = type('CountingLoop', (ExperimentIterator,), {
+        '_EXPERIMENTS': {'counting': CountingExperiment},
+        '_DEVICES': {},
+        '_DEFAULT_SETTINGS': ExperimentIterator.get_default_settings(
+            {'counting': CountingExperiment}, [Parameter('counting', 0, int, '')],
+            [Parameter('counting', 1, int, '')], 'loop')
+    })
+    counting = CountingExperiment(name='counting')
+    loop = loop_class(experiments={'counting': counting}, name='loop', settings={'num_loops': 5})
+    for experiment in (counting, loop):
+        experiment.timing_model = model
+    assert loop.predicted_duration() == pytest.approx(10.)
+
+    start = datetime.datetime(2026, 1, 1, 22, 0, 0)
+    unknown = CountingExperiment(name='unknown', settings={'points': 11})
+    unknown.timing_model = TimingModel()
+    schedule = queue_schedule([loop, counting, unknown, counting], start=start)
+    assert [end for _, end in schedule] == [start + datetime.timedelta(seconds=10),
+                                            start + datetime.timedelta(seconds=12), None, None]
@@ -0,0 +1,121 @@
+"""
+Tests for the span tracing instrumentation and the Chrome trace export.
+"""
+
+import json
+import threading
+
+import pytest
+
+from src.core import Device, Parameter, tracing
+from src.core.experiment import Experiment
+
+
+@pytest.fixture(autouse=True)
+def clean_trace():
+    tracing.disable_tracing()
+    tracing.clear_trace()
+    yield
+    tracing.disable_tracing()
+    tracing.clear_trace()
+
+
+class TracedDevice(Device):
+    _DEFAULT_SETTINGS = Parameter([Parameter('frequency', 1.0, float, 'frequency')])
+    _PROBES = {'power': 'measured power'}
+
+    def update(self, settings):
+        super().update(settings)
+
+    def read_probes(self, key=None):
+        return 1.0
+
+
+class TracedExperiment(Experiment):
+    _DEFAULT_SETTINGS = []
+    _DEVICES = {'device': TracedDevice}
+    _EXPERIMENTS = {}
+
+    def _function(self):
+        with tracing.span('acquire', 'experiment', points=3):
+            self.devices['device']['instance'].update({'frequency': 2.0})
+            self.data = {'power': self.devices['device']['instance'].read_probes('power')}
+
+
+def test_disabled_tracing_records_nothing():
+    with tracing.span('nothing'):
+        pass
+    assert tracing.span('nothing') is tracing.span('other')
+    TracedDevice().update({'frequency': 3.0})
+    assert tracing.get_trace_events() == []
+
+
+def test_spans_nest_and_record_threads():
+    tracing.enable_tracing()
+
+    @tracing.traced(category='analysis')
+    def inner():
+        return 42
+
+    with tracing.span('outer', 'test', label='a'):
+        assert inner() == 42
+    thread = threading.Thread(target=inner, name='worker')
+    thread.start()
+    thread.join()
+
+    events = tracing.get_trace_events()
+    names = [event['name'] for event in events]
+    assert names[0].endswith('inner') and names[1] == 'outer'
+    inner_event, outer_event = events[0], events[1]
+    assert outer_event['ts'] <= inner_event['ts']
+    assert inner_event['ts'] + inner_event['dur'] <= outer_event['ts'] + outer_event['dur']
+    assert outer_event['args'] == {'label': 'a'}
+    assert events[2]['tid'] != events[0]['tid']
+
+
+def test_exception_is_recorded():
+    tracing.enable_tracing()
+    with pytest.raises(ValueError):
+        with tracing.span('failing'):
+            raise ValueError('boom')
+    assert tracing.get_trace_events()[0]['args'] == {'error': 'ValueError'}
+
+
+def test_experiment_run_and_chrome_export(tmp_path):
+    tracing.enable_tracing()
+    device = TracedDevice(name='device')
+    experiment = TracedExperiment(devices={'device': {'instance': device}}, name='traced')
+    experiment.run()
+
+    filename = tmp_path / 'trace.json'
+    count = tracing.export_chrome_trace(filename)
+    trace = json.loads(filename.read_text())
+    spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    assert len(spans) == count
+    names = {event['name'] for event in spans}
+    assert {'traced.setup', 'traced._function', 'acquire', 'TracedDevice.update', 'TracedDevice.read_probes'} <= names
+    assert any(event['ph'] == 'M' and event['name'] == 'thread_name' for event in trace['traceEvents'])
+
+    by_name = {event['name']: event for event in spans}
+    function_span, device_span = by_name['traced._function'], by_name['TracedDevice.update']
+    assert function_span['ts'] <= device_span['ts']
+    assert device_span['ts'] + device_span['dur'] <= function_span['ts'] + function_span['dur']
+    assert device_span['cat'] == 'device'
+
+
+def test_saved_run_writes_trace(tmp_path):
+    device = TracedDevice(name='device')
+    experiment = TracedExperiment(devices={'device': {'instance': device}}, name='traced',
+                                  settings={'path': str(tmp_path), 'tag': 'traced', 'save': True})
+    experiment.run()
+    assert not list(tmp_path.rglob('*-trace.json'))
+
+    tracing.enable_tracing()
+    with tracing.span('before the run'):
+        pass
+    experiment.run()
+    filename = experiment.filename('-trace.json')
+    trace = json.loads(open(filename).read())
+    names = {event['name'] for event in trace['traceEvents'] if event['ph'] == 'X'}
+    assert {'traced.setup', 'traced._function', 'TracedDevice.update'} <= names
+    assert 'before the run' not in names
@@ -0,0 +1,51 @@
+"""
+Tests for the cached unit conversions in src.core.unit_utils.
+"""
+
+import numpy as np
+import pint
+import pytest
+
+from src import ur
+from src.core.parameter import Parameter
+from src.core.unit_utils import UnitConverter, convert_magnitude, convert_to_common_unit, conversion_factor
+
+
+def test_factors_match_pint():
+    converter = UnitConverter()
+    for source, target in [('ns', 'us'), ('ms', 's'), ('Hz', 'GHz'), ('mV', 'V'), ('kohm', 'ohm')]:
+        expected = ur.Quantity(3.7, source).to(target).magnitude
+        assert converter.convert(3.7, source, target) == pytest.approx(expected, rel=1e-15)
+    assert ('ns', 'us') in converter._factors
+
+
+def test_arrays_and_offset_units():
+    delays = np.array([100, 250, 500])
+    np.testing.assert_allclose(convert_magnitude(delays, 'ns', 'us'), [0.1, 0.25, 0.5])
+    np.testing.assert_allclose(convert_magnitude([1, 2], 'ms', 'us'), [1000, 2000])
+
+    assert conversion_factor('degC', 'K') is None
+    assert convert_magnitude(25.0, 'degC', 'K') == pytest.approx(298.15)
+    assert conversion_factor('dBm', 'mW') is None
+    assert convert_magnitude(0.0, 'dBm', 'mW') == pytest.approx(1.0)
+
+
+def test_errors():
+    with pytest.raises(ValueError):
+        convert_magnitude(1.0, 'not_a_unit', 's')
+    with pytest.raises(pint.DimensionalityError):
+        convert_magnitude(1.0, 'Hz', 'V')
+
+
+def test_convert_to_common_unit():
+    frequency = convert_to_common_unit(2.87e9 * ur.Hz, 'MHz')
+    assert frequency.units == ur.MHz
+    assert frequency.magnitude == pytest.approx(2870.0)
+    assert convert_to_common_unit(5.0, 'MHz') == 5.0
+
+
+def test_parameter_conversion_follows_value():
+    p = Parameter('delay', 100 * ur.ns, float, 'delay')
+    assert p.get_value_in_units('us').magnitude == pytest.approx(0.1)
+    p['delay'] = 200 * ur.ns
+    assert p.get_value_in_units('us').magnitude == pytest.approx(0.2)